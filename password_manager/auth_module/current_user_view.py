@@ -37,7 +37,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from security.authentication import EscalationAwareJWTAuthentication
 
 
 class CurrentUserView(APIView):
@@ -68,7 +69,7 @@ class CurrentUserView(APIView):
 
     # Tuples so Ruff RUF012 (mutable class-attr) doesn't flag, and so
     # a stray `+=` on the class can't mutate the shared default.
-    authentication_classes = (JWTAuthentication, TokenAuthentication)
+    authentication_classes = (EscalationAwareJWTAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
 
     def get(self, request: Request) -> Response:
@@ -44,6 +44,7 @@ from .models import KyberKeyPair, KyberEncryptedPassword, KyberSession
 from .services.parallel_kyber import ParallelKyberOperations, get_parallel_kyber
 from .services.kyber_cache import KyberCacheManager, get_kyber_cache
 from .services.kyber_crypto import get_crypto_status, production_kyber
+from .services.kyber_reservoir import get_kyber_reservoir
 from .services.optimized_ntt import get_optimized_ntt
 from django.db.models import Max
 
@@ -76,9 +77,8 @@ def get_user_keypair(user, version: int = None, create_if_missing: bool = False)
         keypair = query.order_by('-key_version').first()
         
         if keypair is None and create_if_missing:
-            # Generate new keypair
-            kyber_ops = get_parallel_kyber()
-            new_keypair = kyber_ops.generate_keypair()
+            # Take a pre-generated keypair from the reservoir
+            public_key, private_key = get_kyber_reservoir().acquire_keypair()
             
             # Get next version number
             max_version = KyberKeyPair.objects.filter(user=user).aggregate(
@@ -87,8 +87,8 @@ def get_user_keypair(user, version: int = None, create_if_missing: bool = False)
             
             keypair = KyberKeyPair.objects.create(
                 user=user,
-                public_key=base64.b64decode(new_keypair['public_key']),
-                private_key=base64.b64decode(new_keypair['private_key']),
+                public_key=public_key,
+                private_key=private_key,
                 key_version=max_version + 1,
                 algorithm='Kyber768',
                 security_level=3
@@ -214,12 +214,9 @@ async def generate_keypair_view(request):
                 'message': 'Returned cached public key'
             })
         
-        # Generate new keypair
-        kyber_ops = get_parallel_kyber()
-        keypair = kyber_ops.generate_keypair()
-        
-        public_key_bytes = base64.b64decode(keypair['public_key'])
-        private_key_bytes = base64.b64decode(keypair['private_key'])
+        # Take a pre-generated keypair from the reservoir
+        reservoir = get_kyber_reservoir()
+        public_key_bytes, private_key_bytes = reservoir.acquire_keypair()
         
         key_version = 1
         
@@ -236,11 +233,11 @@ async def generate_keypair_view(request):
         
         return Response({
             'status': 'success',
-            'public_key': keypair['public_key'],
-            'public_key_size': keypair['public_key_size'],
+            'public_key': base64.b64encode(public_key_bytes).decode('utf-8'),
+            'public_key_size': len(public_key_bytes),
             'key_version': key_version,
             'algorithm': algorithm,
-            'is_quantum_resistant': keypair['is_real_pqc'],
+            'is_quantum_resistant': reservoir.is_real_pqc,
             'generation_time_ms': elapsed * 1000,
             'cached': False
         })
@@ -675,7 +672,8 @@ def get_kyber_metrics(request):
             "status": "success",
             "parallel_metrics": {...},
             "cache_metrics": {...},
-            "ntt_metrics": {...}
+            "ntt_metrics": {...},
+            "reservoir_metrics": {...}
         }
     """
     try:
@@ -687,7 +685,8 @@ def get_kyber_metrics(request):
             'status': 'success',
             'parallel_metrics': kyber_ops.get_metrics(),
             'cache_metrics': cache_manager.get_metrics(),
-            'ntt_metrics': ntt.get_metrics()
+            'ntt_metrics': ntt.get_metrics(),
+            'reservoir_metrics': get_kyber_reservoir().get_metrics()
         })
         
     except Exception as e:
@@ -710,6 +709,7 @@ def reset_kyber_metrics(request):
         kyber_ops.reset_metrics()
         cache_manager.reset_metrics()
         ntt.reset_metrics()
+        get_kyber_reservoir().reset_metrics()
         
         return Response({
             'status': 'success',
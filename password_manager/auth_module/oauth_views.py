@@ -16,6 +16,7 @@ from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.github.views import GitHubOAuth2Adapter
 from allauth.socialaccount.providers.apple.views import AppleOAuth2Adapter
 from dj_rest_auth.registration.views import SocialLoginView, SocialConnectView
+from security.authentication import stamp_auth_time
 from .services.authy_service import authy_service
 from django.contrib.auth.models import User
 import logging
@@ -28,7 +29,7 @@ def get_tokens_for_user(user):
     """
     Generate JWT tokens for a user
     """
-    refresh = RefreshToken.for_user(user)
+    refresh = stamp_auth_time(RefreshToken.for_user(user))
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
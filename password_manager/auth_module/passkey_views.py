@@ -23,6 +23,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from password_manager.api_utils import error_response, success_response
+from security.authentication import stamp_auth_time
 from django.conf import settings
 
 # Setup logging
@@ -437,7 +438,7 @@ def webauthn_complete_authentication(request):
         login(request, user)
         
         # Generate JWT tokens for API access
-        refresh = RefreshToken.for_user(user)
+        refresh = stamp_auth_time(RefreshToken.for_user(user))
         access_token = str(refresh.access_token)
         refresh_token = str(refresh)
         
@@ -14,7 +14,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from security.authentication import EscalationAwareJWTAuthentication
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db import transaction
@@ -45,7 +45,7 @@ class QuantumRecoveryViewSet(viewsets.ViewSet):
     """
     ViewSet for Quantum-Resilient Recovery System
     """
-    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    authentication_classes = [EscalationAwareJWTAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated]
 
     # These actions are called during recovery when the user has no session yet
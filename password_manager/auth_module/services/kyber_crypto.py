@@ -282,6 +282,25 @@ class HybridKyberEncryption:
         Returns:
             Dictionary containing all encrypted components
         """
+        kyber_ciphertext, nonce, ciphertext = self.encrypt_raw(
+            plaintext, recipient_public_key, associated_data
+        )
+        return self.package_encrypted(kyber_ciphertext, nonce, ciphertext, associated_data)
+    
+    def encrypt_raw(
+        self,
+        plaintext: bytes,
+        recipient_public_key: bytes,
+        associated_data: Optional[bytes] = None
+    ) -> Tuple[bytes, bytes, bytes]:
+        """
+        Encrypt data and return the raw components without encoding.
+        
+        Used by bulk paths that move results through binary buffers.
+        
+        Returns:
+            (kyber_ciphertext, nonce, aes_ciphertext)
+        """
         # Step 1: Kyber KEM encapsulation
         kyber_ciphertext, shared_secret = self.kyber.encapsulate(recipient_public_key)
         
@@ -300,6 +319,16 @@ class HybridKyberEncryption:
         nonce = os.urandom(12)  # 96-bit nonce
         ciphertext = aesgcm.encrypt(nonce, plaintext, associated_data)
         
+        return kyber_ciphertext, nonce, ciphertext
+    
+    def package_encrypted(
+        self,
+        kyber_ciphertext: bytes,
+        nonce: bytes,
+        ciphertext: bytes,
+        associated_data: Optional[bytes] = None
+    ) -> dict:
+        """Build the encrypted-data dictionary returned by encrypt()."""
         return {
             'kyber_ciphertext': base64.b64encode(kyber_ciphertext).decode('utf-8'),
             'aes_ciphertext': base64.b64encode(ciphertext).decode('utf-8'),
@@ -327,6 +356,25 @@ class HybridKyberEncryption:
         Returns:
             Decrypted plaintext
         """
+        kyber_ciphertext, nonce, aes_ciphertext = self.unpack_encrypted(
+            encrypted_data, associated_data
+        )
+        return self.decrypt_raw(kyber_ciphertext, nonce, aes_ciphertext, private_key, associated_data)
+    
+    def unpack_encrypted(
+        self,
+        encrypted_data: dict,
+        associated_data: Optional[bytes] = None
+    ) -> Tuple[bytes, bytes, bytes]:
+        """
+        Decode the components of an encrypted-data dictionary.
+        
+        Raises:
+            ValueError: If the associated data does not match the stored hash
+        
+        Returns:
+            (kyber_ciphertext, nonce, aes_ciphertext)
+        """
         # Extract components
         kyber_ciphertext = base64.b64decode(encrypted_data['kyber_ciphertext'])
         aes_ciphertext = base64.b64decode(encrypted_data['aes_ciphertext'])
@@ -338,6 +386,22 @@ class HybridKyberEncryption:
             if encrypted_data['aad_hash'] != expected_hash:
                 raise ValueError("Associated data hash mismatch")
         
+        return kyber_ciphertext, nonce, aes_ciphertext
+    
+    def decrypt_raw(
+        self,
+        kyber_ciphertext: bytes,
+        nonce: bytes,
+        aes_ciphertext: bytes,
+        private_key: bytes,
+        associated_data: Optional[bytes] = None
+    ) -> bytes:
+        """
+        Decrypt raw components produced by encrypt_raw().
+        
+        Returns:
+            Decrypted plaintext
+        """
         # Step 1: Kyber KEM decapsulation
         shared_secret = self.kyber.decapsulate(kyber_ciphertext, private_key)
         
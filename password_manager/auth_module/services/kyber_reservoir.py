@@ -0,0 +1,439 @@
+"""
+Kyber Keypair Reservoir
+
+Keeps a pool of ready-made CRYSTALS-Kyber keypairs so enrollment requests
+pop a keypair instead of generating one on the request path.
+
+Features:
+- Local memory or Redis storage (Redis list shared by all workers)
+- Entries encrypted at rest with CryptoService (HKDF + AES-256-GCM)
+- Low-watermark refill from a Celery task or a background thread
+- Stale entries discarded after ENTRY_MAX_AGE
+- Metrics: pool depth, refill rate, request-path misses
+
+Encapsulations depend on the recipient's public key, so only keypairs are
+pooled; encapsulation stays on the request path.
+
+Usage:
+    from auth_module.services.kyber_reservoir import get_kyber_reservoir
+
+    reservoir = get_kyber_reservoir()
+    public_key, private_key = reservoir.acquire_keypair()
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .kyber_crypto import ProductionKyber
+
+logger = logging.getLogger(__name__)
+
+REFILL_MODES = ('celery', 'thread', 'none')
+
+
+# =============================================================================
+# STORAGE BACKENDS
+# =============================================================================
+
+class LocalReservoirStore:
+    """Thread-safe in-process FIFO of encrypted reservoir entries."""
+
+    def __init__(self):
+        self._entries: deque = deque()
+        self._lock = threading.Lock()
+
+    def push_many(self, entries: list):
+        with self._lock:
+            self._entries.extend(entries)
+
+    def pop(self) -> Optional[str]:
+        with self._lock:
+            return self._entries.popleft() if self._entries else None
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisReservoirStore:
+    """Redis list of encrypted reservoir entries shared by all workers."""
+
+    def __init__(self, key: str, redis_cache_alias: str = 'default'):
+        from django_redis import get_redis_connection
+        self._key = key
+        self._redis = get_redis_connection(redis_cache_alias)
+
+    def push_many(self, entries: list):
+        if entries:
+            self._redis.rpush(self._key, *entries)
+
+    def pop(self) -> Optional[str]:
+        value = self._redis.lpop(self._key)
+        if value is None:
+            return None
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def size(self) -> int:
+        return int(self._redis.llen(self._key))
+
+    def clear(self):
+        self._redis.delete(self._key)
+
+
+# =============================================================================
+# RESERVOIR
+# =============================================================================
+
+class KyberKeyReservoir:
+    """
+    Pool of pre-generated Kyber keypairs with watermark-based refill.
+
+    Attributes:
+        capacity: Number of keypairs the refill tops the pool up to
+        low_watermark: Pool depth below which a refill is scheduled
+        refill_mode: 'celery', 'thread' or 'none'
+    """
+
+    RESERVOIR_KEY = 'kyber:reservoir:keypairs'
+    REFILL_LOCK_KEY = 'kyber:reservoir:refill-lock'
+    ENCRYPTION_CONTEXT = 'kyber-reservoir'
+
+    DEFAULT_CAPACITY = 64
+    DEFAULT_LOW_WATERMARK = 16
+
+    # Pooled keys older than this are discarded instead of handed out
+    ENTRY_MAX_AGE = 86400
+
+    # Debounce window for scheduling refills
+    REFILL_LOCK_TTL = 60
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        low_watermark: int = DEFAULT_LOW_WATERMARK,
+        use_redis: bool = False,
+        redis_cache_alias: str = 'default',
+        refill_mode: str = 'thread',
+        kyber: Optional[ProductionKyber] = None
+    ):
+        """
+        Initialize KyberKeyReservoir.
+
+        Args:
+            capacity: Target pool depth after a refill
+            low_watermark: Depth that triggers a refill
+            use_redis: Store the pool in Redis instead of local memory
+            redis_cache_alias: django-redis cache alias for the pool
+            refill_mode: 'celery', 'thread' or 'none' (manual refill only)
+            kyber: ProductionKyber instance (default: new instance)
+        """
+        if refill_mode not in REFILL_MODES:
+            raise ValueError(f"refill_mode must be one of {REFILL_MODES}, got {refill_mode!r}")
+        if not 0 <= low_watermark <= capacity:
+            raise ValueError("low_watermark must be between 0 and capacity")
+
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self.refill_mode = refill_mode
+        self.kyber = kyber or ProductionKyber(allow_simulation=True)
+
+        self._store = self._create_store(use_redis, redis_cache_alias)
+        self._refill_thread: Optional[threading.Thread] = None
+        self._refill_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = self._empty_metrics()
+
+        logger.info(
+            f"KyberKeyReservoir initialized: capacity={capacity}, "
+            f"low_watermark={low_watermark}, store={self.store_type}, refill={refill_mode}"
+        )
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        return {
+            'hits': 0,
+            'misses': 0,
+            'stale_discarded': 0,
+            'refills': 0,
+            'refilled_keys': 0,
+            'total_refill_time': 0.0,
+            'refills_scheduled': 0,
+            'errors': 0
+        }
+
+    def _create_store(self, use_redis: bool, redis_cache_alias: str):
+        """Create the storage backend, falling back to local memory."""
+        if use_redis:
+            try:
+                return RedisReservoirStore(self.RESERVOIR_KEY, redis_cache_alias)
+            except Exception as e:
+                logger.warning(f"Redis reservoir unavailable, using local memory: {e}")
+        return LocalReservoirStore()
+
+    @property
+    def store_type(self) -> str:
+        return 'redis' if isinstance(self._store, RedisReservoirStore) else 'local'
+
+    @property
+    def is_real_pqc(self) -> bool:
+        return self.kyber.is_real_pqc
+
+    def _increment(self, name: str, amount=1):
+        with self._metrics_lock:
+            self._metrics[name] += amount
+
+    # ==========================================================================
+    # ENTRY ENCODING
+    # ==========================================================================
+
+    def _seal(self, public_key: bytes, private_key: bytes) -> Optional[str]:
+        """Encrypt a keypair for storage in the pool."""
+        from security.services.crypto_service import CryptoService
+
+        payload = json.dumps({
+            'public_key': base64.b64encode(public_key).decode('utf-8'),
+            'private_key': base64.b64encode(private_key).decode('utf-8'),
+            'created_at': time.time()
+        })
+        return CryptoService.encrypt_data(payload, user_id=self.ENCRYPTION_CONTEXT)
+
+    def _unseal(self, entry: str) -> Optional[Tuple[bytes, bytes, float]]:
+        """Decrypt a pool entry into (public_key, private_key, created_at)."""
+        from security.services.crypto_service import CryptoService
+
+        payload = CryptoService.decrypt_data(entry, user_id=self.ENCRYPTION_CONTEXT)
+        if payload is None:
+            return None
+        data = json.loads(payload)
+        return (
+            base64.b64decode(data['public_key']),
+            base64.b64decode(data['private_key']),
+            data['created_at']
+        )
+
+    # ==========================================================================
+    # REQUEST PATH
+    # ==========================================================================
+
+    def acquire_keypair(self) -> Tuple[bytes, bytes]:
+        """
+        Take a keypair from the pool, generating one inline on a miss.
+
+        Schedules a refill when the remaining depth drops below the low
+        watermark. A pooled keypair is handed out exactly once.
+
+        Returns:
+            (public_key, private_key)
+        """
+        keypair = None
+
+        try:
+            while keypair is None:
+                entry = self._store.pop()
+                if entry is None:
+                    break
+
+                unsealed = self._unseal(entry)
+                if unsealed is None:
+                    self._increment('errors')
+                    continue
+
+                public_key, private_key, created_at = unsealed
+                if time.time() - created_at > self.ENTRY_MAX_AGE:
+                    self._increment('stale_discarded')
+                    continue
+
+                keypair = (public_key, private_key)
+        except Exception as e:
+            self._increment('errors')
+            logger.error(f"Kyber reservoir pop failed: {e}")
+
+        if keypair is not None:
+            self._increment('hits')
+        else:
+            self._increment('misses')
+            keypair = self.kyber.generate_keypair()
+
+        self._maybe_schedule_refill()
+        return keypair
+
+    def level(self) -> int:
+        """Current pool depth."""
+        try:
+            return self._store.size()
+        except Exception as e:
+            logger.error(f"Kyber reservoir size check failed: {e}")
+            return 0
+
+    # ==========================================================================
+    # REFILL
+    # ==========================================================================
+
+    def refill(self, max_keys: Optional[int] = None) -> int:
+        """
+        Top the pool up to capacity.
+
+        Runs in the Celery task or background thread, never on the
+        request path.
+
+        Args:
+            max_keys: Upper bound on keypairs generated by this call
+
+        Returns:
+            Number of keypairs added
+        """
+        needed = self.capacity - self.level()
+        if max_keys is not None:
+            needed = min(needed, max_keys)
+        if needed <= 0:
+            return 0
+
+        start_time = time.perf_counter()
+        entries = []
+
+        for _ in range(needed):
+            try:
+                public_key, private_key = self.kyber.generate_keypair()
+                entry = self._seal(public_key, private_key)
+                if entry is None:
+                    self._increment('errors')
+                    continue
+                entries.append(entry)
+            except Exception as e:
+                self._increment('errors')
+                logger.error(f"Kyber reservoir keygen failed: {e}")
+
+        self._store.push_many(entries)
+
+        elapsed = time.perf_counter() - start_time
+        with self._metrics_lock:
+            self._metrics['refills'] += 1
+            self._metrics['refilled_keys'] += len(entries)
+            self._metrics['total_refill_time'] += elapsed
+
+        logger.info(f"Kyber reservoir refilled with {len(entries)} keypairs in {elapsed*1000:.2f}ms")
+        return len(entries)
+
+    def _maybe_schedule_refill(self):
+        """Schedule a refill if the pool is below the low watermark."""
+        if self.refill_mode == 'none' or self.level() >= self.low_watermark:
+            return
+
+        if self.refill_mode == 'thread':
+            with self._refill_lock:
+                if self._refill_thread is not None and self._refill_thread.is_alive():
+                    return
+                self._refill_thread = threading.Thread(
+                    target=self._refill_in_background,
+                    name='kyber-reservoir-refill',
+                    daemon=True
+                )
+                self._refill_thread.start()
+        else:
+            # Debounce across workers: one queued refill per lock window
+            if not cache.add(self.REFILL_LOCK_KEY, 1, self.REFILL_LOCK_TTL):
+                return
+            try:
+                from auth_module.tasks import refill_kyber_reservoir
+                refill_kyber_reservoir.delay()
+            except Exception as e:
+                cache.delete(self.REFILL_LOCK_KEY)
+                self._increment('errors')
+                logger.error(f"Could not queue Kyber reservoir refill: {e}")
+                return
+
+        self._increment('refills_scheduled')
+
+    def _refill_in_background(self):
+        try:
+            self.refill()
+        except Exception as e:
+            self._increment('errors')
+            logger.error(f"Background Kyber reservoir refill failed: {e}")
+
+    def release_refill_lock(self):
+        """Allow the next refill to be scheduled (called by the Celery task)."""
+        cache.delete(self.REFILL_LOCK_KEY)
+
+    # ==========================================================================
+    # METRICS AND UTILITIES
+    # ==========================================================================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get reservoir metrics.
+
+        Returns:
+            Dictionary with pool depth, refill rate and request-path misses
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+
+        requests = metrics['hits'] + metrics['misses']
+
+        return {
+            **metrics,
+            'pool_depth': self.level(),
+            'capacity': self.capacity,
+            'low_watermark': self.low_watermark,
+            'store': self.store_type,
+            'refill_mode': self.refill_mode,
+            'hit_rate': f'{(metrics["hits"] / max(requests, 1) * 100):.2f}%',
+            'refill_rate_keys_per_sec': (
+                metrics['refilled_keys'] / metrics['total_refill_time']
+                if metrics['total_refill_time'] > 0 else 0.0
+            ),
+            'is_real_pqc': self.is_real_pqc
+        }
+
+    def reset_metrics(self):
+        """Reset reservoir metrics."""
+        with self._metrics_lock:
+            self._metrics = self._empty_metrics()
+        logger.info("Kyber reservoir metrics reset")
+
+    def clear(self):
+        """Discard every pooled keypair."""
+        self._store.clear()
+
+
+# Global singleton instance
+_global_reservoir = None
+_global_reservoir_lock = threading.Lock()
+
+
+def get_kyber_reservoir() -> KyberKeyReservoir:
+    """
+    Get or create the global KyberKeyReservoir instance.
+
+    Configured from settings.KYBER_RESERVOIR_SETTINGS.
+
+    Returns:
+        Global KyberKeyReservoir instance
+    """
+    global _global_reservoir
+
+    with _global_reservoir_lock:
+        if _global_reservoir is None:
+            config = getattr(settings, 'KYBER_RESERVOIR_SETTINGS', {})
+            _global_reservoir = KyberKeyReservoir(
+                capacity=config.get('CAPACITY', KyberKeyReservoir.DEFAULT_CAPACITY),
+                low_watermark=config.get('LOW_WATERMARK', KyberKeyReservoir.DEFAULT_LOW_WATERMARK),
+                use_redis=config.get('USE_REDIS', False),
+                redis_cache_alias=config.get('REDIS_ALIAS', 'default'),
+                refill_mode=config.get('REFILL_MODE', 'thread')
+            )
+
+    return _global_reservoir
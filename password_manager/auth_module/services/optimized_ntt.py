@@ -5,6 +5,10 @@ This module provides a highly optimized NTT implementation using:
 - Precomputed twiddle factors with caching
 - Vectorized operations with NumPy
 - Cooley-Tukey FFT algorithm with bit-reversal permutation
+- Batched transforms: every butterfly stage runs as a single NumPy
+  operation across all polynomials of a (batch, 256) array or a full
+  Kyber module vector/matrix (k x 256, k x k x 256)
+- Barrett reduction in place of the generic ``%`` operator
 
 Performance: ~6-8x speedup over naive implementation
 
@@ -27,6 +31,15 @@ KYBER_N = 256       # Polynomial degree
 KYBER_Q = 3329      # Modulus
 KYBER_ZETA = 17     # Primitive 256th root of unity mod q
 
+# Barrett reduction: x mod q ~= x - ((x * v) >> shift) * q with v = 2^shift // q.
+# With shift = 32 the estimate is off by at most one q for x < 2^32, which
+# covers every product and lazy sum produced by the butterflies.
+BARRETT_SHIFT = 32
+BARRETT_BOUND = 1 << BARRETT_SHIFT
+
+# Batch sizes used by benchmark_ntt for the single vs. batched comparison
+DEFAULT_BENCHMARK_BATCH_SIZES = (1, 16, 256, 4096)
+
 
 class OptimizedNTT:
     """
@@ -65,6 +78,11 @@ class OptimizedNTT:
         # Precompute Montgomery constants for faster modular arithmetic
         self._inv_n = pow(self.n, -1, self.q)  # Inverse of n mod q
         
+        # Barrett constant and per-stage twiddle vectors for batched butterflies
+        self._barrett_v = BARRETT_BOUND // self.q
+        self._forward_stages = self._precompute_forward_stages()
+        self._inverse_stages = self._precompute_inverse_stages()
+        
         # Performance metrics
         self._forward_count = 0
         self._inverse_count = 0
@@ -118,6 +136,50 @@ class OptimizedNTT:
             table[i] = self._bitrev(i, self.log_n)
         return table
     
+    def _precompute_forward_stages(self) -> List[Tuple[int, np.ndarray]]:
+        """
+        Precompute the twiddle vector of every forward NTT stage.
+        
+        Stage ``length`` has ``n / (2 * length)`` butterfly blocks, each using
+        the next twiddle factor in bit-reversed order. The factors are shaped
+        ``(blocks, 1)`` so they broadcast over a ``(batch, blocks, length)``
+        view of the coefficients.
+        
+        Returns:
+            List of (length, twiddle vector) tuples in execution order
+        """
+        stages = []
+        k = 1
+        length = self.n // 2
+        while length >= 1:
+            blocks = self.n // (2 * length)
+            zetas = self._twiddle_factors[k:k + blocks].reshape(blocks, 1).copy()
+            stages.append((length, zetas))
+            k += blocks
+            length //= 2
+        return stages
+    
+    def _precompute_inverse_stages(self) -> List[Tuple[int, np.ndarray]]:
+        """
+        Precompute the twiddle vector of every inverse NTT stage.
+        
+        Each Gentleman-Sande block undoes the forward block at the same
+        position, so it uses the negated inverse of that block's twiddle:
+        ``(lo + z*hi) - (lo - z*hi) = 2*z*hi`` is recovered by ``-z^(-1)``
+        applied to ``hi' - lo'``. Stages run from length 1 up to n/2.
+        
+        Returns:
+            List of (length, twiddle vector) tuples in execution order
+        """
+        stages = []
+        length = 1
+        while length < self.n:
+            blocks = self.n // (2 * length)
+            zetas = (self.q - self._inv_twiddle_factors[blocks:2 * blocks]) % self.q
+            stages.append((length, zetas.reshape(blocks, 1).copy()))
+            length *= 2
+        return stages
+    
     @staticmethod
     def _bitrev(x: int, width: int) -> int:
         """
@@ -132,12 +194,100 @@ class OptimizedNTT:
         """
         return int(bin(x)[2:].zfill(width)[::-1], 2)
     
+    def _barrett_reduce(self, x: np.ndarray) -> np.ndarray:
+        """
+        Reduce non-negative values below 2^32 modulo q without division.
+        
+        Args:
+            x: int64 array with entries in [0, 2^32)
+            
+        Returns:
+            Array with entries in [0, q)
+        """
+        r = x - ((x * self._barrett_v) >> BARRETT_SHIFT) * self.q
+        return r - self.q * (r >= self.q)
+    
+    def _conditional_subtract(self, x: np.ndarray) -> np.ndarray:
+        """
+        Reduce values in [0, 2q) to [0, q) with a single conditional subtraction.
+        
+        Args:
+            x: int64 array with entries in [0, 2q)
+            
+        Returns:
+            Array with entries in [0, q)
+        """
+        return x - self.q * (x >= self.q)
+    
+    def _as_batch(self, polys: Union[List[int], np.ndarray]) -> Tuple[np.ndarray, Tuple[int, ...]]:
+        """
+        Normalize input into a reduced, contiguous ``(batch, n)`` int64 array.
+        
+        Args:
+            polys: Array-like whose last dimension has length n
+            
+        Returns:
+            Tuple of (2-D array, original shape)
+        """
+        a = np.asarray(polys, dtype=np.int64)
+        if a.ndim == 0 or a.shape[-1] != self.n:
+            raise ValueError(
+                f"Polynomials must have {self.n} coefficients in the last dimension, "
+                f"got shape {a.shape}"
+            )
+        shape = a.shape
+        return np.remainder(a.reshape(-1, self.n), self.q), shape
+    
+    def _forward_batch(self, a: np.ndarray) -> np.ndarray:
+        """
+        Run all forward butterfly stages over a reduced ``(batch, n)`` array.
+        
+        Each stage is one set of NumPy operations across every row and every
+        butterfly block, so the Python-level loop is only log2(n) iterations.
+        """
+        batch = a.shape[0]
+        a = a[:, self._bit_rev_table]
+        
+        for length, zetas in self._forward_stages:
+            view = a.reshape(batch, -1, 2, length)
+            lo = view[:, :, 0, :]
+            hi = view[:, :, 1, :]
+            
+            # Butterfly: t = zeta * a_hi mod q
+            t = self._barrett_reduce(zetas * hi)
+            
+            new_lo = self._conditional_subtract(lo + t)
+            new_hi = self._conditional_subtract(lo - t + self.q)
+            a = np.stack((new_lo, new_hi), axis=2).reshape(batch, self.n)
+        
+        return a
+    
+    def _inverse_batch(self, a: np.ndarray) -> np.ndarray:
+        """
+        Run all inverse butterfly stages over a reduced ``(batch, n)`` array,
+        followed by the bit-reversal permutation and scaling by n^(-1).
+        """
+        batch = a.shape[0]
+        
+        for length, zetas in self._inverse_stages:
+            view = a.reshape(batch, -1, 2, length)
+            lo = view[:, :, 0, :]
+            hi = view[:, :, 1, :]
+            
+            new_lo = self._conditional_subtract(lo + hi)
+            new_hi = self._barrett_reduce(zetas * (hi - lo + self.q))
+            a = np.stack((new_lo, new_hi), axis=2).reshape(batch, self.n)
+        
+        a = a[:, self._bit_rev_table]
+        return self._barrett_reduce(a * self._inv_n)
+    
     def forward_ntt(self, poly: Union[List[int], np.ndarray]) -> np.ndarray:
         """
         Perform forward NTT using Cooley-Tukey algorithm.
         
         Transforms polynomial from coefficient form to NTT domain.
-        Optimized with precomputed twiddle factors and vectorized operations.
+        Optimized with precomputed per-stage twiddle vectors and Barrett
+        reduction; shares its butterfly kernel with ``forward_ntt_batch``.
         
         Args:
             poly: Polynomial coefficients (list or numpy array of length n)
@@ -147,46 +297,19 @@ class OptimizedNTT:
         """
         start_time = time.perf_counter()
         
-        # Convert to numpy array with int64 for overflow protection
-        a = np.array(poly, dtype=np.int64)
+        a = np.asarray(poly, dtype=np.int64)
         
-        if len(a) != self.n:
+        if a.shape != (self.n,):
             raise ValueError(f"Polynomial must have {self.n} coefficients, got {len(a)}")
         
-        # Apply bit-reversal permutation
-        a = a[self._bit_rev_table]
-        
-        # Cooley-Tukey iterative NTT
-        k = 1
-        length = self.n // 2
-        
-        while length >= 1:
-            for start in range(0, self.n, 2 * length):
-                zeta = self._twiddle_factors[k]
-                k += 1
-                
-                # Vectorized butterfly operation
-                j_range = np.arange(start, start + length)
-                
-                # Extract coefficients
-                a_lo = a[j_range]
-                a_hi = a[j_range + length]
-                
-                # Butterfly: t = zeta * a_hi mod q
-                t = (zeta * a_hi) % self.q
-                
-                # Update coefficients
-                a[j_range + length] = (a_lo - t) % self.q
-                a[j_range] = (a_lo + t) % self.q
-            
-            length //= 2
+        result = self._forward_batch(np.remainder(a, self.q).reshape(1, self.n))[0]
         
         # Update metrics
         elapsed = time.perf_counter() - start_time
         self._forward_count += 1
         self._total_forward_time += elapsed
         
-        return a
+        return result
     
     def inverse_ntt(self, poly: Union[List[int], np.ndarray]) -> np.ndarray:
         """
@@ -203,78 +326,81 @@ class OptimizedNTT:
         """
         start_time = time.perf_counter()
         
-        # Convert to numpy array
-        a = np.array(poly, dtype=np.int64)
+        a = np.asarray(poly, dtype=np.int64)
         
-        if len(a) != self.n:
+        if a.shape != (self.n,):
             raise ValueError(f"Polynomial must have {self.n} coefficients, got {len(a)}")
         
-        # Gentleman-Sande iterative inverse NTT
-        length = 1
-        k = self.n - 1
+        result = self._inverse_batch(np.remainder(a, self.q).reshape(1, self.n))[0]
         
-        while length < self.n:
-            for start in range(0, self.n, 2 * length):
-                zeta = self._inv_twiddle_factors[k]
-                k -= 1
-                
-                # Vectorized butterfly operation
-                j_range = np.arange(start, start + length)
-                
-                # Extract coefficients
-                a_lo = a[j_range]
-                a_hi = a[j_range + length]
-                
-                # Butterfly
-                t = a_lo
-                a[j_range] = (t + a_hi) % self.q
-                a[j_range + length] = (zeta * (a_hi - t)) % self.q
+        # Update metrics
+        elapsed = time.perf_counter() - start_time
+        self._inverse_count += 1
+        self._total_inverse_time += elapsed
+        
+        return result
+    
+    def forward_ntt_batch(self, polys: Union[List[List[int]], np.ndarray]) -> np.ndarray:
+        """
+        Forward NTT of many polynomials at once.
+        
+        Accepts any array whose last dimension is n: a ``(batch, 256)`` stack,
+        a Kyber module vector ``(k, 256)`` or a module matrix ``(k, k, 256)``.
+        All rows go through each butterfly stage in a single NumPy operation.
+        
+        Args:
+            polys: Polynomial coefficients with shape (..., n)
             
-            length *= 2
+        Returns:
+            NTT representations with the same shape as the input
+        """
+        start_time = time.perf_counter()
         
-        # Apply bit-reversal permutation
-        a = a[self._bit_rev_table]
+        a, shape = self._as_batch(polys)
+        result = self._forward_batch(a).reshape(shape)
         
-        # Multiply by inverse of n
-        a = (a * self._inv_n) % self.q
+        elapsed = time.perf_counter() - start_time
+        self._forward_count += a.shape[0]
+        self._total_forward_time += elapsed
+        
+        return result
+    
+    def inverse_ntt_batch(self, polys: Union[List[List[int]], np.ndarray]) -> np.ndarray:
+        """
+        Inverse NTT of many polynomials at once.
+        
+        Accepts the same shapes as ``forward_ntt_batch``.
+        
+        Args:
+            polys: NTT representations with shape (..., n)
+            
+        Returns:
+            Polynomial coefficients with the same shape as the input
+        """
+        start_time = time.perf_counter()
+        
+        a, shape = self._as_batch(polys)
+        result = self._inverse_batch(a).reshape(shape)
         
-        # Update metrics
         elapsed = time.perf_counter() - start_time
-        self._inverse_count += 1
+        self._inverse_count += a.shape[0]
         self._total_inverse_time += elapsed
         
-        return a
+        return result
     
     def forward_ntt_vectorized(self, poly: np.ndarray) -> np.ndarray:
         """
         Fully vectorized forward NTT for maximum performance.
         
-        Uses NumPy broadcasting for all butterfly operations.
-        Best for batch processing multiple polynomials.
+        Alias of ``forward_ntt_batch`` kept for backwards compatibility.
         
         Args:
-            poly: Polynomial coefficients as numpy array
+            poly: Polynomial coefficients as numpy array (..., n)
             
         Returns:
             NTT representation as numpy array
         """
-        a = np.array(poly, dtype=np.int64)
-        a = a[self._bit_rev_table]
-        
-        m = 1
-        while m < self.n:
-            for i in range(0, self.n, 2 * m):
-                w = 1
-                for j in range(m):
-                    # Butterfly operation
-                    t = (w * a[i + j + m]) % self.q
-                    u = a[i + j]
-                    a[i + j] = (u + t) % self.q
-                    a[i + j + m] = (u - t) % self.q
-                    w = (w * pow(self.zeta, self.n // (2 * m), self.q)) % self.q
-            m *= 2
-        
-        return a
+        return self.forward_ntt_batch(poly)
     
     def multiply_ntt(self, a_ntt: np.ndarray, b_ntt: np.ndarray) -> np.ndarray:
         """
@@ -292,6 +418,33 @@ class OptimizedNTT:
         """
         return (a_ntt * b_ntt) % self.q
     
+    def matrix_vector_multiply_ntt(self, matrix_ntt: np.ndarray, vector_ntt: np.ndarray) -> np.ndarray:
+        """
+        Multiply a Kyber module matrix by a module vector in NTT domain.
+        
+        Computes ``sum_j A[i][j] * s[j]`` for every row i with point-wise
+        products, accumulating lazily and reducing once per output polynomial.
+        
+        Args:
+            matrix_ntt: Matrix of NTT polynomials, shape (k, k, n), entries in [0, q)
+            vector_ntt: Vector of NTT polynomials, shape (k, n), entries in [0, q)
+            
+        Returns:
+            Resulting vector of NTT polynomials, shape (k, n)
+        """
+        A = np.asarray(matrix_ntt, dtype=np.int64)
+        s = np.asarray(vector_ntt, dtype=np.int64)
+        
+        if A.ndim != 3 or s.ndim != 2 or A.shape[1:] != s.shape or A.shape[2] != self.n:
+            raise ValueError(
+                f"Expected matrix (k, k, {self.n}) and vector (k, {self.n}), "
+                f"got {A.shape} and {s.shape}"
+            )
+        if A.shape[1] * (self.q - 1) ** 2 >= BARRETT_BOUND:
+            raise ValueError(f"Module rank {A.shape[1]} too large for lazy accumulation")
+        
+        return self._barrett_reduce((A * s[np.newaxis, :, :]).sum(axis=1))
+    
     def add_poly(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
         """
         Add two polynomials (coefficient-wise).
@@ -452,12 +605,20 @@ def get_optimized_ntt() -> OptimizedNTT:
     return _global_ntt
 
 
-def benchmark_ntt(iterations: int = 1000) -> dict:
+def benchmark_ntt(
+    iterations: int = 1000,
+    batch_sizes: Tuple[int, ...] = DEFAULT_BENCHMARK_BATCH_SIZES
+) -> dict:
     """
     Benchmark NTT performance.
     
+    Besides the per-operation timings, compares throughput (polys/sec) of
+    transforming each polynomial with ``forward_ntt`` against a single
+    ``forward_ntt_batch`` call for every size in ``batch_sizes``.
+    
     Args:
         iterations: Number of iterations for benchmarking
+        batch_sizes: Batch sizes for the single vs. batched comparison
         
     Returns:
         Dictionary with benchmark results
@@ -501,12 +662,41 @@ def benchmark_ntt(iterations: int = 1000) -> dict:
         'multiply_ntt_avg_us': (multiply_time / iterations) * 1_000_000,
         'throughput_forward_ops_per_sec': iterations / forward_time,
         'throughput_inverse_ops_per_sec': iterations / inverse_time,
+        'batch_comparison': {},
     }
     
+    # Single vs. batched forward NTT throughput
+    for batch_size in batch_sizes:
+        polys = np.random.randint(0, KYBER_Q, size=(batch_size, KYBER_N), dtype=np.int64)
+        
+        start = time.perf_counter()
+        for row in polys:
+            ntt.forward_ntt(row)
+        single_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        ntt.forward_ntt_batch(polys)
+        batched_time = time.perf_counter() - start
+        
+        single_rate = batch_size / single_time if single_time > 0 else float('inf')
+        batched_rate = batch_size / batched_time if batched_time > 0 else float('inf')
+        
+        results['batch_comparison'][batch_size] = {
+            'single_polys_per_sec': single_rate,
+            'batched_polys_per_sec': batched_rate,
+            'speedup': batched_rate / single_rate if single_rate > 0 else 0,
+        }
+    
     logger.info(f"NTT Benchmark Results:")
     logger.info(f"  Forward NTT: {results['forward_ntt_avg_us']:.2f} µs/op")
     logger.info(f"  Inverse NTT: {results['inverse_ntt_avg_us']:.2f} µs/op")
     logger.info(f"  Multiply NTT: {results['multiply_ntt_avg_us']:.2f} µs/op")
+    for batch_size, stats in results['batch_comparison'].items():
+        logger.info(
+            f"  Batch {batch_size}: single {stats['single_polys_per_sec']:.0f} polys/s, "
+            f"batched {stats['batched_polys_per_sec']:.0f} polys/s "
+            f"({stats['speedup']:.1f}x)"
+        )
     
     return results
 
@@ -1,9 +1,12 @@
 """Pure Python 3 Shamir Secret Sharing.
 
 Implements ``PlaintextToHexSecretSharer``-compatible split/recover for a
-hex-encoded plaintext secret over GF(p) where p is the 521-bit Mersenne prime
-(2^521 - 1). This replaces the unmaintained ``secretsharing`` package which
-uses the Python 2-only ``long`` built-in.
+hex-encoded plaintext secret. This replaces the unmaintained
+``secretsharing`` package which uses the Python 2-only ``long`` built-in.
+
+New shares are split byte-wise over GF(2^8) by ``shared.crypto.shamir_gf256``.
+Shares written earlier were split over GF(p), p = 2^521 - 1, in 64-byte
+chunks; ``recover_secret`` still accepts them.
 
 API intentionally mirrors ``secretsharing.PlaintextToHexSecretSharer``:
 
@@ -16,6 +19,8 @@ Each share is a string ``"<index>-<hex_data>"``.
 import secrets as _secrets
 from functools import reduce as _reduce
 
+from shared.crypto import shamir_gf256
+
 # 2^521 - 1, the 13th Mersenne prime (521 bits).
 # Accommodates secrets up to 520 bits (~65 bytes) which exceeds any realistic
 # private key or passphrase. This replaces the 127-bit prime that was too
@@ -72,15 +77,19 @@ def _recover(points, prime):
 # We split large secrets into fixed-size chunks so they fit in the field.
 _CHUNK_HEX_LEN = 128
 
+# Payload prefix of GF(2^8) shares; legacy payloads are pure hex or
+# "<hex_len>:<chunks>", so "gf:" cannot be mistaken for either.
+_GF256_PREFIX = 'gf:'
+
 
 class ShamirSecretSharer:
     """
     Drop-in replacement for ``secretsharing.PlaintextToHexSecretSharer``.
 
-    Shares encode the original hex length so arbitrarily-long secrets can be
-    faithfully reconstructed regardless of leading zeros.  The on-wire format
-    is ``"<index>-<total_hex_len>:<chunk_hex_1>.<chunk_hex_2>..."``.  Legacy
-    single-chunk shares (``"<index>-<hex>"``) remain parseable.
+    Shares are ``"<index>-gf:<share_hex>"``, where the share is as long as
+    the secret. Prime-field shares from before, in the chunked
+    ``"<index>-<total_hex_len>:<chunk_hex_1>.<chunk_hex_2>..."`` format or
+    the legacy single-chunk ``"<index>-<hex>"`` format, remain parseable.
     """
 
     @staticmethod
@@ -98,6 +107,16 @@ class ShamirSecretSharer:
     @staticmethod
     def split_secret(secret_hex: str, threshold: int, n: int) -> list[str]:
         """Split *secret_hex* into *n* shares, *threshold* needed to recover."""
+        if len(secret_hex) % 2:
+            secret_hex = '0' + secret_hex
+        return [
+            f"{index}-{_GF256_PREFIX}{share.hex()}"
+            for index, share in shamir_gf256.split(bytes.fromhex(secret_hex), threshold, n)
+        ]
+
+    @staticmethod
+    def split_secret_prime(secret_hex: str, threshold: int, n: int) -> list[str]:
+        """Split over GF(2^521 - 1) in the chunked format (pre-GF(256) shares)."""
         prime = _PRIME
         # Normalize to even length so round-tripping via bytes.fromhex works.
         if len(secret_hex) % 2:
@@ -127,6 +146,16 @@ class ShamirSecretSharer:
     @staticmethod
     def recover_secret(shares: list[str]) -> str:
         """Recover the hex secret from *threshold* or more shares."""
+        payloads = [share.split('-', 1) for share in shares]
+        gf256 = [payload.startswith(_GF256_PREFIX) for _, payload in payloads]
+        if all(gf256):
+            return shamir_gf256.combine([
+                (int(idx_s), bytes.fromhex(payload[len(_GF256_PREFIX):]))
+                for idx_s, payload in payloads
+            ]).hex()
+        if any(gf256):
+            raise ValueError("Cannot combine GF(256) and prime-field shares")
+
         parsed: list[tuple[int, int, list[int]]] = []
         for share in shares:
             idx_s, payload = share.split('-', 1)
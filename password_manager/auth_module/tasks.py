@@ -0,0 +1,38 @@
+"""
+Auth Module Celery Tasks
+========================
+
+Background tasks for the authentication module.
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refill_kyber_reservoir():
+    """
+    Top the Kyber keypair reservoir up to capacity.
+
+    Queued by ``KyberKeyReservoir`` when the pool drops below its low
+    watermark (refill mode ``celery``) and run periodically by beat so the
+    pool recovers after idle periods. Only does work when the reservoir is
+    shared through Redis; a local-memory pool lives in another process.
+    """
+    from .services.kyber_reservoir import get_kyber_reservoir
+
+    reservoir = get_kyber_reservoir()
+    if reservoir.store_type != 'redis':
+        reservoir.release_refill_lock()
+        return {'added': 0, 'skipped': 'local reservoir'}
+
+    try:
+        added = reservoir.refill()
+    finally:
+        reservoir.release_refill_lock()
+
+    logger.info("Kyber reservoir refill added %s keypair(s)", added)
+    return {'added': added, 'pool_depth': reservoir.level()}
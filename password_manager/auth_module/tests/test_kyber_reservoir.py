@@ -0,0 +1,93 @@
+"""
+Unit Tests for Kyber Keypair Reservoir
+
+Tests the pre-generated keypair pool:
+- Pops served from the pool vs. request-path misses
+- Watermark-triggered refill
+- Encryption of pooled entries
+- Stale entry eviction
+"""
+
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ..services.kyber_crypto import ProductionKyber
+from ..services.kyber_reservoir import KyberKeyReservoir
+
+
+class TestKyberKeyReservoir(SimpleTestCase):
+    """Test reservoir pop, refill and metrics"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.reservoir = KyberKeyReservoir(capacity=4, low_watermark=2, refill_mode='none')
+
+    def test_miss_generates_inline(self):
+        """Test that an empty pool still returns a keypair and counts a miss"""
+        public_key, private_key = self.reservoir.acquire_keypair()
+
+        self.assertEqual(len(public_key), ProductionKyber.PUBLIC_KEY_SIZE)
+        self.assertEqual(len(private_key), ProductionKyber.PRIVATE_KEY_SIZE)
+        self.assertEqual(self.reservoir.get_metrics()['misses'], 1)
+
+    def test_refill_then_hit(self):
+        """Test that refill tops up to capacity and pops are served from the pool"""
+        self.assertEqual(self.reservoir.refill(), 4)
+        self.assertEqual(self.reservoir.level(), 4)
+
+        self.reservoir.acquire_keypair()
+
+        metrics = self.reservoir.get_metrics()
+        self.assertEqual(metrics['hits'], 1)
+        self.assertEqual(metrics['misses'], 0)
+        self.assertEqual(metrics['pool_depth'], 3)
+        self.assertGreater(metrics['refill_rate_keys_per_sec'], 0)
+
+    def test_keypairs_handed_out_once(self):
+        """Test that each pooled keypair is returned at most once"""
+        self.reservoir.refill()
+
+        public_keys = {self.reservoir.acquire_keypair()[0] for _ in range(4)}
+
+        self.assertEqual(len(public_keys), 4)
+
+    def test_entries_encrypted_at_rest(self):
+        """Test that stored entries do not contain the raw private key"""
+        with patch.object(self.reservoir.kyber, 'generate_keypair',
+                          return_value=(b'P' * 1184, b'S' * 2400)):
+            self.reservoir.refill(max_keys=1)
+
+        entry = self.reservoir._store.pop()
+        self.assertNotIn('U1NTU1NT', entry)
+        self.assertEqual(self.reservoir._unseal(entry)[1], b'S' * 2400)
+
+    def test_stale_entries_discarded(self):
+        """Test that entries older than ENTRY_MAX_AGE are skipped"""
+        self.reservoir.refill(max_keys=1)
+
+        with patch('auth_module.services.kyber_reservoir.time.time',
+                   return_value=time.time() + KyberKeyReservoir.ENTRY_MAX_AGE + 1):
+            self.reservoir.acquire_keypair()
+
+        metrics = self.reservoir.get_metrics()
+        self.assertEqual(metrics['stale_discarded'], 1)
+        self.assertEqual(metrics['misses'], 1)
+
+    def test_thread_refill_below_watermark(self):
+        """Test that dropping below the low watermark refills in the background"""
+        reservoir = KyberKeyReservoir(capacity=4, low_watermark=2, refill_mode='thread')
+
+        reservoir.acquire_keypair()
+        reservoir._refill_thread.join(timeout=10)
+
+        self.assertEqual(reservoir.level(), 4)
+        self.assertEqual(reservoir.get_metrics()['refills_scheduled'], 1)
+
+    def test_invalid_configuration(self):
+        """Test that inconsistent settings raise ValueError"""
+        with self.assertRaises(ValueError):
+            KyberKeyReservoir(capacity=2, low_watermark=3)
+        with self.assertRaises(ValueError):
+            KyberKeyReservoir(refill_mode='cron')
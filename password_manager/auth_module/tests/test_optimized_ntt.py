@@ -0,0 +1,95 @@
+"""
+Unit Tests for Optimized NTT
+
+Tests the single-polynomial and batched NTT paths:
+- Forward/inverse round trip
+- Batched results match the single-polynomial transform
+- Module vector/matrix shapes (k x 256, k x k x 256)
+- Barrett reduction bounds
+"""
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..services.optimized_ntt import (
+    KYBER_N,
+    KYBER_Q,
+    OptimizedNTT,
+    benchmark_ntt,
+)
+
+
+class TestOptimizedNTT(SimpleTestCase):
+    """Test NTT correctness for single and batched transforms"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.ntt = OptimizedNTT()
+        self.rng = np.random.default_rng(1234)
+
+    def _random_polys(self, *shape):
+        return self.rng.integers(0, KYBER_Q, size=shape + (KYBER_N,), dtype=np.int64)
+
+    def test_round_trip(self):
+        """Test that inverse_ntt(forward_ntt(poly)) == poly"""
+        poly = self._random_polys()
+
+        recovered = self.ntt.inverse_ntt(self.ntt.forward_ntt(poly))
+
+        np.testing.assert_array_equal(recovered, poly)
+        self.assertTrue(self.ntt.verify_ntt_correctness(num_tests=5))
+
+    def test_batch_matches_single(self):
+        """Test that each batched row equals the single-polynomial transform"""
+        polys = self._random_polys(16)
+
+        batched = self.ntt.forward_ntt_batch(polys)
+
+        self.assertEqual(batched.shape, polys.shape)
+        for row, expected in zip(polys, batched):
+            np.testing.assert_array_equal(self.ntt.forward_ntt(row), expected)
+
+    def test_batch_round_trip_module_matrix(self):
+        """Test batched round trip on a Kyber-768 module matrix"""
+        matrix = self._random_polys(3, 3)
+
+        recovered = self.ntt.inverse_ntt_batch(self.ntt.forward_ntt_batch(matrix))
+
+        self.assertEqual(recovered.shape, (3, 3, KYBER_N))
+        np.testing.assert_array_equal(recovered, matrix)
+
+    def test_outputs_fully_reduced(self):
+        """Test that Barrett-reduced outputs stay in [0, q)"""
+        polys = np.full((4, KYBER_N), KYBER_Q - 1, dtype=np.int64)
+        polys[1] = -1
+        polys[2] = 10 * KYBER_Q + 7
+
+        for result in (self.ntt.forward_ntt_batch(polys), self.ntt.inverse_ntt_batch(polys)):
+            self.assertTrue(np.all(result >= 0))
+            self.assertTrue(np.all(result < KYBER_Q))
+
+    def test_matrix_vector_multiply(self):
+        """Test module matrix-vector product against the naive reduction"""
+        matrix = self.ntt.forward_ntt_batch(self._random_polys(3, 3))
+        vector = self.ntt.forward_ntt_batch(self._random_polys(3))
+
+        result = self.ntt.matrix_vector_multiply_ntt(matrix, vector)
+
+        expected = (matrix * vector[np.newaxis]).sum(axis=1) % KYBER_Q
+        np.testing.assert_array_equal(result, expected)
+
+    def test_invalid_shape_rejected(self):
+        """Test that polynomials of the wrong length raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.ntt.forward_ntt_batch(np.zeros((2, 128), dtype=np.int64))
+        with self.assertRaises(ValueError):
+            self.ntt.forward_ntt(np.zeros(255, dtype=np.int64))
+
+    def test_benchmark_reports_batch_comparison(self):
+        """Test that benchmark_ntt reports single vs. batched throughput"""
+        results = benchmark_ntt(iterations=2, batch_sizes=(1, 16))
+
+        self.assertEqual(set(results['batch_comparison']), {1, 16})
+        for stats in results['batch_comparison'].values():
+            self.assertGreater(stats['single_polys_per_sec'], 0)
+            self.assertGreater(stats['batched_polys_per_sec'], 0)
@@ -0,0 +1,108 @@
+"""
+Unit Tests for Parallel Kyber Operations
+
+Tests executor mode selection and the process-pool backend:
+- Mode validation and 'auto' threshold
+- Chunked keygen/encapsulation/encryption through shared memory
+- Result format parity with the thread-pool path
+"""
+
+import asyncio
+import base64
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ..services.kyber_crypto import ProductionKyber
+from ..services.parallel_kyber import (
+    PROCESS_MIN_BATCH,
+    ParallelKyberOperations,
+)
+
+
+class TestExecutorModeSelection(SimpleTestCase):
+    """Test executor mode validation and selection"""
+
+    def test_invalid_mode_rejected(self):
+        """Test that unknown executor modes raise ValueError"""
+        with self.assertRaises(ValueError):
+            ParallelKyberOperations(max_workers=1, executor_mode='fibers')
+
+    def test_thread_mode_never_uses_processes(self):
+        """Test that thread mode keeps every batch on the thread pool"""
+        ops = ParallelKyberOperations(max_workers=2, executor_mode='thread')
+        try:
+            self.assertFalse(ops._use_processes(10_000))
+        finally:
+            ops.shutdown()
+
+    @patch('auth_module.services.parallel_kyber.os.cpu_count', return_value=8)
+    def test_auto_mode_threshold(self, _cpu_count):
+        """Test that auto mode only uses processes for large batches"""
+        ops = ParallelKyberOperations(max_workers=4, executor_mode='auto')
+        try:
+            self.assertFalse(ops._use_processes(PROCESS_MIN_BATCH - 1))
+            self.assertTrue(ops._use_processes(PROCESS_MIN_BATCH))
+        finally:
+            ops.shutdown()
+
+    def test_chunk_size(self):
+        """Test that batches are split into several chunks per worker"""
+        ops = ParallelKyberOperations(max_workers=2, executor_mode='process')
+        try:
+            self.assertEqual(ops._chunk_size_for(80), 10)
+            self.assertEqual(ops._chunk_size_for(1), 1)
+        finally:
+            ops.shutdown()
+
+
+class TestProcessBackend(SimpleTestCase):
+    """Test bulk operations through the process pool"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ops = ParallelKyberOperations(max_workers=2, executor_mode='process', chunk_size=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ops.shutdown()
+        super().tearDownClass()
+
+    def test_keygen_in_processes(self):
+        """Test chunked keygen returns keypairs of the expected sizes"""
+        keypairs = self.ops.batch_keygen_sync(7)
+
+        self.assertEqual(len(keypairs), 7)
+        for keypair in keypairs:
+            self.assertEqual(len(base64.b64decode(keypair['public_key'])), ProductionKyber.PUBLIC_KEY_SIZE)
+            self.assertEqual(len(base64.b64decode(keypair['private_key'])), ProductionKyber.PRIVATE_KEY_SIZE)
+        self.assertGreater(self.ops.get_metrics()['process_chunks'], 1)
+
+    def test_encapsulate_in_processes(self):
+        """Test parallel encapsulation returns ciphertext/shared secret pairs"""
+        public_keys = [
+            base64.b64decode(kp['public_key']) for kp in self.ops.batch_keygen_sync(4)
+        ]
+
+        results = asyncio.run(self.ops.parallel_encapsulate(public_keys))
+
+        self.assertEqual(len(results), 4)
+        for ciphertext, shared_secret in results:
+            self.assertEqual(len(ciphertext), ProductionKyber.CIPHERTEXT_SIZE)
+            self.assertEqual(len(shared_secret), ProductionKyber.SHARED_SECRET_SIZE)
+
+    def test_encrypt_matches_thread_format(self):
+        """Test process-pool encryption returns the same fields as the thread path"""
+        public_keys = [
+            base64.b64decode(kp['public_key']) for kp in self.ops.batch_keygen_sync(5)
+        ]
+        messages = [b'message %d' % i for i in range(5)]
+
+        results = self.ops.batch_encrypt_sync(public_keys, messages)
+        expected = self.ops.hybrid.encrypt(messages[0], public_keys[0])
+
+        self.assertEqual([r['index'] for r in results], list(range(5)))
+        for result, message in zip(results, messages):
+            self.assertTrue(set(expected) <= set(result))
+            self.assertEqual(len(base64.b64decode(result['aes_ciphertext'])), len(message) + 16)
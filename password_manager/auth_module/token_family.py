@@ -25,6 +25,8 @@ from django.conf import settings
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from security.authentication import stamp_auth_time
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,6 +98,10 @@ class FamilyLimitedTokenObtainPairSerializer(TokenObtainPairSerializer):
         'TOKEN_OBTAIN_SERIALIZER': 'auth_module.token_family.FamilyLimitedTokenObtainPairSerializer'
     """
 
+    @classmethod
+    def get_token(cls, user):
+        return stamp_auth_time(super().get_token(user))
+
     def validate(self, attrs):
         # Standard validation + token generation
         data = super().validate(attrs)
@@ -218,6 +218,15 @@ class AuthViewSet(viewsets.ViewSet):
                 requires_2fa = False
                 mfa_type = None
             
+            # A login the fast risk score flags only proceeds through the
+            # second factor (step-up); without 2FA it is refused here.
+            if analysis_result2 is not None and analysis_result2.is_suspicious and not requires_2fa:
+                return error_response(
+                    'This sign-in was flagged as suspicious and has been blocked.',
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    code='login_suspicious',
+                )
+            
             # Log login attempt
             AuditLog.objects.create(
                 user=user,
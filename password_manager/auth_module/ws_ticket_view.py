@@ -16,9 +16,9 @@ from rest_framework.decorators import (
 )
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from ml_dark_web.ws_ticket import TTL_SECONDS, issue_ticket
+from security.authentication import EscalationAwareJWTAuthentication
 
 
 # The DRF default is JWT-only, but the SPA's api client sends
@@ -26,7 +26,7 @@ from ml_dark_web.ws_ticket import TTL_SECONDS, issue_ticket
 # localStorage 'token' key). Accept both — mirroring CurrentUserView — so ticket
 # minting works for JWT and DRF-token sessions alike.
 @api_view(['POST'])
-@authentication_classes([JWTAuthentication, TokenAuthentication])
+@authentication_classes([EscalationAwareJWTAuthentication, TokenAuthentication])
 @permission_classes([IsAuthenticated])
 def ws_ticket_view(request):
     """Issue a short-lived, single-use WebSocket auth ticket for the caller.
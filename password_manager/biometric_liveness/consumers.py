@@ -5,13 +5,15 @@ Biometric Liveness WebSocket Consumer
 Real-time video streaming for liveness verification.
 """
 
+import asyncio
 import json
 import logging
+from django.conf import settings
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
 from asgiref.sync import sync_to_async
 
-from .frame_utils import decode_frame
+from .frame_utils import decode_binary_pixels, decode_frame, parse_binary_frame
 from .services.liveness_session_service import (
     GazeChallengeIncompleteError, SessionLockError,
 )
@@ -24,12 +26,27 @@ class LivenessConsumer(AsyncJsonWebsocketConsumer):
     WebSocket consumer for real-time liveness verification.
     
     Receives video frames and returns liveness analysis in real-time.
+
+    Frames arrive either as JSON ``{'type': 'frame', 'frame': <base64>, ...}``
+    text messages or as binary messages in the frame_utils binary layout; all
+    replies are JSON. With ``BIOMETRIC_LIVENESS['WS_DROP_STALE_FRAMES']`` on,
+    binary frames are analysed by a background task that only ever holds the
+    newest unprocessed frame: one arriving while another waits replaces it, so
+    a client that sends faster than the session is scored gets the latest
+    frame analysed instead of an ever-growing backlog. ``frame_result`` then
+    reports the running ``dropped_frames`` count.
     """
+
+    _frame_worker = None
+    _pending_frame = None
+    dropped_frames = 0
     
     async def connect(self):
         """Handle WebSocket connection."""
         self.session_id = self.scope['url_route']['kwargs'].get('session_id')
         self.user = self.scope.get('user')
+        self.drop_stale_frames = getattr(settings, 'BIOMETRIC_LIVENESS', {}).get(
+            'WS_DROP_STALE_FRAMES', False)
         
         if not self.user or not self.user.is_authenticated:
             await self.close(code=4001)
@@ -64,11 +81,24 @@ class LivenessConsumer(AsyncJsonWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
+        self._pending_frame = None
+        if self._frame_worker is not None:
+            self._frame_worker.cancel()
         logger.info(f"Liveness WebSocket disconnected: {self.session_id}, code: {close_code}")
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        """Route binary messages to the binary frame path, text to receive_json."""
+        if bytes_data is not None:
+            await self.receive_frame_bytes(bytes_data)
+            return
+        await super().receive(text_data=text_data, bytes_data=bytes_data, **kwargs)
     
     async def receive_json(self, content):
         """Handle incoming JSON messages."""
         msg_type = content.get('type')
+        # Keep message order: a queued binary frame is scored before a
+        # challenge response or `complete` that the client sent after it.
+        await self._drain_frames()
         
         if msg_type == 'frame':
             await self.handle_frame(content)
@@ -117,34 +147,84 @@ class LivenessConsumer(AsyncJsonWebsocketConsumer):
                 await self.send_json({'type': 'error', 'message': decode_error})
                 return
 
-            # Process frame. thread_sensitive=False so CPU-heavy frame analysis
-            # for independent sessions runs concurrently instead of serializing
-            # in asgiref's single thread-sensitive lane. Safe here: process_frame
-            # is per-session-locked and touches no Django ORM / thread-locals.
-            result = await sync_to_async(self.service.process_frame, thread_sensitive=False)(
-                self.session_id, frame, timestamp_ms
-            )
+            await self._analyze_frame(frame, timestamp_ms)
 
-            # Surface real session-state errors (expired, already completed,
-            # not found) instead of replying with an empty frame_result -- the
-            # REST path returns 400 for these, and a WS client would otherwise
-            # keep streaming with no idea the session stopped accepting frames.
-            if 'error' in result:
-                await self.send_json({'type': 'error', 'message': result['error']})
-                return
+        except SessionLockError:
+            await self._send_session_busy('frame')
+        except Exception as e:
+            logger.error(f"Frame processing error: {e}")
+            await self.send_json({'type': 'error', 'message': 'internal_error'})
 
-            await self.send_json({
-                'type': 'frame_result',
-                'frame_number': result.get('frame_number', 0),
-                'results': result.get('results', {}),
-                'current_challenge': result.get('current_challenge', 0),
-            })
+    async def receive_frame_bytes(self, data):
+        """Accept one binary frame: validate its header, then analyse or queue it."""
+        header, payload, error = parse_binary_frame(data)
+        if error is None and header.session_id != self.session_id:
+            error = 'Frame session mismatch'
+        if error:
+            await self.send_json({'type': 'error', 'message': error})
+            return
+
+        if not self.drop_stale_frames:
+            await self.handle_binary_frame(header, payload)
+            return
+        if self._pending_frame is not None:
+            self.dropped_frames += 1
+        self._pending_frame = (header, payload)
+        if self._frame_worker is None or self._frame_worker.done():
+            self._frame_worker = asyncio.ensure_future(self._run_frame_worker())
 
+    async def _run_frame_worker(self):
+        while self._pending_frame is not None:
+            header, payload = self._pending_frame
+            self._pending_frame = None
+            await self.handle_binary_frame(header, payload)
+
+    async def _drain_frames(self):
+        """Wait until every queued binary frame has been analysed."""
+        if self._frame_worker is not None and not self._frame_worker.done():
+            await self._frame_worker
+
+    async def handle_binary_frame(self, header, payload):
+        """Process a parsed binary frame (decoded only now, after any drop)."""
+        try:
+            frame, decode_error = decode_binary_pixels(header, payload)
+            if decode_error:
+                await self.send_json({'type': 'error', 'message': decode_error})
+                return
+            await self._analyze_frame(frame, header.timestamp_ms)
         except SessionLockError:
             await self._send_session_busy('frame')
         except Exception as e:
             logger.error(f"Frame processing error: {e}")
             await self.send_json({'type': 'error', 'message': 'internal_error'})
+
+    async def _analyze_frame(self, frame, timestamp_ms):
+        """Run one decoded frame through the session and reply with its result."""
+        # Process frame. thread_sensitive=False so CPU-heavy frame analysis
+        # for independent sessions runs concurrently instead of serializing
+        # in asgiref's single thread-sensitive lane. Safe here: process_frame
+        # is per-session-locked and touches no Django ORM / thread-locals.
+        result = await sync_to_async(self.service.process_frame, thread_sensitive=False)(
+            self.session_id, frame, timestamp_ms
+        )
+
+        # Surface real session-state errors (expired, already completed,
+        # not found) instead of replying with an empty frame_result -- the
+        # REST path returns 400 for these, and a WS client would otherwise
+        # keep streaming with no idea the session stopped accepting frames.
+        if 'error' in result:
+            await self.send_json({'type': 'error', 'message': result['error']})
+            return
+
+        reply = {
+            'type': 'frame_result',
+            'frame_number': result.get('frame_number', 0),
+            'results': result.get('results', {}),
+            'current_challenge': result.get('current_challenge', 0),
+        }
+        if self.drop_stale_frames:
+            reply['dropped_frames'] = self.dropped_frames
+        await self.send_json(reply)
     
     async def handle_challenge_response(self, content):
         """Handle challenge response submission."""
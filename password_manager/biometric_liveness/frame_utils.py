@@ -7,6 +7,9 @@ identically and reject the same malformed input.
 """
 
 import base64
+import struct
+import uuid
+from dataclasses import dataclass
 from typing import Optional, Tuple
 
 import numpy as np
@@ -75,3 +78,113 @@ def decode_frame(
         return np.ascontiguousarray(frame.reshape((height, width, 4))[:, :, :3]), None
     except ValueError:
         return None, 'Frame dimensions do not match data'
+
+
+# --------------------------------------------------------------------------- #
+# Binary WebSocket frames
+# --------------------------------------------------------------------------- #
+#
+# A binary WS message is a fixed little-endian header followed by the pixels:
+#
+#   magic 'LV' | version u8 | pixel format u8 | session UUID (16 bytes) |
+#   timestamp_ms f64 | width u16 | height u16 | payload
+#
+# Raw formats carry height*width*channels bytes, row-major; JPEG carries the
+# compressed image. Compared with base64-in-JSON this skips the JSON parse,
+# the base64 decode and the 4/3 size inflation, and a raw RGB payload is
+# handed to the detectors as a view of the received message, without a copy.
+
+BINARY_FRAME_MAGIC = b'LV'
+BINARY_FRAME_VERSION = 1
+BINARY_FRAME_HEADER = struct.Struct('<2sBB16sdHH')
+
+PIXEL_FORMAT_RGB = 1
+PIXEL_FORMAT_RGBA = 2
+PIXEL_FORMAT_JPEG = 3
+
+_RAW_CHANNELS = {PIXEL_FORMAT_RGB: 3, PIXEL_FORMAT_RGBA: 4}
+
+
+@dataclass(frozen=True)
+class BinaryFrameHeader:
+    session_id: str
+    timestamp_ms: float
+    width: int
+    height: int
+    pixel_format: int
+
+
+def pack_binary_frame_header(session_id: str, timestamp_ms: float, width: int,
+                             height: int, pixel_format: int = PIXEL_FORMAT_RGB) -> bytes:
+    """Header bytes for a binary frame (clients append the payload)."""
+    return BINARY_FRAME_HEADER.pack(
+        BINARY_FRAME_MAGIC, BINARY_FRAME_VERSION, pixel_format,
+        uuid.UUID(session_id).bytes, timestamp_ms, width, height,
+    )
+
+
+def parse_binary_frame(
+    data: bytes
+) -> Tuple[Optional[BinaryFrameHeader], Optional[memoryview], Optional[str]]:
+    """
+    Split a binary frame message into its header and payload, without decoding.
+
+    Cheap enough to run on every message, so a caller can drop a frame it will
+    not process before paying for the pixel decode. Returns
+    (header, payload, None) or (None, None, message) with a client-safe message.
+    """
+    if len(data) < BINARY_FRAME_HEADER.size:
+        return None, None, 'Invalid frame header'
+    magic, version, pixel_format, session, timestamp_ms, width, height = \
+        BINARY_FRAME_HEADER.unpack_from(data)
+    if magic != BINARY_FRAME_MAGIC or version != BINARY_FRAME_VERSION:
+        return None, None, 'Invalid frame header'
+    if pixel_format not in _RAW_CHANNELS and pixel_format != PIXEL_FORMAT_JPEG:
+        return None, None, 'Unsupported pixel format'
+    if width <= 0 or height <= 0:
+        return None, None, 'Missing or invalid frame dimensions'
+    if width * height > _max_frame_pixels():
+        return None, None, 'Frame dimensions exceed maximum'
+    if timestamp_ms != timestamp_ms:
+        return None, None, 'Invalid frame timestamp'
+    header = BinaryFrameHeader(
+        session_id=str(uuid.UUID(bytes=session)), timestamp_ms=timestamp_ms,
+        width=width, height=height, pixel_format=pixel_format,
+    )
+    return header, memoryview(data)[BINARY_FRAME_HEADER.size:], None
+
+
+def decode_binary_pixels(
+    header: BinaryFrameHeader, payload: memoryview
+) -> Tuple[Optional[np.ndarray], Optional[str]]:
+    """
+    Turn a parsed binary frame's payload into an HxWx3 RGB array.
+
+    RGB is returned as a READ-ONLY view of the message (zero-copy); a detector
+    that wants to preprocess in place must copy first, and gets a ValueError
+    rather than silent corruption if it does not. RGBA costs one copy to drop
+    alpha, and JPEG is decoded by OpenCV into a fresh array.
+    """
+    channels = _RAW_CHANNELS.get(header.pixel_format)
+    if channels is not None:
+        if len(payload) != header.width * header.height * channels:
+            return None, 'Frame dimensions do not match data'
+        frame = np.frombuffer(payload, dtype=np.uint8).reshape(
+            (header.height, header.width, channels))
+        if channels == 3:
+            return frame, None
+        return np.ascontiguousarray(frame[:, :, :3]), None
+
+    # A JPEG larger than the raw frame it encodes is not a real capture.
+    if not payload or len(payload) > header.width * header.height * 3:
+        return None, 'Frame payload too large' if payload else 'Missing frame data'
+    try:
+        import cv2
+    except ImportError:
+        return None, 'Unsupported pixel format'
+    bgr = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if bgr is None:
+        return None, 'Invalid frame encoding'
+    if bgr.shape[:2] != (header.height, header.width):
+        return None, 'Frame dimensions do not match data'
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), None
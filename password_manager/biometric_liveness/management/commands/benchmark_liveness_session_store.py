@@ -0,0 +1,111 @@
+"""
+Measure liveness session save/load cost against frames processed.
+
+Usage:
+    python manage.py benchmark_liveness_session_store [--frames N] [--every N] [--redis-url URL]
+
+Drives one synthetic session through N locked frame cycles (acquire, load,
+append one pulse reading / gaze point / deepfake probability, save, release)
+against a real Redis, once per write layout ('blob' and 'delta'), and reports
+the mean load and save time and the stored size at regular frame counts. With
+'blob' both grow with the frame count; with 'delta' the save should stay flat.
+"""
+
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+
+def _new_service():
+    from biometric_liveness.services.liveness_session_service import LivenessSessionService
+    # Build sessions in memory; the stores under test are created below.
+    config = {**settings.BIOMETRIC_LIVENESS, 'SESSION_STORE': 'memory'}
+    with override_settings(BIOMETRIC_LIVENESS=config):
+        return LivenessSessionService()
+
+
+class Command(BaseCommand):
+    help = "Report liveness session store load/save time vs. frames processed for each write layout."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=2000)
+        parser.add_argument('--every', type=int, default=250,
+                            help='Report a row every N frames')
+        parser.add_argument('--redis-url', default=None,
+                            help="Defaults to BIOMETRIC_LIVENESS['SESSION_STORE_REDIS_URL']")
+
+    def handle(self, *args, **options):
+        import redis
+        from biometric_liveness.services.gaze_tracking_service import GazePoint
+        from biometric_liveness.services.pulse_oximetry_service import PulseReading
+        from biometric_liveness.services.session_store import RedisSessionStore
+
+        url = (options['redis_url']
+               or settings.BIOMETRIC_LIVENESS.get('SESSION_STORE_REDIS_URL')
+               or 'redis://127.0.0.1:6379/3')
+        client = redis.Redis.from_url(url)
+        try:
+            client.ping()
+        except redis.RedisError as e:
+            raise CommandError(f"Redis at {url} is unreachable: {e}")
+
+        service = _new_service()
+        frame = np.full((64, 64, 3), 120, dtype=np.uint8)
+        retention = service.config.get('SESSION_TIMEOUT_SECONDS', 120) + service.SESSION_RETENTION_SECONDS
+
+        self.stdout.write(f"{options['frames']} frames, one row per {options['every']}")
+        self.stdout.write(f"{'layout':>6} {'frames':>7} {'load ms':>8} {'save ms':>8} {'stored KiB':>11}")
+        for layout in ('blob', 'delta'):
+            store = RedisSessionStore(client, service._new_session_services, retention, layout=layout)
+            info = service.create_session(user_id=0)
+            session = service._sessions_mem.pop(info['session_id'])
+            sid = session['session_id']
+            session['status'] = 'in_progress'
+            # Stay live for the whole run, however long the blob layout takes.
+            session['expires_at'] = timezone.now() + timedelta(hours=1)
+            store.save(sid, session, fenced=False)
+
+            load_times, save_times = [], []
+            try:
+                for i in range(1, options['frames'] + 1):
+                    if not store.acquire(sid):
+                        raise CommandError(f"Could not lock benchmark session {sid}")
+                    started = time.perf_counter()
+                    session = store.load(sid)
+                    load_times.append(time.perf_counter() - started)
+
+                    now_ms = i * 33.0
+                    session['services']['pulse'].process_frame(frame, now_ms)
+                    session['frames_processed'] = i
+                    session['pulse_readings'].append(PulseReading(
+                        timestamp_ms=now_ms, frame_number=i, rgb_means=(120.0, 121.0, 119.0),
+                        ppg_value=0.01 * (i % 7), heart_rate_bpm=72.0, heart_rate_variability=35.0,
+                        spo2_estimate=None, signal_quality=0.8))
+                    track = session['gaze_track']
+                    track.append(GazePoint(x=0.5, y=0.5, timestamp_ms=now_ms, confidence=0.9,
+                                           is_fixation=i % 5 != 0))
+                    cutoff_ms = now_ms - service.GAZE_TRACK_RETENTION_MS
+                    if track[0].timestamp_ms < cutoff_ms:
+                        session['gaze_track'] = [g for g in track if g.timestamp_ms >= cutoff_ms]
+                    session['deepfake_probs'].append(0.1)
+
+                    started = time.perf_counter()
+                    store.save(sid, session)
+                    save_times.append(time.perf_counter() - started)
+                    store.release(sid)
+
+                    if i % options['every'] == 0:
+                        stored = sum(client.strlen(key) for key in
+                                     [store._KEY + sid] + store._side_keys(sid))
+                        self.stdout.write(
+                            f"{layout:>6} {i:>7} {1000 * np.mean(load_times):>8.2f} "
+                            f"{1000 * np.mean(save_times):>8.2f} {stored / 1024:>11.1f}"
+                        )
+                        load_times, save_times = [], []
+            finally:
+                store.delete(sid)
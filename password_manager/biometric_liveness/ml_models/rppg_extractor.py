@@ -4,6 +4,12 @@ rPPG Extractor
 
 Remote Photoplethysmography signal extraction for liveness detection.
 Extracts blood volume pulse from video to verify living tissue.
+
+In incremental mode (the default) each frame costs O(1) filter work plus
+O(bins) spectral work: the band-pass filter keeps its state between frames
+and the heart-rate band of the window's DFT is updated in place as samples
+enter and leave the window, instead of re-filtering and re-running a full
+FFT over the whole buffer for every frame.
 """
 
 import logging
@@ -11,6 +17,11 @@ from typing import Dict, List, Optional, Tuple
 import numpy as np
 from collections import deque
 
+try:
+    from scipy.signal import sosfilt as _sosfilt
+except ImportError:
+    _sosfilt = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,16 +40,34 @@ class RPPGExtractor:
     HR_MIN_BPM = 40
     HR_MAX_BPM = 180
     
-    def __init__(self, fps: int = 30, window_size: int = 300):
+    # Band-pass (filter) and heart-rate search band, in Hz
+    FILTER_LOW_HZ = 0.7
+    FILTER_HIGH_HZ = 4.0
+    HR_BAND_LOW_HZ = 0.7
+    HR_BAND_HIGH_HZ = 3.0
+    
+    def __init__(
+        self,
+        fps: int = 30,
+        window_size: int = 300,
+        incremental: bool = True,
+        hr_update_interval: int = 15
+    ):
         """
         Initialize rPPG extractor.
         
         Args:
             fps: Video frame rate
             window_size: Number of frames in sliding window
+            incremental: Stream the filter and spectrum instead of
+                recomputing them from the whole buffer on every frame
+            hr_update_interval: In incremental mode, re-estimate heart rate
+                every this many frames and report the cached value between
         """
         self.fps = fps
         self.window_size = window_size
+        self.incremental = incremental
+        self.hr_update_interval = max(1, hr_update_interval)
         
         # Signal buffers
         self.rgb_buffer = deque(maxlen=window_size)
@@ -47,7 +76,48 @@ class RPPGExtractor:
         
         self.frame_count = 0
         
-        logger.info(f"RPPGExtractor initialized (fps={fps})")
+        if incremental:
+            self._init_streaming()
+        
+        logger.info(f"RPPGExtractor initialized (fps={fps}, incremental={incremental})")
+    
+    def _init_streaming(self):
+        """Set up the streaming filter and sliding-DFT state."""
+        n = self.window_size
+        
+        # Second-order sections keep the filter numerically stable when run
+        # one sample at a time; without scipy a one-pole high-pass removes DC.
+        self._sos = None
+        try:
+            from scipy.signal import butter, sosfilt_zi
+            nyquist = self.fps / 2
+            low = self.FILTER_LOW_HZ / nyquist
+            high = min(self.FILTER_HIGH_HZ / nyquist, 0.99)
+            if low < high:
+                self._sos = butter(2, [low, high], btype='band', output='sos')
+                self._sos_zi_unit = sosfilt_zi(self._sos)
+        except ImportError:
+            pass
+        self._zi = None
+        self._dc = None
+        
+        # Only the DFT bins inside the heart-rate band are tracked. Bin k of
+        # an n-point window sits at k * fps / n Hz.
+        bins = np.arange(n // 2 + 1)
+        freqs = bins * self.fps / n
+        band = (freqs >= self.HR_BAND_LOW_HZ) & (freqs <= self.HR_BAND_HIGH_HZ)
+        self._hr_freqs = freqs[band]
+        # twiddle[:, m] = exp(-2j*pi*k*m/n): sample m (absolute index mod n)
+        # contributes x * twiddle[:, m] to bin k.
+        self._twiddle = np.exp(-2j * np.pi * np.outer(bins[band], np.arange(n)) / n)
+        self._spectrum = np.zeros(len(self._hr_freqs), dtype=complex)
+        
+        self._filtered = deque(maxlen=n)
+        self._sample_index = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._hr_cache: Tuple[Optional[float], float] = (None, 0.0)
+        self._hr_cache_frame = 0
     
     def process_frame(
         self, 
@@ -90,6 +160,8 @@ class RPPGExtractor:
         # Extract PPG using CHROM method
         ppg = self._chrom_ppg(rgb_mean)
         self.ppg_buffer.append(ppg)
+        if self.incremental:
+            self._push_sample(float(ppg))
         
         result = {
             'ppg_value': float(ppg),
@@ -100,7 +172,10 @@ class RPPGExtractor:
         
         # Calculate heart rate if enough samples
         if len(self.ppg_buffer) >= self.fps * 3:
-            hr, hr_confidence = self._calculate_heart_rate()
+            if self.incremental:
+                hr, hr_confidence = self._cached_heart_rate()
+            else:
+                hr, hr_confidence = self._calculate_heart_rate()
             result['heart_rate_bpm'] = hr
             result['hr_confidence'] = hr_confidence
             
@@ -130,8 +205,80 @@ class RPPGExtractor:
         
         return ppg
     
+    def _push_sample(self, ppg: float):
+        """Filter one PPG sample and slide it into the HR-band spectrum."""
+        if self._sos is not None:
+            if self._zi is None:
+                # Start in steady state for the first sample (no step transient)
+                self._zi = self._sos_zi_unit * ppg
+            filtered, self._zi = _sosfilt(self._sos, [ppg], zi=self._zi)
+            value = float(filtered[0])
+        else:
+            self._dc = ppg if self._dc is None else self._dc + 0.05 * (ppg - self._dc)
+            value = ppg - self._dc
+        
+        n = self.window_size
+        slot = self._sample_index % n
+        if len(self._filtered) == n:
+            # The sample leaving the window was added at the same slot
+            oldest = self._filtered[0]
+            self._spectrum -= oldest * self._twiddle[:, slot]
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+        self._filtered.append(value)
+        self._spectrum += value * self._twiddle[:, slot]
+        self._sum += value
+        self._sum_sq += value * value
+        self._sample_index += 1
+        
+        # Recompute exactly once per window so rounding error cannot build up
+        if self._sample_index % n == 0:
+            window = np.fromiter(self._filtered, dtype=float, count=len(self._filtered))
+            slots = (np.arange(self._sample_index - len(window), self._sample_index)) % n
+            self._spectrum = self._twiddle[:, slots] @ window
+            self._sum = float(window.sum())
+            self._sum_sq = float(window @ window)
+    
+    def _cached_heart_rate(self) -> Tuple[Optional[float], float]:
+        """Heart rate re-estimated every ``hr_update_interval`` frames."""
+        if (
+            self._hr_cache_frame == 0
+            or self.frame_count - self._hr_cache_frame >= self.hr_update_interval
+        ):
+            self._hr_cache = self._calculate_heart_rate()
+            self._hr_cache_frame = self.frame_count
+        return self._hr_cache
+    
+    def _streaming_heart_rate(self) -> Tuple[Optional[float], float]:
+        """Heart rate from the sliding HR-band spectrum."""
+        count = len(self._filtered)
+        if count < self.fps * 2 or len(self._spectrum) == 0:
+            return None, 0.0
+        
+        std = np.sqrt(max(0.0, self._sum_sq / count - (self._sum / count) ** 2))
+        if std < 0.001:
+            return None, 0.0
+        
+        # Same prominence measure as the batch path, which normalises the
+        # signal to unit variance before its FFT
+        hr_power = np.abs(self._spectrum) / std
+        peak_idx = int(np.argmax(hr_power))
+        heart_rate = abs(self._hr_freqs[peak_idx] * 60)
+        
+        peak_power = hr_power[peak_idx]
+        avg_power = np.mean(hr_power)
+        confidence = min(1.0, peak_power / (avg_power * 3 + 0.001))
+        
+        if not (self.HR_MIN_BPM <= heart_rate <= self.HR_MAX_BPM):
+            return None, 0.0
+        
+        return float(heart_rate), float(confidence)
+    
     def _calculate_heart_rate(self) -> Tuple[Optional[float], float]:
         """Calculate heart rate from PPG signal."""
+        if self.incremental:
+            return self._streaming_heart_rate()
+        
         signal = np.array(list(self.ppg_buffer))
         
         if len(signal) < self.fps * 2:
@@ -239,6 +386,8 @@ class RPPGExtractor:
         self.ppg_buffer.clear()
         self.timestamps.clear()
         self.frame_count = 0
+        if self.incremental:
+            self._init_streaming()
     
     def get_ppg_waveform(self) -> np.ndarray:
         """Get current PPG waveform."""
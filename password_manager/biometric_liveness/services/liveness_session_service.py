@@ -274,7 +274,9 @@ class LivenessSessionService:
             client = redis.Redis.from_url(url)
             retention = (self.config.get('SESSION_TIMEOUT_SECONDS', 120)
                          + self.SESSION_RETENTION_SECONDS)
-            store = RedisSessionStore(client, self._new_session_services, retention)
+            store = RedisSessionStore(
+                client, self._new_session_services, retention,
+                layout=self.config.get('SESSION_STORE_LAYOUT', 'delta'))
             logger.info("Liveness session store backend: redis")
             return store
         except Exception as exc:
@@ -24,6 +24,8 @@ serialized (they are process-wide resources rebuilt on the far side).
 
 import json
 import logging
+import operator
+import struct
 import threading
 import uuid
 from datetime import datetime
@@ -95,6 +97,77 @@ end
 return 1
 """
 
+# The same fenced save for the 'delta' layout, where the session is a small
+# scalar document plus side keys that are written incrementally.
+#
+# Every side key carries an op: 'a' APPENDs the payload, 's' replaces the key
+# with it (deleting it when empty) and 'k' leaves the value alone. An append is
+# only correct on top of exactly the bytes this worker loaded, so each one
+# names the length it expects, and ALL of those are checked before anything is
+# written: a mismatch returns -1 and the caller retries as a full replace.
+# Side keys get the same retention treatment as the document -- refreshed while
+# live, countdown kept (and backfilled with NX) once terminal -- so the whole
+# session ages out together.
+#
+# KEYS: 1 lock, 2 doc, 3 owner, 4 global live index, 5..4+n side keys,
+#       [5+n per-user live index]
+# ARGV: 1-8 as _SAVE_LUA (with the document in 2), 9 n, then per side key i:
+#       7+3i op, 8+3i expected length, 9+3i payload
+_SAVE_DELTA_LUA = """
+if ARGV[1] ~= '' and redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local n = tonumber(ARGV[9])
+for i = 1, n do
+    local a = 7 + 3 * i
+    if ARGV[a] == 'a' and redis.call('strlen', KEYS[4 + i]) ~= tonumber(ARGV[a + 1]) then
+        return -1
+    end
+end
+local live = ARGV[3] == '1'
+if live then
+    redis.call('set', KEYS[2], ARGV[2], 'EX', ARGV[4])
+else
+    redis.call('set', KEYS[2], ARGV[2], 'KEEPTTL')
+    redis.call('expire', KEYS[2], ARGV[4], 'NX')
+end
+for i = 1, n do
+    local key, a = KEYS[4 + i], 7 + 3 * i
+    if ARGV[a] == 's' then
+        if ARGV[a + 2] == '' then
+            redis.call('del', key)
+        else
+            redis.call('set', key, ARGV[a + 2], 'KEEPTTL')
+        end
+    elseif ARGV[a] == 'a' and ARGV[a + 2] ~= '' then
+        redis.call('append', key, ARGV[a + 2])
+    end
+    if live then
+        redis.call('expire', key, ARGV[4])
+    else
+        redis.call('expire', key, ARGV[4], 'NX')
+    end
+end
+local ukey = KEYS[5 + n]
+if live then
+    if ARGV[8] ~= '' then
+        redis.call('set', KEYS[3], ARGV[8], 'EX', ARGV[4])
+    end
+    redis.call('zadd', KEYS[4], ARGV[6], ARGV[7])
+    redis.call('pexpire', KEYS[4], ARGV[5])
+    if ukey then
+        redis.call('zadd', ukey, ARGV[6], ARGV[7])
+        redis.call('pexpire', ukey, ARGV[5])
+    end
+else
+    redis.call('zrem', KEYS[4], ARGV[7])
+    if ukey then
+        redis.call('zrem', ukey, ARGV[7])
+    end
+end
+return 1
+"""
+
 
 # --------------------------------------------------------------------------- #
 # Dataclass (de)serialization
@@ -320,9 +393,9 @@ def _restore_services(services: Dict, snapshots: Dict) -> None:
             svc.restore_state(state)
 
 
-def serialize_session(session: Dict) -> str:
-    """Convert a live session dict to a JSON string for the shared store."""
-    data = {
+def _session_scalars_to_json(session: Dict) -> Dict:
+    """Everything in the session except the per-frame series and detectors."""
+    return {
         'session_id': session['session_id'],
         'user_id': session.get('user_id'),
         'context': session.get('context'),
@@ -341,15 +414,9 @@ def serialize_session(session: Dict) -> str:
             }
             for c in session.get('challenges', [])
         ],
-        'pulse_readings': [_pulse_reading_to_json(p) for p in session.get('pulse_readings', [])],
-        'deepfake_probs': list(session.get('deepfake_probs', [])),
-        'deepfake_model_probs': list(session.get('deepfake_model_probs', [])),
         'expression_au_frames': session.get('expression_au_frames', 0),
         'gaze_samples': session.get('gaze_samples', 0),
-        'gaze_track': [_gaze_point_to_json(g) for g in session.get('gaze_track', [])],
         'gaze_task_results': [_task_result_to_json(r) for r in session.get('gaze_task_results', [])],
-        'thermal_readings': [
-            _thermal_reading_to_json(t) for t in session.get('thermal_readings', [])],
         # A set is not JSON-native; store as a list, restore as a set.
         'answered_challenges': sorted(session.get('answered_challenges', set())),
         # JSON object keys are strings; the service uses int sequence keys.
@@ -359,20 +426,11 @@ def serialize_session(session: Dict) -> str:
         'failed_required_challenges': list(session.get('failed_required_challenges', [])),
         'expression_score': session.get('expression_score'),
         'result': _session_result_to_json(session.get('result')),
-        'services': _services_to_json(session.get('services')),
     }
-    # default=float is a belt-and-braces guard: the score producers are fixed at
-    # source to return native floats, but a numpy scalar nested in
-    # details['modality_scores'] (or added by future code) must never break the
-    # single most important write in the flow -- persisting a completed verdict.
-    return json.dumps(data, default=float)
 
 
-def deserialize_session(blob: str, build_services: Callable[[], Dict]) -> Dict:
-    """Rebuild a live session dict (incl. detector instances) from JSON."""
-    data = json.loads(blob)
-    services = build_services()
-    _restore_services(services, data.get('services', {}))
+def _session_from_json(data: Dict, series: Dict, services: Dict) -> Dict:
+    """Inverse of _session_scalars_to_json, with the series and detectors given."""
     return {
         'session_id': data['session_id'],
         'user_id': data.get('user_id'),
@@ -392,15 +450,14 @@ def deserialize_session(blob: str, build_services: Callable[[], Dict]) -> Dict:
             }
             for c in data.get('challenges', [])
         ],
-        'pulse_readings': [_pulse_reading_from_json(p) for p in data.get('pulse_readings', [])],
-        'deepfake_probs': list(data.get('deepfake_probs', [])),
-        'deepfake_model_probs': list(data.get('deepfake_model_probs', [])),
+        'pulse_readings': series.get('pulse_readings', []),
+        'deepfake_probs': series.get('deepfake_probs', []),
+        'deepfake_model_probs': series.get('deepfake_model_probs', []),
         'expression_au_frames': data.get('expression_au_frames', 0),
         'gaze_samples': data.get('gaze_samples', 0),
-        'gaze_track': [_gaze_point_from_json(g) for g in data.get('gaze_track', [])],
+        'gaze_track': series.get('gaze_track', []),
         'gaze_task_results': [_task_result_from_json(r) for r in data.get('gaze_task_results', [])],
-        'thermal_readings': [
-            _thermal_reading_from_json(t) for t in data.get('thermal_readings', [])],
+        'thermal_readings': series.get('thermal_readings', []),
         'answered_challenges': set(data.get('answered_challenges', [])),
         'challenge_activated_ms': {
             int(k): v for k, v in data.get('challenge_activated_ms', {}).items()
@@ -412,6 +469,180 @@ def deserialize_session(blob: str, build_services: Callable[[], Dict]) -> Dict:
     }
 
 
+def serialize_session(session: Dict) -> str:
+    """Convert a live session dict to a single JSON string (the 'blob' layout)."""
+    data = _session_scalars_to_json(session)
+    data.update({
+        'pulse_readings': [_pulse_reading_to_json(p) for p in session.get('pulse_readings', [])],
+        'deepfake_probs': list(session.get('deepfake_probs', [])),
+        'deepfake_model_probs': list(session.get('deepfake_model_probs', [])),
+        'gaze_track': [_gaze_point_to_json(g) for g in session.get('gaze_track', [])],
+        'thermal_readings': [
+            _thermal_reading_to_json(t) for t in session.get('thermal_readings', [])],
+        'services': _services_to_json(session.get('services')),
+    })
+    # default=float is a belt-and-braces guard: the score producers are fixed at
+    # source to return native floats, but a numpy scalar nested in
+    # details['modality_scores'] (or added by future code) must never break the
+    # single most important write in the flow -- persisting a completed verdict.
+    return json.dumps(data, default=float)
+
+
+def deserialize_session(blob: str, build_services: Callable[[], Dict]) -> Dict:
+    """Rebuild a live session dict (incl. detector instances) from JSON."""
+    return _session_from_blob_json(json.loads(blob), build_services)
+
+
+def _session_from_blob_json(data: Dict, build_services: Callable[[], Dict]) -> Dict:
+    services = build_services()
+    _restore_services(services, data.get('services', {}))
+    series = {
+        'pulse_readings': [_pulse_reading_from_json(p) for p in data.get('pulse_readings', [])],
+        'deepfake_probs': list(data.get('deepfake_probs', [])),
+        'deepfake_model_probs': list(data.get('deepfake_model_probs', [])),
+        'gaze_track': [_gaze_point_from_json(g) for g in data.get('gaze_track', [])],
+        'thermal_readings': [
+            _thermal_reading_from_json(t) for t in data.get('thermal_readings', [])],
+    }
+    return _session_from_json(data, series, services)
+
+
+# --------------------------------------------------------------------------- #
+# Per-frame series encoding (the 'delta' layout)
+# --------------------------------------------------------------------------- #
+#
+# The series that grow with every frame are stored as packed little-endian
+# records rather than JSON, so a save APPENDs just the new frames' bytes and a
+# load unpacks them without a JSON parse. Optional floats are stored as NaN;
+# no producer emits NaN for those fields (a missing value is None), so the
+# mapping is unambiguous.
+
+_NAN = float('nan')
+
+
+def _opt(value: Optional[float]) -> float:
+    return _NAN if value is None else value
+
+
+def _unopt(value: float) -> Optional[float]:
+    return None if value != value else value
+
+
+class _FixedSeries:
+    """Fixed-width struct records; ``start`` skips dead records by offset."""
+
+    def __init__(self, fmt: str, pack: Callable, unpack: Callable):
+        self.record = struct.Struct(fmt)
+        self._pack = pack
+        self._unpack = unpack
+
+    def encode(self, items) -> bytes:
+        pack = self.record.pack
+        return b''.join(pack(*self._pack(item)) for item in items)
+
+    def decode(self, buf: bytes, start: int) -> List:
+        size = self.record.size
+        body = memoryview(buf)[start * size:]
+        usable = len(body) - len(body) % size
+        return [self._unpack(fields) for fields in self.record.iter_unpack(body[:usable])]
+
+
+class _JsonSeries:
+    """Length-prefixed JSON records, for rare series with nested fields."""
+
+    _LEN = struct.Struct('<I')
+
+    def __init__(self, to_json: Callable, from_json: Callable):
+        self._to_json = to_json
+        self._from_json = from_json
+
+    def encode(self, items) -> bytes:
+        out = []
+        for item in items:
+            payload = json.dumps(self._to_json(item), default=float).encode('utf-8')
+            out.append(self._LEN.pack(len(payload)))
+            out.append(payload)
+        return b''.join(out)
+
+    def decode(self, buf: bytes, start: int) -> List:
+        items, offset, index = [], 0, 0
+        while offset + self._LEN.size <= len(buf):
+            (length,) = self._LEN.unpack_from(buf, offset)
+            offset += self._LEN.size
+            if index >= start:
+                items.append(self._from_json(json.loads(buf[offset:offset + length])))
+            offset += length
+            index += 1
+        return items
+
+
+def _pack_pulse(p) -> tuple:
+    return (p.timestamp_ms, p.frame_number, *p.rgb_means, p.ppg_value,
+            _opt(p.heart_rate_bpm), _opt(p.heart_rate_variability),
+            _opt(p.spo2_estimate), p.signal_quality)
+
+
+def _unpack_pulse(f):
+    from .pulse_oximetry_service import PulseReading
+    return PulseReading(
+        timestamp_ms=f[0], frame_number=f[1], rgb_means=(f[2], f[3], f[4]),
+        ppg_value=f[5], heart_rate_bpm=_unopt(f[6]),
+        heart_rate_variability=_unopt(f[7]), spo2_estimate=_unopt(f[8]),
+        signal_quality=f[9],
+    )
+
+
+def _pack_gaze(g) -> tuple:
+    return (g.x, g.y, g.timestamp_ms, g.confidence, bool(g.is_fixation),
+            _opt(g.pupil_diameter))
+
+
+def _unpack_gaze(f):
+    from .gaze_tracking_service import GazePoint
+    return GazePoint(x=f[0], y=f[1], timestamp_ms=f[2], confidence=f[3],
+                     is_fixation=f[4], pupil_diameter=_unopt(f[5]))
+
+
+_PROBABILITIES = _FixedSeries('<d', lambda v: (v,), lambda f: f[0])
+
+# session field -> codec. PulseReading packs to 80 bytes and GazePoint to 41,
+# against roughly 250 and 120 bytes of JSON.
+_SERIES = {
+    'pulse_readings': _FixedSeries('<dq8d', _pack_pulse, _unpack_pulse),
+    'gaze_track': _FixedSeries('<4d?d', _pack_gaze, _unpack_gaze),
+    'deepfake_probs': _PROBABILITIES,
+    'deepfake_model_probs': _PROBABILITIES,
+    'thermal_readings': _JsonSeries(_thermal_reading_to_json, _thermal_reading_from_json),
+}
+
+_SNAPSHOTS = ('pulse', 'gaze', 'expression')
+
+# Marks a scalar-only document whose series and snapshots live in side keys.
+_DELTA_LAYOUT = 2
+
+
+def _series_delta(base, current) -> Optional[tuple]:
+    """
+    ``(dropped, appended)`` with ``current == base[dropped:] + appended``.
+
+    Matches by identity, not equality: the items are the objects load()
+    produced, so an append-only series keeps them in place and a trimmed one
+    (gaze_track's time window) keeps a suffix of them. Returns None when
+    ``current`` is neither, e.g. a series rewritten in the middle.
+    """
+    if not base:
+        return 0, current
+    if current and current[0] is base[0]:
+        dropped = 0
+    else:
+        first = current[0] if current else None
+        dropped = next((i for i, item in enumerate(base) if item is first), len(base))
+    kept = len(base) - dropped
+    if len(current) < kept or not all(map(operator.is_, current[:kept], base[dropped:])):
+        return None
+    return dropped, current[kept:]
+
+
 # --------------------------------------------------------------------------- #
 # Redis backend
 # --------------------------------------------------------------------------- #
@@ -422,6 +653,8 @@ class RedisSessionStore:
 
     Layout:
       liveness:sess:<id>          JSON session, TTL = retention window
+      liveness:sess:<id>:<series> packed per-frame records ('delta' layout)
+      liveness:sess:<id>:svc:<n>  versioned detector snapshot ('delta' layout)
       liveness:live               ZSET of live session ids, scored by deadline
       liveness:ulive:<user_id>    ZSET of that user's live ids, same scoring
       liveness:lock:<id>          per-session mutex (SET NX PX, token value)
@@ -449,6 +682,25 @@ class RedisSessionStore:
     accepts the kwarg and models no TTL -- so the retention semantics are
     covered separately by RedisTerminalSaveRetentionTests, which runs this store
     against the real redis:7 service container in backend-ci.yml.
+
+    WRITE LAYOUT. ``'blob'`` stores the whole session as one JSON string, so
+    every save re-encodes and re-sends every pulse reading, gaze point and
+    deepfake probability accumulated so far: per-frame cost grows with the
+    frame count. ``'delta'`` (the default) keeps the JSON document down to the
+    scalar state and moves each series to its own key of packed records (see
+    _SERIES), which a save APPENDs to with only the frames added since this
+    worker loaded the session; detector snapshots sit in their own keys and are
+    rewritten only when their JSON changed. load() reads both layouts in one
+    MGET, so a deployment can roll out with 'blob' and switch once every worker
+    runs this code.
+
+    The baseline an incremental save builds on is recorded per thread by a
+    load() made under this thread's lease and dropped on release(). Without
+    one (the create path, an unleased load, a legacy blob) the save rewrites
+    every side key instead. A series that was rewritten rather than appended or
+    trimmed from the front, or whose stored length moved underneath us, falls
+    back the same way, as does one whose dead (trimmed) records outgrow its live
+    ones, which keeps gaze_track's key from growing for the whole session.
     """
 
     _KEY = 'liveness:sess:'
@@ -458,10 +710,16 @@ class RedisSessionStore:
     _LOCK = 'liveness:lock:'
     _CREATE_LOCK = 'liveness:clock'
 
+    # Trimmed-away records a series may carry before a save compacts it.
+    _COMPACT_MIN_RECORDS = 256
+
     def __init__(self, client, build_services: Callable[[], Dict],
                  retention_seconds: int, lock_ttl_ms: int = 15000,
-                 create_lock_ttl_ms: int = 2000):
+                 create_lock_ttl_ms: int = 2000, layout: str = 'delta'):
+        if layout not in ('delta', 'blob'):
+            raise ValueError(f"layout must be 'delta' or 'blob', got {layout!r}")
         self.redis = client
+        self.layout = layout
         self._build_services = build_services
         self.retention_seconds = retention_seconds
         self.lock_ttl_ms = lock_ttl_ms
@@ -474,16 +732,67 @@ class RedisSessionStore:
         self._release_script = client.register_script(_RELEASE_LUA)
         self._renew_script = client.register_script(_RENEW_LUA)
         self._save_script = client.register_script(_SAVE_LUA)
+        self._save_delta_script = client.register_script(_SAVE_DELTA_LUA)
 
     # -- session read/write ------------------------------------------------- #
 
+    def _side_keys(self, session_id: str) -> List[str]:
+        key = self._KEY + session_id
+        return ([f'{key}:{name}' for name in _SERIES]
+                + [f'{key}:svc:{name}' for name in _SNAPSHOTS])
+
     def load(self, session_id: str) -> Optional[Dict]:
-        blob = self.redis.get(self._KEY + session_id)
+        self._baselines.pop(session_id, None)
+        values = self.redis.mget([self._KEY + session_id] + self._side_keys(session_id))
+        blob = values[0]
         if blob is None:
             return None
         if isinstance(blob, bytes):
             blob = blob.decode('utf-8')
-        return deserialize_session(blob, self._build_services)
+        data = json.loads(blob)
+        if data.get('layout') != _DELTA_LAYOUT:
+            # A 'blob' layout session: everything is in the document.
+            return _session_from_blob_json(data, self._build_services)
+
+        consistent = True
+        meta = data.get('series', {})
+        series, base_series = {}, {}
+        for (name, codec), raw in zip(_SERIES.items(), values[1:]):
+            raw = raw or b''
+            start, records = meta.get(name, (0, 0))
+            items = codec.decode(raw, start)
+            if len(items) != records - start:
+                logger.warning(
+                    "Liveness session %s: %s holds %d records, document expects %d",
+                    session_id, name, len(items), records - start)
+                consistent = False
+            series[name] = items
+            base_series[name] = {'items': tuple(items), 'start': start,
+                                 'records': records, 'bytes': len(raw)}
+
+        versions = data.get('services', {})
+        snapshots, base_services = {}, {}
+        for name, raw in zip(_SNAPSHOTS, values[1 + len(_SERIES):]):
+            version = versions.get(name)
+            stored = json.loads(raw) if raw is not None else {}
+            if stored.get('version') != version:
+                # Only eviction can split these: they are written in one script.
+                logger.warning(
+                    "Liveness session %s: %s snapshot is version %s, document "
+                    "expects %s; starting that detector fresh",
+                    session_id, name, stored.get('version'), version)
+                consistent = False
+                continue
+            if version is None:
+                continue
+            snapshots[name] = stored.get('state')
+            base_services[name] = (version, json.dumps(stored.get('state'), default=float))
+
+        services = self._build_services()
+        _restore_services(services, snapshots)
+        if consistent and session_id in self._tokens:
+            self._baselines[session_id] = {'series': base_series, 'services': base_services}
+        return _session_from_json(data, series, services)
 
     @staticmethod
     def _is_live(session: Dict) -> bool:
@@ -513,7 +822,8 @@ class RedisSessionStore:
         what the fence exists to reject, so it is refused loudly instead.
 
         What each branch writes, unchanged from when this was six client-side
-        commands -- see _SAVE_LUA for why it is now one:
+        commands -- see _SAVE_LUA for why it is now one (_SAVE_DELTA_LUA
+        applies the same rules to the 'delta' layout's side keys):
           * live: refresh the retention TTL so an active session never expires
             mid-flight, and write the tiny owner side key. The per-frame
             authorization check (views._owns_in_memory_session -> owner_of)
@@ -531,7 +841,6 @@ class RedisSessionStore:
             breaking the retention bound. EXPIRE ... NX backfills retention
             without disturbing an existing countdown (Redis 7+).
         """
-        blob = serialize_session(session)
         is_live = self._is_live(session)
         uid = session.get('user_id')
         keys = [self._LOCK + session_id, self._KEY + session_id,
@@ -539,8 +848,7 @@ class RedisSessionStore:
         # Defensive: create_session always stamps user_id, but an unowned
         # session must not create a 'liveness:ulive:None' bucket -- no
         # count_live(user_id) would ever prune it by user.
-        if uid is not None:
-            keys.append(self._ULIVE + str(uid))
+        ukeys = [self._ULIVE + str(uid)] if uid is not None else []
         # The score IS the deadline, which is what lets count_live drop members
         # that expired without anyone saving them again (see the class
         # docstring). Bounding both index keys by the retention window cannot
@@ -555,12 +863,81 @@ class RedisSessionStore:
                 "the write rather than overwriting the session's current owner",
                 session_id)
             return False
-        return bool(self._save_script(
-            keys=keys,
-            args=['' if not fenced else token, blob,
-                  '1' if is_live else '0', self.retention_seconds,
-                  self.retention_seconds * 1000, deadline, session_id,
-                  '' if uid is None else uid]))
+        args = ['' if not fenced else token, None,
+                '1' if is_live else '0', self.retention_seconds,
+                self.retention_seconds * 1000, deadline, session_id,
+                '' if uid is None else uid]
+        if self.layout == 'blob':
+            args[1] = serialize_session(session)
+            return bool(self._save_script(keys=keys + ukeys, args=args))
+
+        side_keys = self._side_keys(session_id)
+        baseline = self._baselines.get(session_id) if fenced else None
+        for attempt in range(2):
+            args[1], ops, after = self._delta_plan(session, baseline)
+            written = self._save_delta_script(
+                keys=keys + side_keys + ukeys,
+                args=args + [len(ops)] + [arg for op in ops for arg in op])
+            if written != -1:
+                break
+            logger.info(
+                "Liveness session %s: stored series moved since load; "
+                "rewriting them in full", session_id)
+            baseline = None
+        if written == 1 and fenced:
+            self._baselines[session_id] = after
+        return written == 1
+
+    def _delta_plan(self, session: Dict, baseline: Optional[Dict]) -> tuple:
+        """
+        Document, side-key ops and the baseline after the write, for _SAVE_DELTA_LUA.
+
+        Ops line up with _side_keys(): one per series, then one per snapshot.
+        """
+        doc = _session_scalars_to_json(session)
+        ops, meta, after_series = [], {}, {}
+        for name, codec in _SERIES.items():
+            items = session.get(name, [])
+            base = baseline['series'].get(name) if baseline else None
+            delta = _series_delta(base['items'], items) if base else None
+            if delta is not None:
+                dropped, appended = delta
+                start = base['start'] + dropped
+                if start > max(len(items), self._COMPACT_MIN_RECORDS):
+                    delta = None
+            if delta is None:
+                payload = codec.encode(items)
+                ops.append(('s', 0, payload))
+                start, records, size = 0, len(items), len(payload)
+            else:
+                payload = codec.encode(appended)
+                ops.append(('a', base['bytes'], payload))
+                records = base['records'] + len(appended)
+                size = base['bytes'] + len(payload)
+            meta[name] = [start, records]
+            after_series[name] = {'items': tuple(items), 'start': start,
+                                  'records': records, 'bytes': size}
+
+        snapshots = _services_to_json(session.get('services'))
+        versions, after_services = {}, {}
+        for name in _SNAPSHOTS:
+            if name not in snapshots:
+                ops.append(('s', 0, b''))
+                continue
+            state = json.dumps(snapshots[name], default=float)
+            base = baseline['services'].get(name) if baseline else None
+            if base is not None and base[1] == state:
+                version = base[0]
+                ops.append(('k', 0, b''))
+            else:
+                version = base[0] + 1 if base is not None else 1
+                ops.append(('s', 0, f'{{"version": {version}, "state": {state}}}'))
+            versions[name] = version
+            after_services[name] = (version, state)
+
+        doc.update({'layout': _DELTA_LAYOUT, 'series': meta, 'services': versions})
+        return (json.dumps(doc, default=float), ops,
+                {'series': after_series, 'services': after_services})
 
     def delete(self, session_id: str) -> None:
         # Read the owner rather than caching it per thread: delete() is the rare
@@ -569,7 +946,9 @@ class RedisSessionStore:
         # that grew by one entry per session for the life of a worker thread.
         # Must run BEFORE the delete, while the owner is still readable.
         uid = self.owner_of(session_id)
-        self.redis.delete(self._KEY + session_id, self._OWNER + session_id)
+        self._baselines.pop(session_id, None)
+        self.redis.delete(self._KEY + session_id, self._OWNER + session_id,
+                          *self._side_keys(session_id))
         self.redis.zrem(self._LIVE, session_id)
         if uid is not None:
             self.redis.zrem(self._ULIVE + str(uid), session_id)
@@ -653,6 +1032,7 @@ class RedisSessionStore:
         original holder deletes the NEW owner's lock and a third worker can then
         enter the same session concurrently.
         """
+        self._baselines.pop(session_id, None)
         token = self._tokens.pop(session_id, None)
         if token is None:
             return
@@ -682,6 +1062,15 @@ class RedisSessionStore:
             self._local.tokens = cache
         return cache
 
+    @property
+    def _baselines(self) -> Dict:
+        """What this thread last loaded or saved, per leased session."""
+        cache = getattr(self._local, 'baselines', None)
+        if cache is None:
+            cache = {}
+            self._local.baselines = cache
+        return cache
+
     # -- capacity (atomic create) ------------------------------------------ #
 
     def count_live(self, user_id: int) -> tuple:
@@ -353,6 +353,50 @@ class RPPGExtractorTests(TestCase):
         self.extractor.reset()
         self.assertEqual(self.extractor.frame_count, 0)
 
+    @staticmethod
+    def _pulse_frames(count, bpm=72.0, fps=30):
+        rng = np.random.default_rng(7)
+        for i in range(count):
+            wave = np.sin(2 * np.pi * bpm / 60 * i / fps)
+            frame = np.empty((40, 40, 3))
+            frame[..., 0] = 150 + 2 * wave + rng.normal(0, 0.3)
+            frame[..., 1] = 120 + 4 * wave
+            frame[..., 2] = 110
+            yield frame
+    
+    def test_incremental_matches_batch_heart_rate(self):
+        """Streaming filter + sliding spectrum find the same pulse as the batch FFT."""
+        batch = RPPGExtractor(incremental=False)
+        streaming = RPPGExtractor()
+        for frame in self._pulse_frames(450):
+            batch_result = batch.process_frame(frame)
+            streaming_result = streaming.process_frame(frame)
+        
+        self.assertAlmostEqual(batch_result['heart_rate_bpm'], 72.0, delta=3)
+        self.assertAlmostEqual(streaming_result['heart_rate_bpm'], 72.0, delta=3)
+        self.assertEqual(streaming.is_living_tissue()[0], batch.is_living_tissue()[0])
+    
+    def test_sliding_spectrum_tracks_window_dft(self):
+        """The in-place HR-band spectrum equals a DFT of the current window."""
+        extractor = RPPGExtractor(window_size=64)
+        for frame in self._pulse_frames(64 * 3 + 17):
+            extractor.process_frame(frame)
+        
+        window = np.array(extractor._filtered)
+        dft = np.fft.rfft(window)
+        bins = np.round(extractor._hr_freqs * 64 / extractor.fps).astype(int)
+        np.testing.assert_allclose(np.abs(extractor._spectrum), np.abs(dft[bins]), rtol=1e-6, atol=1e-9)
+    
+    def test_heart_rate_recomputed_every_interval(self):
+        """Between updates process_frame reports the cached estimate."""
+        extractor = RPPGExtractor(hr_update_interval=10)
+        with patch.object(
+            extractor, '_streaming_heart_rate', wraps=extractor._streaming_heart_rate
+        ) as estimate:
+            for frame in self._pulse_frames(90 + 29):
+                extractor.process_frame(frame)
+        self.assertEqual(estimate.call_count, 3)
+
 
 @patch('ml_dark_web.tasks.monitor_user_credentials.delay', mock_celery_delay)
 class LivenessAPITests(APITestCase):
@@ -811,6 +855,80 @@ class LivenessAPITests(APITestCase):
         self.assertIn('next_challenge', resp.data)
 
 
+class BinaryFrameTests(TestCase):
+    """Binary WS frames: fixed header, zero-copy raw pixels, stale-frame dropping."""
+
+    def setUp(self):
+        self.sid = str(uuid.uuid4())
+
+    def _message(self, payload, width=2, height=2, pixel_format=1, timestamp_ms=5.0):
+        from .frame_utils import pack_binary_frame_header
+        return pack_binary_frame_header(
+            self.sid, timestamp_ms, width, height, pixel_format) + payload
+
+    def test_rgb_payload_is_a_view_of_the_message(self):
+        from .frame_utils import decode_binary_pixels, parse_binary_frame
+        raw = bytes(range(12))
+        header, payload, err = parse_binary_frame(self._message(raw))
+        self.assertIsNone(err)
+        self.assertEqual(header.session_id, self.sid)
+        self.assertEqual((header.width, header.height, header.timestamp_ms), (2, 2, 5.0))
+        frame, err = decode_binary_pixels(header, payload)
+        self.assertIsNone(err)
+        self.assertEqual(frame.shape, (2, 2, 3))
+        self.assertEqual(frame.tobytes(), raw)
+        # No copy was made: the array is the (immutable) message buffer.
+        self.assertFalse(frame.flags.writeable)
+
+    def test_rgba_payload_drops_alpha(self):
+        from .frame_utils import decode_binary_pixels, parse_binary_frame
+        header, payload, _ = parse_binary_frame(self._message(bytes(range(16)), pixel_format=2))
+        frame, err = decode_binary_pixels(header, payload)
+        self.assertIsNone(err)
+        self.assertEqual(frame.shape, (2, 2, 3))
+        self.assertEqual(frame[0, 1].tolist(), [4, 5, 6])
+        self.assertTrue(frame.flags.c_contiguous)
+
+    def test_malformed_messages_are_rejected(self):
+        from .frame_utils import decode_binary_pixels, parse_binary_frame
+        self.assertEqual(parse_binary_frame(b'LV')[2], 'Invalid frame header')
+        self.assertEqual(parse_binary_frame(b'XX' + self._message(b'')[2:])[2],
+                         'Invalid frame header')
+        self.assertEqual(parse_binary_frame(self._message(b'', pixel_format=9))[2],
+                         'Unsupported pixel format')
+        self.assertEqual(parse_binary_frame(self._message(b'', width=60000, height=60000))[2],
+                         'Frame dimensions exceed maximum')
+        header, payload, _ = parse_binary_frame(self._message(bytes(11)))
+        self.assertEqual(decode_binary_pixels(header, payload)[1],
+                         'Frame dimensions do not match data')
+
+    def test_stale_frames_are_dropped_while_one_is_analysed(self):
+        import asyncio
+        from .consumers import LivenessConsumer
+        consumer = LivenessConsumer()
+        consumer.session_id = self.sid
+        consumer.drop_stale_frames = True
+        analysed = []
+        release = asyncio.Event()
+
+        async def handle_binary_frame(header, payload):
+            analysed.append(header.timestamp_ms)
+            await release.wait()
+        consumer.handle_binary_frame = handle_binary_frame
+
+        async def stream():
+            await consumer.receive_frame_bytes(self._message(bytes(12), timestamp_ms=1.0))
+            await asyncio.sleep(0)      # the worker picks frame 1 up
+            for t in (2.0, 3.0, 4.0):   # arrive while frame 1 is in flight
+                await consumer.receive_frame_bytes(self._message(bytes(12), timestamp_ms=t))
+            release.set()
+            await consumer._drain_frames()
+        asyncio.run(stream())
+
+        self.assertEqual(analysed, [1.0, 4.0])
+        self.assertEqual(consumer.dropped_frames, 2)
+
+
 class PersistOutboxTests(TestCase):
     """DB-backed persist outbox: the last-resort net behind the broker retry."""
 
@@ -1910,8 +2028,8 @@ class _FakeRedis:
     """
     Minimal in-process Redis double for the session-store tests.
 
-    Implements only what RedisSessionStore uses (set with nx/px/ex, get, delete,
-    exists, pexpire, sadd/srem/scard/smembers, and the ZSET commands backing the
+    Implements only what RedisSessionStore uses (set with nx/px/ex, get, mget,
+    delete, exists, pexpire, sadd/srem/scard/smembers, and the ZSET commands backing the
     live indexes), returning bytes like a real from_url() client so the store's
     decode paths are exercised. Key TTL is not simulated -- these tests are
     hermetic and assert state sharing/locking, not expiry timing; the retention
@@ -1940,6 +2058,9 @@ class _FakeRedis:
     def get(self, name):
         return self.kv.get(name)
 
+    def mget(self, names):
+        return [self.kv.get(name) for name in names]
+
     def delete(self, *names):
         removed = 0
         for name in names:
@@ -2015,7 +2136,7 @@ class _FakeRedis:
 
     def register_script(self, script):
         """
-        Emulate the two lock scripts the store registers.
+        Emulate the scripts the store registers.
 
         There is no Lua interpreter here, so we match on the exact source the
         store registers and implement the same semantics in Python. Matching on
@@ -2023,7 +2144,7 @@ class _FakeRedis:
         adding a third script fails loudly instead of silently no-op'ing.
         """
         from .services.session_store import (
-            _RELEASE_LUA, _RENEW_LUA, _SAVE_LUA)
+            _RELEASE_LUA, _RENEW_LUA, _SAVE_DELTA_LUA, _SAVE_LUA)
 
         if script == _RELEASE_LUA:
             def release(keys, args):
@@ -2064,6 +2185,43 @@ class _FakeRedis:
                 return 1
             return save
 
+        if script == _SAVE_DELTA_LUA:
+            def save_delta(keys, args):
+                lock, doc_key, owner_key, live = keys[:4]
+                n = int(args[8])
+                side, ukey = keys[4:4 + n], (keys[4 + n] if len(keys) > 4 + n else None)
+                ops = [args[9 + 3 * i:12 + 3 * i] for i in range(n)]
+                token, doc, is_live = args[0], args[1], args[2]
+                deadline, sid, owner = args[5], args[6], args[7]
+                if token != '' and self.kv.get(lock) != self._b(token):
+                    return 0
+                # Every append's base length is checked before anything is written.
+                for key, (op, expected, _payload) in zip(side, ops):
+                    if op == 'a' and len(self.kv.get(key, b'')) != int(expected):
+                        return -1
+                self.kv[doc_key] = self._b(doc)
+                for key, (op, _expected, payload) in zip(side, ops):
+                    payload = self._b(payload)
+                    if op == 's':
+                        if payload:
+                            self.kv[key] = payload
+                        else:
+                            self.kv.pop(key, None)
+                    elif op == 'a' and payload:
+                        self.kv[key] = self.kv.get(key, b'') + payload
+                if is_live == '1':
+                    if owner != '':
+                        self.kv[owner_key] = self._b(owner)
+                    self.zadd(live, {sid: deadline})
+                    if ukey:
+                        self.zadd(ukey, {sid: deadline})
+                else:
+                    self.zrem(live, sid)
+                    if ukey:
+                        self.zrem(ukey, sid)
+                return 1
+            return save_delta
+
         raise AssertionError(f'_FakeRedis has no emulation for script: {script!r}')
 
 
@@ -2577,6 +2735,124 @@ class RedisSessionStoreCrossProcessTests(TestCase):
         self.assertEqual(reread.verdict, result.verdict)
 
 
+class RedisSessionStoreDeltaLayoutTests(TestCase):
+    """The 'delta' layout appends per-frame series instead of rewriting them."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='delta', email='delta@example.com', password='pw')
+        self.fake = _FakeRedis()
+        self.svc = _redis_service(self.fake)
+        self.store = self.svc._redis_store
+        self.sid = self.svc.create_session(user_id=self.user.id)['session_id']
+
+    def _key(self, suffix):
+        return self.store._KEY + self.sid + ':' + suffix
+
+    def _gaze(self, t, pupil=None):
+        from .services.gaze_tracking_service import GazePoint
+        return GazePoint(x=0.4, y=0.6, timestamp_ms=t, confidence=0.9,
+                         is_fixation=t % 2 == 0, pupil_diameter=pupil)
+
+    def test_every_series_round_trips(self):
+        from .services.pulse_oximetry_service import PulseReading
+        from .services.thermal_imaging_service import ThermalReading
+        session = self.store.load(self.sid)
+        session['pulse_readings'] = [PulseReading(
+            timestamp_ms=i * 33.0, frame_number=i, rgb_means=(1.0, 2.0, 3.0),
+            ppg_value=0.25, heart_rate_bpm=72.0 if i else None,
+            heart_rate_variability=None, spo2_estimate=None, signal_quality=0.8)
+            for i in range(5)]
+        session['gaze_track'] = [self._gaze(10.0), self._gaze(11.0, pupil=3.5)]
+        session['deepfake_probs'] = [0.1, 0.2, 0.3]
+        session['thermal_readings'] = [ThermalReading(
+            timestamp_ms=5.0, frame_number=2, average_temp_c=36.5,
+            min_temp_c=35.2, max_temp_c=37.1, has_natural_gradient=True,
+            matches_living_tissue=True, heat_map_features={'forehead_mean': 36.4})]
+        self.assertTrue(self.store.save(self.sid, session, fenced=False))
+
+        restored = self.store.load(self.sid)
+        for name in ('pulse_readings', 'gaze_track', 'deepfake_probs', 'thermal_readings'):
+            self.assertEqual(restored[name], session[name], name)
+        # The document itself no longer carries the series.
+        self.assertNotIn('pulse_readings', self.store._raw(self.sid))
+
+    def test_leased_save_appends_only_the_new_frames(self):
+        self.assertTrue(self.store.acquire(self.sid))
+        session = self.store.load(self.sid)
+        session['deepfake_probs'].extend([0.1, 0.2])
+        self.assertTrue(self.store.save(self.sid, session))
+        key = self._key('deepfake_probs')
+        self.assertEqual(len(self.fake.kv[key]), 16)
+
+        # Overwrite the stored prefix with different bytes of the same length:
+        # an append leaves them alone, a rewrite would restore 0.1 and 0.2.
+        tampered = b'\x00' * 16
+        self.fake.kv[key] = tampered
+        session['deepfake_probs'].append(0.3)
+        self.assertTrue(self.store.save(self.sid, session))
+        self.assertTrue(self.fake.kv[key].startswith(tampered))
+        self.assertEqual(len(self.fake.kv[key]), 24)
+        self.store.release(self.sid)
+
+    def test_trimmed_gaze_track_stays_consistent(self):
+        self.assertTrue(self.store.acquire(self.sid))
+        session = self.store.load(self.sid)
+        session['gaze_track'].extend(self._gaze(float(t)) for t in range(6))
+        self.assertTrue(self.store.save(self.sid, session))
+        self.store.release(self.sid)
+
+        self.assertTrue(self.store.acquire(self.sid))
+        session = self.store.load(self.sid)
+        # What process_frame does once samples age out of the window.
+        session['gaze_track'] = session['gaze_track'][4:] + [self._gaze(6.0)]
+        self.assertTrue(self.store.save(self.sid, session))
+        self.store.release(self.sid)
+
+        restored = self.store.load(self.sid)
+        self.assertEqual([g.timestamp_ms for g in restored['gaze_track']], [4.0, 5.0, 6.0])
+
+    def test_moved_series_falls_back_to_a_full_rewrite(self):
+        self.assertTrue(self.store.acquire(self.sid))
+        session = self.store.load(self.sid)
+        # Stored bytes changed length behind this worker's baseline.
+        self.fake.kv[self._key('deepfake_probs')] = b'\x00' * 8
+        session['deepfake_probs'].append(0.5)
+        self.assertTrue(self.store.save(self.sid, session))
+        self.store.release(self.sid)
+        self.assertEqual(self.store.load(self.sid)['deepfake_probs'], [0.5])
+
+    def test_unchanged_snapshots_are_not_rewritten(self):
+        self.assertTrue(self.store.acquire(self.sid))
+        session = self.store.load(self.sid)
+        before = dict(self.store._raw(self.sid)['services'])
+        self.assertTrue(self.store.save(self.sid, session))
+        self.assertEqual(self.store._raw(self.sid)['services'], before)
+        self.store.release(self.sid)
+
+    def test_blob_layout_sessions_are_still_readable(self):
+        from .services.session_store import serialize_session
+        session = self.store.load(self.sid)
+        session['deepfake_probs'] = [0.4]
+        session['frames_processed'] = 3
+        self.fake.kv[self.store._KEY + self.sid] = serialize_session(session).encode()
+
+        restored = self.store.load(self.sid)
+        self.assertEqual(restored['deepfake_probs'], [0.4])
+        self.assertEqual(restored['frames_processed'], 3)
+        # Saving it again moves it to the delta layout.
+        self.assertTrue(self.store.save(self.sid, restored, fenced=False))
+        self.assertEqual(self.store._raw(self.sid)['layout'], 2)
+        self.assertEqual(self.store.load(self.sid)['deepfake_probs'], [0.4])
+
+    def test_delete_removes_the_side_keys(self):
+        session = self.store.load(self.sid)
+        session['deepfake_probs'] = [0.4]
+        self.store.save(self.sid, session, fenced=False)
+        self.store.delete(self.sid)
+        self.assertFalse([k for k in self.fake.kv if k.startswith(self.store._KEY + self.sid)])
+
+
 class PulseRestoreStateToleranceTests(TestCase):
     """A malformed pulse blob must degrade, not raise a frame LATER."""
 
@@ -0,0 +1,81 @@
+"""
+Compare MerkleTreeBuilder with the incremental MerkleAccumulator.
+
+Usage:
+    python manage.py benchmark_merkle_accumulator [--leaves N] [--proofs N]
+
+Times tree construction and proof generation for N random leaves with
+both implementations, checks they agree, and reports the memory held by
+each tree's node storage. No database access.
+"""
+
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from blockchain.services.merkle_accumulator import MerkleAccumulator
+from blockchain.services.merkle_tree_builder import MerkleTreeBuilder
+
+
+class Command(BaseCommand):
+    help = "Benchmark Merkle tree construction and proof generation, builder vs accumulator."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leaves', type=int, default=1_000_000)
+        parser.add_argument(
+            '--proofs',
+            type=int,
+            default=None,
+            help="Number of proofs to generate (default: one per leaf)",
+        )
+
+    def handle(self, *args, **opts):
+        n = opts['leaves']
+        proof_count = min(opts['proofs'] if opts['proofs'] is not None else n, n)
+        leaves = [os.urandom(32) for _ in range(n)]
+
+        started = time.perf_counter()
+        builder = MerkleTreeBuilder(leaves)
+        builder_build = time.perf_counter() - started
+        started = time.perf_counter()
+        for i in range(proof_count):
+            builder.get_proof(i)
+        builder_proofs = time.perf_counter() - started
+        builder_bytes = sum(
+            sys.getsizeof(level) + sum(sys.getsizeof(node) for node in level)
+            for level in builder.tree
+        )
+        builder_root = builder.root
+        del builder
+
+        started = time.perf_counter()
+        accumulator = MerkleAccumulator()
+        for leaf in leaves:
+            accumulator.append(leaf)
+        accumulator.seal()
+        accumulator_build = time.perf_counter() - started
+        started = time.perf_counter()
+        for i in range(proof_count):
+            accumulator.get_proof(i)
+        accumulator_proofs = time.perf_counter() - started
+        accumulator_bytes = sum(len(level) for level in accumulator._levels)
+
+        if accumulator.root() != builder_root:
+            self.stderr.write(self.style.ERROR("Roots differ between builder and accumulator"))
+            return
+
+        self.stdout.write(f"{n} leaves, {proof_count} proofs")
+        for name, build, proofs, size in (
+            ('builder', builder_build, builder_proofs, builder_bytes),
+            ('accumulator', accumulator_build, accumulator_proofs, accumulator_bytes),
+        ):
+            self.stdout.write(
+                f"{name:>12}: build {build:.2f} s, proofs {proofs:.2f} s "
+                f"({proofs / max(proof_count, 1) * 1e6:.1f} us each), nodes {size / 2**20:.1f} MiB"
+            )
+        self.stdout.write(
+            f"{'frontier':>12}: {len(accumulator.frontier)} nodes "
+            f"({sum(1 for node in accumulator.frontier if node)} set)"
+        )
@@ -0,0 +1,42 @@
+"""
+Add ``AnchorBatch``: the persisted Merkle accumulator frontier and
+primary-key cursor that make anchor batches size-capped and resumable.
+"""
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0004_batch_size_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnchorBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('building', 'Building'), ('sealed', 'Sealed'), ('submitted', 'Submitted'), ('anchored', 'Anchored')], db_index=True, default='building', max_length=16)),
+                ('first_pending_id', models.BigIntegerField(blank=True, help_text='Primary key of the first PendingCommitment in the batch', null=True)),
+                ('last_pending_id', models.BigIntegerField(default=0, help_text='Cursor: primary key of the last PendingCommitment appended')),
+                ('leaf_count', models.IntegerField(default=0)),
+                ('frontier', models.JSONField(blank=True, default=list, help_text='Unpaired Merkle node per level (hex or null)')),
+                ('leaves', models.BinaryField(blank=True, default=bytes, help_text='Packed 32-byte leaf hashes in append order')),
+                ('merkle_root', models.CharField(blank=True, help_text='Root hash once the batch is sealed (0x prefixed)', max_length=66, null=True)),
+                ('tx_hash', models.CharField(blank=True, help_text='Anchor transaction, once broadcast', max_length=66, null=True)),
+                ('gas_price_wei', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('blockchain_anchor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='batches', to='blockchain.blockchainanchor')),
+            ],
+            options={
+                'verbose_name': 'Anchor Batch',
+                'verbose_name_plural': 'Anchor Batches',
+                'db_table': 'anchor_batches',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+"""
+Add ``AnchorBatch.submitted_at`` so a batch whose transaction was dropped
+can be told apart from one still waiting to confirm.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0005_anchorbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anchorbatch',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, help_text='When the anchor transaction was broadcast', null=True),
+        ),
+    ]
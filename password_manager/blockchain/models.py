@@ -252,3 +252,91 @@ class PendingCommitment(models.Model):
     def __str__(self):
         status = "Anchored" if self.is_anchored else "Pending"
         return f"{status}: {self.commitment_hash[:10]}..."
+
+
+class AnchorBatch(models.Model):
+    """
+    Resumable build state for one anchor batch.
+
+    Pending commitments are streamed into a Merkle accumulator in primary
+    key order; the accumulator frontier, the packed leaf hashes and the
+    primary-key cursor are saved after every chunk, so an interrupted or
+    retried anchoring run continues the same batch instead of rebuilding
+    the tree from every pending row.
+    """
+    STATUS_CHOICES = [
+        ('building', 'Building'),
+        ('sealed', 'Sealed'),
+        ('submitted', 'Submitted'),
+        ('anchored', 'Anchored'),
+    ]
+
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default='building',
+        db_index=True
+    )
+    first_pending_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Primary key of the first PendingCommitment in the batch"
+    )
+    last_pending_id = models.BigIntegerField(
+        default=0,
+        help_text="Cursor: primary key of the last PendingCommitment appended"
+    )
+    leaf_count = models.IntegerField(default=0)
+    frontier = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Unpaired Merkle node per level (hex or null)"
+    )
+    leaves = models.BinaryField(
+        default=bytes,
+        blank=True,
+        help_text="Packed 32-byte leaf hashes in append order"
+    )
+    merkle_root = models.CharField(
+        max_length=66,
+        null=True,
+        blank=True,
+        help_text="Root hash once the batch is sealed (0x prefixed)"
+    )
+    tx_hash = models.CharField(
+        max_length=66,
+        null=True,
+        blank=True,
+        help_text="Anchor transaction, once broadcast"
+    )
+    gas_price_wei = models.BigIntegerField(
+        null=True,
+        blank=True
+    )
+    submitted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the anchor transaction was broadcast"
+    )
+    blockchain_anchor = models.ForeignKey(
+        BlockchainAnchor,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='batches'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        db_table = 'anchor_batches'
+        ordering = ['created_at']
+        verbose_name = 'Anchor Batch'
+        verbose_name_plural = 'Anchor Batches'
+
+    def __str__(self):
+        return f"Batch {self.pk} ({self.status}, {self.leaf_count} commitments)"
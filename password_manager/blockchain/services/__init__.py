@@ -3,7 +3,8 @@ Blockchain services for anchoring commitments to Arbitrum
 """
 
 from .merkle_tree_builder import MerkleTreeBuilder
+from .merkle_accumulator import MerkleAccumulator
 from .blockchain_anchor_service import BlockchainAnchorService
 
-__all__ = ['MerkleTreeBuilder', 'BlockchainAnchorService']
+__all__ = ['MerkleTreeBuilder', 'MerkleAccumulator', 'BlockchainAnchorService']
 
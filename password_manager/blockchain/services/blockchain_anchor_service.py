@@ -5,16 +5,20 @@ Blockchain Anchor Service for submitting commitment batches to Arbitrum
 import logging
 import os
 import threading
+from datetime import timedelta
 from typing import Dict, List, Optional
 from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
 from eth_account.messages import encode_defunct
 from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Max
 
-from ..models import BlockchainAnchor, MerkleProof, PendingCommitment
+from ..models import AnchorBatch, BlockchainAnchor, MerkleProof, PendingCommitment
 from .exceptions import classify
 from .key_provider import get_key_provider
+from .merkle_accumulator import NODE_SIZE, MerkleAccumulator
 from .merkle_tree_builder import MerkleTreeBuilder, create_commitment_hash
 from shared.circuit_breaker import blockchain_breaker, CircuitBreakerOpen
 
@@ -271,11 +275,18 @@ class BlockchainAnchorService:
             )
             return None
     
-    @transaction.atomic
     def anchor_pending_batch(self) -> Optional[str]:
         """
-        Anchor all pending commitments to blockchain
-        
+        Anchor the next batch of pending commitments to blockchain
+
+        Batches hold at most ``MAX_BATCH_LEAVES`` commitments and are built
+        incrementally (see ``_build_anchor_batch``), so a backlog drains
+        over several calls and a retry resumes the open batch instead of
+        rebuilding its tree. Batches broadcast by an earlier call are
+        polled first, without blocking (see ``_poll_submitted_batches``),
+        so a transaction that never confirms does not hold up the batches
+        behind it.
+
         Returns:
             Transaction hash or None if failed
         """
@@ -289,207 +300,419 @@ class BlockchainAnchorService:
         except CircuitBreakerOpen as e:
             logger.warning(f"Blockchain circuit breaker OPEN: {e}")
             return None
+
+        try:
+            confirmed = self._poll_submitted_batches()
+        except Exception as e:
+            blockchain_breaker.on_failure(classify(e))
+            logger.error(f"Error polling submitted anchor batches: {e}", exc_info=True)
+            return None
+
+        batch, tree = self._build_anchor_batch()
         
-        # Get all pending commitments
-        pending = list(PendingCommitment.objects.filter(
-            is_anchored=False
-        ).select_related('user', 'commitment').order_by('created_at'))
-        
-        if not pending:
+        if batch is None:
             logger.info("No pending commitments to anchor")
-            return None
+            return confirmed
         
-        logger.info(f"Anchoring batch of {len(pending)} commitments")
+        merkle_root = batch.merkle_root
+        batch_size = batch.leaf_count
+        logger.info(f"Anchoring batch {batch.pk} of {batch_size} commitments, root {merkle_root}")
         
         try:
-            # Build Merkle tree
-            commitment_dicts = [
-                {'commitment_hash': p.commitment_hash}
-                for p in pending
-            ]
-            tree = MerkleTreeBuilder.build_from_commitments(commitment_dicts)
-            merkle_root = tree.get_root_hex()
-            
-            logger.info(f"Built Merkle tree with root: {merkle_root}")
-            
-            # Sign the commitment. The on-chain contract binds the
-            # signed payload to (chainId, contract address) so a
-            # signature minted for one deployment can't be replayed on
-            # another. Match its `abi.encode(block.chainid, address(this),
-            # merkleRoot, batchSize)` exactly — added per CodeRabbit
-            # review of PR #262.
-            chain_id = self.w3.eth.chain_id
-            contract_addr = Web3.to_checksum_address(self.contract_address)
-            message_hash = Web3.solidity_keccak(
-                ['uint256', 'address', 'bytes32', 'uint256'],
-                [chain_id, contract_addr, bytes.fromhex(merkle_root[2:]), len(pending)]
-            )
-            msg = encode_defunct(primitive=message_hash)
-            signature = self.key_provider.sign_message(msg)
+            broadcast = self._broadcast_anchor(merkle_root, batch_size, signer_address)
+            if broadcast is None:
+                return None
+            # Record the broadcast first, so a retry after a receipt
+            # timeout or DB error never anchors the same root twice.
+            batch.tx_hash, batch.gas_price_wei = broadcast
+            batch.status = 'submitted'
+            batch.submitted_at = timezone.now()
+            batch.save(update_fields=['tx_hash', 'gas_price_wei', 'status', 'submitted_at', 'updated_at'])
             
-            # Submit to blockchain
-            contract = self.w3.eth.contract(
-                address=self.contract_address,
-                abi=self.contract_abi
-            )
-
-            # Preflight: confirm our signer is still authorized on the
-            # contract before paying gas to send a tx that would just
-            # revert. Catches the "owner rotated us out" case loudly
-            # instead of leaving anchoring quietly broken. Added per
-            # CodeRabbit review of PR #262.
+            # Wait for receipt
             try:
-                if not contract.functions.authorizedSigners(
-                    signer_address
-                ).call():
-                    logger.error(
-                        "Blockchain signer %s is not in CommitmentRegistry."
-                        "authorizedSigners; refusing to broadcast. Have the "
-                        "registry owner call addAuthorizedSigner() and retry.",
-                        signer_address,
-                    )
-                    # Audit-fix M10 + PR #273 review: a deterministic
-                    # "unauthorized signer" outcome is a contract-revert
-                    # equivalent, not infra. Wrap through `classify()`
-                    # so the breaker doesn't trip on it.
-                    blockchain_breaker.on_failure(
-                        classify(PermissionError("unauthorized signer"))
-                    )
-                    return None
-            except Exception as e:
-                # Fail closed: if we can't verify the signer is still
-                # authorized, don't burn gas on an anchorCommitment() that
-                # might just revert (and tie up the on-chain nonce). The
-                # circuit breaker takes the failure so the retry path
-                # recovers when the read becomes healthy again. Tightened
-                # per CodeRabbit review of PR #262.
-                logger.error(
-                    "authorizedSigners preflight call failed: %s; refusing "
-                    "to broadcast until signer authorization can be confirmed.",
-                    e,
+                receipt = self.w3.eth.wait_for_transaction_receipt(
+                    batch.tx_hash, timeout=int(self.config.get('RECEIPT_TIMEOUT_SECONDS', 300))
+                )
+            except TimeExhausted:
+                logger.warning(
+                    f"No receipt for batch {batch.pk} ({batch.tx_hash}) yet; "
+                    "it will be polled on the next run"
                 )
-                blockchain_breaker.on_failure(classify(e))
                 return None
 
-            # Audit-fix H4 + PR #272 review: thread-safe nonce
-            # reservation with double-checked lazy init under the
-            # `_nonce_manager_lock` created in __init__. Before the
-            # lock, two concurrent `anchor_pending_batch` callers
-            # could both observe `_nonce_manager is None` and
-            # construct separate managers, each seeded from the same
-            # on-chain pending nonce — the exact race H4 was
-            # supposed to fix.
-            if self._nonce_manager is None:
-                with self._nonce_manager_lock:
-                    if self._nonce_manager is None:
-                        from smart_contracts.services.nonce_manager import NonceManager
-                        self._nonce_manager = NonceManager(self.w3, signer_address)
-
-            # Lease the nonce (PR #272 review). If anything between
-            # here and a successful send_raw_transaction raises, the
-            # lease's __exit__ releases the nonce so the next batch
-            # doesn't sit behind a permanent gap.
-            lease = self._nonce_manager.lease()
-            try:
-                tx = contract.functions.anchorCommitment(
-                    bytes.fromhex(merkle_root[2:]),
-                    len(pending),
-                    signature.signature
-                ).build_transaction({
-                    'from': signer_address,
-                    'nonce': lease.value,
-                    'gas': 500000,  # Estimate, will be calculated
-                    'gasPrice': self.w3.eth.gas_price,
-                })
-
-                # Sign and send transaction via the KeyProvider so the
-                # raw private bytes don't need to be in scope here.
-                raw_tx = self.key_provider.sign_transaction(tx, self.w3)
-                try:
-                    tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
-                except Exception as send_err:
-                    msg = str(send_err).lower()
-                    if 'nonce' in msg or 'replacement' in msg:
-                        self._nonce_manager.resync()
-                    raise
-                # Broadcast succeeded — chain has consumed this nonce
-                # regardless of what wait_for_receipt or DB writes do
-                # below. Commit so the lease is settled.
-                lease.commit()
-            except Exception:
-                # Release the lease back to the pool so the next batch
-                # can reuse the slot.
-                lease.release()
-                raise
-            tx_hash_hex = self.w3.to_hex(tx_hash)
-            
-            logger.info(f"Transaction sent: {tx_hash_hex}")
+            return self._finish_batch(batch, tree, receipt)
+
+        except Exception as e:
+            # Audit-fix M10: classify before passing to the breaker so
+            # deterministic contract reverts don't count toward the
+            # failure threshold.
+            blockchain_breaker.on_failure(classify(e))
+            logger.error(f"Error anchoring batch: {e}", exc_info=True)
+            return None
+
+    def _finish_batch(self, batch, tree, receipt) -> Optional[str]:
+        """
+        Record the receipt of a submitted batch.
+
+        Returns:
+            The transaction hash if it confirmed, None if it reverted
+        """
+        if receipt['status'] == 1:
+            logger.info(f"Transaction confirmed in block {receipt['blockNumber']}")
             
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            anchored_count = self._store_batch_proofs(batch, tree, {
+                'tx_hash': batch.tx_hash,
+                'block_number': receipt['blockNumber'],
+                'gas_used': receipt['gasUsed'],
+                'gas_price_wei': batch.gas_price_wei,
+            })
             
-            if receipt['status'] == 1:
-                logger.info(f"Transaction confirmed in block {receipt['blockNumber']}")
-                
-                # Save to database
-                anchor = BlockchainAnchor.objects.create(
-                    merkle_root=merkle_root,
-                    tx_hash=tx_hash_hex,
-                    block_number=receipt['blockNumber'],
-                    batch_size=len(pending),
-                    network=self.network,
-                    gas_used=receipt['gasUsed'],
-                    gas_price_wei=tx['gasPrice']
+            logger.info(f"Successfully anchored {anchored_count} commitments")
+            blockchain_breaker.on_success()
+            return batch.tx_hash
+
+        # Receipt says status=0 → the tx was mined but reverted.
+        # Capture enough context for the breaker's failure log:
+        # the tx hash is the most useful pointer for after-the-
+        # fact triage. The "reverted" message routes the wrapped
+        # RuntimeError through `classify()` as
+        # `BlockchainContractRevert`, so the breaker won't trip
+        # on per-user condition mismatches (the M10 invariant).
+        logger.error(f"Transaction failed: {receipt}")
+        # The sealed batch is kept; the next attempt re-signs it.
+        self._reseal(batch)
+        blockchain_breaker.on_failure(
+            classify(RuntimeError(
+                "Anchor transaction reverted "
+                f"(tx_hash={receipt.get('transactionHash')}, "
+                f"block={receipt.get('blockNumber')})"
+            ))
+        )
+        return None
+
+    def _reseal(self, batch):
+        """Return a submitted batch to 'sealed' so its root is broadcast again."""
+        batch.tx_hash = None
+        batch.submitted_at = None
+        batch.status = 'sealed'
+        batch.save(update_fields=['tx_hash', 'submitted_at', 'status', 'updated_at'])
+
+    def _poll_submitted_batches(self) -> Optional[str]:
+        """
+        Settle batches broadcast by earlier calls, without waiting.
+
+        A batch with a receipt is recorded (or re-sealed if it reverted).
+        One still without a receipt ``RESUBMIT_AFTER_SECONDS`` after its
+        broadcast, whose transaction the node no longer knows, was dropped
+        from the mempool: it is re-sealed so the same root is broadcast
+        again with a fresh nonce. A transaction that is still pending is
+        left to confirm.
+
+        Returns:
+            Hash of the last transaction confirmed here, if any
+        """
+        resubmit_after = timedelta(seconds=int(self.config.get('RESUBMIT_AFTER_SECONDS', 1800)))
+        confirmed = None
+        for batch in AnchorBatch.objects.filter(status='submitted').order_by('created_at'):
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(batch.tx_hash)
+            except TransactionNotFound:
+                receipt = None
+            if receipt is not None:
+                confirmed = self._finish_batch(batch, None, receipt) or confirmed
+                continue
+
+            if timezone.now() - (batch.submitted_at or batch.updated_at) < resubmit_after:
+                continue
+            try:
+                self.w3.eth.get_transaction(batch.tx_hash)
+            except TransactionNotFound:
+                logger.warning(
+                    f"Anchor transaction {batch.tx_hash} of batch {batch.pk} was dropped; "
+                    f"resubmitting root {batch.merkle_root}"
                 )
-                
-                # Create Merkle proofs for each commitment
-                for i, pending_commitment in enumerate(pending):
-                    proof = tree.get_proof_hex(i)
-                    
-                    MerkleProof.objects.create(
-                        user=pending_commitment.user,
-                        commitment=pending_commitment.commitment,
-                        commitment_hash=pending_commitment.commitment_hash,
-                        merkle_root=merkle_root,
-                        proof=proof,
-                        leaf_index=i,
-                        blockchain_anchor=anchor
-                    )
-                    
-                    # Mark as anchored
-                    pending_commitment.is_anchored = True
-                    pending_commitment.save()
-                
-                logger.info(f"Successfully anchored {len(pending)} commitments")
-                blockchain_breaker.on_success()
-                return tx_hash_hex
-            
+                self._reseal(batch)
+                if self._nonce_manager is not None:
+                    self._nonce_manager.resync()
             else:
-                # Receipt says status=0 → the tx was mined but reverted.
-                # Capture enough context for the breaker's failure log:
-                # the tx hash is the most useful pointer for after-the-
-                # fact triage. The "reverted" message routes the wrapped
-                # RuntimeError through `classify()` as
-                # `BlockchainContractRevert`, so the breaker won't trip
-                # on per-user condition mismatches (the M10 invariant).
-                logger.error(f"Transaction failed: {receipt}")
+                logger.warning(
+                    f"Anchor transaction {batch.tx_hash} of batch {batch.pk} still pending "
+                    f"after {resubmit_after}"
+                )
+        return confirmed
+
+    def _broadcast_anchor(self, merkle_root: str, batch_size: int, signer_address: str):
+        """
+        Sign and broadcast ``anchorCommitment`` for a sealed batch.
+
+        Returns:
+            ``(tx_hash_hex, gas_price_wei)``, or None if the signer
+            preflight refused to broadcast
+        """
+        # Sign the commitment. The on-chain contract binds the
+        # signed payload to (chainId, contract address) so a
+        # signature minted for one deployment can't be replayed on
+        # another. Match its `abi.encode(block.chainid, address(this),
+        # merkleRoot, batchSize)` exactly — added per CodeRabbit
+        # review of PR #262.
+        chain_id = self.w3.eth.chain_id
+        contract_addr = Web3.to_checksum_address(self.contract_address)
+        message_hash = Web3.solidity_keccak(
+            ['uint256', 'address', 'bytes32', 'uint256'],
+            [chain_id, contract_addr, bytes.fromhex(merkle_root[2:]), batch_size]
+        )
+        msg = encode_defunct(primitive=message_hash)
+        signature = self.key_provider.sign_message(msg)
+        
+        # Submit to blockchain
+        contract = self.w3.eth.contract(
+            address=self.contract_address,
+            abi=self.contract_abi
+        )
+
+        # Preflight: confirm our signer is still authorized on the
+        # contract before paying gas to send a tx that would just
+        # revert. Catches the "owner rotated us out" case loudly
+        # instead of leaving anchoring quietly broken. Added per
+        # CodeRabbit review of PR #262.
+        try:
+            if not contract.functions.authorizedSigners(
+                signer_address
+            ).call():
+                logger.error(
+                    "Blockchain signer %s is not in CommitmentRegistry."
+                    "authorizedSigners; refusing to broadcast. Have the "
+                    "registry owner call addAuthorizedSigner() and retry.",
+                    signer_address,
+                )
+                # Audit-fix M10 + PR #273 review: a deterministic
+                # "unauthorized signer" outcome is a contract-revert
+                # equivalent, not infra. Wrap through `classify()`
+                # so the breaker doesn't trip on it.
                 blockchain_breaker.on_failure(
-                    classify(RuntimeError(
-                        "Anchor transaction reverted "
-                        f"(tx_hash={receipt.get('transactionHash')}, "
-                        f"block={receipt.get('blockNumber')})"
-                    ))
+                    classify(PermissionError("unauthorized signer"))
                 )
                 return None
-
         except Exception as e:
-            # Audit-fix M10: classify before passing to the breaker so
-            # deterministic contract reverts don't count toward the
-            # failure threshold.
+            # Fail closed: if we can't verify the signer is still
+            # authorized, don't burn gas on an anchorCommitment() that
+            # might just revert (and tie up the on-chain nonce). The
+            # circuit breaker takes the failure so the retry path
+            # recovers when the read becomes healthy again. Tightened
+            # per CodeRabbit review of PR #262.
+            logger.error(
+                "authorizedSigners preflight call failed: %s; refusing "
+                "to broadcast until signer authorization can be confirmed.",
+                e,
+            )
             blockchain_breaker.on_failure(classify(e))
-            logger.error(f"Error anchoring batch: {e}", exc_info=True)
             return None
 
+        # Audit-fix H4 + PR #272 review: thread-safe nonce
+        # reservation with double-checked lazy init under the
+        # `_nonce_manager_lock` created in __init__. Before the
+        # lock, two concurrent `anchor_pending_batch` callers
+        # could both observe `_nonce_manager is None` and
+        # construct separate managers, each seeded from the same
+        # on-chain pending nonce — the exact race H4 was
+        # supposed to fix.
+        if self._nonce_manager is None:
+            with self._nonce_manager_lock:
+                if self._nonce_manager is None:
+                    from smart_contracts.services.nonce_manager import NonceManager
+                    self._nonce_manager = NonceManager(self.w3, signer_address)
+
+        # Lease the nonce (PR #272 review). If anything between
+        # here and a successful send_raw_transaction raises, the
+        # lease's __exit__ releases the nonce so the next batch
+        # doesn't sit behind a permanent gap.
+        lease = self._nonce_manager.lease()
+        try:
+            tx = contract.functions.anchorCommitment(
+                bytes.fromhex(merkle_root[2:]),
+                batch_size,
+                signature.signature
+            ).build_transaction({
+                'from': signer_address,
+                'nonce': lease.value,
+                'gas': 500000,  # Estimate, will be calculated
+                'gasPrice': self.w3.eth.gas_price,
+            })
+
+            # Sign and send transaction via the KeyProvider so the
+            # raw private bytes don't need to be in scope here.
+            raw_tx = self.key_provider.sign_transaction(tx, self.w3)
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
+            except Exception as send_err:
+                msg = str(send_err).lower()
+                if 'nonce' in msg or 'replacement' in msg:
+                    self._nonce_manager.resync()
+                raise
+            # Broadcast succeeded — chain has consumed this nonce
+            # regardless of what wait_for_receipt or DB writes do
+            # below. Commit so the lease is settled.
+            lease.commit()
+        except Exception:
+            # Release the lease back to the pool so the next batch
+            # can reuse the slot.
+            lease.release()
+            raise
+        tx_hash_hex = self.w3.to_hex(tx_hash)
+        logger.info(f"Transaction sent: {tx_hash_hex}")
+        return tx_hash_hex, tx['gasPrice']
+
+    def _build_anchor_batch(self):
+        """
+        Build (or resume) the next anchor batch and seal it.
+
+        Resumes the oldest batch that is neither anchored nor awaiting its
+        receipt, otherwise starts one behind any submitted batches.
+        Pending commitments are streamed in primary-key order,
+        ``STREAM_CHUNK_SIZE`` at a time, into a ``MerkleAccumulator``
+        until ``MAX_BATCH_LEAVES`` is reached; the frontier, leaves and
+        cursor are saved after every chunk.
+
+        Returns:
+            ``(batch, accumulator)``; the accumulator is None for a batch
+            sealed by an earlier call. ``(None, None)`` if nothing is pending.
+        """
+        max_leaves = min(int(self.config.get('MAX_BATCH_LEAVES', 10000)), 10000)
+        chunk_size = int(self.config.get('STREAM_CHUNK_SIZE', 1000))
+
+        batch = (
+            AnchorBatch.objects.exclude(status__in=('anchored', 'submitted'))
+            .order_by('created_at').first()
+        )
+        if batch is not None and batch.status != 'building':
+            return batch, None
+        if batch is None:
+            # Commitments of submitted batches are not anchored yet either;
+            # start after them.
+            submitted = AnchorBatch.objects.filter(status='submitted').aggregate(cursor=Max('last_pending_id'))
+            batch = AnchorBatch(last_pending_id=submitted['cursor'] or 0)
+
+        if batch.leaf_count:
+            tree = MerkleAccumulator.from_state({
+                'leaf_count': batch.leaf_count,
+                'frontier': batch.frontier,
+            })
+        else:
+            tree = MerkleAccumulator()
+        leaves = bytearray(batch.leaves or b'')
+
+        pending = PendingCommitment.objects.filter(is_anchored=False).order_by('pk')
+        while len(tree) < max_leaves:
+            chunk = list(
+                pending.filter(pk__gt=batch.last_pending_id)
+                .values_list('pk', 'commitment_hash')[:min(chunk_size, max_leaves - len(tree))]
+            )
+            if not chunk:
+                break
+            for _, commitment_hash in chunk:
+                leaf = bytes.fromhex(commitment_hash)
+                tree.append(leaf)
+                leaves += leaf
+            if batch.first_pending_id is None:
+                batch.first_pending_id = chunk[0][0]
+            batch.last_pending_id = chunk[-1][0]
+            batch.leaf_count = len(tree)
+            batch.frontier = tree.state()['frontier']
+            batch.leaves = bytes(leaves)
+            batch.save()
+
+        if not len(tree):
+            return None, None
+
+        batch.merkle_root = '0x' + tree.seal().hex()
+        batch.status = 'sealed'
+        batch.save(update_fields=['merkle_root', 'status', 'updated_at'])
+        logger.info(f"Sealed anchor batch {batch.pk}: {len(tree)} commitments, root {batch.merkle_root}")
+        return batch, tree
+
+    def _store_batch_proofs(self, batch, tree, receipt_fields: Dict) -> int:
+        """
+        Record a confirmed batch: the anchor row, one MerkleProof per
+        commitment (bulk-inserted per chunk) and the pending rows marked
+        anchored, in one transaction.
+
+        Proofs are read from the accumulator levels. A batch resumed from
+        its frontier has none, so its levels are rebuilt from the stored
+        leaves (bounded by ``MAX_BATCH_LEAVES``).
+
+        Returns:
+            Number of commitments anchored
+        """
+        chunk_size = int(self.config.get('STREAM_CHUNK_SIZE', 1000))
+        if tree is None or not tree.has_levels:
+            tree = MerkleAccumulator.from_leaves(bytes(batch.leaves))
+        if tree.get_root_hex() != batch.merkle_root:
+            raise RuntimeError(f"Stored leaves of anchor batch {batch.pk} do not match its sealed root")
+
+        packed = tree.leaves()
+        leaf_index = {
+            packed[offset:offset + NODE_SIZE].hex(): offset // NODE_SIZE
+            for offset in range(0, len(packed), NODE_SIZE)
+        }
+
+        with transaction.atomic():
+            anchor = BlockchainAnchor.objects.create(
+                merkle_root=batch.merkle_root,
+                batch_size=batch.leaf_count,
+                network=self.network,
+                **receipt_fields
+            )
+
+            now = timezone.now()
+            anchored = 0
+            rows = PendingCommitment.objects.filter(
+                is_anchored=False,
+                pk__gte=batch.first_pending_id,
+                pk__lte=batch.last_pending_id,
+            ).order_by('pk').values_list('pk', 'user_id', 'commitment_id', 'commitment_hash')
+            cursor = batch.first_pending_id - 1
+            while True:
+                chunk = list(rows.filter(pk__gt=cursor)[:chunk_size])
+                if not chunk:
+                    break
+                cursor = chunk[-1][0]
+
+                proofs = []
+                anchored_ids = []
+                for pk, user_id, commitment_id, commitment_hash in chunk:
+                    index = leaf_index.get(commitment_hash.lower())
+                    if index is None:
+                        # Committed inside the batch's key range after the
+                        # batch was built; it goes into the next batch.
+                        continue
+                    proofs.append(MerkleProof(
+                        user_id=user_id,
+                        commitment_id=commitment_id,
+                        commitment_hash=commitment_hash,
+                        merkle_root=batch.merkle_root,
+                        proof=tree.get_proof_hex(index),
+                        leaf_index=index,
+                        blockchain_anchor=anchor,
+                    ))
+                    anchored_ids.append(pk)
+
+                MerkleProof.objects.bulk_create(proofs, batch_size=chunk_size)
+                PendingCommitment.objects.filter(pk__in=anchored_ids).update(
+                    is_anchored=True,
+                    anchored_at=now,
+                    blockchain_anchor=anchor,
+                )
+                anchored += len(anchored_ids)
+
+            batch.status = 'anchored'
+            batch.blockchain_anchor = anchor
+            batch.frontier = []
+            batch.leaves = b''
+            batch.save(update_fields=['status', 'blockchain_anchor', 'frontier', 'leaves', 'updated_at'])
+
+        return anchored
+
     def verify_commitment_on_chain(self, commitment_hash: str) -> bool:
         """
         Verify a commitment exists on the blockchain
@@ -615,8 +838,20 @@ class BlockchainAnchorService:
         """
         Verify that a given merkle_root was anchored on the blockchain.
         """
+        return self.verify_anchor_on_chain_status(merkle_root) == 'ok'
+
+    def verify_anchor_on_chain_status(self, merkle_root: str) -> str:
+        """
+        Structured variant of ``verify_anchor_on_chain``.
+
+        Returns one of:
+            'ok'         — the contract has a commitment for this root.
+            'missing'    — the contract has no such root; data divergence.
+            'rpc_error'  — RPC/transport/decoding failure; transient.
+            'disabled'   — feature flag off or web3 unavailable.
+        """
         if not self.enabled or not self.w3:
-            return False
+            return 'disabled'
         try:
             contract = self.w3.eth.contract(
                 address=self.contract_address,
@@ -624,10 +859,37 @@ class BlockchainAnchorService:
             )
             root_bytes = bytes.fromhex(merkle_root.replace('0x', ''))
             result = contract.functions.getCommitment(root_bytes).call()
-            return result[-1]  # 'exists' flag
+            return 'ok' if result[-1] else 'missing'  # 'exists' flag
         except Exception as e:
             logger.error(f"Error verifying anchor on-chain: {e}")
-            return False
+            return 'rpc_error'
+
+    def verify_proofs_locally(self, merkle_root: str, proofs: List[tuple]) -> List[bool]:
+        """
+        Batch form of :meth:`verify_proof_locally` for proofs under one root.
+
+        Args:
+            merkle_root: Root the proofs must reach (hex, 0x optional)
+            proofs: ``(leaf_hash, proof)`` pairs, hex as stored on MerkleProof
+
+        Returns:
+            One bool per pair; malformed hex counts as a failed proof.
+        """
+        root = bytes.fromhex(merkle_root.replace('0x', ''))
+        results = [False] * len(proofs)
+        indices, leaves, siblings = [], [], []
+        for i, (leaf_hash, proof) in enumerate(proofs):
+            try:
+                leaf = bytes.fromhex(leaf_hash.replace('0x', ''))
+                path = [bytes.fromhex(p.replace('0x', '')) for p in proof or []]
+            except (AttributeError, TypeError, ValueError):
+                continue
+            indices.append(i)
+            leaves.append(leaf)
+            siblings.append(path)
+        for i, ok in zip(indices, MerkleTreeBuilder.verify_proofs(root, leaves, siblings)):
+            results[i] = ok
+        return results
 
     def get_pending_count(self) -> int:
         """Get count of pending (not yet anchored) commitments"""
@@ -0,0 +1,229 @@
+"""
+Append-only Merkle accumulator for anchor batches.
+
+Produces exactly the root and proofs of :class:`MerkleTreeBuilder`
+(keccak256 over sorted pairs, an odd tail node paired with itself) but
+takes leaves one at a time. Only the frontier -- at most one unpaired
+left node per level -- is needed to keep appending or to compute the
+root, so a half-built batch can be persisted as ``state()`` and resumed
+with ``from_state()`` without re-reading its leaves.
+
+Proofs need every level. When levels are recorded they are kept as packed
+32-byte node arrays (one buffer per level instead of a list of ``bytes``
+objects) and each proof is sliced out of them on demand.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .merkle_tree_builder import MerkleTreeBuilder
+
+NODE_SIZE = 32
+
+hash_pair = MerkleTreeBuilder.hash_pair
+
+
+class MerkleAccumulator:
+    """
+    Incremental Merkle tree over 32-byte leaves.
+
+    Call :meth:`seal` once the last leaf is appended; after that the root
+    is fixed and, if levels were recorded, proofs are available.
+    """
+
+    def __init__(
+        self,
+        leaf_count: int = 0,
+        frontier: Optional[List[Optional[bytes]]] = None,
+        record_levels: bool = True,
+    ):
+        self.leaf_count = leaf_count
+        self.frontier: List[Optional[bytes]] = list(frontier or [])
+        # Levels can only be recorded from the first leaf onwards
+        # bytearray per level while building, bytes once sealed
+        self._levels: Optional[list] = [] if record_levels and leaf_count == 0 else None
+        self._level_counts: List[int] = []
+        self._root: Optional[bytes] = None
+        self._sealed = False
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'MerkleAccumulator':
+        """Resume from :meth:`state`. The resumed accumulator has no levels."""
+        frontier = [bytes.fromhex(node) if node else None for node in state.get('frontier', [])]
+        return cls(leaf_count=state.get('leaf_count', 0), frontier=frontier, record_levels=False)
+
+    @classmethod
+    def from_leaves(cls, leaves: bytes) -> 'MerkleAccumulator':
+        """Build and seal an accumulator, with levels, from packed leaf hashes."""
+        if len(leaves) % NODE_SIZE:
+            raise ValueError("Packed leaves must be a multiple of 32 bytes")
+        accumulator = cls()
+        view = memoryview(leaves)
+        for offset in range(0, len(leaves), NODE_SIZE):
+            accumulator.append(bytes(view[offset:offset + NODE_SIZE]))
+        accumulator.seal()
+        return accumulator
+
+    def state(self) -> Dict:
+        """JSON-serialisable frontier, enough to resume appending."""
+        return {
+            'leaf_count': self.leaf_count,
+            'frontier': [node.hex() if node else None for node in self.frontier],
+        }
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _record(self, level: int, node: bytes):
+        if self._levels is None:
+            return
+        if level == len(self._levels):
+            self._levels.append(bytearray())
+        self._levels[level] += node
+
+    def append(self, leaf: bytes) -> int:
+        """Append a leaf and return its index."""
+        if self._sealed:
+            raise ValueError("Cannot append to a sealed Merkle accumulator")
+        if len(leaf) != NODE_SIZE:
+            raise ValueError(f"Merkle leaves must be {NODE_SIZE} bytes, got {len(leaf)}")
+
+        index = self.leaf_count
+        node = bytes(leaf)
+        levels = self._levels
+        frontier = self.frontier
+        if levels is not None:
+            if not levels:
+                levels.append(bytearray())
+            levels[0] += node
+        level = 0
+        while level < len(frontier) and frontier[level] is not None:
+            node = hash_pair(frontier[level], node)
+            frontier[level] = None
+            level += 1
+            if levels is not None:
+                if level == len(levels):
+                    levels.append(bytearray())
+                levels[level] += node
+        if level == len(frontier):
+            frontier.append(node)
+        else:
+            frontier[level] = node
+        self.leaf_count += 1
+        return index
+
+    def extend(self, leaves: Iterable[bytes]):
+        for leaf in leaves:
+            self.append(leaf)
+
+    def _close(self) -> Tuple[List[Tuple[int, bytes]], bytes]:
+        """
+        Right-edge nodes that only exist once the tree is closed, and the root.
+
+        Walks the frontier bottom-up carrying the last node of each level:
+        paired with the level's unpaired left node if there is one,
+        otherwise paired with itself, as ``MerkleTreeBuilder`` does.
+        """
+        if self.leaf_count == 0:
+            raise ValueError("Cannot build Merkle tree with empty leaves")
+
+        tail = []
+        carry = None
+        level = 0
+        size = self.leaf_count
+        while size > 1:
+            left = self.frontier[level] if level < len(self.frontier) else None
+            if left is not None:
+                carry = hash_pair(left, carry if carry is not None else left)
+            elif carry is not None:
+                carry = hash_pair(carry, carry)
+            level += 1
+            size = (size + 1) // 2
+            if carry is not None:
+                tail.append((level, carry))
+        root = carry if carry is not None else self.frontier[level]
+        return tail, root
+
+    def root(self) -> bytes:
+        """Root over the leaves appended so far."""
+        if self._root is not None:
+            return self._root
+        return self._close()[1]
+
+    def get_root_hex(self) -> str:
+        """Get Merkle root as hex string (0x prefixed)."""
+        return '0x' + self.root().hex()
+
+    def seal(self) -> bytes:
+        """Close the tree: no more appends, levels completed for proofs."""
+        if not self._sealed:
+            tail, self._root = self._close()
+            for level, node in tail:
+                self._record(level, node)
+            if self._levels is not None:
+                # Frozen, so proof slices come out as bytes without a copy
+                self._levels = [bytes(level) for level in self._levels]
+                # Node count per level, top (root) level excluded
+                self._level_counts = [len(level) // NODE_SIZE for level in self._levels[:-1]]
+            self._sealed = True
+        return self._root
+
+    # ------------------------------------------------------------------
+    # Proofs
+    # ------------------------------------------------------------------
+
+    @property
+    def has_levels(self) -> bool:
+        return self._sealed and self._levels is not None
+
+    def leaf(self, index: int) -> bytes:
+        return self._node(0, index)
+
+    def leaves(self) -> bytes:
+        """Packed leaf hashes, in append order."""
+        self._require_levels()
+        return self._levels[0]
+
+    def _node(self, level: int, index: int) -> bytes:
+        self._require_levels()
+        offset = index * NODE_SIZE
+        return self._levels[level][offset:offset + NODE_SIZE]
+
+    def _require_levels(self):
+        if not self.has_levels:
+            raise ValueError(
+                "Proofs need a sealed accumulator built with recorded levels; "
+                "rebuild it with MerkleAccumulator.from_leaves()"
+            )
+
+    def get_proof(self, leaf_index: int) -> List[bytes]:
+        """Get Merkle proof for a specific leaf."""
+        self._require_levels()
+        if leaf_index < 0 or leaf_index >= self.leaf_count:
+            raise ValueError(f"Invalid leaf index: {leaf_index}")
+
+        proof = []
+        index = leaf_index
+        for level, count in zip(self._levels, self._level_counts):
+            sibling = index ^ 1
+            if sibling >= count:
+                # Odd tail: the node was paired with itself
+                sibling = index
+            offset = sibling * NODE_SIZE
+            proof.append(level[offset:offset + NODE_SIZE])
+            index >>= 1
+        return proof
+
+    def get_proof_hex(self, leaf_index: int) -> List[str]:
+        """Get Merkle proof as hex strings (0x prefixed)."""
+        return ['0x' + p.hex() for p in self.get_proof(leaf_index)]
+
+    def __len__(self) -> int:
+        return self.leaf_count
+
+    def __repr__(self) -> str:
+        return f"<MerkleAccumulator: {self.leaf_count} leaves, frontier={len(self.frontier)} levels>"
@@ -83,8 +83,11 @@ class MerkleTreeBuilder:
             level_nodes = self.tree[level]
 
             sibling_index = index + 1 if index % 2 == 0 else index - 1
-            if 0 <= sibling_index < len(level_nodes):
+            if sibling_index < len(level_nodes):
                 proof.append(level_nodes[sibling_index])
+            else:
+                # Odd tail: _build_tree paired the node with itself.
+                proof.append(level_nodes[index])
 
             index = index // 2
 
@@ -103,6 +106,34 @@ class MerkleTreeBuilder:
 
         return computed_hash == root
 
+    @classmethod
+    def verify_proofs(
+        cls, root: bytes, leaves: List[bytes], proofs: List[List[bytes]]
+    ) -> List[bool]:
+        """
+        Verify many proofs against one root; same result as calling
+        :meth:`verify_proof` on each pair.
+
+        Runs level by level over all proofs at once. Proofs under one root
+        share every node above their leaves, so each distinct pair is
+        hashed only once per level: about one keccak per tree node
+        instead of one per proof step.
+        """
+        computed = list(leaves)
+        depth = max((len(proof) for proof in proofs), default=0)
+        for level in range(depth):
+            parents: Dict[tuple, bytes] = {}
+            for i, proof in enumerate(proofs):
+                if level >= len(proof):
+                    continue
+                node, sibling = computed[i], proof[level]
+                pair = (node, sibling) if node <= sibling else (sibling, node)
+                parent = parents.get(pair)
+                if parent is None:
+                    parent = parents[pair] = _keccak(pair[0] + pair[1])
+                computed[i] = parent
+        return [node == root for node in computed]
+
     @classmethod
     def build_from_commitments(cls, commitments: List[Dict]) -> 'MerkleTreeBuilder':
         """Build Merkle tree from commitment dicts with 'commitment_hash' key."""
@@ -47,25 +47,23 @@ def anchor_pending_commitments(self):
         
         logger.info(f"Found {pending_count} pending commitments. Initiating anchoring...")
         
-        # Anchor the batch
-        result = service.anchor_pending_batch()
+        # Anchor the next batch (capped at MAX_BATCH_LEAVES; a backlog
+        # drains over successive runs)
+        tx_hash = service.anchor_pending_batch()
         
-        if result['success']:
-            tx_hash = result['tx_hash']
-            anchored_count = result['anchored_count']
-            merkle_root = result['merkle_root']
-            
+        if tx_hash:
+            remaining = PendingCommitment.objects.filter(is_anchored=False).count()
             logger.info(
-                f"✅ Successfully anchored {anchored_count} commitments. "
-                f"TX: {tx_hash}, Merkle Root: {merkle_root}"
+                f"✅ Successfully anchored {pending_count - remaining} commitments. "
+                f"TX: {tx_hash}, {remaining} still pending"
             )
             
-            return f"Anchored {anchored_count} commitments: {tx_hash}"
+            return f"Anchored {pending_count - remaining} commitments: {tx_hash}"
         else:
-            error_msg = result.get('error', 'Unknown error')
-            logger.error(f"❌ Failed to anchor commitments: {error_msg}")
+            logger.error("❌ Failed to anchor commitments")
             
-            # Retry with exponential backoff
+            # Retry with exponential backoff; the open batch is resumed,
+            # not rebuilt
             raise self.retry(countdown=60 * (2 ** self.request.retries))
             
     except Exception as exc:
@@ -326,6 +324,141 @@ def verify_random_proofs(sample_size: int = None):
         return f"Error: {exc}"
 
 
+@shared_task
+def verify_all_proofs(chunk_size: int = 5000):
+    """
+    Nightly sweep over the whole ``MerkleProof`` table.
+
+    ``verify_random_proofs`` pays one ``verifyCommitment`` RPC per proof,
+    so it can only sample. This task asks the chain once per anchored root
+    (``getCommitment``) and checks every proof under a confirmed root
+    locally with ``MerkleTreeBuilder.verify_proofs`` — the same keccak256
+    sorted-pair fold the contract runs, batched so shared tree nodes are
+    hashed once.
+
+    Per anchor, on the ``verify_anchor_on_chain_status`` outcome:
+        - 'ok'        → proofs are streamed in ``chunk_size`` slices and
+                        verified locally. Passing rows get
+                        ``verified=True`` + ``verified_at=now()``; failing
+                        rows get ``verified=False`` and a mismatch alert.
+        - 'missing'   → the root is not on-chain, so every proof under it
+                        is a mismatch.
+        - 'rpc_error' → anchor left untouched, counted as rpc_failed.
+        - 'disabled'  → stop.
+
+    Legacy SHA-256 rows (``verifiable=False``) are skipped, as in
+    ``verify_random_proofs``.
+    """
+    try:
+        from .services.blockchain_anchor_service import BlockchainAnchorService
+        from .models import BlockchainAnchor, MerkleProof
+        from django.utils import timezone
+
+        if not settings.BLOCKCHAIN_ANCHORING.get('ENABLED', False):
+            logger.info("verify_all_proofs: blockchain anchoring disabled")
+            return "disabled"
+
+        service = BlockchainAnchorService()
+        if not service.enabled:
+            logger.info("verify_all_proofs: anchor service not enabled")
+            return "service_disabled"
+
+        chunk_size = max(1, int(chunk_size))
+        roots_checked = 0
+        verified_count = 0
+        mismatch_count = 0
+        rpc_failed = 0
+
+        anchors = (
+            BlockchainAnchor.objects
+            .filter(verifiable=True)
+            .order_by('pk')
+            .values_list('pk', 'merkle_root', 'tx_hash')
+        )
+        for anchor_id, merkle_root, tx_hash in anchors.iterator():
+            proofs = MerkleProof.objects.filter(blockchain_anchor_id=anchor_id, verifiable=True)
+
+            status = service.verify_anchor_on_chain_status(merkle_root)
+            if status == 'disabled':
+                logger.info("verify_all_proofs: service became disabled mid-run")
+                break
+            if status == 'rpc_error':
+                rpc_failed += 1
+                continue
+            roots_checked += 1
+
+            if status == 'missing':
+                missing = proofs.update(verified=False)
+                mismatch_count += missing
+                logger.error(
+                    "verify_all_proofs: MISMATCH — root %s (anchor tx %s) is "
+                    "not on-chain; %d proof(s) affected",
+                    merkle_root, tx_hash, missing,
+                    extra={
+                        'anchor_id': str(anchor_id),
+                        'anchor_tx_hash': tx_hash,
+                        'merkle_root': merkle_root,
+                        'proof_count': missing,
+                        'verifier_event_type': 'merkle_root_missing',
+                    },
+                )
+                continue
+
+            rows = proofs.order_by('pk').values_list('pk', 'commitment_hash', 'merkle_root', 'proof')
+            cursor = 0
+            while True:
+                chunk = list(rows.filter(pk__gt=cursor)[:chunk_size])
+                if not chunk:
+                    break
+                cursor = chunk[-1][0]
+
+                results = service.verify_proofs_locally(
+                    merkle_root,
+                    [(commitment_hash, proof) for _, commitment_hash, _, proof in chunk],
+                )
+                passed, failed = [], []
+                for (pk, _, proof_root, _), ok in zip(chunk, results):
+                    # A proof filed under another root than its anchor's
+                    # would fail on-chain as well
+                    (passed if ok and proof_root == merkle_root else failed).append(pk)
+
+                if passed:
+                    MerkleProof.objects.filter(pk__in=passed).update(
+                        verified=True, verified_at=timezone.now(),
+                    )
+                if failed:
+                    # verified_at is left alone: it records when the proof
+                    # last verified successfully.
+                    MerkleProof.objects.filter(pk__in=failed).update(verified=False)
+                    logger.error(
+                        "verify_all_proofs: MISMATCH for %d proof(s) under root %s "
+                        "(anchor tx %s)",
+                        len(failed), merkle_root, tx_hash,
+                        extra={
+                            'proof_pks': [str(pk) for pk in failed[:20]],
+                            'anchor_id': str(anchor_id),
+                            'anchor_tx_hash': tx_hash,
+                            'merkle_root': merkle_root,
+                            'verifier_event_type': 'merkle_proof_mismatch',
+                        },
+                    )
+                verified_count += len(passed)
+                mismatch_count += len(failed)
+
+        logger.info(
+            "verify_all_proofs: roots=%d verified=%d mismatch=%d rpc_failed=%d",
+            roots_checked, verified_count, mismatch_count, rpc_failed,
+        )
+        return (
+            f"roots={roots_checked} verified={verified_count} "
+            f"mismatch={mismatch_count} rpc_failed={rpc_failed}"
+        )
+
+    except Exception as exc:
+        logger.exception(f"Error in verify_all_proofs task: {exc}")
+        return f"Error: {exc}"
+
+
 @shared_task
 def cleanup_old_pending_commitments():
     """
@@ -0,0 +1,201 @@
+"""
+Tests for the incremental Merkle accumulator and resumable anchor batches.
+
+Covers:
+* MerkleAccumulator produces the same root and proofs as MerkleTreeBuilder
+  for every tree shape, including odd tails, and after a resume from its
+  persisted frontier.
+* MerkleTreeBuilder proofs for odd-tail leaves verify.
+* BlockchainAnchorService builds capped batches chunk by chunk, resumes an
+  open batch instead of rebuilding it, and bulk-writes proofs that verify
+  against the sealed root.
+* A batch whose receipt times out does not block the batches behind it,
+  and is broadcast again once its transaction has been dropped.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from behavioral_recovery.models import BehavioralCommitment
+from blockchain.models import AnchorBatch, MerkleProof, PendingCommitment
+from blockchain.services.blockchain_anchor_service import BlockchainAnchorService
+from blockchain.services.merkle_accumulator import MerkleAccumulator
+from blockchain.services.merkle_tree_builder import MerkleTreeBuilder, create_commitment_hash
+
+
+def _leaves(n):
+    return [os.urandom(32) for _ in range(n)]
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 8, 13, 64, 100])
+def test_accumulator_matches_builder(n):
+    leaves = _leaves(n)
+    builder = MerkleTreeBuilder(leaves)
+    accumulator = MerkleAccumulator()
+    accumulator.extend(leaves)
+    accumulator.seal()
+
+    assert accumulator.get_root_hex() == builder.get_root_hex()
+    for i, leaf in enumerate(leaves):
+        assert accumulator.get_proof(i) == builder.get_proof(i)
+        assert builder.verify_proof(leaf, builder.get_proof(i))
+
+
+@pytest.mark.parametrize('split', [0, 1, 6, 7, 12])
+def test_accumulator_resumes_from_frontier(split):
+    leaves = _leaves(13)
+    first = MerkleAccumulator()
+    first.extend(leaves[:split])
+
+    resumed = MerkleAccumulator.from_state(first.state())
+    resumed.extend(leaves[split:])
+
+    assert resumed.root() == MerkleTreeBuilder(leaves).root
+
+
+def test_resumed_accumulator_has_no_proofs():
+    first = MerkleAccumulator()
+    first.extend(_leaves(3))
+    resumed = MerkleAccumulator.from_state(first.state())
+    resumed.seal()
+    with pytest.raises(ValueError):
+        resumed.get_proof(0)
+
+
+def test_accumulator_rejects_bad_input():
+    with pytest.raises(ValueError):
+        MerkleAccumulator().root()
+    with pytest.raises(ValueError):
+        MerkleAccumulator().append(b'short')
+    sealed = MerkleAccumulator()
+    sealed.append(os.urandom(32))
+    sealed.seal()
+    with pytest.raises(ValueError):
+        sealed.append(os.urandom(32))
+
+
+@pytest.fixture
+def anchor_service():
+    # Bypass the singleton __init__: these tests never touch the chain.
+    service = object.__new__(BlockchainAnchorService)
+    service.config = {'MAX_BATCH_LEAVES': 5, 'STREAM_CHUNK_SIZE': 2}
+    service.network = 'testnet'
+    return service
+
+
+@pytest.fixture
+def pending(db):
+    user = User.objects.create_user(username='anchor-user')
+    rows = []
+    for i in range(7):
+        commitment = BehavioralCommitment.objects.create(
+            user=user, encrypted_embedding=b'x', challenge_type='typing',
+        )
+        rows.append(PendingCommitment.objects.create(
+            user=user,
+            commitment=commitment,
+            commitment_hash=create_commitment_hash(str(commitment.pk), f'data-{i}'),
+        ))
+    return rows
+
+
+def test_batches_are_capped_and_resumable(anchor_service, pending):
+    batch, tree = anchor_service._build_anchor_batch()
+    assert batch.status == 'sealed'
+    assert batch.leaf_count == 5
+    assert batch.last_pending_id == pending[4].pk
+
+    expected = MerkleTreeBuilder([bytes.fromhex(p.commitment_hash) for p in pending[:5]])
+    assert batch.merkle_root == expected.get_root_hex()
+
+    # A retry picks up the same sealed batch instead of rebuilding it
+    again, _ = anchor_service._build_anchor_batch()
+    assert again.pk == batch.pk
+    assert AnchorBatch.objects.count() == 1
+
+
+def test_interrupted_batch_resumes_from_cursor(anchor_service, pending):
+    # Simulate a build that stopped after its first chunk
+    first_chunk = pending[:2]
+    partial = MerkleAccumulator()
+    partial.extend(bytes.fromhex(p.commitment_hash) for p in first_chunk)
+    AnchorBatch.objects.create(
+        first_pending_id=first_chunk[0].pk,
+        last_pending_id=first_chunk[-1].pk,
+        leaf_count=2,
+        frontier=partial.state()['frontier'],
+        leaves=b''.join(bytes.fromhex(p.commitment_hash) for p in first_chunk),
+    )
+
+    batch, tree = anchor_service._build_anchor_batch()
+    assert batch.leaf_count == 5
+    assert not tree.has_levels
+
+    count = anchor_service._store_batch_proofs(batch, tree, {
+        'tx_hash': '0x' + 'ab' * 32,
+        'block_number': 1,
+        'gas_used': 21000,
+        'gas_price_wei': 1,
+    })
+    assert count == 5
+
+    batch.refresh_from_db()
+    assert batch.status == 'anchored'
+    assert bytes(batch.leaves) == b''
+    assert PendingCommitment.objects.filter(is_anchored=True).count() == 5
+    for proof in MerkleProof.objects.all():
+        assert anchor_service.verify_proof_locally(proof.merkle_root, proof.commitment_hash, proof.proof)
+
+    # The remaining rows go into a fresh batch
+    next_batch, _ = anchor_service._build_anchor_batch()
+    assert next_batch.pk != batch.pk
+    assert next_batch.leaf_count == 2
+
+
+def test_timed_out_receipt_does_not_wedge_anchoring(anchor_service, pending):
+    anchor_service.enabled = True
+    anchor_service.w3 = MagicMock()
+    anchor_service.key_provider = MagicMock(is_available=True, address='0x' + '00' * 20)
+    anchor_service._nonce_manager = None
+    eth = anchor_service.w3.eth
+    eth.wait_for_transaction_receipt.side_effect = TimeExhausted()
+    eth.get_transaction_receipt.side_effect = TransactionNotFound('pending')
+    hashes = iter('0x' + c * 64 for c in 'abc')
+
+    with patch('blockchain.services.blockchain_anchor_service.blockchain_breaker'), \
+            patch.object(anchor_service, '_broadcast_anchor', side_effect=lambda *a: (next(hashes), 1)) as broadcast:
+        assert anchor_service.anchor_pending_batch() is None
+        stuck = AnchorBatch.objects.get()
+        assert stuck.status == 'submitted'
+        assert stuck.submitted_at is not None
+
+        # The next batch builds behind the unconfirmed one
+        anchor_service.anchor_pending_batch()
+        behind = AnchorBatch.objects.exclude(pk=stuck.pk).get()
+        assert behind.status == 'submitted'
+        assert behind.first_pending_id == pending[5].pk
+        assert behind.leaf_count == 2
+
+        # Once the node has dropped the transaction, the same root is resubmitted
+        AnchorBatch.objects.filter(pk=stuck.pk).update(submitted_at=timezone.now() - timedelta(hours=1))
+        eth.get_transaction.side_effect = TransactionNotFound('dropped')
+        anchor_service.anchor_pending_batch()
+        assert broadcast.call_args_list[-1].args[0] == stuck.merkle_root
+        stuck.refresh_from_db()
+        assert stuck.status == 'submitted'
+        assert stuck.tx_hash == '0x' + 'c' * 64
+
+        eth.get_transaction_receipt.side_effect = None
+        eth.get_transaction_receipt.return_value = {'status': 1, 'blockNumber': 7, 'gasUsed': 21000}
+        anchor_service.anchor_pending_batch()
+
+    assert not AnchorBatch.objects.exclude(status='anchored').exists()
+    assert PendingCommitment.objects.filter(is_anchored=False).count() == 0
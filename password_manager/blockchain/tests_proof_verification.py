@@ -0,0 +1,105 @@
+"""
+Tests for batched local Merkle proof verification (``verify_all_proofs``).
+
+Covers:
+* MerkleTreeBuilder.verify_proofs agrees with verify_proof per proof.
+* verify_all_proofs confirms each root once, verifies proofs locally and
+  flags tampered proofs, missing roots and RPC failures correctly.
+"""
+
+from __future__ import annotations
+
+import os
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from behavioral_recovery.models import BehavioralCommitment
+from blockchain.models import BlockchainAnchor, MerkleProof
+from blockchain.services.blockchain_anchor_service import BlockchainAnchorService
+from blockchain.services.merkle_tree_builder import MerkleTreeBuilder
+from blockchain.tasks import verify_all_proofs
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 7, 33])
+def test_verify_proofs_matches_single_verification(n):
+    leaves = [os.urandom(32) for _ in range(n)]
+    tree = MerkleTreeBuilder(leaves)
+    proofs = [tree.get_proof(i) for i in range(n)]
+    proofs[-1] = proofs[-1][:-1] + [os.urandom(32)] if n > 1 else proofs[-1]
+
+    expected = [tree.verify_proof(leaf, proof) for leaf, proof in zip(leaves, proofs)]
+    assert MerkleTreeBuilder.verify_proofs(tree.root, leaves, proofs) == expected
+    assert expected[0]
+
+
+@pytest.fixture
+def anchor_service():
+    service = object.__new__(BlockchainAnchorService)
+    service._initialized = True
+    service.enabled = True
+    with mock.patch.object(BlockchainAnchorService, '_instance', service), \
+            override_settings(BLOCKCHAIN_ANCHORING={'ENABLED': True}):
+        yield service
+
+
+@pytest.fixture
+def anchored_proofs(db):
+    user = User.objects.create_user(username='proof-user')
+    commitments = [
+        BehavioralCommitment.objects.create(user=user, encrypted_embedding=b'x', challenge_type='typing')
+        for _ in range(5)
+    ]
+    leaves = [os.urandom(32) for _ in commitments]
+    tree = MerkleTreeBuilder(leaves)
+    anchor = BlockchainAnchor.objects.create(
+        merkle_root=tree.get_root_hex(), tx_hash='0x' + 'cd' * 32, block_number=1, batch_size=len(leaves),
+    )
+    return [
+        MerkleProof.objects.create(
+            user=user,
+            commitment=commitment,
+            commitment_hash=leaf.hex(),
+            merkle_root=anchor.merkle_root,
+            proof=tree.get_proof_hex(i),
+            leaf_index=i,
+            blockchain_anchor=anchor,
+        )
+        for i, (commitment, leaf) in enumerate(zip(commitments, leaves))
+    ]
+
+
+def test_sweep_verifies_locally_after_one_root_check(anchor_service, anchored_proofs):
+    tampered = anchored_proofs[2]
+    tampered.proof = ['0x' + '00' * 32] + tampered.proof[1:]
+    tampered.save()
+
+    with mock.patch.object(anchor_service, 'verify_anchor_on_chain_status', return_value='ok') as root_check, \
+            mock.patch.object(anchor_service, 'verify_proof_on_chain_status') as per_proof:
+        result = verify_all_proofs(chunk_size=2)
+
+    root_check.assert_called_once()
+    per_proof.assert_not_called()
+    assert result == "roots=1 verified=4 mismatch=1 rpc_failed=0"
+    tampered.refresh_from_db()
+    assert not tampered.verified and tampered.verified_at is None
+    assert MerkleProof.objects.filter(verified=True).count() == 4
+
+
+def test_sweep_flags_missing_root(anchor_service, anchored_proofs):
+    MerkleProof.objects.update(verified=True)
+    with mock.patch.object(anchor_service, 'verify_anchor_on_chain_status', return_value='missing'):
+        result = verify_all_proofs()
+
+    assert result == "roots=1 verified=0 mismatch=5 rpc_failed=0"
+    assert not MerkleProof.objects.filter(verified=True).exists()
+
+
+def test_sweep_leaves_rows_alone_on_rpc_error(anchor_service, anchored_proofs):
+    with mock.patch.object(anchor_service, 'verify_anchor_on_chain_status', return_value='rpc_error'):
+        result = verify_all_proofs()
+
+    assert result == "roots=0 verified=0 mismatch=0 rpc_failed=1"
+    assert not MerkleProof.objects.filter(verified=True).exists()
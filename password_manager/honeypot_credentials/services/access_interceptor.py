@@ -20,6 +20,7 @@ from typing import Any, Dict, Optional
 from django.conf import settings
 from django.db import transaction
 
+from shared.geoip import get_geoip_service
 from shared.utils import get_client_ip
 
 from ..models import HoneypotAccessEvent, HoneypotAccessType, HoneypotCredential
@@ -57,12 +58,11 @@ class HoneypotAccessInterceptor:
 
         geo_country = ''
         geo_city = ''
-        # Best-effort GeoIP2 — we never let geo lookup block the response.
+        # Best-effort local GeoIP — we never let geo lookup block the response.
         try:
-            from django.contrib.gis.geoip2 import GeoIP2
-            g = GeoIP2().city(ip)
-            geo_country = g.get('country_name', '') or ''
-            geo_city = g.get('city', '') or ''
+            location = get_geoip_service().lookup(ip, allow_remote=False)
+            geo_country = location.get('country', '')
+            geo_city = location.get('city', '')
         except Exception:
             pass
 
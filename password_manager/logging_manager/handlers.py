@@ -38,6 +38,14 @@ def _connection_is_usable():
 
 
 class DatabaseLogHandler(logging.Handler):
+    """
+    Stores log records as ``SystemLog`` rows.
+
+    Rows go through ``shared.buffered_writer`` and are bulk-inserted off the
+    request thread; WARNING and above are marked essential so they are not
+    sampled out when the queue is under pressure.
+    """
+
     def emit(self, record):
         if getattr(_in_emit, 'active', False):
             return
@@ -46,10 +54,18 @@ class DatabaseLogHandler(logging.Handler):
             from django.db import DatabaseError
             from django.db.transaction import TransactionManagementError
             from django.core.exceptions import SynchronousOnlyOperation
+            from shared.buffered_writer import buffered_writes_enabled, in_flusher_thread, write_row
+
+            # The flusher's own log records would queue more rows for itself
+            if in_flusher_thread():
+                return
+
+            buffered = buffered_writes_enabled()
 
             # Skip if the connection is in a broken atomic block —
             # attempting to write would cascade a TransactionManagementError.
-            if not _connection_is_usable():
+            # Buffered rows are written on the flusher's own connection.
+            if not buffered and not _connection_is_usable():
                 return
 
             try:
@@ -69,15 +85,18 @@ class DatabaseLogHandler(logging.Handler):
                     request_path = request.path
                     request_method = request.method
 
-                SystemLog.objects.create(
-                    level=record.levelname,
-                    logger_name=record.name,
-                    message=self.format(record),
-                    user=user,
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    request_path=request_path,
-                    request_method=request_method
+                write_row(
+                    SystemLog(
+                        level=record.levelname,
+                        logger_name=record.name,
+                        message=self.format(record),
+                        user=user,
+                        ip_address=ip_address,
+                        user_agent=user_agent,
+                        request_path=request_path,
+                        request_method=request_method
+                    ),
+                    essential=record.levelno >= logging.WARNING,
                 )
             except TransactionManagementError:
                 # Broken atomic block — skip silently.
@@ -97,15 +97,12 @@ class RecoveryAttemptLog(models.Model):
             
         # Get country information if available
         if request and request.META.get('REMOTE_ADDR'):
-            from django.contrib.gis.geoip2 import GeoIP2
+            from shared.geoip import get_geoip_service
             try:
-                g = GeoIP2()
-                ip = request.META.get('REMOTE_ADDR')
-                if ip and ip != '127.0.0.1':
-                    geo_data = g.city(ip)
-                    if geo_data:
-                        log_entry.country_code = geo_data.get('country_code')
-                        log_entry.region = geo_data.get('region')
+                geo_data = get_geoip_service().lookup(request.META.get('REMOTE_ADDR'), allow_remote=False)
+                if geo_data:
+                    log_entry.country_code = geo_data.get('country_code') or None
+                    log_entry.region = geo_data.get('region') or None
             except Exception:
                 pass
         
@@ -4,6 +4,12 @@ Shamir's Secret Sharing Service
 
 Implements (k,n) threshold secret sharing using finite field arithmetic.
 
+Shares are split byte-wise over GF(2^8) by ``shared.crypto.shamir_gf256``:
+secrets of any size, one share byte per secret byte. Share values carry a
+two-byte marker (``GF256_SHARE_MARKER``) so fragments stored before the
+switch, which hold big-endian integers over GF(2^521 - 1), still
+reconstruct through the original prime-field path.
+
 Key Properties:
 - Secret is split into n shares
 - Any k shares can reconstruct the secret  
@@ -18,8 +24,8 @@ Mathematical basis:
 
 Security:
 - Uses cryptographically secure random coefficients
-- Operates in GF(p) where p is a large prime
-- Includes Feldman VSS commitments for verification
+- Feldman VSS commitments need a prime field: ``with_commitments=True``
+  splits over GF(p) (secrets up to 65 bytes) so shares can be verified
 
 @author Password Manager Team
 @created 2026-01-22
@@ -30,10 +36,16 @@ import hashlib
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
 
+from shared.crypto import shamir_gf256
+
 # Large Mersenne prime for finite field operations (521-bit)
 # M521 = 2^521 - 1 supports secrets up to 65 bytes (520 bits)
 DEFAULT_PRIME = 2**521 - 1
 
+# Prefix of GF(2^8) share values. Prime-field values are minimal big-endian
+# encodings of ~521-bit integers, so they never start with a zero byte.
+GF256_SHARE_MARKER = b'\x00\x01'
+
 
 @dataclass
 class Share:
@@ -61,6 +73,9 @@ class ShamirSecretSharingService:
         # Split secret into 5 shares, need 3 to reconstruct
         result = service.split_secret(b"my secret", k=3, n=5)
         
+        # Verifiable shares (prime field, Feldman commitments)
+        result = service.split_secret(b"my secret", k=3, n=5, with_commitments=True)
+        
         # Reconstruct from any 3+ shares
         secret = service.reconstruct_secret(result.shares[:3])
     """
@@ -82,7 +97,7 @@ class ShamirSecretSharingService:
         secret: bytes, 
         k: int, 
         n: int,
-        with_commitments: bool = True
+        with_commitments: bool = False
     ) -> SplitResult:
         """
         Split a secret into n shares with k-threshold.
@@ -90,8 +105,9 @@ class ShamirSecretSharingService:
         Args:
             secret: The secret to split (bytes)
             k: Threshold - minimum shares needed to reconstruct
-            n: Total number of shares to create
-            with_commitments: Include Feldman VSS commitments
+            n: Total number of shares to create (at most 255)
+            with_commitments: Split over the prime field and include
+                Feldman VSS commitments (secret limited to 65 bytes)
             
         Returns:
             SplitResult with shares, commitments, and original hash
@@ -108,6 +124,16 @@ class ShamirSecretSharingService:
         if len(secret) == 0:
             raise ValueError("Secret cannot be empty")
         
+        # Hash original secret for verification
+        original_hash = hashlib.blake2b(secret, digest_size=32).hexdigest()
+        
+        if not with_commitments:
+            shares = [
+                Share(index=x, value=GF256_SHARE_MARKER + value)
+                for x, value in shamir_gf256.split(secret, k, n)
+            ]
+            return SplitResult(shares=shares, commitments=[], original_hash=original_hash)
+        
         # Convert secret to integer
         secret_int = int.from_bytes(secret, 'big')
         if secret_int >= self.prime:
@@ -122,11 +148,10 @@ class ShamirSecretSharingService:
         
         # Generate Feldman commitments: g^a_i mod p
         commitments = []
-        if with_commitments:
-            commitment_byte_len = (self.prime.bit_length() + 7) // 8
-            for coeff in coefficients:
-                commitment = pow(self.generator, coeff, self.prime)
-                commitments.append(commitment.to_bytes(commitment_byte_len, 'big'))
+        commitment_byte_len = (self.prime.bit_length() + 7) // 8
+        for coeff in coefficients:
+            commitment = pow(self.generator, coeff, self.prime)
+            commitments.append(commitment.to_bytes(commitment_byte_len, 'big'))
         
         # Evaluate polynomial at points 1, 2, ..., n
         # Use unreduced values so Feldman commitment verification works:
@@ -143,9 +168,6 @@ class ShamirSecretSharingService:
             )
             shares.append(share)
         
-        # Hash original secret for verification
-        original_hash = hashlib.blake2b(secret, digest_size=32).hexdigest()
-        
         return SplitResult(
             shares=shares,
             commitments=commitments,
@@ -177,20 +199,28 @@ class ShamirSecretSharingService:
         if len(shares) < 2:
             raise ValueError("Need at least 2 shares to reconstruct")
         
-        # Extract x,y coordinates
-        points = []
-        for share in shares:
-            x = share.index
-            y = int.from_bytes(share.value, 'big')
-            points.append((x, y))
-        
-        # Lagrange interpolation at x=0 to recover secret
-        secret_int = self._lagrange_interpolate(0, points)
-        
-        # Convert back to bytes
-        byte_length = (secret_int.bit_length() + 7) // 8
-        byte_length = max(1, byte_length)  # At least 1 byte
-        secret = secret_int.to_bytes(byte_length, 'big')
+        gf256 = [self._is_gf256(share) for share in shares]
+        if all(gf256):
+            secret = shamir_gf256.combine([
+                (share.index, bytes(share.value)[len(GF256_SHARE_MARKER):]) for share in shares
+            ])
+        elif any(gf256):
+            raise ValueError("Cannot combine GF(256) and prime-field shares")
+        else:
+            # Extract x,y coordinates
+            points = []
+            for share in shares:
+                x = share.index
+                y = int.from_bytes(share.value, 'big')
+                points.append((x, y))
+            
+            # Lagrange interpolation at x=0 to recover secret
+            secret_int = self._lagrange_interpolate(0, points)
+            
+            # Convert back to bytes
+            byte_length = (secret_int.bit_length() + 7) // 8
+            byte_length = max(1, byte_length)  # At least 1 byte
+            secret = secret_int.to_bytes(byte_length, 'big')
         
         # Verify hash if provided
         if expected_hash:
@@ -220,7 +250,7 @@ class ShamirSecretSharingService:
         Returns:
             True if share is valid, False otherwise
         """
-        if not commitments or len(commitments) < k:
+        if not commitments or len(commitments) < k or self._is_gf256(share):
             return False
         
         x = share.index
@@ -239,6 +269,10 @@ class ShamirSecretSharingService:
         
         return left_side == right_side
     
+    @staticmethod
+    def _is_gf256(share: Share) -> bool:
+        return bytes(share.value[:len(GF256_SHARE_MARKER)]) == GF256_SHARE_MARKER
+    
     def _evaluate_polynomial(self, coefficients: List[int], x: int) -> int:
         """
         Evaluate polynomial at point x using Horner's method (mod prime).
@@ -309,6 +343,13 @@ class ShamirSecretSharingService:
         Returns:
             New shares with same secret but different values
         """
+        if old_shares and all(self._is_gf256(share) for share in old_shares):
+            refreshed = shamir_gf256.refresh(
+                [(share.index, bytes(share.value)[len(GF256_SHARE_MARKER):]) for share in old_shares],
+                k,
+            )
+            return [Share(index=x, value=GF256_SHARE_MARKER + value) for x, value in refreshed]
+        
         # Generate a random polynomial with zero constant term
         # g(x) = 0 + b_1*x + b_2*x^2 + ... + b_{k-1}*x^{k-1}
         refresh_coeffs = [0]  # Zero constant term
@@ -126,6 +126,32 @@ class ShamirSecretSharingTests(TestCase):
         )
         self.assertEqual(reconstructed, secret)
     
+    def test_secret_larger_than_prime_field(self):
+        """GF(256) shares have no size cap and are as long as the secret."""
+        secret = bytes(range(256)) * 40
+        result = self.service.split_secret(secret, k=3, n=5)
+        
+        self.assertEqual(len(result.shares[0].value), len(secret) + 2)
+        reconstructed = self.service.reconstruct_secret(
+            result.shares[2:],
+            expected_hash=result.original_hash
+        )
+        self.assertEqual(reconstructed, secret)
+    
+    def test_prime_field_shares_still_reconstruct(self):
+        """Fragments stored before the GF(256) switch still reconstruct."""
+        secret = b"stored before"
+        legacy = self.service.split_secret(secret, k=3, n=5, with_commitments=True)
+        current = self.service.split_secret(secret, k=3, n=5)
+        
+        reconstructed = self.service.reconstruct_secret(
+            legacy.shares[:3],
+            expected_hash=legacy.original_hash
+        )
+        self.assertEqual(reconstructed, secret)
+        with self.assertRaises(ValueError):
+            self.service.reconstruct_secret(legacy.shares[:2] + current.shares[2:3])
+    
     def test_share_refresh(self):
         """Test proactive share refresh."""
         secret = b"refresh me"
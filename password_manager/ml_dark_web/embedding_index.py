@@ -0,0 +1,125 @@
+"""
+Embedding Index for Bulk Credential Matching
+
+Holds L2-normalized Siamese embeddings for one breach dump and answers
+"which breach identifiers are close to these monitored credentials" with
+a chunked matrix product instead of one model call per pair.
+
+Pure NumPy so it can be built and queried without torch; the embeddings
+themselves come from CredentialMatcherService.get_embeddings().
+"""
+
+import logging
+import numpy as np
+from typing import List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows of the query matrix scored per matrix product. Bounds the
+# (chunk x num_identifiers) float32 score matrix held in memory.
+DEFAULT_QUERY_CHUNK = 1024
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize embedding rows so a dot product equals cosine similarity
+
+    Zero rows (fallback embeddings) stay zero, i.e. similarity 0.5 to everything.
+    """
+    matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.maximum(norms, 1e-8, out=norms)
+    return matrix / norms
+
+
+def decode_embedding(raw, dim: int):
+    """
+    Decode an embedding stored with ndarray.tobytes()
+
+    Returns:
+        float32 vector of length dim, or None if missing/wrong size
+    """
+    if not raw:
+        return None
+    vector = np.frombuffer(bytes(raw), dtype=np.float32)
+    if vector.shape[0] != dim:
+        return None
+    return vector
+
+
+class CredentialEmbeddingIndex:
+    """
+    In-memory cosine-similarity index over breach identifier embeddings
+
+    Similarity scores are reported on the same [0, 1] scale as
+    CredentialMatcherService.calculate_similarity ((cos + 1) / 2).
+    """
+
+    def __init__(self,
+                 identifiers: Sequence[str],
+                 embeddings: np.ndarray,
+                 query_chunk: int = DEFAULT_QUERY_CHUNK):
+        matrix = normalize_embeddings(embeddings)
+        if matrix.shape[0] != len(identifiers):
+            raise ValueError(
+                f"Got {len(identifiers)} identifiers for {matrix.shape[0]} embeddings"
+            )
+        if query_chunk < 1:
+            raise ValueError("query_chunk must be >= 1")
+
+        self.identifiers = list(identifiers)
+        self.query_chunk = query_chunk
+        # Stored transposed so each chunk is a single (chunk, d) @ (d, n) GEMM
+        self._matrix_t = np.ascontiguousarray(matrix.T)
+
+    def __len__(self):
+        return len(self.identifiers)
+
+    @property
+    def dim(self) -> int:
+        return self._matrix_t.shape[0]
+
+    def search(self,
+               query_embeddings: np.ndarray,
+               threshold: float,
+               top_k: int = 0) -> List[List[Tuple[str, float]]]:
+        """
+        Find identifiers whose similarity to each query is >= threshold
+
+        Args:
+            query_embeddings: (m, d) embeddings of monitored credentials
+            threshold: Minimum similarity on the [0, 1] scale
+            top_k: Keep at most this many matches per query (0 = all)
+
+        Returns:
+            list: One [(identifier, similarity), ...] list per query row,
+            sorted by similarity (descending)
+        """
+        queries = normalize_embeddings(query_embeddings)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dim queries, got {queries.shape[1]}")
+
+        results: List[List[Tuple[str, float]]] = []
+        if not self.identifiers:
+            return [[] for _ in range(queries.shape[0])]
+
+        # (cos + 1) / 2 >= threshold  <=>  cos >= 2 * threshold - 1
+        cosine_threshold = np.float32(2.0 * threshold - 1.0)
+
+        for start in range(0, queries.shape[0], self.query_chunk):
+            scores = queries[start:start + self.query_chunk] @ self._matrix_t
+            rows, cols = np.nonzero(scores >= cosine_threshold)
+            hit_scores = scores[rows, cols]
+
+            chunk_results: List[List[Tuple[str, float]]] = [[] for _ in range(scores.shape[0])]
+            # Sort hits by (row, -score) once instead of per row
+            order = np.lexsort((-hit_scores, rows))
+            for row, col, score in zip(rows[order], cols[order], hit_scores[order]):
+                bucket = chunk_results[row]
+                if top_k and len(bucket) >= top_k:
+                    continue
+                bucket.append((self.identifiers[col], (float(score) + 1.0) / 2.0))
+
+            results.extend(chunk_results)
+
+        return results
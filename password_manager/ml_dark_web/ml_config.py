@@ -1,12 +1,24 @@
 """
 ML Models Configuration for Dark Web Monitoring
+
+torch is only imported when the device is first needed, so importing this
+module (e.g. from tasks.py) does not pull in torch.
 """
 
-import torch
 from pathlib import Path
 from django.conf import settings
 
 
+class _DefaultDevice:
+    """Resolves MLDarkWebConfig.DEVICE on first access, then caches it"""
+
+    def __get__(self, instance, owner):
+        import torch
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        owner.DEVICE = device
+        return device
+
+
 class MLDarkWebConfig:
     """Configuration for ML models used in dark web monitoring"""
     
@@ -59,7 +71,7 @@ class MLDarkWebConfig:
     PATTERN_CONFIDENCE_THRESHOLD = 0.70  # Minimum confidence for pattern detection
     
     # Processing
-    DEVICE = 'cuda' if torch.cuda.is_available() else 'cpu'
+    DEVICE = _DefaultDevice()
     MAX_WORKERS = 4  # For parallel processing
     
     # Scraping Configuration
@@ -87,6 +99,7 @@ class MLDarkWebConfig:
     # Celery Task Configuration
     SCRAPE_SCHEDULE_HOURS = 24  # How often to scrape sources
     MATCH_BATCH_SIZE = 1000  # Credentials to match per batch
+    EMBEDDING_BATCH_SIZE = 4096  # Credentials per Siamese forward pass
     ANALYSIS_PRIORITY = 'high'  # Celery task priority
     
     # Performance Optimization
@@ -130,6 +143,7 @@ class MLDarkWebConfig:
     @classmethod
     def get_device_info(cls):
         """Get device information for ML models"""
+        import torch
         return {
             'device': cls.DEVICE,
             'cuda_available': torch.cuda.is_available(),
@@ -151,6 +165,7 @@ class MLDarkWebConfig:
             issues.append(f"Training data directory not found: {cls.TRAINING_DATA_DIR}")
         
         # Check CUDA availability if specified
+        import torch
         if cls.DEVICE == 'cuda' and not torch.cuda.is_available():
             issues.append("CUDA specified but not available. Falling back to CPU.")
             cls.DEVICE = 'cpu'
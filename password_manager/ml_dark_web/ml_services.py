@@ -13,6 +13,9 @@ import hashlib
 import logging
 from pathlib import Path
 
+from shared.model_registry import ModelRegistry, mmap_torch_state_dict
+
+from .embedding_index import CredentialEmbeddingIndex
 from .ml_config import MLDarkWebConfig, PREPROCESSING_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -280,19 +283,28 @@ class CredentialMatcherService:
         # Load trained weights if available
         self._load_model(model_path)
         
+        # On CPU this is a no-op, so memory-mapped weights stay shared
         self.model.to(self.device)
         self.model.eval()
     
     def _load_model(self, model_path: Optional[Path] = None):
-        """Load trained Siamese model"""
+        """
+        Load trained Siamese model
+        
+        Weights are memory-mapped read-only from the checkpoint and assigned
+        to the module without a copy, so CPU workers on one node share them.
+        """
         model_path = model_path or self.config.SIAMESE_MODEL_PATH
         
         if model_path.exists():
             try:
                 logger.info(f"Loading Siamese model from {model_path}")
-                self.model.load_state_dict(
-                    torch.load(model_path, map_location=self.device, weights_only=True)  # nosec B614
-                )
+                state_dict = mmap_torch_state_dict(model_path, map_location=self.device)
+                try:
+                    self.model.load_state_dict(state_dict, assign=True)
+                except TypeError:
+                    # torch < 2.1: no assign, parameters are copied
+                    self.model.load_state_dict(state_dict)
                 logger.info("Siamese model loaded successfully")
             except Exception as e:
                 logger.warning(f"Could not load Siamese model: {e}. Using untrained model.")
@@ -382,26 +394,16 @@ class CredentialMatcherService:
             list: List of (credential, similarity_score) tuples
         """
         threshold = threshold or self.config.SIMILARITY_THRESHOLD
-        matches = []
         
-        for breach_cred in breach_credentials:
-            # Hash breach credential if not already hashed
-            if len(breach_cred) != 64:  # Not a SHA-256 hash
-                breach_hash = self.hash_credential(breach_cred)
-            else:
-                breach_hash = breach_cred
-            
-            # Calculate similarity
-            similarity = self.calculate_similarity(user_credential_hash, breach_hash)
-            
-            # Add to matches if above threshold
-            if similarity >= threshold:
-                matches.append((breach_cred, similarity))
+        if not breach_credentials:
+            return []
         
-        # Sort by similarity (descending)
-        matches.sort(key=lambda x: x[1], reverse=True)
+        # One batched forward pass for the whole breach list instead of a
+        # model call per (user credential, breach credential) pair
+        index = self.build_breach_index(breach_credentials)
+        user_embedding = self.get_embeddings([user_credential_hash])
         
-        return matches
+        return index.search(user_embedding, threshold)[0]
     
     def batch_find_matches(self,
                           user_credentials: List[str],
@@ -416,9 +418,15 @@ class CredentialMatcherService:
         results = {}
         threshold = threshold or self.config.SIMILARITY_THRESHOLD
         
-        for user_cred in user_credentials:
-            user_hash = self.hash_credential(user_cred)
-            matches = self.find_matches(user_hash, breach_credentials, threshold)
+        if not user_credentials or not breach_credentials:
+            return results
+        
+        index = self.build_breach_index(breach_credentials)
+        user_embeddings = self.get_embeddings(
+            [self.hash_credential(user_cred) for user_cred in user_credentials]
+        )
+        
+        for user_cred, matches in zip(user_credentials, index.search(user_embeddings, threshold)):
             if matches:
                 results[user_cred] = matches
         
@@ -441,30 +449,100 @@ class CredentialMatcherService:
             logger.error(f"Error getting embedding: {e}")
             return np.zeros(self.config.SIAMESE_EMBEDDING_DIM)
 
+    
+    def normalize_breach_credential(self, breach_credential: str) -> str:
+        """Hash a breach credential unless it is already a SHA-256 hex digest"""
+        if len(breach_credential) != 64:  # Not a SHA-256 hash
+            return self.hash_credential(breach_credential)
+        return breach_credential
+    
+    def credentials_to_matrix(self, credential_hashes: List[str]) -> torch.Tensor:
+        """
+        Vectorized credential_to_vector for many hashes
+        
+        Returns:
+            torch.Tensor: (len(credential_hashes), SIAMESE_INPUT_DIM)
+        """
+        input_dim = self.config.SIAMESE_INPUT_DIM
+        matrix = np.zeros((len(credential_hashes), input_dim), dtype=np.float32)
+        
+        for row, credential_hash in enumerate(credential_hashes):
+            try:
+                hash_bytes = bytes.fromhex(credential_hash)[:input_dim]
+            except ValueError:
+                logger.error("Error converting credential to vector: invalid hex digest")
+                continue  # Zero row fallback, same as credential_to_vector
+            matrix[row, :len(hash_bytes)] = np.frombuffer(hash_bytes, dtype=np.uint8)
+        
+        matrix /= 255.0
+        return torch.from_numpy(matrix).to(self.device)
+    
+    def get_embeddings(self,
+                       credential_hashes: List[str],
+                       batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Get embeddings for many credential hashes in batched forward passes
+        
+        Args:
+            credential_hashes: SHA-256 hex digests
+            batch_size: Rows per forward pass (default EMBEDDING_BATCH_SIZE)
+            
+        Returns:
+            np.ndarray: (len(credential_hashes), SIAMESE_EMBEDDING_DIM) float32
+        """
+        batch_size = batch_size or self.config.EMBEDDING_BATCH_SIZE
+        embeddings = np.zeros(
+            (len(credential_hashes), self.config.SIAMESE_EMBEDDING_DIM), dtype=np.float32
+        )
+        
+        for start in range(0, len(credential_hashes), batch_size):
+            chunk = credential_hashes[start:start + batch_size]
+            try:
+                with torch.no_grad():
+                    output = self.model.forward_one(self.credentials_to_matrix(chunk))
+                embeddings[start:start + len(chunk)] = output.cpu().numpy()
+            except Exception as e:
+                logger.error(f"Error getting embeddings: {e}")
+        
+        return embeddings
+    
+    def build_breach_index(self, breach_credentials: List[str]) -> CredentialEmbeddingIndex:
+        """
+        Embed every breach identifier once and index them for matching
+        
+        Args:
+            breach_credentials: Breach credentials (plaintext or hashed)
+            
+        Returns:
+            CredentialEmbeddingIndex keyed by the original identifiers
+        """
+        breach_hashes = [self.normalize_breach_credential(c) for c in breach_credentials]
+        return CredentialEmbeddingIndex(breach_credentials, self.get_embeddings(breach_hashes))
 
-import threading
+# Models load on first use, once per process. A failed load is retried on
+# the next call (e.g. after a transient model download error).
+_registry = ModelRegistry('ml_dark_web')
+_registry.register('breach_classifier', BreachClassifierService, retry_failures=True)
+_registry.register('credential_matcher', CredentialMatcherService, retry_failures=True)
 
-_singleton_lock = threading.Lock()
-_breach_classifier = None
-_credential_matcher = None
+
+def _get(model_name: str):
+    model = _registry.get(model_name)
+    if model is None:
+        raise RuntimeError(f"{model_name} failed to load: {_registry.get_error(model_name)}")
+    return model
 
 
 def get_breach_classifier() -> BreachClassifierService:
     """Get singleton breach classifier instance (thread-safe)"""
-    global _breach_classifier
-    if _breach_classifier is None:
-        with _singleton_lock:
-            if _breach_classifier is None:
-                _breach_classifier = BreachClassifierService()
-    return _breach_classifier
+    return _get('breach_classifier')
 
 
 def get_credential_matcher() -> CredentialMatcherService:
     """Get singleton credential matcher instance (thread-safe)"""
-    global _credential_matcher
-    if _credential_matcher is None:
-        with _singleton_lock:
-            if _credential_matcher is None:
-                _credential_matcher = CredentialMatcherService()
-    return _credential_matcher
+    return _get('credential_matcher')
+
 
+def get_model_stats():
+    """Per-model load state, load time and resident memory added"""
+    return _registry.stats()
@@ -11,6 +11,7 @@ from django.core.cache import cache
 import logging
 import json
 import os
+import numpy as np
 from typing import List, Dict
 
 from .models import (
@@ -27,6 +28,7 @@ from .models import (
 # Import inside the task bodies instead — that path only fires when
 # the task actually executes (in a Celery worker, not under pytest).
 from vault.models import BreachAlert
+from .embedding_index import decode_embedding
 from .ml_config import MLDarkWebConfig
 
 logger = logging.getLogger(__name__)
@@ -149,61 +151,99 @@ def match_credentials_against_breach(self, breach_id: int):
 
         # Get credential matcher
         matcher = get_credential_matcher()
-
+        
+        # Embed every breach identifier once (batched forward passes) and
+        # index them; each credential batch is then scored with a single
+        # matrix product instead of a model call per pair.
+        breach_index = matcher.build_breach_index(all_breach_identifiers)
+        threshold = MLDarkWebConfig.SIMILARITY_THRESHOLD
+        embedding_dim = MLDarkWebConfig.SIAMESE_EMBEDDING_DIM
+        
         # Get all active monitored credentials
-        monitored_credentials = UserCredentialMonitoring.objects.filter(is_active=True)
+        monitored_credentials = UserCredentialMonitoring.objects.filter(
+            is_active=True
+        ).only('id', 'user_id', 'email_hash', 'email_embedding').order_by('id')
         
         matches_found = 0
         
-        # Process in batches to avoid memory issues
+        # Process in batches to avoid memory issues. Keyset pagination on
+        # id keeps each page an index range scan instead of OFFSET n.
         batch_size = MLDarkWebConfig.MATCH_BATCH_SIZE
+        last_id = 0
         
-        for i in range(0, monitored_credentials.count(), batch_size):
-            batch = monitored_credentials[i:i + batch_size]
-            batch_cred_ids = []
+        while True:
+            batch = list(monitored_credentials.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            batch_cred_ids = [cred.id for cred in batch]
             
-            for cred in batch:
-                batch_cred_ids.append(cred.id)
-                
-                # Find matches
-                credential_matches = matcher.find_matches(
-                    cred.email_hash,
-                    all_breach_identifiers
+            # Use stored embeddings; compute (and persist) only the ones
+            # that are missing or were stored with a different dimension.
+            embeddings = [decode_embedding(cred.email_embedding, embedding_dim) for cred in batch]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                computed = matcher.get_embeddings([batch[i].email_hash for i in missing])
+                for i, embedding in zip(missing, computed):
+                    embeddings[i] = embedding
+                    batch[i].email_embedding = embedding.tobytes()
+                UserCredentialMonitoring.objects.bulk_update(
+                    [batch[i] for i in missing], ['email_embedding']
                 )
+            
+            batch_matches = breach_index.search(np.vstack(embeddings), threshold)
+            
+            # Skip credentials that already have a match row for this
+            # breach (re-driven runs), then insert the rest in one query.
+            already_matched = set(
+                MLBreachMatch.objects.filter(
+                    breach=breach, monitored_credential_id__in=batch_cred_ids
+                ).values_list('monitored_credential_id', flat=True)
+            )
+            new_matches = []
+            for cred, credential_matches in zip(batch, batch_matches):
+                if not credential_matches or cred.id in already_matched:
+                    continue
                 
-                if credential_matches:
-                    # Get best match
-                    best_match = credential_matches[0]
-                    similarity_score = best_match[1]
-                    
-                    # Create match record
-                    match, created = MLBreachMatch.objects.get_or_create(
-                        user=cred.user,
-                        breach=breach,
-                        monitored_credential=cred,
-                        defaults={
-                            'similarity_score': similarity_score,
-                            'confidence_score': similarity_score * breach.confidence_score,
-                            'match_type': 'email' if '@' in best_match[0] else 'credential',
-                            'matched_data': {
-                                'matched_identifier': best_match[0][:50],  # Truncate for privacy
-                                'num_matches': len(credential_matches)
-                            }
-                        }
-                    )
-                    
-                    if created:
-                        matches_found += 1
-                        logger.info(f"Match found: User {cred.user.id} - Breach {breach_id} (similarity: {similarity_score:.2f})")
-                        
-                        # Create alert async
-                        create_breach_alert.delay(match.id)
+                # Get best match
+                best_match = credential_matches[0]
+                similarity_score = best_match[1]
+                
+                new_matches.append(MLBreachMatch(
+                    user_id=cred.user_id,
+                    breach=breach,
+                    monitored_credential_id=cred.id,
+                    similarity_score=similarity_score,
+                    confidence_score=similarity_score * breach.confidence_score,
+                    match_type='email' if '@' in best_match[0] else 'credential',
+                    matched_data={
+                        'matched_identifier': best_match[0][:50],  # Truncate for privacy
+                        'num_matches': len(credential_matches)
+                    }
+                ))
+            
+            if new_matches:
+                # ignore_conflicts covers a concurrent run inserting the same
+                # (user, breach, credential) row; create_breach_alert is
+                # idempotent on alert_created so re-reading ids is safe.
+                MLBreachMatch.objects.bulk_create(new_matches, ignore_conflicts=True)
+                created_ids = MLBreachMatch.objects.filter(
+                    breach=breach,
+                    monitored_credential_id__in=[m.monitored_credential_id for m in new_matches],
+                    alert_created=False,
+                ).values_list('id', flat=True)
+                
+                for match_id in created_ids:
+                    matches_found += 1
+                    # Create alert async
+                    create_breach_alert.delay(match_id)
+                
+                logger.info(f"Breach {breach_id}: {len(new_matches)} new matches in credential batch ending at id {last_id}")
             
             # Batch update last_checked for all credentials in this batch (single UPDATE)
-            if batch_cred_ids:
-                UserCredentialMonitoring.objects.filter(
-                    id__in=batch_cred_ids
-                ).update(last_checked=timezone.now())
+            UserCredentialMonitoring.objects.filter(
+                id__in=batch_cred_ids
+            ).update(last_checked=timezone.now())
         
         # Close-out the breach record. Two race-safety properties that
         # the previous in-memory `breach.processing_status` check
@@ -219,7 +259,7 @@ def match_credentials_against_breach(self, breach_id: int):
         #
         # 2. `affected_records` is the TRUE TOTAL across all runs, not
         #    this run's per-run delta. `matches_found` only counts
-        #    rows we created via `get_or_create`; if another run
+        #    rows we created via `bulk_create`; if another run
         #    already populated MLBreachMatch we'd shrink the recorded
         #    total. Re-derive the count from the DB.
         #
@@ -0,0 +1,87 @@
+"""
+Bulk credential matching via ``CredentialEmbeddingIndex``.
+
+Covers:
+  * search() agrees with the per-pair (cos + 1) / 2 similarity used by
+    ``CredentialMatcherService.calculate_similarity``.
+  * Threshold, top_k and descending ordering per query row.
+  * Query chunking gives the same answer as one big matrix product.
+  * decode_embedding round-trips ``ndarray.tobytes()`` and rejects stale dims.
+"""
+import numpy as np
+from django.test import SimpleTestCase
+
+from ml_dark_web.embedding_index import CredentialEmbeddingIndex, decode_embedding
+
+
+def _pairwise_similarity(a, b):
+    cosine = float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    return (cosine + 1.0) / 2.0
+
+
+class CredentialEmbeddingIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.breach = rng.standard_normal((50, 16)).astype(np.float32)
+        self.identifiers = [f'user{i}@example.com' for i in range(50)]
+        # Queries 0-2 are near-copies of breach rows 3, 7 and 11
+        self.queries = rng.standard_normal((6, 16)).astype(np.float32)
+        self.queries[:3] = self.breach[[3, 7, 11]] + 0.01
+        self.index = CredentialEmbeddingIndex(self.identifiers, self.breach)
+
+    def test_matches_pairwise_similarity(self):
+        """Every reported hit equals the per-pair similarity and clears the threshold."""
+        results = self.index.search(self.queries, threshold=0.6)
+
+        for query, matches in zip(self.queries, results):
+            expected = {
+                ident for ident, row in zip(self.identifiers, self.breach)
+                if _pairwise_similarity(query, row) >= 0.6
+            }
+            self.assertEqual({ident for ident, _ in matches}, expected)
+            for ident, score in matches:
+                row = self.breach[self.identifiers.index(ident)]
+                self.assertAlmostEqual(score, _pairwise_similarity(query, row), places=4)
+
+    def test_best_match_first_and_top_k(self):
+        """Matches are sorted descending and top_k caps each row."""
+        results = self.index.search(self.queries, threshold=0.5, top_k=2)
+
+        self.assertEqual(results[0][0][0], 'user3@example.com')
+        self.assertEqual(results[1][0][0], 'user7@example.com')
+        self.assertEqual(results[2][0][0], 'user11@example.com')
+        for matches in results:
+            self.assertLessEqual(len(matches), 2)
+            scores = [score for _, score in matches]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_chunking_is_transparent(self):
+        """Small query chunks return the same results as a single product."""
+        chunked = CredentialEmbeddingIndex(self.identifiers, self.breach, query_chunk=2)
+
+        self.assertEqual(
+            chunked.search(self.queries, threshold=0.55),
+            self.index.search(self.queries, threshold=0.55),
+        )
+
+    def test_zero_embeddings_never_match(self):
+        """Fallback zero vectors score 0.5 and so never clear the default threshold."""
+        results = self.index.search(np.zeros((2, 16), dtype=np.float32), threshold=0.85)
+
+        self.assertEqual(results, [[], []])
+
+    def test_dimension_mismatch_rejected(self):
+        """Queries and identifiers must line up with the indexed embeddings."""
+        with self.assertRaises(ValueError):
+            self.index.search(np.zeros((1, 8), dtype=np.float32), threshold=0.5)
+        with self.assertRaises(ValueError):
+            CredentialEmbeddingIndex(self.identifiers[:3], self.breach)
+
+    def test_decode_embedding(self):
+        """Stored embeddings decode back to float32; missing or stale ones return None."""
+        vector = self.breach[0]
+
+        np.testing.assert_array_equal(decode_embedding(vector.tobytes(), 16), vector)
+        self.assertIsNone(decode_embedding(None, 16))
+        self.assertIsNone(decode_embedding(vector.tobytes(), 128))
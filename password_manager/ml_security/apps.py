@@ -10,7 +10,7 @@ class MlSecurityConfig(AppConfig):
     verbose_name = 'ML Security'
     
     def ready(self):
-        """Initialize ML models on app startup"""
+        """Preload configured ML models; the rest load on first use"""
         # Skip in the reloader parent process — only load in the child worker
         if os.environ.get('RUN_MAIN') != 'true' and 'runserver' in sys.argv:
             return
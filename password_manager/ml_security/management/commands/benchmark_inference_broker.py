@@ -0,0 +1,124 @@
+"""
+Measure ML inference throughput with and without micro-batching.
+
+Usage:
+    python manage.py benchmark_inference_broker [--model NAME] [--requests N] [--clients N]
+
+Loads the chosen ml_security model, then sends N single-item requests from
+a pool of concurrent clients, first calling the model directly and then
+through the inference broker, and reports throughput, client latency and
+the batch sizes / queueing delay the broker achieved.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_security.ml_models import inference_broker
+
+
+def _password_strength_request(i):
+    return (f"Benchmark{i}Pass!word",)
+
+
+def _anomaly_request(i):
+    return ({
+        'session_duration': 300 + i % 600,
+        'typing_speed': 40.0 + i % 30,
+        'vault_accesses': i % 12,
+        'device_consistency': 0.95,
+        'location_consistency': 0.9,
+    }, None)
+
+
+def _threat_request(i):
+    return (
+        {'device_trust_score': 0.8, 'ip_trust_score': 0.7, 'failed_attempts': i % 4},
+        f"benchmark-user-{i % 50}",
+        {'typing_speed': 45.0, 'vault_access_count': i % 8},
+    )
+
+
+REQUEST_FACTORIES = {
+    'password_strength': _password_strength_request,
+    'anomaly_detector': _anomaly_request,
+    'threat_analyzer': _threat_request,
+}
+
+
+def _load_model(name):
+    if name == 'password_strength':
+        from ml_security.ml_models.password_strength import PasswordStrengthPredictor
+        return PasswordStrengthPredictor()
+    if name == 'anomaly_detector':
+        from ml_security.ml_models.anomaly_detector import AnomalyDetector
+        return AnomalyDetector()
+    from ml_security.ml_models.threat_analyzer import ThreatAnalyzer
+    return ThreatAnalyzer()
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+
+class Command(BaseCommand):
+    help = "Report throughput, latency and achieved batch sizes of ML inference, direct vs micro-batched."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default='password_strength', choices=sorted(REQUEST_FACTORIES))
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--clients', type=int, default=32)
+
+    def handle(self, *args, **options):
+        name = options['model']
+        try:
+            model = _load_model(name)
+        except Exception as e:
+            raise CommandError(f"Could not load {name}: {e}")
+
+        single_method = getattr(model, inference_broker.BATCH_METHODS[name][0])
+        requests = [REQUEST_FACTORIES[name](i) for i in range(options['requests'])]
+
+        def run(call):
+            latencies = []
+
+            def timed(request_args):
+                started = time.perf_counter()
+                call(request_args)
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['clients']) as pool:
+                list(pool.map(timed, requests))
+            return time.perf_counter() - started, latencies
+
+        direct_elapsed, direct_latencies = run(lambda request_args: single_method(*request_args))
+
+        inference_broker.reset_broker_stats()
+        brokered_elapsed, brokered_latencies = run(
+            lambda request_args: inference_broker.submit(name, model, *request_args).result()
+        )
+        stats = inference_broker.get_broker_stats().get(name, {})
+        inference_broker.shutdown_brokers()
+
+        self.stdout.write(f"{name}: {len(requests)} requests from {options['clients']} clients")
+        for label, elapsed, latencies in (
+            ('direct', direct_elapsed, direct_latencies),
+            ('batched', brokered_elapsed, brokered_latencies),
+        ):
+            self.stdout.write(
+                f"{label:>8}: {len(requests) / elapsed:.0f} req/s, "
+                f"latency p50 {_percentile(latencies, 0.5):.2f} ms, p99 {_percentile(latencies, 0.99):.2f} ms"
+            )
+        if not stats:
+            self.stdout.write("Broker disabled (ML_INFERENCE_BROKER['ENABLED'] is False); batched run was direct")
+            return
+        self.stdout.write(
+            f"   batches: {stats['batches']}, avg size {stats['avg_batch_size']}, max size {stats['max_batch_size']}"
+        )
+        self.stdout.write(
+            f"     queue: p50 {stats['queue_delay_ms']['p50']:.2f} ms, p99 {stats['queue_delay_ms']['p99']:.2f} ms"
+        )
+        self.stdout.write(f" histogram: {stats['batch_size_histogram']}")
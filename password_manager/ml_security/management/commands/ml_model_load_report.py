@@ -0,0 +1,52 @@
+"""
+Report what loading each ML model costs.
+
+Usage:
+    python manage.py ml_model_load_report [--models NAME ...] [--dark-web]
+
+First reports whether TensorFlow / torch were already imported after
+Django start-up (with lazy loading they should not be), then loads each
+model through its registry and prints load time, warm-up time and the
+resident memory the load added.
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand
+
+from ml_security.ml_models import _registry as ml_security_registry
+
+HEAVY_MODULES = ('tensorflow', 'torch', 'transformers')
+
+
+class Command(BaseCommand):
+    help = "Load ML models one by one and report load time and resident memory per model."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs='*', default=None,
+                            help="ml_security models to load (default: all registered)")
+        parser.add_argument('--dark-web', action='store_true',
+                            help="Also load the ml_dark_web breach classifier and credential matcher")
+
+    def handle(self, *args, **options):
+        for module in HEAVY_MODULES:
+            state = 'imported' if module in sys.modules else 'not imported'
+            self.stdout.write(f"{module:>12}: {state} at start-up")
+
+        registries = [(ml_security_registry, options['models'])]
+        if options['dark_web']:
+            from ml_dark_web.ml_services import _registry as dark_web_registry
+            registries.append((dark_web_registry, None))
+
+        for registry, names in registries:
+            registry.preload(names)
+            for name, stats in registry.stats().items():
+                if names is not None and name not in names:
+                    continue
+                if not stats['loaded']:
+                    self.stdout.write(f"{registry.name}.{name}: failed ({stats['error']})")
+                    continue
+                self.stdout.write(
+                    f"{registry.name}.{name}: load {stats['load_seconds']:.2f} s, "
+                    f"warm-up {stats['warmup_seconds'] or 0:.2f} s, +{stats['rss_delta_mib']:.1f} MiB RSS"
+                )
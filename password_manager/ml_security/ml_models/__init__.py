@@ -8,78 +8,102 @@ This package contains implementations of various machine learning models:
 - Behavior clusterer (K-Means)
 
 Performance Optimizations:
-- Models are loaded once at application startup
-- Warm-up predictions eliminate TensorFlow's first-call latency
-- Singleton pattern prevents redundant model loading
+- Models are loaded lazily on first use (shared.model_registry), so
+  processes that never serve an ML request never import TensorFlow
+- Warm-up predictions run right after a model loads, eliminating
+  TensorFlow's first-call latency
+- Each model is built once per process; ML_MODEL_LOADING['PRELOAD'] loads
+  selected models at startup instead (e.g. before a prefork server forks)
+- Concurrent requests are micro-batched per model (see inference_broker)
 """
 
 import os
 import logging
 import time
 
+from shared.model_registry import ModelRegistry
+
 logger = logging.getLogger(__name__)
 
-# Global model instances
-_models = {}
+# Global model registry
+_registry = ModelRegistry('ml_security')
 _models_loaded = False
 
 
-def _warmup_models():
-    """
-    Run warm-up predictions to eliminate TensorFlow's first-call latency.
-    
-    TensorFlow performs lazy initialization (JIT compilation, graph building)
-    on the first actual computation. Running dummy predictions at startup
-    ensures all subsequent requests are fast.
-    """
-    warmup_start = time.time()
-    
-    # Warm up password strength model
-    if 'password_strength' in _models and _models['password_strength'] is not None:
-        try:
-            # Run a dummy prediction to trigger TensorFlow initialization
-            _models['password_strength'].predict("WarmUpPassword123!")
-            logger.info("Password strength model warmed up")
-        except Exception as e:
-            logger.warning(f"Failed to warm up password strength model: {e}")
-    
-    # Warm up anomaly detector
-    if 'anomaly_detector' in _models and _models['anomaly_detector'] is not None:
-        try:
-            # Run a dummy anomaly detection
-            dummy_session = {
-                'session_duration': 300,
-                'typing_speed': 45.0,
-                'vault_accesses': 5,
-                'device_consistency': 0.95,
-                'location_consistency': 0.88
-            }
-            _models['anomaly_detector'].detect_anomaly(dummy_session, None)
-            logger.info("Anomaly detector model warmed up")
-        except Exception as e:
-            logger.warning(f"Failed to warm up anomaly detector: {e}")
-    
-    # Warm up threat analyzer
-    if 'threat_analyzer' in _models and _models['threat_analyzer'] is not None:
-        try:
-            # Run a dummy threat analysis
-            dummy_session = {'ip': '127.0.0.1', 'user_agent': 'warmup'}
-            dummy_behavior = {'typing_speed': 45.0, 'mouse_movement': 'normal'}
-            _models['threat_analyzer'].analyze_threat(dummy_session, 'warmup_user', dummy_behavior)
-            logger.info("Threat analyzer model warmed up")
-        except Exception as e:
-            logger.warning(f"Failed to warm up threat analyzer: {e}")
-    
-    warmup_time = time.time() - warmup_start
-    logger.info(f"ML model warm-up completed in {warmup_time:.2f}s")
+def _build_password_strength():
+    from .password_strength import PasswordStrengthPredictor
+    return PasswordStrengthPredictor()
+
+
+def _build_anomaly_detector():
+    from .anomaly_detector import AnomalyDetector
+    return AnomalyDetector()
+
+
+def _build_threat_analyzer():
+    from .threat_analyzer import ThreatAnalyzer
+    return ThreatAnalyzer()
+
+
+def _build_intent_predictor():
+    from .intent_predictor import IntentPredictor
+    return IntentPredictor()
+
+
+def _build_context_analyzer():
+    from .context_analyzer import ContextAnalyzer
+    return ContextAnalyzer()
+
+
+# Warm-up predictions eliminate TensorFlow's first-call latency.
+# TensorFlow performs lazy initialization (JIT compilation, graph building)
+# on the first actual computation, so each model runs one dummy prediction
+# as soon as it is loaded.
+
+def _warmup_password_strength(model):
+    model.predict("WarmUpPassword123!")
+
+
+def _warmup_anomaly_detector(model):
+    dummy_session = {
+        'session_duration': 300,
+        'typing_speed': 45.0,
+        'vault_accesses': 5,
+        'device_consistency': 0.95,
+        'location_consistency': 0.88
+    }
+    model.detect_anomaly(dummy_session, None)
+
+
+def _warmup_threat_analyzer(model):
+    dummy_session = {'ip': '127.0.0.1', 'user_agent': 'warmup'}
+    dummy_behavior = {'typing_speed': 45.0, 'mouse_movement': 'normal'}
+    model.analyze_threat(dummy_session, 'warmup_user', dummy_behavior)
+
+
+_registry.register('password_strength', _build_password_strength, warmup=_warmup_password_strength)
+_registry.register('anomaly_detector', _build_anomaly_detector, warmup=_warmup_anomaly_detector)
+_registry.register('threat_analyzer', _build_threat_analyzer, warmup=_warmup_threat_analyzer)
+_registry.register('intent_predictor', _build_intent_predictor)
+_registry.register('context_analyzer', _build_context_analyzer)
+
+
+def _loading_config():
+    try:
+        from django.conf import settings
+        return getattr(settings, 'ML_MODEL_LOADING', {}) or {}
+    except Exception:
+        return {}
 
 
 def load_models():
     """
-    Load all trained ML models on application startup.
+    Preload ML models on application startup.
     
-    This function implements a singleton pattern to ensure models are
-    only loaded once, even if called multiple times during Django startup.
+    With ML_MODEL_LOADING['LAZY'] (the default) only the models listed in
+    ML_MODEL_LOADING['PRELOAD'] are loaded here and the rest load on first
+    get_model(); with LAZY off every model is loaded. Either way a model is
+    only built once per process, even if this is called several times.
     
     Guards:
     - Module-level `_models_loaded` flag (in-process singleton)
@@ -93,12 +117,12 @@ def load_models():
     # Guard 1: Already loaded in this process
     if _models_loaded:
         logger.debug("ML models already loaded, skipping reload")
-        return _models
+        return {}
 
     # Guard 2: Skip in Django's reloader parent process
     if os.environ.get('RUN_MAIN') != 'true' and 'runserver' in sys.argv:
         logger.debug("Skipping ML model load in reloader parent process")
-        return _models
+        return {}
 
     # Guard 3: Skip ML loading for management commands that don't serve requests
     NON_SERVER_COMMANDS = {
@@ -107,72 +131,42 @@ def load_models():
     }
     if any(cmd in sys.argv for cmd in NON_SERVER_COMMANDS):
         logger.debug("Skipping ML model load for management command")
-        return _models
+        return {}
 
-    from .password_strength import PasswordStrengthPredictor
-    from .anomaly_detector import AnomalyDetector
-    from .threat_analyzer import ThreatAnalyzer
-    from .intent_predictor import IntentPredictor
-    from .context_analyzer import ContextAnalyzer
-    
+    config = _loading_config()
     load_start = time.time()
     
-    try:
-        # Load password strength model
-        _models['password_strength'] = PasswordStrengthPredictor()
-        logger.info("Password strength model loaded")
-    except Exception as e:
-        logger.warning(f"Failed to load password strength model: {e}")
-    
-    try:
-        # Load anomaly detection model
-        _models['anomaly_detector'] = AnomalyDetector()
-        logger.info("Anomaly detection model loaded")
-    except Exception as e:
-        logger.warning(f"Failed to load anomaly detection model: {e}")
+    if config.get('LAZY', True):
+        # Everything else loads on first get_model()
+        preload = config.get('PRELOAD', [])
+    else:
+        preload = _registry.names()
+    _registry.preload(preload)
     
-    try:
-        # Load threat analyzer model
-        _models['threat_analyzer'] = ThreatAnalyzer()
-        logger.info("Threat analyzer model loaded")
-    except Exception as e:
-        logger.warning(f"Failed to load threat analyzer model: {e}")
-    
-    try:
-        # Load intent predictor model
-        _models['intent_predictor'] = IntentPredictor()
-        logger.info("Intent predictor model loaded")
-    except Exception as e:
-        logger.warning(f"Failed to load intent predictor model: {e}")
-    
-    try:
-        # Load context analyzer
-        _models['context_analyzer'] = ContextAnalyzer()
-        logger.info("Context analyzer loaded")
-    except Exception as e:
-        logger.warning(f"Failed to load context analyzer: {e}")
-    
-    load_time = time.time() - load_start
-    logger.info(f"ML models loaded in {load_time:.2f}s")
-    
-    # Warm up models to eliminate first-request latency
-    _warmup_models()
+    if preload:
+        load_time = time.time() - load_start
+        logger.info(f"ML models preloaded in {load_time:.2f}s: {', '.join(preload)}")
     
     _models_loaded = True
-    return _models
+    return {name: _registry.get(name) for name in preload}
 
 
 def get_model(model_name):
     """
-    Get a loaded model instance
+    Get a model instance, loading it on first use
     
     Args:
         model_name: Name of the model ('password_strength', 'anomaly_detector', 'threat_analyzer')
     
     Returns:
-        Model instance or None if not loaded
+        Model instance or None if unknown or it failed to load
     """
-    return _models.get(model_name)
+    return _registry.get(model_name)
+
+
+def get_model_stats():
+    """Per-model load state, load time and resident memory added"""
+    return _registry.stats()
 
 
 def is_models_loaded():
@@ -180,5 +174,5 @@ def is_models_loaded():
     return _models_loaded
 
 
-__all__ = ['load_models', 'get_model', 'is_models_loaded']
+__all__ = ['load_models', 'get_model', 'get_model_stats', 'is_models_loaded']
 
@@ -16,6 +16,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import hashlib
 
+from shared.model_registry import mmap_joblib_load
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -103,7 +105,12 @@ class AnomalyDetector:
         logger.info("Initialized new anomaly detection models")
     
     def _load_models(self):
-        """Load pre-trained models from disk"""
+        """
+        Load pre-trained models from disk
+        
+        The dumps are uncompressed, so their arrays are memory-mapped
+        read-only and shared between worker processes via the page cache.
+        """
         try:
             isolation_path = os.path.join(self.model_dir, 'isolation_forest.pkl')
             rf_path = os.path.join(self.model_dir, 'random_forest.pkl')
@@ -111,19 +118,19 @@ class AnomalyDetector:
             scaler_path = os.path.join(self.model_dir, 'scaler.pkl')
             
             if os.path.exists(isolation_path):
-                self.isolation_forest = joblib.load(isolation_path)
+                self.isolation_forest = mmap_joblib_load(isolation_path)
                 logger.info("Loaded Isolation Forest model")
             
             if os.path.exists(rf_path):
-                self.random_forest = joblib.load(rf_path)
+                self.random_forest = mmap_joblib_load(rf_path)
                 logger.info("Loaded Random Forest model")
             
             if os.path.exists(kmeans_path):
-                self.kmeans = joblib.load(kmeans_path)
+                self.kmeans = mmap_joblib_load(kmeans_path)
                 logger.info("Loaded K-Means model")
             
             if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
+                self.scaler = mmap_joblib_load(scaler_path)
                 logger.info("Loaded feature scaler")
             
         except Exception as e:
@@ -205,66 +212,91 @@ class AnomalyDetector:
         Returns:
             Dictionary with anomaly detection results
         """
-        # Extract features
-        features = self.extract_features(session_data)
+        return self.detect_anomaly_batch([(session_data, user_profile)])[0]
+    
+    def detect_anomaly_batch(self, sessions: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """
+        Detect anomalies in several sessions with one Isolation Forest pass
         
-        # Initialize result
-        result = {
-            'is_anomaly': False,
-            'anomaly_score': 0.0,
-            'confidence': 0.0,
-            'anomaly_type': None,
-            'severity': 'low',
-            'contributing_factors': [],
-            'recommended_action': 'monitor'
-        }
+        Args:
+            sessions: ``(session_data, user_profile)`` pairs
         
-        if SKLEARN_AVAILABLE and self.isolation_forest is not None:
+        Returns:
+            One result per session, as returned by ``detect_anomaly``
+        """
+        results = []
+        for _ in sessions:
+            # Initialize result
+            results.append({
+                'is_anomaly': False,
+                'anomaly_score': 0.0,
+                'confidence': 0.0,
+                'anomaly_type': None,
+                'severity': 'low',
+                'contributing_factors': [],
+                'recommended_action': 'monitor'
+            })
+        
+        rows, scored = [], []
+        if sessions and SKLEARN_AVAILABLE and self.isolation_forest is not None:
+            # Extract features per session so one malformed session only
+            # loses ML scoring for itself
+            for result, (session_data, _) in zip(results, sessions):
+                try:
+                    rows.append(np.asarray(self.extract_features(session_data), dtype=float))
+                    scored.append(result)
+                except Exception as e:
+                    logger.warning(f"Skipping Isolation Forest for malformed session: {e}")
+            
+        if rows:
             # Isolation Forest prediction
             try:
-                # Scale features
+                # Scale features, one row per valid session
+                features = np.vstack(rows)
                 features_scaled = self.scaler.transform(features)
                 
                 # Predict anomaly (-1 = anomaly, 1 = normal)
-                prediction = self.isolation_forest.predict(features_scaled)[0]
+                predictions = self.isolation_forest.predict(features_scaled)
                 # Get anomaly score (lower = more anomalous)
-                anomaly_score = self.isolation_forest.score_samples(features_scaled)[0]
-                
-                # Convert to probability (0-1, higher = more anomalous)
-                anomaly_probability = 1 / (1 + np.exp(anomaly_score))
-                
-                result['is_anomaly'] = (prediction == -1)
-                result['anomaly_score'] = float(anomaly_probability)
-                result['confidence'] = 0.85
+                anomaly_scores = self.isolation_forest.score_samples(features_scaled)
                 
-                # Determine severity
-                if anomaly_probability > 0.8:
-                    result['severity'] = 'critical'
-                    result['recommended_action'] = 'block_and_alert'
-                elif anomaly_probability > 0.6:
-                    result['severity'] = 'high'
-                    result['recommended_action'] = 'require_mfa'
-                elif anomaly_probability > 0.4:
-                    result['severity'] = 'medium'
-                    result['recommended_action'] = 'alert'
-                else:
-                    result['severity'] = 'low'
-                    result['recommended_action'] = 'monitor'
+                for result, prediction, anomaly_score in zip(scored, predictions, anomaly_scores):
+                    # Convert to probability (0-1, higher = more anomalous)
+                    anomaly_probability = 1 / (1 + np.exp(anomaly_score))
+                    
+                    result['is_anomaly'] = (prediction == -1)
+                    result['anomaly_score'] = float(anomaly_probability)
+                    result['confidence'] = 0.85
+                    
+                    # Determine severity
+                    if anomaly_probability > 0.8:
+                        result['severity'] = 'critical'
+                        result['recommended_action'] = 'block_and_alert'
+                    elif anomaly_probability > 0.6:
+                        result['severity'] = 'high'
+                        result['recommended_action'] = 'require_mfa'
+                    elif anomaly_probability > 0.4:
+                        result['severity'] = 'medium'
+                        result['recommended_action'] = 'alert'
+                    else:
+                        result['severity'] = 'low'
+                        result['recommended_action'] = 'monitor'
                 
             except Exception as e:
                 logger.error(f"Error in Isolation Forest prediction: {e}")
         
-        # Rule-based analysis
-        rule_based_result = self._rule_based_detection(session_data, user_profile)
-        
-        # Combine ML and rule-based results
-        if rule_based_result['is_anomaly']:
-            result['is_anomaly'] = True
-            result['anomaly_score'] = max(result['anomaly_score'], rule_based_result['anomaly_score'])
-            result['contributing_factors'].extend(rule_based_result['factors'])
-            result['anomaly_type'] = rule_based_result['anomaly_type']
+        for result, (session_data, user_profile) in zip(results, sessions):
+            # Rule-based analysis
+            rule_based_result = self._rule_based_detection(session_data, user_profile)
+            
+            # Combine ML and rule-based results
+            if rule_based_result['is_anomaly']:
+                result['is_anomaly'] = True
+                result['anomaly_score'] = max(result['anomaly_score'], rule_based_result['anomaly_score'])
+                result['contributing_factors'].extend(rule_based_result['factors'])
+                result['anomaly_type'] = rule_based_result['anomaly_type']
         
-        return result
+        return results
     
     def _rule_based_detection(self, session_data: Dict, user_profile: Dict = None) -> Dict:
         """
@@ -0,0 +1,331 @@
+"""
+In-process micro-batching broker for ML model inference
+
+Concurrent requests for the same model are queued and handed to a single
+worker thread per model, which drains the queue into batches of up to
+``MAX_BATCH_SIZE`` items or until ``MAX_WAIT_MS`` has passed since the
+oldest queued item arrived, whichever comes first. Each batch runs as one
+vectorised model call (``predict_batch``, ``detect_anomaly_batch``,
+``analyze_threat_batch``) and every caller gets its own
+``concurrent.futures.Future``.
+
+One worker per model also serialises access to model state that is not
+thread-safe (e.g. the threat analyzer's per-user behavior sequences).
+
+Configuration (``settings.ML_INFERENCE_BROKER``):
+- ENABLED: route requests through the broker (direct calls otherwise)
+- MAX_BATCH_SIZE: upper bound on items per model call
+- MAX_WAIT_MS: how long the oldest queued item may wait for a batch to fill
+- MAX_QUEUE: queued items per model before callers fall back to direct calls
+- TIMEOUT_SECONDS: how long ``infer`` waits for a result
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'MAX_BATCH_SIZE': 32,
+    'MAX_WAIT_MS': 5,
+    'MAX_QUEUE': 1024,
+    'TIMEOUT_SECONDS': 5,
+}
+
+# model name -> (single-item method, batch method, number of arguments)
+BATCH_METHODS = {
+    'password_strength': ('predict', 'predict_batch', 1),
+    'anomaly_detector': ('detect_anomaly', 'detect_anomaly_batch', 2),
+    'threat_analyzer': ('analyze_threat', 'analyze_threat_batch', 3),
+}
+
+# Queueing delays kept per model for percentile reporting
+DELAY_SAMPLES = 2048
+
+
+def get_broker_config() -> Dict:
+    """Broker settings merged over the defaults"""
+    try:
+        from django.conf import settings
+        overrides = getattr(settings, 'ML_INFERENCE_BROKER', {}) or {}
+    except Exception:
+        overrides = {}
+    return {**DEFAULT_CONFIG, **overrides}
+
+
+class MicroBatcher:
+    """
+    Coalesces single requests into batched calls on a dedicated thread
+
+    ``batch_fn`` takes a list of argument tuples and must return one
+    result per tuple, in order. When it raises, the items are retried one
+    per call and only the failing ones get the exception.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Tuple]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5, max_queue: int = 1024):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"ml-batcher-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def _reset_stats(self):
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.rejected = 0
+        self.batch_sizes = Counter()
+        self.queue_delays = deque(maxlen=DELAY_SAMPLES)
+        self.busy_seconds = 0.0
+        self.first_request_at = None
+        self.last_result_at = None
+
+    def submit(self, *args) -> Future:
+        """
+        Queue one request
+
+        Raises:
+            queue.Full: if the queue is at ``max_queue``
+            RuntimeError: if the batcher has been stopped
+        """
+        if not self._running:
+            raise RuntimeError(f"Batcher '{self.name}' is stopped")
+        future = Future()
+        try:
+            self._queue.put_nowait((time.monotonic(), args, future))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise
+        return future
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the worker once the queue is drained"""
+        if self._running:
+            self._running = False
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+
+    def _collect(self) -> List[Tuple]:
+        """Block for the first item, then fill the batch until its deadline"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = first[0] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop requested: finish this batch, then exit
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _call_batch(self, items: List[Tuple]) -> List[Any]:
+        results = self.batch_fn(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"{self.name} returned {len(results)} results for {len(items)} requests"
+            )
+        return results
+
+    def _call(self, items: List[Tuple]) -> List[Tuple[Any, Exception]]:
+        """
+        ``(result, error)`` per item
+
+        If the batched call fails, each item is retried on its own so one
+        bad request only fails its own future.
+        """
+        try:
+            return [(result, None) for result in self._call_batch(items)]
+        except Exception as e:
+            logger.error(f"Batched inference failed for {self.name}: {e}")
+            if len(items) == 1:
+                return [(None, e)]
+
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((self._call_batch([item])[0], None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+    def _run(self):
+        while self._running or not self._queue.empty():
+            batch = self._collect()
+            if not batch:
+                break
+
+            started = time.monotonic()
+            outcomes = self._call([args for _, args, _ in batch])
+            finished = time.monotonic()
+
+            failed = 0
+            for (_, _, future), (result, error) in zip(batch, outcomes):
+                if error is not None:
+                    failed += 1
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+            with self._stats_lock:
+                if self.first_request_at is None:
+                    self.first_request_at = batch[0][0]
+                self.requests += len(batch)
+                self.batches += 1
+                self.errors += failed
+                self.batch_sizes[len(batch)] += 1
+                self.queue_delays.extend(started - enqueued for enqueued, _, _ in batch)
+                self.busy_seconds += finished - started
+                self.last_result_at = finished
+
+    def stats(self) -> Dict:
+        """Achieved batch sizes, queueing delay and throughput so far"""
+        with self._stats_lock:
+            delays = sorted(self.queue_delays)
+            elapsed = (
+                self.last_result_at - self.first_request_at
+                if self.first_request_at is not None else 0.0
+            )
+
+            def percentile(p):
+                if not delays:
+                    return 0.0
+                return delays[min(len(delays) - 1, int(p * len(delays)))] * 1000
+
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'queued': self._queue.qsize(),
+                'avg_batch_size': round(self.requests / self.batches, 2) if self.batches else 0.0,
+                'max_batch_size': max(self.batch_sizes) if self.batch_sizes else 0,
+                'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+                'queue_delay_ms': {
+                    'p50': round(percentile(0.50), 3),
+                    'p99': round(percentile(0.99), 3),
+                    'max': round(delays[-1] * 1000, 3) if delays else 0.0,
+                },
+                'busy_seconds': round(self.busy_seconds, 4),
+                'throughput_per_second': round(self.requests / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._reset_stats()
+
+
+# model name -> (model instance, batcher)
+_batchers: Dict[str, Tuple[Any, MicroBatcher]] = {}
+_batchers_lock = threading.Lock()
+
+
+def _get_batcher(model_name: str, model) -> MicroBatcher:
+    """Batcher bound to this model instance, replaced if the model was reloaded"""
+    with _batchers_lock:
+        entry = _batchers.get(model_name)
+        if entry is not None and entry[0] is model:
+            return entry[1]
+        if entry is not None:
+            entry[1].stop(timeout=0)
+
+        config = get_broker_config()
+        _, batch_name, arity = BATCH_METHODS[model_name]
+        batch_method = getattr(model, batch_name)
+
+        def run_batch(items):
+            if arity == 1:
+                return batch_method([args[0] for args in items])
+            # Optional trailing arguments default to None
+            return batch_method([tuple(args) + (None,) * (arity - len(args)) for args in items])
+
+        batcher = MicroBatcher(
+            model_name,
+            run_batch,
+            max_batch_size=config['MAX_BATCH_SIZE'],
+            max_wait_ms=config['MAX_WAIT_MS'],
+            max_queue=config['MAX_QUEUE'],
+        )
+        _batchers[model_name] = (model, batcher)
+        return batcher
+
+
+def _call_direct(model_name: str, model, args: Tuple) -> Future:
+    future = Future()
+    try:
+        future.set_result(getattr(model, BATCH_METHODS[model_name][0])(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def submit(model_name: str, model, *args) -> Future:
+    """
+    Queue one inference request and return its future
+
+    ``args`` are the arguments of the model's single-item method, e.g.
+    ``submit('password_strength', model, password)``. Falls back to a
+    direct call (returning an already-completed future) when the broker is
+    disabled, the model has no batch method, or the queue is full.
+    """
+    if (
+        model_name in BATCH_METHODS
+        and get_broker_config()['ENABLED']
+        and hasattr(model, BATCH_METHODS[model_name][1])
+    ):
+        try:
+            return _get_batcher(model_name, model).submit(*args)
+        except (queue.Full, RuntimeError):
+            logger.warning(f"Inference queue for {model_name} unavailable, calling model directly")
+    return _call_direct(model_name, model, args)
+
+
+def infer(model_name: str, model, *args):
+    """Submit one request and wait for its result"""
+    return submit(model_name, model, *args).result(timeout=get_broker_config()['TIMEOUT_SECONDS'])
+
+
+def get_broker_stats() -> Dict[str, Dict]:
+    """Per-model batching statistics"""
+    with _batchers_lock:
+        batchers = {name: batcher for name, (_, batcher) in _batchers.items()}
+    return {name: batcher.stats() for name, batcher in batchers.items()}
+
+
+def reset_broker_stats():
+    with _batchers_lock:
+        for _, batcher in _batchers.values():
+            batcher.reset_stats()
+
+
+def shutdown_brokers():
+    """Stop every worker thread (queued requests are still answered)"""
+    with _batchers_lock:
+        entries = list(_batchers.values())
+        _batchers.clear()
+    for _, batcher in entries:
+        batcher.stop()
@@ -13,7 +13,7 @@ Performance Optimizations:
 import numpy as np
 import os
 import logging
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 import math
 import re
 from collections import Counter
@@ -383,45 +383,67 @@ class PasswordStrengthPredictor:
                 'recommendations': list  # Improvement recommendations
             }
         """
-        if not password:
-            return {
-                'strength': 'very_weak',
-                'confidence': 1.0,
-                'features': {},
-                'recommendations': ['Password cannot be empty']
-            }
+        return self.predict_batch([password])[0]
+    
+    def predict_batch(self, passwords: List[str]) -> List[Dict]:
+        """
+        Predict strength for several passwords with one LSTM call
+        
+        Args:
+            passwords: Passwords to analyze
+        
+        Returns:
+            One result per password, as returned by ``predict``
+        """
+        results: List[Optional[Dict]] = [None] * len(passwords)
+        pending = []
+        for i, password in enumerate(passwords):
+            if not password:
+                results[i] = {
+                    'strength': 'very_weak',
+                    'confidence': 1.0,
+                    'features': {},
+                    'recommendations': ['Password cannot be empty']
+                }
+            else:
+                pending.append((i, password, self.extract_features(password)))
         
-        # Extract features
-        features = self.extract_features(password)
+        if not pending:
+            return results
         
         # Make prediction
+        predictions = None
         if self.model is not None and TENSORFLOW_AVAILABLE:
             try:
-                # LSTM prediction
-                encoded = self._encode_password(password)
-                predictions = self.model.predict(encoded, verbose=0)[0]
-                
-                # Get predicted class and confidence
-                predicted_idx = np.argmax(predictions)
-                strength = self.strength_classes[predicted_idx]
-                confidence = float(predictions[predicted_idx])
+                # LSTM prediction, one row per password
+                encoded = np.vstack([self._encode_password(password) for _, password, _ in pending])
+                predictions = self.model.predict(encoded, verbose=0)
             except Exception as e:
                 logger.error(f"Error in LSTM prediction: {e}")
                 # Fallback to rule-based
-                strength, confidence = self._rule_based_prediction(password, features)
-        else:
-            # Use rule-based prediction
-            strength, confidence = self._rule_based_prediction(password, features)
+                predictions = None
         
-        # Generate recommendations
-        recommendations = self._generate_recommendations(password, features, strength)
+        for row, (i, password, features) in enumerate(pending):
+            if predictions is not None:
+                # Get predicted class and confidence
+                predicted_idx = np.argmax(predictions[row])
+                strength = self.strength_classes[predicted_idx]
+                confidence = float(predictions[row][predicted_idx])
+            else:
+                # Use rule-based prediction
+                strength, confidence = self._rule_based_prediction(password, features)
+            
+            # Generate recommendations
+            recommendations = self._generate_recommendations(password, features, strength)
+            
+            results[i] = {
+                'strength': strength,
+                'confidence': confidence,
+                'features': features,
+                'recommendations': recommendations
+            }
         
-        return {
-            'strength': strength,
-            'confidence': confidence,
-            'features': features,
-            'recommendations': recommendations
-        }
+        return results
     
     def _generate_recommendations(self, password: str, features: Dict, strength: str) -> list:
         """
@@ -254,7 +254,7 @@ class ThreatAnalyzer:
             current_behavior.get('session_anomaly_score', 0),
             current_behavior.get('behavior_deviation_score', 0),
             datetime.now().timestamp() / 1e9,  # Normalized timestamp
-        ])
+        ], dtype=float)  # Rejects non-numeric input before it enters the buffer
         
         # Add to sequence buffer
         self.behavior_sequences[user_id].append(behavior_vector)
@@ -284,77 +284,96 @@ class ThreatAnalyzer:
         Returns:
             Threat analysis results
         """
-        # Extract features
-        spatial_features = self.extract_spatial_features(session_data)
-        temporal_features = self.extract_temporal_features(user_id, behavior_data)
+        return self.analyze_threat_batch([(session_data, user_id, behavior_data)])[0]
+    
+    def analyze_threat_batch(self, sessions: List[Tuple[Dict, str, Dict]]) -> List[Dict]:
+        """
+        Analyze several sessions with one CNN-LSTM call
         
-        # Initialize result
-        result = {
-            'threat_detected': False,
-            'threat_type': 'benign',
-            'threat_score': 0.0,
-            'confidence': 0.0,
-            'risk_level': 0,
-            'recommended_action': 'allow',
-            'spatial_analysis': {},
-            'temporal_analysis': {},
-            'reasoning': []
-        }
+        Args:
+            sessions: ``(session_data, user_id, behavior_data)`` triples, in
+                arrival order (each one extends its user's behavior sequence)
         
-        if self.model is not None and TENSORFLOW_AVAILABLE:
+        Returns:
+            One result per session, as returned by ``analyze_threat``
+        """
+        # Extract features per session, so a malformed session falls back
+        # to the rules on its own instead of taking the batch with it
+        features = []
+        for session_data, user_id, behavior_data in sessions:
+            try:
+                spatial = np.asarray(self.extract_spatial_features(session_data), dtype=float)
+                temporal = np.asarray(self.extract_temporal_features(user_id, behavior_data), dtype=float)
+                features.append((spatial, temporal))
+            except Exception as e:
+                logger.warning(f"Malformed session for threat analysis, using rules: {e}")
+                features.append(None)
+        
+        results = [None] * len(sessions)
+        valid = [i for i, pair in enumerate(features) if pair is not None]
+        if valid and self.model is not None and TENSORFLOW_AVAILABLE:
             try:
                 # Prepare inputs
-                spatial_input = spatial_features.reshape(1, -1)
-                temporal_input = temporal_features.reshape(1, self.temporal_sequence_length, -1)
+                spatial_input = np.vstack([features[i][0] for i in valid])
+                temporal_input = np.stack([features[i][1] for i in valid]).reshape(
+                    len(valid), self.temporal_sequence_length, -1
+                )
                 
                 # Make prediction
-                predictions = self.model.predict([spatial_input, temporal_input], verbose=0)[0]
-                
-                # Get predicted threat class
-                predicted_idx = np.argmax(predictions)
-                threat_type = self.threat_classes[predicted_idx]
-                confidence = float(predictions[predicted_idx])
-                
-                result['threat_type'] = threat_type
-                result['confidence'] = confidence
-                result['threat_detected'] = (threat_type != 'benign' and confidence > 0.6)
-                
-                # Calculate threat score (0-1)
-                result['threat_score'] = float(1 - predictions[0])  # Inverse of benign probability
-                
-                # Calculate risk level (0-100)
-                result['risk_level'] = int(result['threat_score'] * 100)
-                
-                # Determine recommended action
-                if result['risk_level'] >= 90:
-                    result['recommended_action'] = 'block'
-                elif result['risk_level'] >= 70:
-                    result['recommended_action'] = 'require_mfa'
-                elif result['risk_level'] >= 50:
-                    result['recommended_action'] = 'challenge'
-                elif result['risk_level'] >= 30:
-                    result['recommended_action'] = 'monitor'
-                else:
-                    result['recommended_action'] = 'allow'
-                
-                # Add analysis details
-                result['spatial_analysis'] = self._analyze_spatial_features(spatial_features)
-                result['temporal_analysis'] = self._analyze_temporal_patterns(temporal_features)
-                
-                # Generate reasoning
-                result['reasoning'] = self._generate_reasoning(
-                    result['threat_type'],
-                    result['spatial_analysis'],
-                    result['temporal_analysis']
-                )
+                predictions = self.model.predict([spatial_input, temporal_input], verbose=0)
                 
+                for i, row in zip(valid, predictions):
+                    results[i] = self._model_threat_result(row, *features[i])
             except Exception as e:
                 logger.error(f"Error in threat analysis: {e}")
-                # Fallback to rule-based
-                result = self._rule_based_threat_analysis(session_data, behavior_data)
+        
+        # Rule-based analysis for everything the model did not score
+        return [
+            result if result is not None else self._rule_based_threat_analysis(session_data, behavior_data)
+            for result, (session_data, _, behavior_data) in zip(results, sessions)
+        ]
+    
+    def _model_threat_result(self, predictions: np.ndarray, spatial_features: np.ndarray,
+                             temporal_features: np.ndarray) -> Dict:
+        """Build a threat result from one row of model output"""
+        # Get predicted threat class
+        predicted_idx = np.argmax(predictions)
+        threat_type = self.threat_classes[predicted_idx]
+        confidence = float(predictions[predicted_idx])
+        
+        result = {
+            'threat_detected': (threat_type != 'benign' and confidence > 0.6),
+            'threat_type': threat_type,
+            'confidence': confidence,
+            # Calculate threat score (0-1)
+            'threat_score': float(1 - predictions[0]),  # Inverse of benign probability
+        }
+        
+        # Calculate risk level (0-100)
+        result['risk_level'] = int(result['threat_score'] * 100)
+        
+        # Determine recommended action
+        if result['risk_level'] >= 90:
+            result['recommended_action'] = 'block'
+        elif result['risk_level'] >= 70:
+            result['recommended_action'] = 'require_mfa'
+        elif result['risk_level'] >= 50:
+            result['recommended_action'] = 'challenge'
+        elif result['risk_level'] >= 30:
+            result['recommended_action'] = 'monitor'
         else:
-            # Use rule-based analysis
-            result = self._rule_based_threat_analysis(session_data, behavior_data)
+            result['recommended_action'] = 'allow'
+        
+        # Add analysis details
+        result['spatial_analysis'] = self._analyze_spatial_features(spatial_features)
+        result['temporal_analysis'] = self._analyze_temporal_patterns(temporal_features)
+        
+        # Generate reasoning
+        result['reasoning'] = self._generate_reasoning(
+            result['threat_type'],
+            result['spatial_analysis'],
+            result['temporal_analysis']
+        )
         
         return result
     
@@ -986,6 +986,120 @@ class MLSecurityPerformanceTest(TestCase):
         self.assertLess(elapsed_time, 0.1)
 
 
+class InferenceBrokerTest(TestCase):
+    """Test micro-batched model inference"""
+    
+    def tearDown(self):
+        from .ml_models import inference_broker
+        inference_broker.shutdown_brokers()
+    
+    def test_concurrent_requests_are_batched(self):
+        """Concurrent requests share model calls and get their own results"""
+        import threading
+        from django.test.utils import override_settings
+        from .ml_models import inference_broker
+        
+        model = MagicMock()
+        model.predict_batch.side_effect = lambda passwords: [{'length': len(p)} for p in passwords]
+        results = {}
+        
+        def worker(i):
+            results[i] = inference_broker.infer('password_strength', model, 'x' * i)
+        
+        broker_settings = {'ENABLED': True, 'MAX_BATCH_SIZE': 16, 'MAX_WAIT_MS': 50}
+        with override_settings(ML_INFERENCE_BROKER=broker_settings):
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 41)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            stats = inference_broker.get_broker_stats()['password_strength']
+        
+        self.assertEqual(results, {i: {'length': i} for i in range(1, 41)})
+        self.assertEqual(stats['requests'], 40)
+        self.assertLess(model.predict_batch.call_count, 40)
+        self.assertLessEqual(stats['max_batch_size'], 16)
+        model.predict.assert_not_called()
+    
+    def test_batch_errors_reach_every_caller(self):
+        """A failed batch call raises in each request's future"""
+        from django.test.utils import override_settings
+        from .ml_models import inference_broker
+        
+        model = MagicMock()
+        model.analyze_threat_batch.side_effect = ValueError('model failure')
+        
+        with override_settings(ML_INFERENCE_BROKER={'ENABLED': True}):
+            future = inference_broker.submit('threat_analyzer', model, {}, '1', {})
+            with self.assertRaises(ValueError):
+                future.result(timeout=5)
+
+    def test_bad_request_fails_only_its_own_future(self):
+        """A failed batch is retried item by item, so other callers still get results"""
+        from django.test.utils import override_settings
+        from .ml_models import inference_broker
+
+        def predict_batch(passwords):
+            if 'bad' in passwords:
+                raise ValueError('malformed input')
+            return [{'length': len(p)} for p in passwords]
+
+        model = MagicMock()
+        model.predict_batch.side_effect = predict_batch
+
+        broker_settings = {'ENABLED': True, 'MAX_BATCH_SIZE': 8, 'MAX_WAIT_MS': 200}
+        with override_settings(ML_INFERENCE_BROKER=broker_settings):
+            futures = [
+                inference_broker.submit('password_strength', model, p)
+                for p in ('a', 'bad', 'ccc')
+            ]
+            self.assertEqual(futures[0].result(timeout=5), {'length': 1})
+            self.assertEqual(futures[2].result(timeout=5), {'length': 3})
+            with self.assertRaises(ValueError):
+                futures[1].result(timeout=5)
+            stats = inference_broker.get_broker_stats()['password_strength']
+
+        self.assertEqual(stats['errors'], 1)
+
+    def test_malformed_session_keeps_ml_scoring_for_the_rest(self):
+        """One non-numeric session skips the Isolation Forest only for itself"""
+        import tempfile
+        from .ml_models import anomaly_detector
+
+        if not anomaly_detector.SKLEARN_AVAILABLE:
+            self.skipTest('scikit-learn not installed')
+
+        detector = anomaly_detector.AnomalyDetector(model_dir=tempfile.mkdtemp())
+        detector.scaler = MagicMock(transform=lambda features: features)
+        detector.isolation_forest = MagicMock()
+        detector.isolation_forest.predict.side_effect = lambda rows: np.ones(len(rows))
+        detector.isolation_forest.score_samples.side_effect = lambda rows: np.zeros(len(rows))
+
+        results = detector.detect_anomaly_batch([
+            ({'typing_speed': 40}, None),
+            ({'typing_speed': 'fast'}, None),
+            ({'typing_speed': 55}, None),
+        ])
+
+        self.assertEqual([r['confidence'] for r in results], [0.85, 0.0, 0.85])
+        self.assertEqual(len(detector.isolation_forest.predict.call_args[0][0]), 2)
+
+    def test_disabled_broker_calls_model_directly(self):
+        """With the broker disabled the single-item method is used"""
+        from django.test.utils import override_settings
+        from .ml_models import inference_broker
+        
+        model = MagicMock()
+        model.detect_anomaly.return_value = {'is_anomaly': False}
+        
+        with override_settings(ML_INFERENCE_BROKER={'ENABLED': False}):
+            result = inference_broker.infer('anomaly_detector', model, {'typing_speed': 40}, None)
+        
+        self.assertEqual(result, {'is_anomaly': False})
+        model.detect_anomaly.assert_called_once_with({'typing_speed': 40}, None)
+        model.detect_anomaly_batch.assert_not_called()
+
+
 # ==============================================================================
 # HELPER FUNCTIONS FOR TESTING
 # ==============================================================================
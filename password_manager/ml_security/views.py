@@ -22,7 +22,7 @@ import json
 
 from django.conf import settings
 
-from .ml_models import get_model
+from .ml_models import get_model, get_model_stats, inference_broker
 from .models import (
     PasswordStrengthPrediction,
     UserBehaviorProfile,
@@ -81,8 +81,8 @@ def predict_password_strength(request):
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         
-        # Make prediction
-        prediction = model.predict(password)
+        # Make prediction (batched with concurrent requests)
+        prediction = inference_broker.infer('password_strength', model, password)
         
         # Save prediction if requested and user is authenticated
         if save_prediction and request.user.is_authenticated:
@@ -222,7 +222,7 @@ def detect_session_anomaly(request):
             user_profile = None
         
         # Detect anomaly
-        result = detector.detect_anomaly(session_data, user_profile)
+        result = inference_broker.infer('anomaly_detector', detector, session_data, user_profile)
         
         # Save anomaly if detected
         if result['is_anomaly'] and result['severity'] in ['high', 'critical']:
@@ -381,7 +381,9 @@ def analyze_threat(request):
             )
         
         # Analyze threat
-        result = analyzer.analyze_threat(
+        result = inference_broker.infer(
+            'threat_analyzer',
+            analyzer,
             session_data,
             str(request.user.id),
             behavior_data
@@ -487,7 +489,11 @@ def get_ml_model_info(request):
             'training_samples': m.training_samples
         } for m in models]
         
-        return success_response({'models': data})
+        return success_response({
+            'models': data,
+            'loading': get_model_stats(),
+            'inference_broker': inference_broker.get_broker_stats(),
+        })
     
     except Exception as e:
         logger.error(f"Error fetching ML model info: {str(e)}")
@@ -518,13 +524,15 @@ def batch_analyze_session(request):
     """
     try:
         result = {}
+        # Submit all analyses first so the three models run concurrently
+        pending = {}
         
         # Password strength analysis (if provided)
         password = request.data.get('password')
         if password:
             model = get_model('password_strength')
             if model:
-                result['password_strength'] = model.predict(password)
+                pending['password_strength'] = inference_broker.submit('password_strength', model, password)
         
         # Anomaly detection
         session_data = request.data.get('session_data', {})
@@ -537,18 +545,26 @@ def batch_analyze_session(request):
                 except UserBehaviorProfile.DoesNotExist:
                     user_profile = None
                 
-                result['anomaly_detection'] = detector.detect_anomaly(session_data, user_profile)
+                pending['anomaly_detection'] = inference_broker.submit(
+                    'anomaly_detector', detector, session_data, user_profile
+                )
         
         # Threat analysis
         behavior_data = request.data.get('behavior_data', {})
         if session_data and behavior_data:
             analyzer = get_model('threat_analyzer')
             if analyzer:
-                result['threat_analysis'] = analyzer.analyze_threat(
+                pending['threat_analysis'] = inference_broker.submit(
+                    'threat_analyzer',
+                    analyzer,
                     session_data,
                     str(request.user.id),
                     behavior_data
                 )
+        
+        timeout = inference_broker.get_broker_config()['TIMEOUT_SECONDS']
+        for key, future in pending.items():
+            result[key] = future.result(timeout=timeout)
 
         # Ambient fusion: attach latest ambient trust + adjust composite threat.
         try:
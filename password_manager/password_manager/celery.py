@@ -98,6 +98,32 @@ app.conf.update(
             'schedule': crontab(minute=0, hour='*/6'),  # Every 6 hours
         },
 
+        # Incremental refresh of the offline Pwned Passwords mirror (every
+        # 10 minutes). Skips itself unless HIBP_MIRROR_SETTINGS enables the
+        # mirror and a base file has been imported.
+        'update-pwned-passwords-mirror': {
+            'task': 'security.tasks.breach_tasks.update_pwned_passwords_mirror',
+            'schedule': crontab(minute='*/10'),
+            'options': {'expires': 600},
+        },
+
+        # Keep the Kyber keypair reservoir topped up (every minute). Refills
+        # are also queued on demand when the pool drops below its low
+        # watermark; this tick covers idle periods and lost messages.
+        'refill-kyber-reservoir': {
+            'task': 'auth_module.tasks.refill_kyber_reservoir',
+            'schedule': crontab(),  # Every minute
+            'options': {'expires': 60},
+        },
+
+        # Keep the Redis-shared quantum entropy pool topped up (every minute).
+        # A no-op unless QUANTUM_ENTROPY_POOL_SETTINGS enables Redis.
+        'refill-quantum-entropy-pool': {
+            'task': 'security.tasks.entropy_tasks.refill_quantum_entropy_pool',
+            'schedule': crontab(),  # Every minute
+            'options': {'expires': 60},
+        },
+
         # Bug Bounty: continuous vault self-pentest (daily, fans out per user)
         'bug-bounty-self-pentest-daily': {
             'task': 'bug_bounty.tasks.run_scheduled_self_tests',
@@ -119,6 +145,14 @@ app.conf.update(
             'schedule': crontab(hour=4, minute=15),  # 4:15 AM daily
         },
 
+        # Nightly full sweep: one getCommitment call per anchored root,
+        # every proof under it verified locally in batches. 5:30 is free
+        # (4:45 is `adaptive-cleanup-expired-adaptations`).
+        'verify-all-merkle-proofs': {
+            'task': 'blockchain.tasks.verify_all_proofs',
+            'schedule': crontab(hour=5, minute=30),  # 5:30 AM daily
+        },
+
         # Phase 2b: flush pending reputation events into Merkle-rooted anchor
         # batches (every 15 minutes). If the adapter is "null" this is
         # effectively a cheap bookkeeping sweep; with "arbitrum" it submits
@@ -442,6 +476,21 @@ app.conf.update(
             'schedule': 60.0,  # Every 60 seconds
         },
 
+        # =================================================================
+        # Vault Audit Log
+        # =================================================================
+
+        # Drain queued audit events from the Redis stream in batches
+        'flush-audit-events': {
+            'task': 'vault.tasks.flush_audit_events',
+            'schedule': 5.0,  # Every 5 seconds
+        },
+        # Chunked retention delete, bounded by DELETE_MAX_SECONDS per run
+        'cleanup-audit-logs': {
+            'task': 'vault.tasks.cleanup_old_audit_logs',
+            'schedule': crontab(hour=2, minute=0),  # 2 AM daily
+        },
+
         # =================================================================
         # Mesh Dead Drop Password Sharing
         # =================================================================
@@ -492,6 +492,60 @@ KYBER_CACHE_SETTINGS = {
     'LRU_CACHE_SIZE': 256,
 }
 
+# Executor for bulk Kyber batches: 'thread', 'process' or 'auto'
+# (see auth_module.services.parallel_kyber)
+KYBER_PARALLEL_EXECUTOR_MODE = os.environ.get('KYBER_PARALLEL_EXECUTOR_MODE', 'thread')
+
+# Pre-generated keypair pool (see auth_module.services.kyber_reservoir).
+# REFILL_MODE: 'thread' (in-process), 'celery' (Redis-shared pool) or 'none'.
+KYBER_RESERVOIR_SETTINGS = {
+    'CAPACITY': int(os.environ.get('KYBER_RESERVOIR_CAPACITY', '64')),
+    'LOW_WATERMARK': int(os.environ.get('KYBER_RESERVOIR_LOW_WATERMARK', '16')),
+    'USE_REDIS': os.environ.get('USE_REDIS_CACHE', 'False').lower() == 'true',
+    'REDIS_ALIAS': 'kyber' if os.environ.get('USE_REDIS_CACHE', 'False').lower() == 'true' else 'default',
+    'REFILL_MODE': os.environ.get(
+        'KYBER_RESERVOIR_REFILL_MODE',
+        'celery' if os.environ.get('USE_REDIS_CACHE', 'False').lower() == 'true' else 'thread'
+    ),
+}
+
+# Quantum entropy pool (see security.services.quantum_rng_service).
+# MIN/MAX_POOL_SIZE are the low/high refill watermarks in bytes. With
+# USE_REDIS the pool is shared by all workers and refilled by Celery.
+QUANTUM_ENTROPY_POOL_SETTINGS = {
+    'MIN_POOL_SIZE': int(os.environ.get('QUANTUM_POOL_MIN_BYTES', '1024')),
+    'MAX_POOL_SIZE': int(os.environ.get('QUANTUM_POOL_MAX_BYTES', '4096')),
+    'BATCH_SIZE': int(os.environ.get('QUANTUM_POOL_BATCH_BYTES', '512')),
+    'PROVIDER_TIMEOUT': float(os.environ.get('QUANTUM_PROVIDER_TIMEOUT', '10')),
+    'USE_REDIS': os.environ.get('USE_REDIS_CACHE', 'False').lower() == 'true',
+    'REDIS_ALIAS': 'default',
+    'REFILL_MODE': os.environ.get(
+        'QUANTUM_POOL_REFILL_MODE',
+        'celery' if os.environ.get('USE_REDIS_CACHE', 'False').lower() == 'true' else 'thread'
+    ),
+}
+
+# Offline Pwned Passwords mirror (see security.services.hibp_mirror).
+# Build with `manage.py pwned_passwords_mirror import <source>`; breach
+# checks fall back to the live range API when it is stale or missing.
+HIBP_MIRROR_SETTINGS = {
+    'ENABLED': os.environ.get('HIBP_MIRROR_ENABLED', 'False').lower() == 'true',
+    'PATH': os.environ.get('HIBP_MIRROR_PATH', os.path.join(BASE_DIR, 'data', 'pwned-passwords.bin')),
+    'MAX_AGE_HOURS': int(os.environ.get('HIBP_MIRROR_MAX_AGE_HOURS', '504')),
+    # Prefixes refreshed per `update_pwned_passwords_mirror` run; at the
+    # default 10-minute beat interval 1024 sweeps all 16^5 in about a week.
+    'UPDATE_BATCH': int(os.environ.get('HIBP_MIRROR_UPDATE_BATCH', '1024')),
+}
+
+# Batched vault breach scans (see security.services.hibp_batch). Range
+# responses are cached per 5-char prefix; with USE_REDIS_CACHE the default
+# cache is Redis, so the cache is shared across scan shards and workers.
+HIBP_BATCH_SETTINGS = {
+    'CACHE_ALIAS': 'default',
+    'CACHE_TTL': int(os.environ.get('HIBP_RANGE_CACHE_TTL', str(6 * 3600))),
+    'MAX_CONCURRENCY': int(os.environ.get('HIBP_MAX_CONCURRENCY', '16')),
+}
+
 
 
 # Password validation
@@ -518,7 +572,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # Authentication settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication plus the login-risk escalation check
+        'security.authentication.EscalationAwareJWTAuthentication',
         #'rest_framework.authentication.SessionAuthentication',  # removed for SPA JWT usage
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -1047,12 +1102,36 @@ os.makedirs(GEOIP_PATH, exist_ok=True)
 GEOIP_CITY = 'GeoLite2-City.mmdb'
 GEOIP_COUNTRY = 'GeoLite2-Country.mmdb'
 
+# Process-wide lookup service (see shared.geoip): the city database is
+# memory-mapped once per process and reopened when the file changes.
+GEOIP_LOOKUP_SETTINGS = {
+    'CACHE_SIZE': int(os.environ.get('GEOIP_CACHE_SIZE', '10000')),
+    'RELOAD_CHECK_SECONDS': float(os.environ.get('GEOIP_RELOAD_CHECK_SECONDS', '60')),
+    'REMOTE_TIMEOUT': float(os.environ.get('GEOIP_REMOTE_TIMEOUT', '5')),
+}
+
 
 # Security Service Configuration
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_DURATION_MINUTES = 30
 SUSPICIOUS_THRESHOLD = 3
 
+# Two-phase login risk analysis (security/services/login_risk.py). The
+# request only runs a fast-path score from cached features; geolocation,
+# full scoring, device bookkeeping and alerts run in the enrichment stage.
+LOGIN_RISK_SETTINGS = {
+    # 'celery' (queue a task), 'thread' (in-process pool) or 'inline'
+    'ENRICHMENT_MODE': os.environ.get('LOGIN_RISK_ENRICHMENT_MODE', 'celery'),
+    'THREAD_WORKERS': int(os.environ.get('LOGIN_RISK_THREAD_WORKERS', '4')),
+    'FEATURE_TTL_SECONDS': int(os.environ.get('LOGIN_RISK_FEATURE_TTL_SECONDS', '86400')),
+    # When enrichment flips a let-through login to suspicious, blacklist the
+    # refresh tokens issued for it and delete the user's DRF token. Access
+    # tokens predating the escalation are always rejected by
+    # security.authentication.EscalationAwareJWTAuthentication
+    'REVOKE_ON_ESCALATION': os.environ.get('LOGIN_RISK_REVOKE_ON_ESCALATION', 'True').lower() == 'true',
+    'ESCALATION_TTL_SECONDS': int(os.environ.get('LOGIN_RISK_ESCALATION_TTL_SECONDS', '3600')),
+}
+
 
 def _parse_ip_list(raw):
     """Parse a BLACKLISTED_IPS / ALLOWED_IP_RANGES value into address/CIDR tokens.
@@ -1097,6 +1176,17 @@ for _bl_entry in BLACKLISTED_IPS:
             stacklevel=2,
         )
 
+# Compiled IP reputation index (security/services/ip_reputation.py).
+# BLACKLISTED_IP_NETS is compiled in memory; threat-feed ranges are merged
+# into a memory-mapped file under INDEX_DIR shared by every worker.
+IP_REPUTATION_SETTINGS = {
+    'INDEX_DIR': os.environ.get('IP_REPUTATION_INDEX_DIR', os.path.join(BASE_DIR, 'data', 'ip-reputation')),
+    # Reputation score (0-1) at or above which an address counts as blacklisted
+    'BLOCK_SCORE': float(os.environ.get('IP_REPUTATION_BLOCK_SCORE', '0.9')),
+    # How often workers stat the index file to pick up a rebuild
+    'RELOAD_CHECK_SECONDS': int(os.environ.get('IP_REPUTATION_RELOAD_CHECK_SECONDS', '30')),
+}
+
 # IP Whitelisting (Enterprise Feature - Optional)
 # Set ALLOWED_IP_RANGES in .env for IP restriction
 # Example: ALLOWED_IP_RANGES=192.168.1.0/24,10.0.0.0/8
@@ -1425,6 +1515,64 @@ SYSTEM_METRIC_RETENTION_DAYS = int(os.environ.get('SYSTEM_METRIC_RETENTION_DAYS'
 # ML model training interval (hours)
 ML_MODEL_TRAINING_INTERVAL = int(os.environ.get('ML_MODEL_TRAINING_INTERVAL', '24'))
 
+# ml_security models load on first use so workers that never serve an ML
+# request never import TensorFlow. PRELOAD lists models to load at startup
+# instead, e.g. in a prefork parent so children share the pages.
+ML_MODEL_LOADING = {
+    'LAZY': os.environ.get('ML_MODEL_LAZY_LOADING', 'True').lower() == 'true',
+    'PRELOAD': [name.strip() for name in os.environ.get('ML_MODEL_PRELOAD', '').split(',') if name.strip()],
+}
+
+# Micro-batching broker for ml_security model inference: concurrent requests
+# for one model are coalesced into a single batched call on a worker thread
+ML_INFERENCE_BROKER = {
+    'ENABLED': os.environ.get('ML_INFERENCE_BROKER_ENABLED', 'True').lower() == 'true',
+    'MAX_BATCH_SIZE': int(os.environ.get('ML_INFERENCE_MAX_BATCH_SIZE', '32')),
+    # Longest the oldest queued request waits for its batch to fill
+    'MAX_WAIT_MS': float(os.environ.get('ML_INFERENCE_MAX_WAIT_MS', '5')),
+    'MAX_QUEUE': int(os.environ.get('ML_INFERENCE_MAX_QUEUE', '1024')),
+    'TIMEOUT_SECONDS': float(os.environ.get('ML_INFERENCE_TIMEOUT_SECONDS', '5')),
+}
+
+# Buffered inserts for SystemLog (DatabaseLogHandler) and PerformanceMetric
+# rows: queued in memory and bulk-inserted by a background flusher thread
+BUFFERED_DB_WRITES = {
+    'ENABLED': os.environ.get('BUFFERED_DB_WRITES_ENABLED', 'True').lower() == 'true',
+    'MAX_QUEUE': int(os.environ.get('BUFFERED_DB_WRITES_MAX_QUEUE', '10000')),
+    'BATCH_SIZE': int(os.environ.get('BUFFERED_DB_WRITES_BATCH_SIZE', '500')),
+    'FLUSH_INTERVAL_SECONDS': float(os.environ.get('BUFFERED_DB_WRITES_FLUSH_INTERVAL', '1.0')),
+    # Above this fill fraction only one in SAMPLE_EVERY non-essential rows
+    # (INFO logs, performance metrics) is kept
+    'SAMPLE_ABOVE': float(os.environ.get('BUFFERED_DB_WRITES_SAMPLE_ABOVE', '0.8')),
+    'SAMPLE_EVERY': int(os.environ.get('BUFFERED_DB_WRITES_SAMPLE_EVERY', '10')),
+    # How long WARNING+ log rows wait for space when the queue is full
+    'BLOCK_TIMEOUT_MS': float(os.environ.get('BUFFERED_DB_WRITES_BLOCK_TIMEOUT_MS', '50')),
+}
+
+# Vault audit log: events are queued in a Redis stream and bulk-inserted by
+# vault.tasks.flush_audit_events; retention deletes run in bounded batches
+AUDIT_LOG_SETTINGS = {
+    # 'redis' (shared stream), 'local' (in-process buffered writer) or 'sync'
+    'BUFFER': os.environ.get(
+        'AUDIT_LOG_BUFFER',
+        'redis' if os.environ.get('USE_REDIS_CACHE', 'False').lower() == 'true' else 'local',
+    ),
+    'REDIS_CACHE_ALIAS': 'default',
+    'STREAM_KEY': 'vault:audit:stream',
+    # Approximate cap on queued events if the flush task falls behind
+    'STREAM_MAXLEN': int(os.environ.get('AUDIT_LOG_STREAM_MAXLEN', '1000000')),
+    'FLUSH_BATCH_SIZE': int(os.environ.get('AUDIT_LOG_FLUSH_BATCH_SIZE', '5000')),
+    'FLUSH_MAX_BATCHES': int(os.environ.get('AUDIT_LOG_FLUSH_MAX_BATCHES', '50')),
+    # Events read but not acknowledged for this long are redelivered
+    'CLAIM_IDLE_SECONDS': 300,
+    'RETENTION_DAYS': int(os.environ.get('AUDIT_LOG_RETENTION_DAYS', '90')),
+    'DELETE_BATCH_SIZE': int(os.environ.get('AUDIT_LOG_DELETE_BATCH_SIZE', '5000')),
+    'DELETE_MAX_SECONDS': float(os.environ.get('AUDIT_LOG_DELETE_MAX_SECONDS', '300')),
+    'DELETE_PAUSE_SECONDS': 0.05,
+    'PAGE_SIZE': 50,
+    'MAX_PAGE_SIZE': 500,
+}
+
 # System resource monitoring interval (seconds)
 SYSTEM_MONITORING_INTERVAL = int(os.environ.get('SYSTEM_MONITORING_INTERVAL', '60'))
 
@@ -1572,6 +1720,16 @@ BLOCKCHAIN_ANCHORING = {
     ),
     'BATCH_SIZE': int(os.environ.get('BLOCKCHAIN_BATCH_SIZE', '1000')),
     'BATCH_INTERVAL_HOURS': int(os.environ.get('BLOCKCHAIN_BATCH_INTERVAL_HOURS', '24')),
+    # Cap on commitments per anchor batch; the contract rejects more than 10000
+    'MAX_BATCH_LEAVES': min(int(os.environ.get('BLOCKCHAIN_MAX_BATCH_LEAVES', '10000')), 10000),
+    # Pending rows read (and batch state saved) per chunk while building a batch
+    'STREAM_CHUNK_SIZE': int(os.environ.get('BLOCKCHAIN_STREAM_CHUNK_SIZE', '1000')),
+    # How long one anchoring run waits for a receipt before moving on; the
+    # batch is polled again on the next run
+    'RECEIPT_TIMEOUT_SECONDS': int(os.environ.get('BLOCKCHAIN_RECEIPT_TIMEOUT_SECONDS', '300')),
+    # A submitted transaction the node no longer knows after this long was
+    # dropped; its batch is broadcast again
+    'RESUBMIT_AFTER_SECONDS': int(os.environ.get('BLOCKCHAIN_RESUBMIT_AFTER_SECONDS', '1800')),
 }
 
 # Ambient Biometric Fusion Configuration
@@ -1701,6 +1859,22 @@ if BACKUP_ENVELOPE_ENFORCEMENT not in ('strict', 'header', 'off'):
 # typically send ``v2``.
 BACKUP_ENVELOPE_CLIENT_VERSION_HEADER = 'HTTP_X_BACKUP_ENVELOPE_CLIENT_VERSION'
 
+# Delta vault sync (vault/services/sync_feed.py): changes returned per
+# /vault/items/sync/ page, and the most a client may ask for.
+VAULT_SYNC_PAGE_SIZE = int(os.environ.get('VAULT_SYNC_PAGE_SIZE', '500'))
+VAULT_SYNC_MAX_PAGE_SIZE = int(os.environ.get('VAULT_SYNC_MAX_PAGE_SIZE', '5000'))
+
+# Streamed (ndjson-v1) vault backups: see vault/services/backup_stream.py.
+# Backups are spooled to a temp file (in memory up to SPOOL_MAX_BYTES) and
+# uploaded to object storage in PART_SIZE multipart chunks; restores write
+# RESTORE_BATCH_SIZE rows per bulk upsert.
+VAULT_BACKUP_STREAM_SETTINGS = {
+    'COMPRESS': os.environ.get('VAULT_BACKUP_COMPRESS', 'True').lower() == 'true',
+    'SPOOL_MAX_BYTES': int(os.environ.get('VAULT_BACKUP_SPOOL_MAX_BYTES', str(16 * 1024 * 1024))),
+    'PART_SIZE': int(os.environ.get('VAULT_BACKUP_PART_SIZE', str(8 * 1024 * 1024))),
+    'RESTORE_BATCH_SIZE': int(os.environ.get('VAULT_BACKUP_RESTORE_BATCH_SIZE', '1000')),
+}
+
 # Honeypot default alert fan-out channels. Must be a subset of
 # {'email', 'sms', 'webhook', 'signal'}. Operators can set the env var
 # to a comma-separated list to broaden/narrow the default.
@@ -2063,6 +2237,11 @@ DARK_PROTOCOL = {
     'HEALTH_CHECK_INTERVAL_SECONDS': int(os.environ.get('DARK_PROTOCOL_HEALTH_INTERVAL', '60')),
     'NODE_TIMEOUT_MS': int(os.environ.get('DARK_PROTOCOL_NODE_TIMEOUT', '5000')),
     
+    # Relay directory (in-memory node snapshot used for path selection)
+    'RELAY_DIRECTORY_REFRESH_SECONDS': float(os.environ.get('DARK_PROTOCOL_DIRECTORY_REFRESH', '30')),
+    'RELAY_DIRECTORY_VERSION_CHECK_SECONDS': float(os.environ.get('DARK_PROTOCOL_DIRECTORY_VERSION_CHECK', '5')),
+    'RELAY_DIRECTORY_MISS_REFRESH_SECONDS': float(os.environ.get('DARK_PROTOCOL_DIRECTORY_MISS_REFRESH', '1')),
+    
     # Data retention
     'SESSION_RETENTION_HOURS': int(os.environ.get('DARK_PROTOCOL_SESSION_RETENTION', '24')),
     'TRAFFIC_BUNDLE_RETENTION_HOURS': int(os.environ.get('DARK_PROTOCOL_BUNDLE_RETENTION', '24')),
@@ -2351,6 +2530,22 @@ def _liveness_session_store():
     return raw
 
 
+def _liveness_session_store_layout():
+    """
+    Resolve and validate how the Redis session store writes sessions.
+
+    'delta' appends each frame's samples to per-series keys; 'blob' rewrites
+    the whole session as one JSON string on every save. Both are readable by
+    the current code, so a fleet can roll out on 'blob' and then switch.
+    """
+    from django.core.exceptions import ImproperlyConfigured
+    raw = os.environ.get('LIVENESS_SESSION_STORE_LAYOUT', 'delta').strip().lower()
+    if raw not in ('delta', 'blob'):
+        raise ImproperlyConfigured(
+            f"LIVENESS_SESSION_STORE_LAYOUT must be 'delta' or 'blob', got {raw!r}")
+    return raw
+
+
 # Liveness sessions get their own Redis logical database. They are short-lived
 # but NOT disposable: an in-flight session holds the accumulated rPPG buffer,
 # gaze track and replay guard, and losing one mid-verification fails a real
@@ -2438,6 +2633,11 @@ BIOMETRIC_LIVENESS = {
     # allocation a client can force on the REST/WS decode path.
     'MAX_FRAME_PIXELS': _liveness_int_env('LIVENESS_MAX_FRAME_PIXELS', str(1920 * 1080), minimum=1),
 
+    # Binary WebSocket frames: when the session falls behind, analyse only the
+    # newest waiting frame and drop the ones it replaced (counted back to the
+    # client as dropped_frames). Off keeps every frame, in order.
+    'WS_DROP_STALE_FRAMES': os.environ.get('LIVENESS_WS_DROP_STALE_FRAMES', 'False').lower() == 'true',
+
     # In-memory session store bounds (per worker). Live = concurrent
     # pending/in_progress; retained = terminal records kept for replay guards
     # (retention may be 0 to keep none).
@@ -2495,6 +2695,11 @@ BIOMETRIC_LIVENESS = {
     # single-process deployments are unaffected.
     'SESSION_STORE': _liveness_session_store(),
     'SESSION_STORE_REDIS_URL': _liveness_session_redis_url(),
+    # Redis write layout: 'delta' (scalar document + append-only per-series
+    # keys, so a save costs O(new frames)) or 'blob' (one JSON string rewritten
+    # on every save). Deploy new code with 'blob' first when older workers
+    # still share the store: they can only read 'blob' sessions.
+    'SESSION_STORE_LAYOUT': _liveness_session_store_layout(),
 }
 
 # =============================================================================
@@ -2544,6 +2749,16 @@ PREDICTIVE_EXPIRATION = {
     'ML_CONFIDENCE_THRESHOLD': float(os.environ.get('PREDICTIVE_ML_CONFIDENCE', '0.75')),
 }
 
+# Compiled wordlist/keyboard-walk/name/date dictionary used by the pattern
+# analysis engine (see security.services.pattern_dictionary). Built with
+# `manage.py pattern_dictionary build`; until then the engine's short
+# built-in lists are used.
+PATTERN_DICTIONARY_SETTINGS = {
+    'PATH': os.environ.get('PATTERN_DICTIONARY_PATH', os.path.join(BASE_DIR, 'data', 'pattern-dictionary.bin')),
+    # How often workers stat the file to pick up a rebuild
+    'RELOAD_CHECK_SECONDS': int(os.environ.get('PATTERN_DICTIONARY_RELOAD_CHECK_SECONDS', '30')),
+}
+
 # =============================================================================
 # Cosmic Ray Entropy Configuration
 # =============================================================================
@@ -2715,6 +2930,19 @@ if TESTING:
     CELERY_TASK_ALWAYS_EAGER = False
     CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = False
 
+    # With no worker, deferred login-risk enrichment would never run; tests
+    # expect analyze_login_attempt to finish device registration and alerts.
+    LOGIN_RISK_SETTINGS['ENRICHMENT_MODE'] = 'inline'
+
+    # Call ML models directly so patched models are invoked on the test thread
+    ML_INFERENCE_BROKER['ENABLED'] = False
+
+    # Save log and metric rows on the test thread, inside the test transaction
+    BUFFERED_DB_WRITES['ENABLED'] = False
+
+    # Write audit rows on the test thread instead of through Redis
+    AUDIT_LOG_SETTINGS['BUFFER'] = 'sync'
+
 
 # =============================================================================
 # Audit-fix M1: production guard on USE_REDIS_CHANNELS
@@ -0,0 +1,49 @@
+"""
+JWT authentication that enforces login-risk escalations
+
+When background enrichment flips an already-accepted login to suspicious,
+``security.services.login_risk.escalate_session`` caches an escalation
+marker for the user. This class is where that marker is enforced: any
+access token whose sign-in predates the escalation is rejected with
+``login_escalated``, so the client must sign in again (and that login is
+scored afresh). Tokens from a later sign-in pass. Refresh tokens and the DRF
+``Token`` are revoked by the escalation itself, see ``REVOKE_ON_ESCALATION``.
+
+The sign-in time is the ``auth_time`` claim, stamped with sub-second
+precision by :func:`stamp_auth_time` when a login mints a refresh token and
+copied into every access token derived from it. ``iat`` has one-second
+resolution, so it is only the fallback for tokens minted without the claim.
+"""
+
+import time
+
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .services.login_risk import is_token_escalated
+
+AUTH_TIME_CLAIM = 'auth_time'
+
+
+def stamp_auth_time(token):
+    """Record the sign-in time on a freshly minted refresh token and return it."""
+    token[AUTH_TIME_CLAIM] = time.time()
+    return token
+
+
+class EscalationAwareJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that rejects tokens predating a login escalation"""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None:
+            return None
+
+        user, validated_token = result
+        signed_in_at = validated_token.get(AUTH_TIME_CLAIM, validated_token.get('iat'))
+        if is_token_escalated(user, signed_in_at):
+            raise exceptions.AuthenticationFailed(
+                'This sign-in was flagged as suspicious. Please sign in again.',
+                code='login_escalated',
+            )
+        return result
@@ -0,0 +1,57 @@
+"""
+Simulate dark protocol path selection through the relay directory.
+
+Usage:
+    python manage.py benchmark_relay_directory [--sessions 10000] [--entries 20]
+                                               [--relays 200] [--destinations 20]
+                                               [--regions 8] [--hops 3] [--seed 0]
+
+Builds a synthetic network in memory (no database rows), establishes
+``--sessions`` paths with the weighted relay directory and with the previous
+top-ranked rule, and reports time per path and how the circuits spread over
+the nodes of each type.
+"""
+
+from django.core.management.base import BaseCommand
+
+from security.services.relay_directory import simulate_sessions
+
+
+class Command(BaseCommand):
+    help = "Benchmark relay directory path selection and load spread on a simulated network."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=10_000)
+        parser.add_argument('--entries', type=int, default=20)
+        parser.add_argument('--relays', type=int, default=200)
+        parser.add_argument('--destinations', type=int, default=20)
+        parser.add_argument('--regions', type=int, default=8)
+        parser.add_argument('--hops', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        result = simulate_sessions(
+            sessions=options['sessions'],
+            entries=options['entries'],
+            relays=options['relays'],
+            destinations=options['destinations'],
+            regions=options['regions'],
+            hop_count=options['hops'],
+            seed=options['seed'],
+        )
+        self.stdout.write(f"{result['sessions']} sessions")
+        for policy in ('weighted', 'top_ranked'):
+            stats = result[policy]
+            line = f"{policy}: {stats['us_per_path']:.1f} us/path"
+            if 'short_paths' in stats:
+                line += f", {stats['short_paths']} short paths"
+            self.stdout.write(line)
+            self.stdout.write(
+                f"  {'type':<12} {'nodes':>6} {'used':>6} {'top share':>10} {'max load %':>11} {'full':>5}"
+            )
+            for node_type, spread in stats['spread'].items():
+                self.stdout.write(
+                    f"  {node_type:<12} {spread['nodes']:>6} {spread['nodes_used']:>6} "
+                    f"{spread['top_node_share']:>10.3f} {spread['max_load_percent']:>11.1f} "
+                    f"{spread['full_nodes']:>5}"
+                )
@@ -0,0 +1,103 @@
+"""
+Manage the compiled IP reputation index (security/services/ip_reputation.py).
+
+Usage:
+    python manage.py ip_reputation_index import <file> --source NAME [--category C] [--score S]
+    python manage.py ip_reputation_index remove --source NAME
+    python manage.py ip_reputation_index rebuild
+    python manage.py ip_reputation_index lookup <ip>
+    python manage.py ip_reputation_index benchmark [--ranges N] [--samples N]
+
+``<file>`` has one ``network[,category[,score]]`` per line (``#`` starts a
+comment); missing columns fall back to ``--category`` and ``--score``.
+``import`` and ``remove`` rebuild the index afterwards.
+"""
+
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from security.services.ip_reputation import benchmark_index, get_ip_reputation_index
+
+
+class Command(BaseCommand):
+    help = "Import sources into, rebuild, query, or benchmark the IP reputation index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['import', 'remove', 'rebuild', 'lookup', 'benchmark'])
+        parser.add_argument('target', nargs='?', help="Range file (import) or IP address (lookup)")
+        parser.add_argument('--source', help="Source name (import/remove)")
+        parser.add_argument('--category', default='blacklist')
+        parser.add_argument('--score', type=float, default=1.0)
+        parser.add_argument('--ranges', type=int, default=1_000_000)
+        parser.add_argument('--samples', type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        action = options['action']
+        index = get_ip_reputation_index()
+
+        if action == 'import':
+            path, source = options['target'], options['source']
+            if not path or not os.path.exists(path):
+                raise CommandError("import needs an existing range file")
+            if not source:
+                raise CommandError("import needs --source")
+            counts = index.update_source(source, self._read_entries(path, options))
+            index.rebuild()
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {counts[4]} IPv4 and {counts[6]} IPv6 ranges as {source}"
+            ))
+
+        elif action == 'remove':
+            if not options['source']:
+                raise CommandError("remove needs --source")
+            if not index.remove_source(options['source']):
+                raise CommandError(f"No source named {options['source']}")
+            index.rebuild()
+            self.stdout.write(f"Removed {options['source']}")
+
+        elif action == 'rebuild':
+            started = time.perf_counter()
+            counts = index.rebuild()
+            self.stdout.write(
+                f"Rebuilt {index.index_path} from {len(index.source_names())} source(s): "
+                f"{counts[4]} IPv4 / {counts[6]} IPv6 ranges in {time.perf_counter() - started:.1f}s"
+            )
+
+        elif action == 'lookup':
+            if not options['target']:
+                raise CommandError("lookup needs an IP address")
+            reputation = index.lookup(options['target'])
+            if reputation is None:
+                self.stdout.write(f"{options['target']}: no reputation data")
+            else:
+                verdict = 'blocked' if reputation.score >= index.block_score else 'allowed'
+                self.stdout.write(
+                    f"{options['target']}: {reputation.category} score={reputation.score:.2f} ({verdict})"
+                )
+
+        else:
+            with tempfile.TemporaryDirectory() as scratch:
+                results = benchmark_index(scratch, ranges=options['ranges'], samples=options['samples'])
+            self.stdout.write(
+                f"{results['ranges']:,} ranges -> {results['disjoint_records']:,} records "
+                f"({results['index_size_bytes'] / 1e6:.1f} MB) built in {results['build_seconds']:.1f}s\n"
+                f"index: {results['index_lookups_per_sec']:,.0f} lookups/sec "
+                f"({results['index_avg_us']:.1f} us avg, {results['hit_ratio']:.1%} hits)\n"
+                f"linear scan: {results['linear_avg_ms']:.1f} ms avg\n"
+                f"speedup: {results['speedup']:,.0f}x"
+            )
+
+    @staticmethod
+    def _read_entries(path, options):
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                parts = [part.strip() for part in line.split(',')]
+                category = parts[1] if len(parts) > 1 and parts[1] else options['category']
+                score = float(parts[2]) if len(parts) > 2 and parts[2] else options['score']
+                yield parts[0], category, score
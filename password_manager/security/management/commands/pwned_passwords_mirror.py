@@ -0,0 +1,75 @@
+"""
+Manage the offline Pwned Passwords mirror (security/services/hibp_mirror.py).
+
+Usage:
+    python manage.py pwned_passwords_mirror import <source> [--path PATH]
+    python manage.py pwned_passwords_mirror update [--max-prefixes N]
+    python manage.py pwned_passwords_mirror benchmark [--samples N] [--http-samples N]
+
+``<source>`` is either a directory of per-prefix ``XXXXX.txt`` range files
+or a single ``FULLHASH:COUNT`` file sorted by hash, as produced by the HIBP
+PwnedPasswordsDownloader. ``--path`` defaults to HIBP_MIRROR_SETTINGS['PATH'].
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from security.services import hibp_mirror
+
+
+class Command(BaseCommand):
+    help = "Import, incrementally update, or benchmark the offline Pwned Passwords mirror."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['import', 'update', 'benchmark'])
+        parser.add_argument('source', nargs='?', help="Range-file directory or hash file (import only)")
+        parser.add_argument('--path', help="Mirror file (default: HIBP_MIRROR_SETTINGS['PATH'])")
+        parser.add_argument('--max-prefixes', type=int, default=None)
+        parser.add_argument('--samples', type=int, default=10000)
+        parser.add_argument('--http-samples', type=int, default=200)
+
+    def handle(self, *args, **options):
+        config = getattr(settings, 'HIBP_MIRROR_SETTINGS', {})
+        path = options['path'] or config.get('PATH')
+        if not path:
+            raise CommandError("No mirror path configured; pass --path")
+
+        action = options['action']
+        if action == 'import':
+            source = options['source']
+            if not source or not os.path.exists(source):
+                raise CommandError("import needs an existing range-file directory or hash file")
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            started = time.perf_counter()
+            total = hibp_mirror.import_mirror(source, path)
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {total} hashes into {path} in {time.perf_counter() - started:.1f}s"
+            ))
+
+        elif action == 'update':
+            if not os.path.exists(path):
+                raise CommandError(f"{path} does not exist; run import first")
+            result = hibp_mirror.update_mirror(
+                path, options['max_prefixes'] or config.get('UPDATE_BATCH', 1024)
+            )
+            self.stdout.write(
+                f"Refreshed {result['fetched']} prefixes; cursor {result['cursor']:05X}; "
+                f"compacted={result['compacted']}"
+            )
+
+        else:
+            if not os.path.exists(path):
+                raise CommandError(f"{path} does not exist; run import first")
+            results = hibp_mirror.benchmark_mirror(
+                path, samples=options['samples'], http_samples=options['http_samples']
+            )
+            self.stdout.write(
+                f"mirror: {results['mirror_lookups_per_sec']:,.0f} lookups/sec "
+                f"({results['mirror_avg_us']:.1f} us avg)\n"
+                f"http (local stand-in): {results['http_lookups_per_sec']:,.0f} lookups/sec "
+                f"({results['http_avg_ms']:.2f} ms avg)\n"
+                f"speedup: {results['speedup']:,.0f}x"
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0030_adaptive_driver_delta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='garlicsession',
+            name='path_node_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
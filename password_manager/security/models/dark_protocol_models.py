@@ -188,6 +188,11 @@ class GarlicSession(models.Model):
         related_name='entry_sessions'
     )
     
+    # Primary keys of every hop, kept only while the session is active so
+    # the circuit slot it holds on each node can be released; cleared when
+    # the session ends
+    path_node_ids = models.JSONField(default=list, blank=True)
+    
     # Session timing
     created_at = models.DateTimeField(auto_now_add=True)
     last_activity_at = models.DateTimeField(auto_now=True)
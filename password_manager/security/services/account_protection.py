@@ -13,10 +13,11 @@ import logging
 from datetime import timedelta, datetime
 from ipware import get_client_ip
 import user_agents
-import geoip2.database
 import hashlib
 import hmac
-import ipaddress
+
+from shared.geoip import get_geoip_service
+from .ip_reputation import is_ip_blacklisted
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,6 @@ class AccountProtectionService:
         self.max_failed_attempts = 5
         self.lockout_duration_minutes = 30
         self.suspicious_threshold = 3
-        self.geo_db_path = getattr(settings, 'GEOIP_PATH', None)
     
     def analyze_login_attempt(self, request, user=None, username=None, success=False, failure_reason=None):
         """
@@ -420,14 +420,10 @@ class AccountProtectionService:
     
     def get_location_from_ip(self, ip_address):
         """Get location from IP address using GeoIP"""
-        try:
-            if self.geo_db_path and ip_address != '127.0.0.1':
-                with geoip2.database.Reader(self.geo_db_path) as reader:
-                    response = reader.city(ip_address)
-                    return f"{response.city.name}, {response.country.name}"
-        except:
-            pass
-        return "Unknown Location"
+        location = get_geoip_service().lookup(ip_address, allow_remote=False)
+        if not location:
+            return "Unknown Location"
+        return f"{location['city']}, {location['country']}"
     
     def detect_device(self, user_agent, ip_address):
         """Detect device information from user agent"""
@@ -476,15 +472,12 @@ class AccountProtectionService:
         startup) holds parsed ``ip_network`` objects; a single IP parses
         as a /32 (or /128), so this subsumes the old exact-match
         behaviour.
+
+        Lookups go through the compiled IP reputation index (a binary
+        search over flattened ranges) rather than scanning every network,
+        and also match ranges ingested from threat-intel feeds.
         """
-        nets = getattr(settings, 'BLACKLISTED_IP_NETS', [])
-        if not nets:
-            return False
-        try:
-            addr = ipaddress.ip_address(ip_address)
-        except ValueError:
-            return False
-        return any(addr in net for net in nets)
+        return is_ip_blacklisted(ip_address)
     
     def unlock_social_accounts(self, user, platforms=None):
         """Manually unlock social media accounts"""
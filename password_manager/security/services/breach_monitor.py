@@ -6,6 +6,8 @@ from django.utils import timezone
 from vault.models.vault_models import EncryptedVaultItem
 from shared.circuit_breaker import hibp_breaker, CircuitBreakerOpen
 
+from . import hibp_mirror
+
 logger = logging.getLogger(__name__)
 
 class HIBPService:
@@ -25,6 +27,10 @@ class HIBPService:
         Returns:
             dict: Dictionary of hash suffixes to breach counts
         """
+        mirrored = hibp_mirror.lookup_range(prefix.upper())
+        if mirrored is not None:
+            return mirrored
+
         try:
             hibp_breaker.before_call()
 
@@ -227,6 +227,12 @@ class DarkProtocolService:
             self._cover_generator = CoverTrafficGenerator()
         return self._cover_generator
 
+    @property
+    def relay_directory(self):
+        """Process-wide snapshot of live nodes used for path selection."""
+        from .relay_directory import get_relay_directory
+        return get_relay_directory()
+
     @property
     def tor(self):
         """The Tor capability layer - the only source of the anonymity verdict."""
@@ -397,15 +403,11 @@ class DarkProtocolService:
                 session_id=session_id,
             )
             
-            # Calculate estimated latency
-            def _node_latency(node):
-                health = (
-                    NetworkHealth.objects.filter(node=node, is_reachable=True)
-                    .order_by('-checked_at')
-                    .first()
-                )
-                return (health.latency_ms if health else None) or 50
-            estimated_latency = sum(_node_latency(node) for node in nodes)
+            # Calculate estimated latency (latest reachable check, loaded
+            # with the relay directory snapshot)
+            estimated_latency = sum(
+                getattr(node, 'latest_latency_ms', None) or 50 for node in nodes
+            )
             
             # Create session record
             with transaction.atomic():
@@ -417,6 +419,7 @@ class DarkProtocolService:
                     path_length=len(nodes),
                     layer_keys=layer_keys,
                     entry_node=nodes[0],
+                    path_node_ids=[str(node.pk) for node in nodes],
                     expires_at=timezone.now() + timedelta(
                         minutes=config.session_timeout_minutes
                     ),
@@ -429,6 +432,7 @@ class DarkProtocolService:
                     type(node).objects.filter(pk=node.pk).update(
                         current_circuits=F('current_circuits') + 1
                     )
+            self.relay_directory.record_circuits(nodes, 1)
             
             logger.info(
                 f"Established dark protocol session {session_id[:8]}... "
@@ -467,14 +471,7 @@ class DarkProtocolService:
                 user=user,
             )
             
-            if session.entry_node:
-                session.entry_node.current_circuits = max(
-                    0, session.entry_node.current_circuits - 1
-                )
-                session.entry_node.save(update_fields=['current_circuits'])
-            
-            session.status = 'terminated'
-            session.save(update_fields=['status'])
+            self.end_sessions(GarlicSession.objects.filter(pk=session.pk))
             
             # Clean up associated paths
             RoutingPath.objects.filter(
@@ -493,6 +490,46 @@ class DarkProtocolService:
             logger.error(f"Error terminating session: {e}")
             return False
     
+    def end_sessions(self, sessions) -> int:
+        """
+        Terminate the active sessions in ``sessions`` and release the
+        circuit slot each one holds on every node of its path.
+        
+        Each session is claimed with a conditional update, so a session
+        ended by both ``terminate_session`` and the expiry sweep is only
+        released once.
+        
+        Returns:
+            Number of sessions ended
+        """
+        from collections import Counter
+        from django.db.models import F, Value
+        from django.db.models.functions import Greatest
+        
+        released = Counter()
+        ended = 0
+        for session in sessions.filter(status='active').only('pk', 'entry_node_id', 'path_node_ids'):
+            claimed = GarlicSession.objects.filter(pk=session.pk, status='active').update(
+                status='terminated', path_node_ids=[],
+            )
+            if not claimed:
+                continue
+            ended += 1
+            # Sessions created before path_node_ids was recorded only know their entry
+            released.update(
+                session.path_node_ids
+                or ([str(session.entry_node_id)] if session.entry_node_id else [])
+            )
+        
+        pk_field = DarkProtocolNode._meta.pk
+        for node_id, count in released.items():
+            pk = pk_field.to_python(node_id)
+            DarkProtocolNode.objects.filter(pk=pk).update(
+                current_circuits=Greatest(F('current_circuits') - count, Value(0))
+            )
+            self.relay_directory.record_circuits([pk] * count, -1)
+        return ended
+    
     def get_active_session(self, user) -> Optional[GarlicSession]:
         """Get user's active session if one exists."""
         return GarlicSession.objects.filter(
@@ -515,88 +552,18 @@ class DarkProtocolService:
         """
         Select nodes for a routing path.
         
-        Nodes are selected to maximize anonymity:
-        - Different regions for each hop
-        - High trust scores
-        - Low current load
-        - Good uptime
+        Nodes are selected from the in-memory relay directory (no queries)
+        to spread load while keeping anonymity properties:
+        - Different regions for each hop where possible
+        - Weighted by bandwidth, trust score and uptime
+        - Less likely to pick nodes close to ``max_circuits``
         """
-        # Base query for available nodes
-        nodes_qs = DarkProtocolNode.objects.filter(
-            status='active',
-            last_seen_at__gt=timezone.now() - timedelta(minutes=5),
+        return self.relay_directory.select_path(
+            hop_count=hop_count,
+            preferred_regions=preferred_regions,
+            require_verified=require_verified,
+            use_bridges=use_bridges,
         )
-        
-        if require_verified:
-            nodes_qs = nodes_qs.filter(trust_score__gte=self.config.get('MIN_NODE_TRUST_SCORE', 0.3))
-        
-        # Select entry node (prefer bridges if enabled)
-        if use_bridges:
-            entry_candidates = nodes_qs.filter(node_type='bridge')
-            if not entry_candidates.exists():
-                entry_candidates = nodes_qs.filter(node_type='entry')
-        else:
-            entry_candidates = nodes_qs.filter(node_type='entry')
-        
-        # Apply region preference for entry
-        if preferred_regions:
-            preferred_entry = entry_candidates.filter(region__in=preferred_regions)
-            if preferred_entry.exists():
-                entry_candidates = preferred_entry
-        
-        entry_node = entry_candidates.order_by(
-            '-trust_score', '-uptime_percentage', 'current_circuits'
-        ).first()
-        
-        if not entry_node:
-            return []
-        
-        selected_nodes = [entry_node]
-        used_regions = {entry_node.region}
-        
-        # Select relay nodes
-        for i in range(hop_count - 2):
-            relay_candidates = nodes_qs.filter(
-                node_type='relay'
-            ).exclude(
-                id__in=[n.id for n in selected_nodes]
-            ).exclude(
-                region__in=used_regions  # Different region for diversity
-            )
-            
-            relay = relay_candidates.order_by(
-                '-trust_score', '-uptime_percentage', 'current_circuits'
-            ).first()
-            
-            if not relay:
-                # Fallback: allow same region if necessary
-                relay = nodes_qs.filter(
-                    node_type='relay'
-                ).exclude(
-                    id__in=[n.id for n in selected_nodes]
-                ).order_by(
-                    '-trust_score', '-uptime_percentage'
-                ).first()
-            
-            if relay:
-                selected_nodes.append(relay)
-                used_regions.add(relay.region)
-        
-        # Select destination node
-        dest_candidates = nodes_qs.filter(
-            node_type='destination'
-        ).exclude(
-            id__in=[n.id for n in selected_nodes]
-        )
-        
-        destination = dest_candidates.order_by(
-            '-trust_score', '-uptime_percentage', 'current_circuits'
-        ).first()
-        
-        if destination:
-            selected_nodes.append(destination)
-        
-        return selected_nodes
     
     def rotate_path(self, user) -> Optional[RoutingPath]:
         """
@@ -1160,6 +1127,9 @@ def run_relay_node():
         logger.error(f"Failed to register node: {e}")
         return
     
+    from .relay_directory import invalidate_relay_directory
+    invalidate_relay_directory()
+    
     # Health check handler
     class HealthHandler(BaseHTTPRequestHandler):
         def do_GET(self):
@@ -1232,6 +1202,7 @@ def run_relay_node():
             DarkProtocolNode.objects.filter(node_id=node_id).update(
                 status='maintenance'
             )
+            invalidate_relay_directory()
         except Exception:
             pass
         
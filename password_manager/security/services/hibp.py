@@ -11,6 +11,8 @@ import requests
 
 from shared.circuit_breaker import hibp_breaker, CircuitBreakerOpen
 
+from . import hibp_mirror
+
 logger = logging.getLogger(__name__)
 
 # HIBP API endpoints
@@ -88,24 +90,34 @@ def hash_password(password: str) -> str:
     return _hibp_protocol_digest(password.encode("utf-8"))
 
 
-def check_password_prefix(prefix: str) -> Dict[str, int] | object:
-    """
-    Query HIBP range API with a 5-char SHA-1 prefix (k-anonymity model).
-    The full password hash is never sent over the network.
-
-    Args:
-        prefix: First 5 hex characters of the SHA-1 hash.
-
-    Returns:
-        Dict mapping uppercase hash suffixes to breach counts (may be empty if API
-        returns no lines for this prefix). On timeout or request failure, returns
-        ``_BREACH_UNKNOWN`` — callers must not treat that like an empty dict.
-    """
+def _validate_prefix(prefix: str) -> None:
     if not prefix or len(prefix) != 5 or not all(
         c in "0123456789ABCDEFabcdef" for c in prefix
     ):
         raise ValueError(f"Prefix must be exactly 5 hex characters, got: {prefix!r}")
 
+
+def _parse_range_text(text: str) -> Dict[str, int]:
+    """Parse a range API body (``SUFFIX:COUNT`` lines) into a dict."""
+    result = {}
+    for line in text.splitlines():
+        if ":" not in line:
+            continue
+        suffix, _, count_str = line.partition(":")
+        try:
+            result[suffix.strip().upper()] = int(count_str.strip())
+        except ValueError:
+            logger.warning("Unexpected HIBP line format: %r", line)
+    return result
+
+
+def fetch_password_range(prefix: str) -> Dict[str, int] | object:
+    """
+    Query the live HIBP range API for a 5-char SHA-1 prefix, bypassing the
+    offline mirror. Same return contract as ``check_password_prefix``.
+    """
+    _validate_prefix(prefix)
+
     try:
         hibp_breaker.before_call()
 
@@ -116,15 +128,7 @@ def check_password_prefix(prefix: str) -> Dict[str, int] | object:
         )
         response.raise_for_status()
 
-        result = {}
-        for line in response.text.splitlines():
-            if ":" not in line:
-                continue
-            suffix, _, count_str = line.partition(":")
-            try:
-                result[suffix.strip().upper()] = int(count_str.strip())
-            except ValueError:
-                logger.warning("Unexpected HIBP line format: %r", line)
+        result = _parse_range_text(response.text)
 
         hibp_breaker.on_success()
         return result
@@ -142,6 +146,31 @@ def check_password_prefix(prefix: str) -> Dict[str, int] | object:
         return _BREACH_UNKNOWN
 
 
+def check_password_prefix(prefix: str) -> Dict[str, int] | object:
+    """
+    Query HIBP range API with a 5-char SHA-1 prefix (k-anonymity model).
+    The full password hash is never sent over the network.
+
+    When ``HIBP_MIRROR_SETTINGS`` enables a fresh offline mirror covering the
+    prefix, it is answered locally and no request is made.
+
+    Args:
+        prefix: First 5 hex characters of the SHA-1 hash.
+
+    Returns:
+        Dict mapping uppercase hash suffixes to breach counts (may be empty if API
+        returns no lines for this prefix). On timeout or request failure, returns
+        ``_BREACH_UNKNOWN`` — callers must not treat that like an empty dict.
+    """
+    _validate_prefix(prefix)
+
+    mirrored = hibp_mirror.lookup_range(prefix.upper())
+    if mirrored is not None:
+        return mirrored
+
+    return fetch_password_range(prefix)
+
+
 def is_password_breached(password_or_hash: str) -> Tuple[Optional[bool], int]:
     """
     Check if a password appears in known data breaches (k-anonymity).
@@ -167,13 +196,14 @@ def is_password_breached(password_or_hash: str) -> Tuple[Optional[bool], int]:
     else:
         full_hash = _sha1_hex(password_or_hash)
 
-    prefix = full_hash[:5]
-    suffix = full_hash[5:]
+    mirrored = hibp_mirror.lookup(full_hash)
+    if mirrored is not None:
+        return mirrored > 0, mirrored
 
-    breach_data = check_password_prefix(prefix)
+    breach_data = fetch_password_range(full_hash[:5])
     if breach_data is _BREACH_UNKNOWN:
         return None, 0
-    count = breach_data.get(suffix, 0)
+    count = breach_data.get(full_hash[5:], 0)
     return count > 0, count
 
 
@@ -0,0 +1,216 @@
+"""
+Batched Pwned Passwords checks for vault-wide scans.
+
+Groups SHA-1 hashes by their 5-character k-anonymity prefix so each unique
+prefix is resolved once per batch, whether the batch is one user's vault or
+a whole scan shard. Each prefix is answered from, in order:
+
+1. the offline mirror (security.services.hibp_mirror), when fresh, which
+   binary-searches each hash without decoding the range;
+2. the range cache (Redis in production, see HIBP_BATCH_SETTINGS);
+3. the live range API, through one pooled keep-alive httpx client with
+   bounded concurrency.
+
+Only full hashes ever leave the process as 5-character prefixes, exactly as
+in ``hibp.check_password_prefix``.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from shared.circuit_breaker import CircuitBreakerOpen, hibp_breaker
+
+from . import hibp_mirror
+from .hibp import (
+    _HIBP_429_MAX_RETRIES,
+    _HIBP_REQUEST_TIMEOUT,
+    _PWNED_HEADERS,
+    HIBP_PASSWORD_API_URL,
+    _parse_range_text,
+    _retry_after_seconds,
+)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "hibp:range:"
+
+DEFAULT_SETTINGS = {
+    'CACHE_ALIAS': 'default',
+    'CACHE_TTL': 6 * 3600,
+    'MAX_CONCURRENCY': 16,
+}
+
+
+@dataclass
+class BreachCheckStats:
+    """Per-run accounting for a batch check."""
+
+    hashes: int = 0
+    unique_prefixes: int = 0
+    mirror_hits: int = 0
+    cache_hits: int = 0
+    fetched: int = 0
+    failed: int = 0
+
+    @property
+    def prefix_hit_ratio(self) -> float:
+        """Share of unique prefixes answered without a live request."""
+        if not self.unique_prefixes:
+            return 0.0
+        return (self.mirror_hits + self.cache_hits) / self.unique_prefixes
+
+    @property
+    def requests_saved(self) -> int:
+        """Live requests avoided versus one request per hash."""
+        return self.hashes - self.fetched - self.failed
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data['prefix_hit_ratio'] = round(self.prefix_hit_ratio, 4)
+        data['requests_saved'] = self.requests_saved
+        return data
+
+
+class BatchBreachChecker:
+    """
+    Resolve many SHA-1 hashes against Pwned Passwords with one lookup per prefix.
+
+    Usage:
+        checker = BatchBreachChecker()
+        counts, stats = checker.check_hashes(hashes)
+        # counts[hash] is the breach count, or None if the prefix could not
+        # be resolved (API down / circuit open) -- never treat None as 0.
+    """
+
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 cache_alias: Optional[str] = None,
+                 cache_ttl: Optional[int] = None,
+                 transport=None):
+        config = {**DEFAULT_SETTINGS, **getattr(settings, 'HIBP_BATCH_SETTINGS', {})}
+        self.max_concurrency = max_concurrency or config['MAX_CONCURRENCY']
+        self.cache = caches[cache_alias or config['CACHE_ALIAS']]
+        self.cache_ttl = cache_ttl if cache_ttl is not None else config['CACHE_TTL']
+        # Optional httpx transport (e.g. httpx.MockTransport in tests)
+        self.transport = transport
+
+    def check_hashes(self, hashes: Iterable[str]):
+        """
+        Args:
+            hashes: 40-character SHA-1 hex digests (any case, duplicates fine)
+
+        Returns:
+            (counts, stats): ``{HASH: count or None}`` and a BreachCheckStats
+        """
+        hashes = {h.upper() for h in hashes}
+        stats = BreachCheckStats(hashes=len(hashes))
+        if not hashes:
+            return {}, stats
+
+        by_prefix: Dict[str, list] = {}
+        for full_hash in hashes:
+            by_prefix.setdefault(full_hash[:5], []).append(full_hash)
+        stats.unique_prefixes = len(by_prefix)
+
+        counts = {}
+        unresolved = []
+        mirror = hibp_mirror.get_pwned_passwords_mirror()
+        for prefix, prefix_hashes in by_prefix.items():
+            # The mirror covers whole prefixes: look each hash up directly
+            # rather than decoding the range.
+            mirrored = [mirror.lookup(h) for h in prefix_hashes] if mirror is not None else [None]
+            if None in mirrored:
+                unresolved.append(prefix)
+            else:
+                counts.update(zip(prefix_hashes, mirrored))
+                stats.mirror_hits += 1
+
+        ranges = self._resolve_prefixes(unresolved, stats)
+        for prefix in unresolved:
+            range_data = ranges.get(prefix)
+            for full_hash in by_prefix[prefix]:
+                counts[full_hash] = None if range_data is None else range_data.get(full_hash[5:], 0)
+
+        logger.info("HIBP batch check: %s", stats.as_dict())
+        return counts, stats
+
+    def _resolve_prefixes(self, prefixes, stats: BreachCheckStats) -> Dict[str, Optional[dict]]:
+        ranges: Dict[str, Optional[dict]] = {}
+
+        remaining = list(prefixes)
+        if remaining:
+            cached = self.cache.get_many([CACHE_KEY_PREFIX + p for p in remaining])
+            missing = []
+            for prefix in remaining:
+                range_data = cached.get(CACHE_KEY_PREFIX + prefix)
+                if range_data is None:
+                    missing.append(prefix)
+                else:
+                    ranges[prefix] = range_data
+                    stats.cache_hits += 1
+            remaining = missing
+
+        if remaining:
+            fetched = asyncio.run(self._fetch_all(remaining))
+            to_cache = {}
+            for prefix, range_data in fetched.items():
+                ranges[prefix] = range_data
+                if range_data is None:
+                    stats.failed += 1
+                else:
+                    stats.fetched += 1
+                    to_cache[CACHE_KEY_PREFIX + prefix] = range_data
+            if to_cache:
+                self.cache.set_many(to_cache, self.cache_ttl)
+
+        return ranges
+
+    async def _fetch_all(self, prefixes) -> Dict[str, Optional[dict]]:
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx not installed. Run: pip install httpx")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        )
+        async with httpx.AsyncClient(
+            headers=_PWNED_HEADERS, timeout=_HIBP_REQUEST_TIMEOUT, limits=limits,
+            transport=self.transport,
+        ) as client:
+            results = await asyncio.gather(
+                *(self._fetch_one(client, semaphore, prefix) for prefix in prefixes)
+            )
+        return dict(zip(prefixes, results))
+
+    async def _fetch_one(self, client, semaphore, prefix: str) -> Optional[dict]:
+        async with semaphore:
+            for attempt in range(_HIBP_429_MAX_RETRIES + 1):
+                try:
+                    hibp_breaker.before_call()
+                    response = await client.get(f"{HIBP_PASSWORD_API_URL}/{prefix}")
+                    if response.status_code == 429 and attempt < _HIBP_429_MAX_RETRIES:
+                        await asyncio.sleep(_retry_after_seconds(response.headers.get("Retry-After")))
+                        continue
+                    response.raise_for_status()
+                    hibp_breaker.on_success()
+                    return _parse_range_text(response.text)
+                except CircuitBreakerOpen:
+                    logger.warning("HIBP circuit breaker is OPEN — skipping prefix %s***", prefix[:2])
+                    return None
+                except httpx.HTTPError as e:
+                    hibp_breaker.on_failure(e)
+                    logger.error("HIBP range request failed for prefix %s***: %s", prefix[:2], e)
+                    return None
+            return None
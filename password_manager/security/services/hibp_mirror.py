@@ -0,0 +1,602 @@
+"""
+Offline Pwned Passwords mirror.
+
+Stores the HIBP Pwned Passwords range data in a compact, sorted binary file
+that is memory-mapped and binary-searched locally, so a prefix lookup costs
+microseconds instead of an HTTPS round trip. The live range API stays the
+fallback whenever the mirror is disabled, missing, stale, or does not cover
+the requested prefix.
+
+File layout (little-endian):
+
+    header   magic, version, synced_at, cursor, record_count
+    index    PREFIX_COUNT + 1 uint64 record offsets; prefix p owns
+             records [index[p], index[p + 1])
+    present  PREFIX_COUNT-bit bitmap of prefixes the file covers
+    records  record_count x (18-byte suffix, uint32 count), sorted
+
+A suffix is the 35 hex characters after the 5-character prefix, padded with
+one ``0`` nibble to 18 bytes. Byte order preserves hex order, so records
+sort and binary-search as raw bytes.
+
+Incremental updates go to a sibling ``.delta`` file in the same format that
+covers only the refreshed prefixes. Lookups prefer the delta for any prefix
+it covers; once a sweep over the whole keyspace completes, the delta is
+compacted into the base file.
+"""
+
+import heapq
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PWNDMIR1"
+FORMAT_VERSION = 1
+
+PREFIX_LEN = 5
+PREFIX_COUNT = 16 ** PREFIX_LEN
+SUFFIX_LEN = 35
+DELTA_SUFFIX = ".delta"
+
+_HEADER = struct.Struct("<8sIqqQ")  # magic, version, synced_at, cursor, record_count
+_RECORD = struct.Struct("<18sI")  # padded suffix, count
+_OFFSETS = struct.Struct("<QQ")
+_INDEX_BYTES = (PREFIX_COUNT + 1) * 8
+_BITMAP_BYTES = PREFIX_COUNT // 8
+_DATA_OFFSET = _HEADER.size + _INDEX_BYTES + _BITMAP_BYTES
+_MAX_COUNT = 0xFFFFFFFF
+
+# Default live fetcher signature: prefix -> {suffix: count}, or None on failure.
+RangeFetcher = Callable[[str], Optional[Dict[str, int]]]
+
+
+def _encode_suffix(suffix: str) -> bytes:
+    return bytes.fromhex(suffix + "0")
+
+
+def _decode_suffix(raw: bytes) -> str:
+    return raw.hex().upper()[:SUFFIX_LEN]
+
+
+def pack_range(entries: Dict[str, int]) -> bytes:
+    """
+    Encode one prefix's ``{suffix: count}`` mapping as a sorted record block.
+
+    Zero counts (HIBP ``Add-Padding`` filler) are dropped.
+    """
+    records = sorted(
+        (_encode_suffix(suffix.upper()), min(count, _MAX_COUNT))
+        for suffix, count in entries.items()
+        if count > 0 and len(suffix) == SUFFIX_LEN
+    )
+    return b"".join(_RECORD.pack(suffix, count) for suffix, count in records)
+
+
+def write_mirror(
+    path: str,
+    ranges: Iterable[Tuple[int, bytes]],
+    synced_at: Optional[int] = None,
+    cursor: int = 0,
+) -> int:
+    """
+    Write a mirror file from ``(prefix, record_block)`` pairs.
+
+    ``ranges`` must be in strictly ascending prefix order; prefixes it skips
+    are marked as not covered. The file is written next to ``path`` and
+    moved into place atomically, so open readers keep their old mapping.
+
+    Returns:
+        Number of records written.
+    """
+    offsets = array("Q", bytes(_INDEX_BYTES))
+    present = bytearray(_BITMAP_BYTES)
+    total = 0
+    last = -1
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "wb") as fh:
+        fh.seek(_DATA_OFFSET)
+        for prefix, block in ranges:
+            if not last < prefix < PREFIX_COUNT:
+                raise ValueError("Mirror ranges must be in strictly ascending prefix order")
+            if len(block) % _RECORD.size:
+                raise ValueError(f"Malformed record block for prefix {prefix:05X}")
+            for skipped in range(last + 1, prefix + 1):
+                offsets[skipped] = total
+            fh.write(block)
+            total += len(block) // _RECORD.size
+            present[prefix >> 3] |= 1 << (prefix & 7)
+            last = prefix
+        for skipped in range(last + 1, PREFIX_COUNT + 1):
+            offsets[skipped] = total
+
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        fh.seek(0)
+        fh.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION,
+            int(time.time()) if synced_at is None else int(synced_at),
+            cursor, total,
+        ))
+        fh.write(offsets.tobytes())
+        fh.write(present)
+
+    os.replace(tmp_path, path)
+    return total
+
+
+class MirrorFile:
+    """Read-only, memory-mapped view of one mirror file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.synced_at, self.cursor, self.record_count = (
+                _HEADER.unpack_from(self._mm, 0)
+            )
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a v{FORMAT_VERSION} Pwned Passwords mirror")
+            if len(self._mm) != _DATA_OFFSET + self.record_count * _RECORD.size:
+                raise ValueError(f"{path} is truncated or corrupt")
+        except Exception:
+            self._mm.close()
+            raise
+
+    def close(self):
+        self._mm.close()
+
+    def covers(self, prefix: int) -> bool:
+        return bool(self._mm[_HEADER.size + _INDEX_BYTES + (prefix >> 3)] & (1 << (prefix & 7)))
+
+    def covered_prefixes(self) -> Iterator[int]:
+        """Yield covered prefixes in ascending order, skipping empty bitmap bytes."""
+        start = _HEADER.size + _INDEX_BYTES
+        bitmap = self._mm[start:start + _BITMAP_BYTES]
+        for byte_index, byte in enumerate(bitmap):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (byte_index << 3) | bit
+
+    def _bounds(self, prefix: int) -> Tuple[int, int]:
+        return _OFFSETS.unpack_from(self._mm, _HEADER.size + prefix * 8)
+
+    def block(self, prefix: int) -> bytes:
+        """Raw record block for ``prefix`` (empty if none)."""
+        start, end = self._bounds(prefix)
+        return self._mm[_DATA_OFFSET + start * _RECORD.size:_DATA_OFFSET + end * _RECORD.size]
+
+    def range(self, prefix: int) -> Dict[str, int]:
+        """Decode ``prefix`` into the ``{suffix: count}`` shape the range API returns."""
+        return {
+            _decode_suffix(suffix): count
+            for suffix, count in _RECORD.iter_unpack(self.block(prefix))
+        }
+
+    def count(self, prefix: int, suffix: str) -> int:
+        """Binary-search ``suffix`` within ``prefix``; 0 if absent."""
+        key = _encode_suffix(suffix)
+        lo, hi = self._bounds(prefix)
+        mm, size = self._mm, _RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _DATA_OFFSET + mid * size
+            probe = mm[offset:offset + 18]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return _RECORD.unpack_from(mm, offset)[1]
+        return 0
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class PwnedPasswordsMirror:
+    """
+    Base mirror file plus optional delta overlay.
+
+    Reopens both files when either is replaced on disk, so a running worker
+    picks up updater output without a restart.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.delta_path = path + DELTA_SUFFIX
+        self._lock = threading.Lock()
+        self._base: Optional[MirrorFile] = None
+        self._delta: Optional[MirrorFile] = None
+        self._signature = None
+        self.reload_if_changed()
+
+    def reload_if_changed(self) -> bool:
+        signature = (_file_signature(self.path), _file_signature(self.delta_path))
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._base = MirrorFile(self.path) if signature[0] else None
+            self._delta = MirrorFile(self.delta_path) if signature[1] else None
+            self._signature = signature
+        # The old mappings are not closed explicitly: another thread may
+        # still be mid-lookup on them. They are unmapped once unreferenced.
+        return True
+
+    def close(self):
+        with self._lock:
+            for mirror_file in (self._base, self._delta):
+                if mirror_file is not None:
+                    mirror_file.close()
+            self._base = self._delta = None
+            self._signature = None
+
+    @property
+    def available(self) -> bool:
+        return self._base is not None
+
+    @property
+    def synced_at(self) -> int:
+        return self._base.synced_at if self._base is not None else 0
+
+    def age_seconds(self) -> float:
+        return time.time() - self.synced_at
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        return not self.available or self.age_seconds() > max_age_seconds
+
+    def _source_for(self, prefix: int) -> Optional[MirrorFile]:
+        base, delta = self._base, self._delta
+        if delta is not None and delta.covers(prefix):
+            return delta
+        if base is not None and base.covers(prefix):
+            return base
+        return None
+
+    def range_for_prefix(self, prefix: str) -> Optional[Dict[str, int]]:
+        """``{suffix: count}`` for a 5-char prefix, or None if not covered."""
+        source = self._source_for(int(prefix, 16))
+        return source.range(int(prefix, 16)) if source is not None else None
+
+    def lookup(self, full_hash: str) -> Optional[int]:
+        """Breach count for a 40-char SHA-1 hex hash, or None if not covered."""
+        full_hash = full_hash.upper()
+        prefix = int(full_hash[:PREFIX_LEN], 16)
+        source = self._source_for(prefix)
+        return source.count(prefix, full_hash[PREFIX_LEN:]) if source is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Configured singleton
+# ---------------------------------------------------------------------------
+
+_mirror: Optional[PwnedPasswordsMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def _mirror_settings() -> dict:
+    return getattr(settings, "HIBP_MIRROR_SETTINGS", {})
+
+
+def get_pwned_passwords_mirror() -> Optional[PwnedPasswordsMirror]:
+    """
+    The configured mirror if it is enabled, present and fresh; otherwise None.
+
+    Callers treat None as "use the live API".
+    """
+    global _mirror
+    config = _mirror_settings()
+    if not config.get("ENABLED") or not config.get("PATH"):
+        return None
+
+    if _mirror is None or _mirror.path != config["PATH"]:
+        with _mirror_lock:
+            if _mirror is None or _mirror.path != config["PATH"]:
+                try:
+                    _mirror = PwnedPasswordsMirror(config["PATH"])
+                except (OSError, ValueError) as e:
+                    logger.error("Could not open Pwned Passwords mirror: %s", e)
+                    return None
+    else:
+        try:
+            _mirror.reload_if_changed()
+        except (OSError, ValueError) as e:
+            logger.error("Could not reload Pwned Passwords mirror: %s", e)
+            return None
+
+    max_age = float(config.get("MAX_AGE_HOURS", 504)) * 3600
+    if _mirror.is_stale(max_age):
+        logger.warning("Pwned Passwords mirror is stale or missing; using live API")
+        return None
+    return _mirror
+
+
+def lookup(full_hash: str) -> Optional[int]:
+    """
+    Mirror breach count for a full SHA-1 hash, or None when the live API must
+    be used.
+
+    Binary-searches the record instead of decoding the prefix's whole range;
+    use this whenever the full hash is known.
+    """
+    mirror = get_pwned_passwords_mirror()
+    if mirror is None:
+        return None
+    return mirror.lookup(full_hash)
+
+
+def lookup_range(prefix: str) -> Optional[Dict[str, int]]:
+    """Mirror answer for a prefix, or None when the live API must be used."""
+    mirror = get_pwned_passwords_mirror()
+    if mirror is None:
+        return None
+    return mirror.range_for_prefix(prefix)
+
+
+# ---------------------------------------------------------------------------
+# Import / incremental update
+# ---------------------------------------------------------------------------
+
+def _parse_range_lines(lines: Iterable[str]) -> Dict[str, int]:
+    entries = {}
+    for line in lines:
+        suffix, sep, count = line.strip().partition(":")
+        if not sep:
+            continue
+        try:
+            entries[suffix.upper()] = int(count)
+        except ValueError:
+            logger.warning("Skipping malformed Pwned Passwords line: %r", line[:60])
+    return entries
+
+
+def iter_range_directory(source_dir: str) -> Iterator[Tuple[int, bytes]]:
+    """Yield record blocks from per-prefix ``XXXXX.txt`` range files."""
+    names = sorted(
+        name for name in os.listdir(source_dir)
+        if len(name) == PREFIX_LEN + 4 and name.lower().endswith(".txt")
+    )
+    for name in names:
+        prefix = name[:PREFIX_LEN]
+        with open(os.path.join(source_dir, name), encoding="ascii") as fh:
+            yield int(prefix, 16), pack_range(_parse_range_lines(fh))
+
+
+def iter_hash_file(source_file: str) -> Iterator[Tuple[int, bytes]]:
+    """Yield record blocks from a single ``FULLHASH:COUNT`` file sorted by hash."""
+    current = None
+    entries: Dict[str, int] = {}
+    with open(source_file, encoding="ascii") as fh:
+        for line in fh:
+            full_hash, sep, count = line.strip().partition(":")
+            if not sep or len(full_hash) != PREFIX_LEN + SUFFIX_LEN:
+                continue
+            prefix = int(full_hash[:PREFIX_LEN], 16)
+            if prefix != current:
+                if current is not None:
+                    yield current, pack_range(entries)
+                current, entries = prefix, {}
+            entries[full_hash[PREFIX_LEN:].upper()] = int(count)
+    if current is not None:
+        yield current, pack_range(entries)
+
+
+def import_mirror(source: str, path: str) -> int:
+    """
+    Build a base mirror from a range-file directory or a single hash file.
+
+    Returns:
+        Number of records written.
+    """
+    ranges = iter_range_directory(source) if os.path.isdir(source) else iter_hash_file(source)
+    total = write_mirror(path, ranges, cursor=0)
+    # A fresh base supersedes any half-finished incremental sweep
+    if os.path.exists(path + DELTA_SUFFIX):
+        os.remove(path + DELTA_SUFFIX)
+    return total
+
+
+def _tag_blocks(source: Iterable[Tuple[int, bytes]], rank: int):
+    for prefix, block in source:
+        yield prefix, -rank, block
+
+
+def _merge_blocks(*sources: Iterable[Tuple[int, bytes]]) -> Iterator[Tuple[int, bytes]]:
+    """Stream-merge ascending ``(prefix, block)`` streams; later sources win on ties."""
+    last = None
+    tagged = [_tag_blocks(source, rank) for rank, source in enumerate(sources)]
+    for prefix, _, block in heapq.merge(*tagged, key=lambda item: item[:2]):
+        if prefix != last:
+            yield prefix, block
+            last = prefix
+
+
+def _iter_blocks(mirror_file: MirrorFile) -> Iterator[Tuple[int, bytes]]:
+    for prefix in mirror_file.covered_prefixes():
+        yield prefix, mirror_file.block(prefix)
+
+
+def _fetch_live_range(prefix: str) -> Optional[Dict[str, int]]:
+    from .hibp import _BREACH_UNKNOWN, fetch_password_range
+
+    result = fetch_password_range(prefix)
+    return None if result is _BREACH_UNKNOWN else result
+
+
+def update_mirror(
+    path: str,
+    max_prefixes: int,
+    fetch_range: Optional[RangeFetcher] = None,
+) -> dict:
+    """
+    Refresh the next ``max_prefixes`` prefixes of the sweep into the delta file.
+
+    The sweep cursor is kept in the delta header. A failed fetch stops the
+    batch at that prefix so the next run retries it. When the cursor reaches
+    the end of the keyspace the delta is compacted into the base, whose
+    ``synced_at`` becomes the time the sweep started.
+
+    Returns:
+        dict with ``fetched``, ``cursor`` and ``compacted``.
+    """
+    fetch_range = fetch_range or _fetch_live_range
+    delta_path = path + DELTA_SUFFIX
+    base = MirrorFile(path)
+    delta = MirrorFile(delta_path) if os.path.exists(delta_path) else None
+
+    try:
+        cursor = delta.cursor if delta is not None else 0
+        sweep_started = delta.synced_at if delta is not None else int(time.time())
+
+        fetched = []
+        for prefix in range(cursor, min(cursor + max_prefixes, PREFIX_COUNT)):
+            entries = fetch_range(f"{prefix:05X}")
+            if entries is None:
+                logger.warning("Mirror update stopped at prefix %05X (fetch failed)", prefix)
+                break
+            fetched.append((prefix, pack_range(entries)))
+        new_cursor = cursor + len(fetched)
+
+        existing = _iter_blocks(delta) if delta is not None else ()
+        if new_cursor >= PREFIX_COUNT:
+            write_mirror(
+                path,
+                _merge_blocks(_iter_blocks(base), existing, fetched),
+                synced_at=sweep_started,
+            )
+            compacted = True
+        else:
+            write_mirror(
+                delta_path,
+                _merge_blocks(existing, fetched),
+                synced_at=sweep_started,
+                cursor=new_cursor,
+            )
+            compacted = False
+    finally:
+        base.close()
+        if delta is not None:
+            delta.close()
+
+    if compacted and os.path.exists(delta_path):
+        os.remove(delta_path)
+
+    return {
+        "fetched": len(fetched),
+        "cursor": 0 if compacted else new_cursor,
+        "compacted": compacted,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def benchmark_mirror(path: str, samples: int = 10000, http_samples: int = 200) -> dict:
+    """
+    Compare mirror lookups against the HTTP range path.
+
+    The mirror side times ``hibp.is_password_breached`` served by the
+    configured mirror singleton (freshness and reload checks included), the
+    path production callers take. Hashes are drawn from covered prefixes so
+    none of them falls through to the live API.
+
+    The HTTP side runs against a local stand-in for api.pwnedpasswords.com
+    that serves ranges out of the same mirror, so the numbers isolate
+    per-request overhead (connection, transfer, parsing) from HIBP latency.
+    A real deployment pays that latency on top.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import requests
+    from django.test.utils import override_settings
+
+    from .hibp import _parse_range_text, is_password_breached
+
+    global _mirror
+
+    mirror = PwnedPasswordsMirror(path)
+    if not mirror.available:
+        raise FileNotFoundError(path)
+
+    rng = random.Random(0)
+    covered = list(mirror._base.covered_prefixes())
+    hashes = [
+        f"{rng.choice(covered):05X}{rng.getrandbits(SUFFIX_LEN * 4):0{SUFFIX_LEN}X}"
+        for _ in range(samples)
+    ]
+
+    configured = _mirror
+    _mirror = None
+    try:
+        benchmark_settings = {"ENABLED": True, "PATH": path, "MAX_AGE_HOURS": float("inf")}
+        with override_settings(HIBP_MIRROR_SETTINGS=benchmark_settings):
+            started = time.perf_counter()
+            for full_hash in hashes:
+                is_password_breached(full_hash)
+            mirror_elapsed = time.perf_counter() - started
+    finally:
+        if _mirror is not None:
+            _mirror.close()
+        _mirror = configured
+
+    class _RangeHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            prefix = self.path.rsplit("/", 1)[-1]
+            entries = mirror.range_for_prefix(prefix) or {}
+            body = "\r\n".join(f"{s}:{c}" for s, c in entries.items()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/range"
+
+    try:
+        started = time.perf_counter()
+        for full_hash in hashes[:http_samples]:
+            # Same shape as the live path: one fresh request per prefix
+            response = requests.get(f"{base_url}/{full_hash[:PREFIX_LEN]}", timeout=10)
+            _parse_range_text(response.text).get(full_hash[PREFIX_LEN:], 0)
+        http_elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+        mirror.close()
+
+    mirror_rate = samples / mirror_elapsed if mirror_elapsed else float("inf")
+    http_rate = http_samples / http_elapsed if http_elapsed else float("inf")
+    return {
+        "mirror_lookups_per_sec": mirror_rate,
+        "mirror_avg_us": mirror_elapsed / samples * 1e6,
+        "http_lookups_per_sec": http_rate,
+        "http_avg_ms": http_elapsed / http_samples * 1e3,
+        "speedup": mirror_rate / http_rate if http_rate else None,
+    }
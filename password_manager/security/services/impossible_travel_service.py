@@ -588,55 +588,9 @@ class ImpossibleTravelService:
         return location
     
     def _get_location_from_ip(self, ip_address: str) -> Dict[str, str]:
-        """Get location from IP address using GeoIP."""
-        if not ip_address or ip_address in ('127.0.0.1', '::1', 'localhost'):
-            return {}
-        
-        geo_db_path = getattr(settings, 'GEOIP_DB_PATH', None)
-        
-        if geo_db_path:
-            try:
-                import geoip2.database
-                with geoip2.database.Reader(f"{geo_db_path}/GeoLite2-City.mmdb") as reader:
-                    response = reader.city(ip_address)
-                    return {
-                        'city': response.city.name or '',
-                        'country': response.country.name or '',
-                        'country_code': response.country.iso_code or '',
-                        'latitude': response.location.latitude,
-                        'longitude': response.location.longitude
-                    }
-            except Exception as e:
-                logger.warning(f"GeoIP2 lookup failed: {e}")
-        
-        try:
-            from shared.circuit_breaker import ipinfo_breaker, CircuitBreakerOpen
-            import requests
-
-            ipinfo_breaker.before_call()
-            response = requests.get(
-                f"https://ipinfo.io/{ip_address}/json",
-                timeout=5,
-            )
-            if response.status_code == 200:
-                data = response.json()
-                loc = data.get('loc', '0,0').split(',')
-                ipinfo_breaker.on_success()
-                return {
-                    'city': data.get('city', ''),
-                    'country': data.get('country', ''),
-                    'country_code': data.get('country', ''),
-                    'latitude': float(loc[0]) if len(loc) > 0 else 0,
-                    'longitude': float(loc[1]) if len(loc) > 1 else 0,
-                }
-            ipinfo_breaker.on_failure()
-        except CircuitBreakerOpen:
-            pass
-        except Exception as e:
-            ipinfo_breaker.on_failure(e)
-            logger.error(f"IP geolocation failed: {e}")
-        
-        return {}
+        """Get location from IP address using the shared GeoIP service."""
+        from shared.geoip import get_geoip_service
+        return get_geoip_service().lookup(ip_address)
     
     # =========================================================================
     # Geofence Checking
@@ -0,0 +1,301 @@
+"""
+Two-phase login risk scoring for ``SecurityService.analyze_login_attempt``.
+
+Fast path, on the authentication request:
+    The attempt is scored from a cached per-user feature snapshot (known
+    device fingerprints, usual login hours, recent user agents), a per-IP
+    failure counter and the compiled IP reputation index. That costs one
+    cache read and the ``LoginAttempt`` insert, with no geolocation and no
+    history queries.
+
+Enrichment, off the request:
+    Geolocation, the full ``SecurityService._calculate_risk_score``, device
+    bookkeeping and alerts, then the feature snapshot is rebuilt. This runs
+    as a Celery task, on an in-process thread pool, or inline, depending on
+    ``LOGIN_RISK_SETTINGS['ENRICHMENT_MODE']``.
+
+Sometimes enrichment marks a successful login as suspicious after the fast
+path let it through. The session is then escalated: an escalation marker is
+cached for the user (see :func:`get_login_escalation`), and
+``security.authentication.EscalationAwareJWTAuthentication`` (the default
+DRF authentication class) rejects every access token issued before the
+escalation, so the client has to sign in again; that new login is scored
+from scratch. With ``REVOKE_ON_ESCALATION`` (on by default) the JWT refresh
+tokens issued for the login are blacklisted, so they cannot mint fresh
+access tokens, and the user's DRF ``Token`` is deleted.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_MODES = ('celery', 'thread', 'inline')
+
+FEATURES_KEY = 'login_risk:features:{user_id}'
+IP_FAILURES_KEY = 'login_risk:ip_failures:{ip}'
+ESCALATION_KEY = 'login_risk:escalation:{user_id}'
+
+
+def _config() -> dict:
+    return getattr(settings, 'LOGIN_RISK_SETTINGS', {})
+
+
+def enrichment_mode() -> str:
+    mode = _config().get('ENRICHMENT_MODE', 'celery')
+    return mode if mode in ENRICHMENT_MODES else 'celery'
+
+
+# ==============================================================================
+# FAST-PATH FEATURES
+# ==============================================================================
+
+def build_user_features(user) -> Dict:
+    """
+    Snapshot the login history used by the fast-path score.
+
+    Covers the same windows as ``_calculate_risk_score``: 30 days of login
+    hours and 7 days of user agents from successful logins.
+    """
+    from ..models import LoginAttempt, UserDevice
+
+    now = timezone.now()
+    history_limit = int(_config().get('FEATURE_HISTORY_LIMIT', 500))
+    recent = list(
+        LoginAttempt.objects
+        .filter(user=user, status='success', timestamp__gte=now - timedelta(days=30))
+        .order_by('-timestamp')
+        .values_list('timestamp', 'user_agent')[:history_limit]
+    )
+    agent_cutoff = now - timedelta(days=7)
+    agents = []
+    for timestamp, agent in recent:
+        if timestamp >= agent_cutoff and agent and agent not in agents:
+            agents.append(agent)
+
+    return {
+        'devices': list(UserDevice.objects.filter(user=user).values_list('fingerprint', flat=True)),
+        'hours': sorted({timestamp.hour for timestamp, _ in recent}),
+        'agents': agents[:int(_config().get('FEATURE_MAX_AGENTS', 50))],
+    }
+
+
+def get_user_features(user) -> Dict:
+    """Cached feature snapshot for ``user``; built on the first login."""
+    key = FEATURES_KEY.format(user_id=user.pk)
+    features = cache.get(key)
+    if features is None:
+        features = refresh_user_features(user)
+    return features
+
+
+def refresh_user_features(user) -> Dict:
+    """Rebuild and cache the snapshot (called by enrichment after a login)."""
+    features = build_user_features(user)
+    cache.set(FEATURES_KEY.format(user_id=user.pk), features, _config().get('FEATURE_TTL_SECONDS', 86400))
+    return features
+
+
+def get_ip_failures(ip_address: str) -> int:
+    """Failed logins seen from ``ip_address`` in the current 24h window."""
+    if not ip_address:
+        return 0
+    return cache.get(IP_FAILURES_KEY.format(ip=ip_address), 0)
+
+
+def record_ip_failure(ip_address: str):
+    if not ip_address:
+        return
+    key = IP_FAILURES_KEY.format(ip=ip_address)
+    cache.add(key, 0, 86400)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, 86400)
+
+
+# ==============================================================================
+# ENRICHMENT DISPATCH
+# ==============================================================================
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(_config().get('THREAD_WORKERS', 4)),
+                thread_name_prefix='login-risk',
+            )
+    return _executor
+
+
+def _run_enrichment(attempt_id: int, fast_suspicious: bool):
+    from .security_service import SecurityService
+
+    try:
+        SecurityService().enrich_login_attempt(attempt_id, fast_suspicious=fast_suspicious)
+    except Exception as e:
+        logger.error(f"Login risk enrichment failed for attempt {attempt_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def _dispatch(attempt_id: int, fast_suspicious: bool, mode: str):
+    if mode == 'celery':
+        from ..tasks.login_risk_tasks import enrich_login_attempt
+        try:
+            enrich_login_attempt.delay(attempt_id, fast_suspicious)
+            return
+        except Exception as e:
+            # A broker outage must not drop enrichment; run it here instead
+            logger.warning(f"Could not queue login risk enrichment, using a local thread: {e}")
+    _get_executor().submit(_run_enrichment, attempt_id, fast_suspicious)
+
+
+def schedule_enrichment(service, attempt, fast_suspicious: bool, mode: Optional[str] = None):
+    """
+    Run the enrichment stage for a saved ``attempt``.
+
+    Deferred modes are queued after the surrounding transaction commits,
+    so the worker always sees the attempt row.
+    """
+    mode = mode or enrichment_mode()
+    if mode == 'inline':
+        service.enrich_login_attempt(attempt, fast_suspicious=fast_suspicious)
+        return
+    attempt_id = attempt.pk
+    transaction.on_commit(lambda: _dispatch(attempt_id, fast_suspicious, mode))
+
+
+# ==============================================================================
+# ESCALATION
+# ==============================================================================
+
+def escalate_session(user, attempt) -> Dict:
+    """
+    Flag a login that enrichment judged suspicious after it was let through.
+
+    Returns:
+        The escalation record, including how many refresh tokens were revoked.
+    """
+    config = _config()
+    escalation = {
+        'attempt_id': attempt.pk,
+        'threat_score': attempt.threat_score,
+        'suspicious_factors': attempt.suspicious_factors,
+        'escalated_at': timezone.now().isoformat(),
+        # Access tokens issued at or before this are rejected
+        'escalated_ts': time.time(),
+        'revoked_tokens': 0,
+        'revoked_drf_token': False,
+    }
+    if config.get('REVOKE_ON_ESCALATION', True):
+        escalation['revoked_tokens'] = _revoke_login_tokens(user, attempt)
+        escalation['revoked_drf_token'] = _revoke_drf_token(user)
+
+    cache.set(
+        ESCALATION_KEY.format(user_id=user.pk),
+        escalation,
+        config.get('ESCALATION_TTL_SECONDS', 3600),
+    )
+    logger.warning(
+        f"Escalated login {attempt.pk} for user {user.pk}: threat score "
+        f"{attempt.threat_score}, {escalation['revoked_tokens']} refresh token(s) revoked"
+    )
+    return escalation
+
+
+def _revoke_login_tokens(user, attempt) -> int:
+    """Blacklist refresh tokens issued since the login attempt."""
+    try:
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    except ImportError:
+        return 0
+
+    # Tokens are issued just after the attempt row is written; allow for
+    # clock skew between app servers.
+    issued_after = attempt.timestamp - timedelta(seconds=_config().get('TOKEN_SKEW_SECONDS', 5))
+    revoked = 0
+    for token in OutstandingToken.objects.filter(user=user, created_at__gte=issued_after):
+        _, created = BlacklistedToken.objects.get_or_create(token=token)
+        revoked += int(created)
+    return revoked
+
+
+def _revoke_drf_token(user) -> bool:
+    """Delete the DRF ``Token`` the login view hands out alongside the JWTs."""
+    try:
+        from rest_framework.authtoken.models import Token
+    except ImportError:
+        return False
+    deleted, _ = Token.objects.filter(user=user).delete()
+    return bool(deleted)
+
+
+def is_token_escalated(user, issued_at) -> bool:
+    """True if a token issued at ``issued_at`` (epoch seconds) predates an escalation."""
+    escalation = get_login_escalation(user)
+    return bool(escalation) and issued_at is not None and issued_at <= escalation.get('escalated_ts', 0)
+
+
+def get_login_escalation(user) -> Optional[Dict]:
+    """The pending escalation for ``user``, if enrichment raised one."""
+    return cache.get(ESCALATION_KEY.format(user_id=user.pk))
+
+
+def clear_login_escalation(user):
+    """Drop the marker once the user has re-authenticated or been reviewed."""
+    cache.delete(ESCALATION_KEY.format(user_id=user.pk))
+
+
+# ==============================================================================
+# BENCHMARK
+# ==============================================================================
+
+def _percentiles(samples) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'p50_ms': statistics.median(ordered) * 1e3,
+        'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e3,
+    }
+
+
+def benchmark_login_latency(service, user, request, iterations: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Time ``analyze_login_attempt`` with enrichment inline and deferred.
+
+    "inline" is both stages on the request, which costs more than the old
+    single-phase analysis did (the fast path's work is not reused);
+    "deferred" is the fast path alone. Call this inside a transaction that
+    is rolled back afterwards. Every call writes a LoginAttempt, and the
+    deferred jobs queued with on_commit are then discarded rather than run.
+    """
+    results = {}
+    original_mode = service.enrichment_mode
+    try:
+        for mode in ('inline', 'thread'):
+            service.enrichment_mode = mode
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                service.analyze_login_attempt(user, request, is_successful=True)
+                samples.append(time.perf_counter() - started)
+            results['inline' if mode == 'inline' else 'deferred'] = _percentiles(samples)
+    finally:
+        service.enrichment_mode = original_mode
+    return results
@@ -10,11 +10,18 @@ and predicts attacker guessing strategies.
 import hashlib
 import re
 import logging
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from typing import Iterable, List, Dict, Tuple, Optional
+from dataclasses import dataclass, field
 from collections import Counter
 import math
 
+from security.services.pattern_dictionary import (
+    PatternDictionary,
+    PatternMatch,
+    get_pattern_dictionary,
+    leet_readings,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +37,8 @@ class PatternFingerprint:
     mutations: List[str]
     keyboard_patterns: List[str]
     date_patterns: List[str]
+    # Dictionary matches with their spans; empty on the zero-knowledge path.
+    pattern_matches: List[PatternMatch] = field(default_factory=list)
 
     # Aliases so legacy callers / tests can treat this as a mapping.
     _ALIASES = {
@@ -125,10 +134,52 @@ class PatternAnalysisEngine:
         r'20\d{2}',           # 20XX year
     ]
     
-    def __init__(self):
-        """Initialize the pattern analysis engine."""
+    def __init__(self, dictionary: Optional[PatternDictionary] = None):
+        """
+        Initialize the pattern analysis engine.
+
+        Args:
+            dictionary: Compiled pattern dictionary to match against. By
+                default the one built by ``manage.py pattern_dictionary``,
+                or the built-in lists below if none has been built.
+        """
         self.common_base_words_set = set(self.COMMON_BASE_WORDS)
         self.keyboard_patterns_set = set(self.KEYBOARD_PATTERNS)
+        self.leet_readings = leet_readings(self.LEET_MAPPINGS)
+        self._dictionary = dictionary
+        self._builtin_dictionary: Optional[PatternDictionary] = None
+
+    @classmethod
+    def builtin_patterns(cls) -> Iterable[Tuple[str, str]]:
+        """The built-in lists as ``(pattern, category)`` dictionary entries."""
+        for word in cls.COMMON_BASE_WORDS:
+            yield word, 'word'
+        for pattern in cls.KEYBOARD_PATTERNS:
+            yield pattern, 'keyboard'
+
+    @property
+    def dictionary(self) -> PatternDictionary:
+        """The pattern dictionary in use."""
+        if self._dictionary is not None:
+            return self._dictionary
+        shared = get_pattern_dictionary()
+        if shared is not None:
+            return shared
+        if self._builtin_dictionary is None:
+            self._builtin_dictionary = PatternDictionary.from_patterns(self.builtin_patterns())
+        return self._builtin_dictionary
+
+    def find_pattern_matches(self, password: str) -> List[PatternMatch]:
+        """
+        Find every dictionary pattern in the password, leet variants included.
+
+        Args:
+            password: The password to analyze
+
+        Returns:
+            Matches with their character spans, ordered by position
+        """
+        return self.dictionary.find(password.lower(), self.leet_readings)
     
     def extract_structure_fingerprint(self, password: str) -> bytes:
         """
@@ -170,15 +221,18 @@ class PatternAnalysisEngine:
         # Calculate entropy
         entropy = self._calculate_entropy(password)
         
+        # Match the pattern dictionary once for words and keyboard walks
+        matches = self.find_pattern_matches(password)
+
         # Detect base words
-        base_words = self._detect_base_words(password)
+        base_words = self._detect_base_words(password, matches)
         has_dictionary_base = len(base_words) > 0
         
         # Detect mutations
         mutations = self._detect_mutations(password)
         
         # Detect keyboard patterns
-        keyboard_patterns = self._detect_keyboard_patterns(password)
+        keyboard_patterns = self._detect_keyboard_patterns(password, matches)
         
         # Detect date patterns
         date_patterns = self._detect_date_patterns(password)
@@ -196,6 +250,7 @@ class PatternAnalysisEngine:
             mutations=[m.mutation_type for m in mutations],
             keyboard_patterns=keyboard_patterns,
             date_patterns=date_patterns,
+            pattern_matches=matches,
         )
     
     def calculate_similarity_score(
@@ -388,19 +443,32 @@ class PatternAnalysisEngine:
         # Scale by length for bits of entropy
         return entropy * length
     
-    def _detect_base_words(self, password: str) -> List[str]:
-        """Detect dictionary base words in the password."""
+    def _detect_base_words(
+        self,
+        password: str,
+        matches: Optional[List[PatternMatch]] = None
+    ) -> List[str]:
+        """Detect dictionary base words (and names), leet variants included."""
+        if matches is None:
+            matches = self.find_pattern_matches(password)
+        words = [
+            m for m in matches
+            if 'word' in m.categories or 'name' in m.categories
+        ]
+        return self._outermost_patterns(words)
+    
+    @staticmethod
+    def _outermost_patterns(matches: List[PatternMatch]) -> List[str]:
+        """Patterns of matches not inside a longer match, in order, deduplicated."""
         detected = []
-        password_lower = password.lower()
-        
-        # Normalize leet speak
-        normalized = self._normalize_leet(password_lower)
-        
-        # Check for common base words
-        for word in self.COMMON_BASE_WORDS:
-            if word in password_lower or word in normalized:
-                detected.append(word)
-        
+        for match in matches:
+            inside_longer = any(
+                other.start <= match.start and match.end <= other.end
+                and other.end - other.start > match.end - match.start
+                for other in matches
+            )
+            if not inside_longer and match.pattern not in detected:
+                detected.append(match.pattern)
         return detected
     
     def _normalize_leet(self, text: str) -> str:
@@ -457,16 +525,19 @@ class PatternAnalysisEngine:
         
         return mutations
     
-    def _detect_keyboard_patterns(self, password: str) -> List[str]:
-        """Detect keyboard walk patterns."""
-        detected = []
-        password_lower = password.lower()
-        
-        for pattern in self.KEYBOARD_PATTERNS:
-            if pattern in password_lower:
-                detected.append(pattern)
-        
-        return detected
+    def _detect_keyboard_patterns(
+        self,
+        password: str,
+        matches: Optional[List[PatternMatch]] = None
+    ) -> List[str]:
+        """Detect keyboard walk patterns (typed as-is, not leet variants)."""
+        if matches is None:
+            matches = self.find_pattern_matches(password)
+        walks = [
+            m for m in matches
+            if 'keyboard' in m.categories and not m.leet
+        ]
+        return self._outermost_patterns(walks)
     
     def _detect_date_patterns(self, password: str) -> List[str]:
         """Detect date patterns in the password."""
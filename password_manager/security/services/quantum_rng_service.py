@@ -16,12 +16,14 @@ import uuid
 import hashlib
 import logging
 import asyncio
+import threading
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
+from collections import deque
 import json
 import base64
 import hmac
@@ -513,33 +515,266 @@ class FallbackCryptoProvider(QuantumRNGProvider):
         return True
 
 
+@dataclass
+class EntropySegment:
+    """Provenance of a contiguous run of bytes in the entropy store."""
+    length: int
+    provider: QuantumProvider
+    circuit_id: Optional[str]
+    expires_at: float
+
+
+class EntropyRingBuffer:
+    """
+    Fixed-capacity in-process byte ring for the entropy pool.
+
+    Bytes live in one preallocated ``bytearray``; reads and writes copy
+    slices under a short ``threading.Lock`` and never wait on I/O. A deque
+    of ``EntropySegment`` records which provider produced each run of bytes
+    so certificates can name the source. Consumed bytes are zeroed.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._head = 0
+        self._size = 0
+        self._segments: deque = deque()
+        self._lock = threading.Lock()
+
+    def write(
+        self,
+        data: bytes,
+        provider: QuantumProvider,
+        circuit_id: Optional[str],
+        expires_at: float
+    ) -> int:
+        """Append ``data`` (truncated to free space); return bytes stored."""
+        with self._lock:
+            n = min(len(data), self.capacity - self._size)
+            if n <= 0:
+                return 0
+            tail = (self._head + self._size) % self.capacity
+            first = min(n, self.capacity - tail)
+            self._buffer[tail:tail + first] = data[:first]
+            self._buffer[:n - first] = data[first:n]
+            self._size += n
+            self._segments.append(EntropySegment(n, provider, circuit_id, expires_at))
+            return n
+
+    def _consume(self, n: int) -> bytes:
+        first = min(n, self.capacity - self._head)
+        out = bytes(self._buffer[self._head:self._head + first]) + bytes(self._buffer[:n - first])
+        self._buffer[self._head:self._head + first] = bytes(first)
+        self._buffer[:n - first] = bytes(n - first)
+        self._head = (self._head + n) % self.capacity
+        self._size -= n
+        return out
+
+    def read(self, count: int) -> Tuple[bytes, List[EntropySegment]]:
+        """
+        Take up to ``count`` bytes, skipping expired segments.
+
+        Returns:
+            Tuple of (bytes, segments the bytes came from)
+        """
+        now = time.time()
+        out = bytearray()
+        used: List[EntropySegment] = []
+        with self._lock:
+            while len(out) < count and self._segments:
+                segment = self._segments[0]
+                if segment.expires_at <= now:
+                    self._consume(segment.length)
+                    self._segments.popleft()
+                    continue
+                n = min(count - len(out), segment.length)
+                out += self._consume(n)
+                used.append(segment)
+                if n == segment.length:
+                    self._segments.popleft()
+                else:
+                    segment.length -= n
+        return bytes(out), used
+
+    def available(self) -> int:
+        with self._lock:
+            return self._size
+
+    def segment_count(self) -> int:
+        with self._lock:
+            return len(self._segments)
+
+    def clear(self):
+        with self._lock:
+            self._buffer[:] = bytes(self.capacity)
+            self._head = 0
+            self._size = 0
+            self._segments.clear()
+
+
+class RedisEntropyStore:
+    """
+    Redis list of sealed entropy segments shared by every worker process.
+
+    Each entry is one provider fetch, encrypted with CryptoService before
+    it leaves the process. ``LPOP`` hands a segment to exactly one reader;
+    an unused remainder is sealed again and pushed back to the head.
+    """
+
+    ENCRYPTION_CONTEXT = 'quantum-entropy-pool'
+
+    def __init__(self, key: str, capacity: int, redis_cache_alias: str = 'default'):
+        from django_redis import get_redis_connection
+        self.capacity = capacity
+        self._key = key
+        self._size_key = f'{key}:bytes'
+        self._redis = get_redis_connection(redis_cache_alias)
+
+    def _seal(self, data: bytes, segment: EntropySegment) -> Optional[str]:
+        from security.services.crypto_service import CryptoService
+
+        payload = json.dumps({
+            'data': base64.b64encode(data).decode('ascii'),
+            'provider': segment.provider.value,
+            'circuit_id': segment.circuit_id,
+            'expires_at': segment.expires_at,
+        })
+        return CryptoService.encrypt_data(payload, user_id=self.ENCRYPTION_CONTEXT)
+
+    def _unseal(self, entry) -> Optional[Tuple[bytes, EntropySegment]]:
+        from security.services.crypto_service import CryptoService
+
+        if isinstance(entry, bytes):
+            entry = entry.decode('utf-8')
+        payload = CryptoService.decrypt_data(entry, user_id=self.ENCRYPTION_CONTEXT)
+        if payload is None:
+            return None
+        record = json.loads(payload)
+        data = base64.b64decode(record['data'])
+        return data, EntropySegment(
+            len(data), QuantumProvider(record['provider']), record['circuit_id'], record['expires_at']
+        )
+
+    def write(
+        self,
+        data: bytes,
+        provider: QuantumProvider,
+        circuit_id: Optional[str],
+        expires_at: float
+    ) -> int:
+        n = min(len(data), self.capacity - self.available())
+        if n <= 0:
+            return 0
+        entry = self._seal(data[:n], EntropySegment(n, provider, circuit_id, expires_at))
+        if entry is None:
+            return 0
+        pipe = self._redis.pipeline()
+        pipe.rpush(self._key, entry)
+        pipe.incrby(self._size_key, n)
+        pipe.execute()
+        return n
+
+    def read(self, count: int) -> Tuple[bytes, List[EntropySegment]]:
+        now = time.time()
+        out = bytearray()
+        used: List[EntropySegment] = []
+        while len(out) < count:
+            entry = self._redis.lpop(self._key)
+            if entry is None:
+                break
+            unsealed = self._unseal(entry)
+            if unsealed is None:
+                continue
+            data, segment = unsealed
+            self._redis.decrby(self._size_key, len(data))
+            if segment.expires_at <= now:
+                continue
+            n = min(count - len(out), len(data))
+            out += data[:n]
+            segment.length = n
+            used.append(segment)
+            if n < len(data):
+                rest = data[n:]
+                remainder = self._seal(rest, EntropySegment(
+                    len(rest), segment.provider, segment.circuit_id, segment.expires_at
+                ))
+                if remainder is not None:
+                    pipe = self._redis.pipeline()
+                    pipe.lpush(self._key, remainder)
+                    pipe.incrby(self._size_key, len(rest))
+                    pipe.execute()
+        return bytes(out), used
+
+    def available(self) -> int:
+        return max(0, int(self._redis.get(self._size_key) or 0))
+
+    def segment_count(self) -> int:
+        return int(self._redis.llen(self._key))
+
+    def clear(self):
+        self._redis.delete(self._key, self._size_key)
+
+
+REFILL_MODES = ('thread', 'celery', 'none')
+
+
 class QuantumEntropyPool:
     """
     Pre-fetched quantum entropy pool for low-latency password generation.
     
     Maintains a buffer of quantum random bytes that can be consumed
-    immediately without waiting for API calls.
+    immediately without waiting for API calls. Reads only copy bytes out of
+    the store; when the pool drops below ``min_pool_size`` (low watermark)
+    a background refill tops it up to ``max_pool_size`` (high watermark),
+    fetching from all quantum providers concurrently. A read the pool cannot
+    cover is completed with ``os.urandom`` and certified as fallback.
+    
+    With ``use_redis`` the bytes live in a Redis list shared by every
+    worker, and refills can run as a Celery task instead of a thread.
     """
     
+    POOL_KEY = 'quantum:entropy-pool'
+    REFILL_LOCK_KEY = 'quantum:entropy-pool:refill-lock'
+    REFILL_LOCK_TTL = 60
+    
+    # Pause after a refill round in which every provider failed
+    REFILL_BACKOFF_SECONDS = 30.0
+    
     def __init__(
         self,
         min_pool_size: int = 1024,
         max_pool_size: int = 4096,
         batch_size: int = 512,
-        expiry_hours: int = 24
+        expiry_hours: int = 24,
+        provider_timeout: float = 10.0,
+        use_redis: bool = False,
+        redis_cache_alias: str = 'default',
+        refill_mode: str = 'thread'
     ):
+        if refill_mode not in REFILL_MODES:
+            raise ValueError(f"refill_mode must be one of {REFILL_MODES}, got {refill_mode!r}")
+        if not 0 <= min_pool_size <= max_pool_size:
+            raise ValueError("min_pool_size must be between 0 and max_pool_size")
+        
         self.min_pool_size = min_pool_size
         self.max_pool_size = max_pool_size
         self.batch_size = batch_size
         self.expiry_hours = expiry_hours
+        self.provider_timeout = provider_timeout
+        self.refill_mode = refill_mode
+        
+        self._store = self._create_store(use_redis, redis_cache_alias)
+        
+        # Background refill thread with its own event loop; provider HTTP
+        # clients stay bound to that loop instead of the request loops.
+        self._refill_wakeup = threading.Event()
+        self._refill_thread: Optional[threading.Thread] = None
+        self._refill_thread_lock = threading.Lock()
+        self._backoff_until = 0.0
         
-        self._pool: List[QuantumEntropyBatch] = []
-        self._total_available: int = 0
-        # ``_lock`` is created lazily per event-loop so that the singleton pool
-        # can be shared across multiple ``asyncio.run`` calls (tests rebuild
-        # the loop each time).
-        self._lock: Optional[asyncio.Lock] = None
-        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = self._empty_metrics()
         
         # Provider priority order (includes ocean wave and cosmic ray for entropy diversity)
         self._providers: List[QuantumRNGProvider] = [
@@ -550,17 +785,36 @@ class QuantumEntropyPool:
             self._get_cosmic_provider(),  # Cosmic Ray Muon
             FallbackCryptoProvider(),
         ]
-
-    def _get_lock(self) -> asyncio.Lock:
-        """Return a lock that is bound to the currently running event loop."""
-        try:
-            current_loop = asyncio.get_running_loop()
-        except RuntimeError:
-            current_loop = None
-        if self._lock is None or self._lock_loop is not current_loop:
-            self._lock = asyncio.Lock()
-            self._lock_loop = current_loop
-        return self._lock
+        self._providers = [p for p in self._providers if p is not None]
+    
+    def _create_store(self, use_redis: bool, redis_cache_alias: str):
+        """Create the byte store, falling back to local memory."""
+        if use_redis:
+            try:
+                return RedisEntropyStore(self.POOL_KEY, self.max_pool_size, redis_cache_alias)
+            except Exception as e:
+                logger.warning(f"Redis entropy pool unavailable, using local memory: {e}")
+        return EntropyRingBuffer(self.max_pool_size)
+    
+    @property
+    def store_type(self) -> str:
+        return 'redis' if isinstance(self._store, RedisEntropyStore) else 'local'
+    
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        return {
+            'requests': 0,
+            'bytes_served': 0,
+            'starved_requests': 0,
+            'starved_bytes': 0,
+            'refills': 0,
+            'refilled_bytes': 0,
+            'total_refill_time': 0.0,
+            'last_refill_latency_ms': 0.0,
+            'refills_scheduled': 0,
+            'provider_failures': {},
+            'provider_timeouts': {},
+        }
     
     def _get_ocean_provider(self):
         """Lazy import of ocean provider to avoid circular imports."""
@@ -584,100 +838,172 @@ class QuantumEntropyPool:
         """
         Get random bytes from the pool.
         
+        Never waits on a provider: a shortfall is filled from os.urandom and
+        the certificate then names the cryptographic fallback.
+        
         Returns:
             Tuple of (random_bytes, certificate)
         """
-        async with self._get_lock():
-            # Refill if needed
-            if self._total_available < count:
-                await self._refill_pool()
-            
-            # Extract bytes from pool
-            result_bytes = bytearray()
-            certificate_id = str(uuid.uuid4())
-            provider_used = None
-            circuit_id = None
-            
-            while len(result_bytes) < count and self._pool:
-                batch = self._pool[0]
-                
-                # Skip expired batches
-                if batch.is_expired():
-                    self._pool.pop(0)
-                    self._total_available -= len(batch.entropy_bytes)
-                    continue
-                
-                needed = count - len(result_bytes)
-                available = len(batch.entropy_bytes)
-                
-                if available <= needed:
-                    # Use entire batch
-                    result_bytes.extend(batch.entropy_bytes)
-                    provider_used = batch.provider
-                    circuit_id = batch.circuit_id
-                    self._pool.pop(0)
-                    self._total_available -= available
-                else:
-                    # Use partial batch
-                    result_bytes.extend(batch.entropy_bytes[:needed])
-                    batch.entropy_bytes = batch.entropy_bytes[needed:]
-                    provider_used = batch.provider
-                    circuit_id = batch.circuit_id
-                    self._total_available -= needed
-            
-            # Generate certificate
-            password_hash = hashlib.sha256(bytes(result_bytes)).hexdigest()
-            certificate = self._create_certificate(
-                certificate_id=certificate_id,
-                password_hash=password_hash,
-                provider=provider_used or QuantumProvider.FALLBACK,
-                entropy_bits=len(result_bytes) * 8,
-                circuit_id=circuit_id
-            )
-            
-            return bytes(result_bytes), certificate
+        try:
+            result_bytes, segments = self._store.read(count)
+        except Exception as e:
+            logger.error(f"Entropy pool read failed: {e}")
+            result_bytes, segments = b'', []
+        
+        shortfall = count - len(result_bytes)
+        if shortfall > 0:
+            result_bytes += os.urandom(shortfall)
+        
+        with self._metrics_lock:
+            self._metrics['requests'] += 1
+            self._metrics['bytes_served'] += count
+            if shortfall > 0:
+                self._metrics['starved_requests'] += 1
+                self._metrics['starved_bytes'] += shortfall
+        
+        self._maybe_schedule_refill()
+        
+        if shortfall > 0 or not segments:
+            provider_used, circuit_id = QuantumProvider.FALLBACK, None
+        else:
+            provider_used, circuit_id = segments[-1].provider, segments[-1].circuit_id
+        
+        password_hash = hashlib.sha256(result_bytes).hexdigest()
+        certificate = self._create_certificate(
+            certificate_id=str(uuid.uuid4()),
+            password_hash=password_hash,
+            provider=provider_used,
+            entropy_bits=len(result_bytes) * 8,
+            circuit_id=circuit_id
+        )
+        
+        return result_bytes, certificate
+    
+    def level(self) -> int:
+        """Bytes currently in the pool."""
+        try:
+            return self._store.available()
+        except Exception as e:
+            logger.error(f"Entropy pool size check failed: {e}")
+            return 0
+    
+    # ==========================================================================
+    # REFILL
+    # ==========================================================================
     
-    async def _refill_pool(self):
-        """Refill the entropy pool from quantum sources."""
-        target_size = self.max_pool_size - self._total_available
+    async def refill(self) -> int:
+        """
+        Top the pool up to ``max_pool_size`` from the quantum providers.
+        
+        All available providers are queried concurrently, each for an equal
+        share and bounded by ``provider_timeout``. Results are stored in
+        provider priority order. The cryptographic fallback is never pooled.
         
-        for provider in self._providers:
-            if not provider.is_available():
+        Returns:
+            Number of bytes added
+        """
+        needed = self.max_pool_size - self.level()
+        if needed <= 0:
+            return 0
+        
+        providers = [
+            p for p in self._providers
+            if not isinstance(p, FallbackCryptoProvider) and p.is_available()
+        ]
+        if not providers:
+            return 0
+        
+        share = min(self.batch_size, -(-needed // len(providers)))
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(asyncio.wait_for(p.fetch_random_bytes(share), self.provider_timeout) for p in providers),
+            return_exceptions=True
+        )
+        
+        added = 0
+        expires_at = time.time() + self.expiry_hours * 3600
+        for provider, result in zip(providers, results):
+            _name = provider.get_provider_name()
+            name = _name.value if hasattr(_name, 'value') else str(_name)
+            if isinstance(result, BaseException):
+                key = 'provider_timeouts' if isinstance(result, asyncio.TimeoutError) else 'provider_failures'
+                with self._metrics_lock:
+                    self._metrics[key][name] = self._metrics[key].get(name, 0) + 1
+                logger.warning(f"Provider {name} failed: {result!r}")
                 continue
-            
+            entropy_bytes, circuit_id = result
+            # The cosmic-ray and ocean-wave providers name themselves with
+            # the bare enum value; segments always carry the enum.
+            stored = self._store.write(entropy_bytes, QuantumProvider(name), circuit_id, expires_at)
+            added += stored
+            if stored:
+                logger.info(f"Refilled pool with {stored} bytes from {name}")
+        
+        elapsed = time.perf_counter() - started
+        with self._metrics_lock:
+            self._metrics['refills'] += 1
+            self._metrics['refilled_bytes'] += added
+            self._metrics['total_refill_time'] += elapsed
+            self._metrics['last_refill_latency_ms'] = elapsed * 1000
+        return added
+    
+    def _maybe_schedule_refill(self):
+        """Wake the refill worker (or queue the Celery task) below the low watermark."""
+        if self.refill_mode == 'none' or self.level() >= self.min_pool_size:
+            return
+        
+        if self.refill_mode == 'thread':
+            with self._refill_thread_lock:
+                if self._refill_thread is None or not self._refill_thread.is_alive():
+                    self._refill_thread = threading.Thread(
+                        target=self._refill_worker,
+                        name='quantum-entropy-refill',
+                        daemon=True
+                    )
+                    self._refill_thread.start()
+            self._refill_wakeup.set()
+        else:
+            # Debounce across workers: one queued refill per lock window
+            from django.core.cache import cache
+            if not cache.add(self.REFILL_LOCK_KEY, 1, self.REFILL_LOCK_TTL):
+                return
             try:
-                # Fetch batch
-                entropy_bytes, circuit_id = await provider.fetch_random_bytes(
-                    min(target_size, self.batch_size)
-                )
-                
-                # Create batch entry
-                batch = QuantumEntropyBatch(
-                    provider=provider.get_provider_name(),
-                    entropy_bytes=entropy_bytes,
-                    fetched_at=datetime.now(),
-                    certificate_id=str(uuid.uuid4()),
-                    circuit_id=circuit_id,
-                    expires_at=datetime.now() + timedelta(hours=self.expiry_hours)
-                )
-                
-                self._pool.append(batch)
-                self._total_available += len(entropy_bytes)
-                
-                _name = provider.get_provider_name()
-                _name_str = _name.value if hasattr(_name, "value") else str(_name)
-                logger.info(
-                    f"Refilled pool with {len(entropy_bytes)} bytes from {_name_str}"
-                )
-                
-                if self._total_available >= self.min_pool_size:
-                    break
-                    
+                from security.tasks import refill_quantum_entropy_pool
+                refill_quantum_entropy_pool.delay()
             except Exception as e:
-                _name = provider.get_provider_name()
-                _name_str = _name.value if hasattr(_name, "value") else str(_name)
-                logger.warning(f"Provider {_name_str} failed: {e}")
-                continue
+                cache.delete(self.REFILL_LOCK_KEY)
+                logger.error(f"Could not queue entropy pool refill: {e}")
+                return
+        
+        with self._metrics_lock:
+            self._metrics['refills_scheduled'] += 1
+    
+    def _refill_worker(self):
+        """Body of the refill thread: sleep until woken, then refill to the high watermark."""
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                self._refill_wakeup.wait()
+                self._refill_wakeup.clear()
+                delay = self._backoff_until - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                while self.level() < self.max_pool_size:
+                    try:
+                        added = loop.run_until_complete(self.refill())
+                    except Exception as e:
+                        logger.error(f"Background entropy refill failed: {e}")
+                        added = 0
+                    if added <= 0:
+                        self._backoff_until = time.time() + self.REFILL_BACKOFF_SECONDS
+                        break
+        finally:
+            loop.close()
+    
+    def release_refill_lock(self):
+        """Allow the next refill to be scheduled (called by the Celery task)."""
+        from django.core.cache import cache
+        cache.delete(self.REFILL_LOCK_KEY)
     
     def _create_certificate(
         self,
@@ -727,13 +1053,30 @@ class QuantumEntropyPool:
         )
     
     def get_pool_status(self) -> Dict:
-        """Get current pool status."""
+        """Get current pool status, including refill and starvation metrics."""
+        available = self.level()
+        try:
+            batch_count = self._store.segment_count()
+        except Exception:
+            batch_count = 0
+        with self._metrics_lock:
+            metrics = {
+                key: dict(value) if isinstance(value, dict) else value
+                for key, value in self._metrics.items()
+            }
         return {
-            "total_bytes_available": self._total_available,
-            "batch_count": len(self._pool),
+            "total_bytes_available": available,
+            "batch_count": batch_count,
             "min_pool_size": self.min_pool_size,
             "max_pool_size": self.max_pool_size,
-            "health": "good" if self._total_available >= self.min_pool_size else "low"
+            "health": "good" if available >= self.min_pool_size else "low",
+            "store": self.store_type,
+            "refill_mode": self.refill_mode,
+            "avg_refill_latency_ms": (
+                metrics['total_refill_time'] * 1000 / metrics['refills']
+                if metrics['refills'] else 0.0
+            ),
+            **metrics,
         }
 
 
@@ -838,11 +1181,36 @@ class QuantumPasswordGenerator:
 
 # Singleton instance
 _quantum_generator: Optional[QuantumPasswordGenerator] = None
+_quantum_generator_lock = threading.Lock()
+
+
+def _build_pool_from_settings() -> QuantumEntropyPool:
+    from django.conf import settings
+    config = getattr(settings, 'QUANTUM_ENTROPY_POOL_SETTINGS', {})
+    return QuantumEntropyPool(
+        min_pool_size=config.get('MIN_POOL_SIZE', 1024),
+        max_pool_size=config.get('MAX_POOL_SIZE', 4096),
+        batch_size=config.get('BATCH_SIZE', 512),
+        provider_timeout=config.get('PROVIDER_TIMEOUT', 10.0),
+        use_redis=config.get('USE_REDIS', False),
+        redis_cache_alias=config.get('REDIS_ALIAS', 'default'),
+        refill_mode=config.get('REFILL_MODE', 'thread'),
+    )
 
 
 def get_quantum_generator() -> QuantumPasswordGenerator:
-    """Get or create the quantum password generator singleton."""
+    """
+    Get or create the quantum password generator singleton.
+    
+    Its entropy pool is configured from settings.QUANTUM_ENTROPY_POOL_SETTINGS.
+    """
     global _quantum_generator
-    if _quantum_generator is None:
-        _quantum_generator = QuantumPasswordGenerator()
+    with _quantum_generator_lock:
+        if _quantum_generator is None:
+            _quantum_generator = QuantumPasswordGenerator(_build_pool_from_settings())
     return _quantum_generator
+
+
+def get_quantum_pool() -> QuantumEntropyPool:
+    """Get the entropy pool shared by the generator singleton."""
+    return get_quantum_generator().pool
@@ -0,0 +1,522 @@
+"""
+Relay Directory
+===============
+
+In-memory snapshot of the dark protocol node table used for path selection.
+
+``DarkProtocolService`` used to pick every hop with its own ORM queries
+(``exists()`` plus an ordered ``.first()`` per hop) and always took the
+single top-ranked node, so every new circuit landed on the same handful of
+nodes. The directory loads all live nodes with one query, groups them by
+node type, region and verified status, and selects hops by weighted random
+choice:
+
+- static weight: ``bandwidth_mbps * trust_score * uptime_percentage / 100``
+- load feedback: a weighted draw is accepted with probability
+  ``1 - circuits / max_circuits``, where ``circuits`` starts at the
+  snapshot's ``current_circuits`` and is kept current in-process through
+  ``record_circuits()``; full nodes are never chosen
+- region diversity: relay and destination hops avoid regions already on
+  the path, falling back to a repeated region only when nothing else is
+  available
+
+A draw is a bisect over precomputed cumulative weights, so building a path
+costs microseconds and no queries. Draws that keep hitting excluded nodes
+fall back to an exact weighted choice over the eligible ones.
+
+The snapshot is rebuilt every ``RELAY_DIRECTORY_REFRESH_SECONDS``, when a
+path comes up short, and whenever ``invalidate_relay_directory()`` has been
+called by any process (registration and status changes call it; the shared
+version key is checked every ``RELAY_DIRECTORY_VERSION_CHECK_SECONDS``).
+
+Usage:
+    from security.services.relay_directory import get_relay_directory
+
+    directory = get_relay_directory()
+    nodes = directory.select_path(hop_count=3, preferred_regions=['EU'])
+    directory.record_circuits(nodes, 1)
+"""
+
+import logging
+import random
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'dark_protocol:relay_directory:version'
+
+NODE_LIVENESS = timedelta(minutes=5)
+
+# Weighted draws tried before falling back to an exact scan of eligible nodes
+MAX_DRAWS = 32
+
+
+def _directory_settings() -> Dict:
+    config = getattr(settings, 'DARK_PROTOCOL', {})
+    return {
+        'refresh_seconds': float(config.get('RELAY_DIRECTORY_REFRESH_SECONDS', 30)),
+        'version_check_seconds': float(config.get('RELAY_DIRECTORY_VERSION_CHECK_SECONDS', 5)),
+        'miss_refresh_seconds': float(config.get('RELAY_DIRECTORY_MISS_REFRESH_SECONDS', 1)),
+        'min_trust': float(config.get('MIN_NODE_TRUST_SCORE', 0.3)),
+    }
+
+
+def node_weight(node) -> float:
+    """Static selection weight of a node before load feedback."""
+    return max(0.0, node.bandwidth_mbps * node.trust_score * node.uptime_percentage / 100.0)
+
+
+def load_live_nodes() -> List:
+    """Active nodes seen in the last five minutes, with their latest reachable latency."""
+    from django.db.models import OuterRef, Subquery
+
+    from ..models.dark_protocol_models import DarkProtocolNode, NetworkHealth
+
+    latest_latency = (
+        NetworkHealth.objects.filter(node=OuterRef('pk'), is_reachable=True)
+        .order_by('-checked_at')
+        .values('latency_ms')[:1]
+    )
+    return list(
+        DarkProtocolNode.objects.filter(
+            status='active',
+            last_seen_at__gt=timezone.now() - NODE_LIVENESS,
+        ).annotate(latest_latency_ms=Subquery(latest_latency))
+    )
+
+
+class _RelayPool:
+    """Nodes of one (type, region, verified) group with cumulative weights."""
+
+    __slots__ = ('nodes', 'cumulative', 'total')
+
+    def __init__(self, nodes: Sequence):
+        self.nodes = list(nodes)
+        self.cumulative = list(accumulate(node_weight(node) for node in self.nodes))
+        self.total = self.cumulative[-1] if self.cumulative else 0.0
+
+    def draw(self, rng: random.Random):
+        index = bisect_right(self.cumulative, rng.random() * self.total)
+        return self.nodes[min(index, len(self.nodes) - 1)]
+
+
+class RelaySnapshot:
+    """Immutable grouping of the live nodes at one point in time."""
+
+    def __init__(self, nodes: Iterable, min_trust: float):
+        self.built_at = time.monotonic()
+        self.nodes = [node for node in nodes if node_weight(node) > 0]
+        self.last_seen = {node.pk: node.last_seen_at.timestamp() for node in self.nodes}
+
+        grouped = defaultdict(list)
+        for node in self.nodes:
+            for verified in (False, True):
+                if verified and node.trust_score < min_trust:
+                    continue
+                grouped[(node.node_type, None, verified)].append(node)
+                grouped[(node.node_type, node.region, verified)].append(node)
+        self._pools = {key: _RelayPool(members) for key, members in grouped.items()}
+
+    def pool(self, node_type: str, region: Optional[str] = None, verified: bool = False) -> Optional[_RelayPool]:
+        return self._pools.get((node_type, region, verified))
+
+
+class RelayDirectory:
+    """
+    Process-wide relay directory with weighted, load-aware path selection.
+
+    ``loader`` returns the node objects to snapshot (``load_live_nodes`` by
+    default); the simulation benchmark passes unsaved nodes instead.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[], Iterable]] = None,
+        refresh_seconds: Optional[float] = None,
+        version_check_seconds: Optional[float] = None,
+        miss_refresh_seconds: Optional[float] = None,
+        min_trust: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+        use_shared_version: bool = True,
+    ):
+        config = _directory_settings()
+        self.loader = loader or load_live_nodes
+        self.refresh_seconds = config['refresh_seconds'] if refresh_seconds is None else refresh_seconds
+        self.version_check_seconds = (
+            config['version_check_seconds'] if version_check_seconds is None else version_check_seconds
+        )
+        self.miss_refresh_seconds = (
+            config['miss_refresh_seconds'] if miss_refresh_seconds is None else miss_refresh_seconds
+        )
+        self.min_trust = config['min_trust'] if min_trust is None else min_trust
+        self.rng = rng or random.SystemRandom()
+        self.use_shared_version = use_shared_version
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[RelaySnapshot] = None
+        self._circuits: Dict = {}
+        self._stale = True
+        self._version = None
+        self._next_version_check = 0.0
+
+    # =========================================================================
+    # Snapshot Management
+    # =========================================================================
+
+    def invalidate(self):
+        """Rebuild the snapshot on next use."""
+        self._stale = True
+
+    def refresh(self) -> RelaySnapshot:
+        """Reload the nodes and reset circuit counts to the stored values."""
+        with self._lock:
+            snapshot = RelaySnapshot(self.loader(), self.min_trust)
+            self._circuits = {node.pk: node.current_circuits for node in snapshot.nodes}
+            self._snapshot = snapshot
+            self._stale = False
+        logger.debug(f"Relay directory refreshed with {len(snapshot.nodes)} nodes")
+        return snapshot
+
+    def _shared_version_changed(self, now: float) -> bool:
+        if not self.use_shared_version or now < self._next_version_check:
+            return False
+        self._next_version_check = now + self.version_check_seconds
+        try:
+            version = cache.get(VERSION_CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Relay directory version check failed: {e}")
+            return False
+        changed = version != self._version
+        self._version = version
+        return changed
+
+    def snapshot(self) -> RelaySnapshot:
+        """The current snapshot, rebuilt first if it is stale."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        version_changed = self._shared_version_changed(now)
+        if (
+            snapshot is None
+            or self._stale
+            or version_changed
+            or now - snapshot.built_at >= self.refresh_seconds
+        ):
+            snapshot = self.refresh()
+        return snapshot
+
+    # =========================================================================
+    # Load Feedback
+    # =========================================================================
+
+    def record_circuits(self, nodes: Iterable, delta: int):
+        """Adjust the in-process circuit counts of ``nodes`` (or their pks) by ``delta``."""
+        circuits = self._circuits
+        for node in nodes:
+            pk = getattr(node, 'pk', node)
+            if pk is not None and pk in circuits:
+                circuits[pk] = max(0, circuits[pk] + delta)
+
+    def circuits(self, node) -> int:
+        return self._circuits.get(node.pk, node.current_circuits)
+
+    def _headroom(self, node) -> float:
+        if node.max_circuits <= 0:
+            return 0.0
+        return 1.0 - self._circuits.get(node.pk, node.current_circuits) / node.max_circuits
+
+    # =========================================================================
+    # Selection
+    # =========================================================================
+
+    def _eligible(self, node, snapshot, exclude, avoid_regions, seen_cutoff) -> bool:
+        return (
+            node.pk not in exclude
+            and node.region not in avoid_regions
+            and snapshot.last_seen[node.pk] > seen_cutoff
+        )
+
+    def _pick(
+        self,
+        snapshot: RelaySnapshot,
+        pools: List[_RelayPool],
+        exclude: set,
+        avoid_regions: set,
+        seen_cutoff: float,
+    ):
+        """Weighted, load-accepted draw from ``pools``; None if nothing is eligible."""
+        pools = [pool for pool in pools if pool is not None and pool.total > 0]
+        if not pools:
+            return None
+        rng = self.rng
+        if len(pools) == 1:
+            pool_cumulative = None
+        else:
+            pool_cumulative = list(accumulate(pool.total for pool in pools))
+
+        for _ in range(MAX_DRAWS):
+            if pool_cumulative is None:
+                pool = pools[0]
+            else:
+                index = bisect_right(pool_cumulative, rng.random() * pool_cumulative[-1])
+                pool = pools[min(index, len(pools) - 1)]
+            node = pool.draw(rng)
+            if (
+                self._eligible(node, snapshot, exclude, avoid_regions, seen_cutoff)
+                and rng.random() < self._headroom(node)
+            ):
+                return node
+
+        # Constraints rule out most of the weight: choose exactly among the rest
+        candidates, weights = [], []
+        seen = set()
+        for pool in pools:
+            for node in pool.nodes:
+                if node.pk in seen or not self._eligible(node, snapshot, exclude, avoid_regions, seen_cutoff):
+                    continue
+                seen.add(node.pk)
+                weight = node_weight(node) * self._headroom(node)
+                if weight > 0:
+                    candidates.append(node)
+                    weights.append(weight)
+        if not candidates:
+            return None
+        return rng.choices(candidates, weights=weights)[0]
+
+    def _build_path(
+        self,
+        snapshot: RelaySnapshot,
+        hop_count: int,
+        preferred_regions: Sequence[str],
+        require_verified: bool,
+        use_bridges: bool,
+    ) -> List:
+        seen_cutoff = time.time() - NODE_LIVENESS.total_seconds()
+        verified = bool(require_verified)
+
+        entry_type = 'entry'
+        if use_bridges and snapshot.pool('bridge', verified=verified) is not None:
+            entry_type = 'bridge'
+
+        entry = None
+        if preferred_regions:
+            entry = self._pick(
+                snapshot,
+                [snapshot.pool(entry_type, region, verified) for region in preferred_regions],
+                set(), set(), seen_cutoff,
+            )
+        if entry is None:
+            entry = self._pick(snapshot, [snapshot.pool(entry_type, None, verified)], set(), set(), seen_cutoff)
+        if entry is None:
+            return []
+
+        selected = [entry]
+        used = {entry.pk}
+        used_regions = {entry.region}
+
+        def pick_diverse(node_type):
+            pools = [snapshot.pool(node_type, None, verified)]
+            node = self._pick(snapshot, pools, used, used_regions, seen_cutoff)
+            if node is None:
+                # Fallback: allow a region already on the path
+                node = self._pick(snapshot, pools, used, set(), seen_cutoff)
+            if node is not None:
+                selected.append(node)
+                used.add(node.pk)
+                used_regions.add(node.region)
+
+        for _ in range(hop_count - 2):
+            pick_diverse('relay')
+        pick_diverse('destination')
+        return selected
+
+    def select_path(
+        self,
+        hop_count: int,
+        preferred_regions: Sequence[str] = (),
+        require_verified: bool = True,
+        use_bridges: bool = False,
+    ) -> List:
+        """
+        Select ``[entry, relay..., destination]`` for a path of ``hop_count`` hops.
+
+        Returns fewer nodes when the network cannot supply them; the caller
+        decides whether a short path is acceptable.
+        """
+        snapshot = self.snapshot()
+        args = (hop_count, preferred_regions or (), require_verified, use_bridges)
+        nodes = self._build_path(snapshot, *args)
+        if len(nodes) < hop_count and time.monotonic() - snapshot.built_at >= self.miss_refresh_seconds:
+            # Nodes may have registered since the snapshot was taken
+            nodes = self._build_path(self.refresh(), *args)
+        return nodes
+
+
+# =============================================================================
+# Simulation
+# =============================================================================
+
+def _synthetic_nodes(counts: Dict[str, int], regions: int, rng: random.Random) -> List:
+    from ..models.dark_protocol_models import DarkProtocolNode
+
+    now = timezone.now()
+    nodes = []
+    for node_type, count in counts.items():
+        for i in range(count):
+            nodes.append(DarkProtocolNode(
+                node_id=f'{node_type}-{i}',
+                fingerprint=f'{node_type}-{i}',
+                node_type=node_type,
+                status='active',
+                region=f'R{rng.randrange(regions)}',
+                bandwidth_mbps=rng.choice([50, 100, 100, 250, 1000]),
+                max_circuits=1000,
+                current_circuits=0,
+                trust_score=round(rng.uniform(0.5, 1.0), 2),
+                uptime_percentage=round(rng.uniform(90.0, 100.0), 1),
+                last_seen_at=now,
+            ))
+    return nodes
+
+
+def _top_ranked_path(nodes: List, circuits: Dict, hop_count: int) -> List:
+    """The previous selection rule: always the best-ranked eligible node."""
+    def best(candidates, by_load=True):
+        key = (
+            (lambda n: (-n.trust_score, -n.uptime_percentage, circuits[n.pk])) if by_load
+            else (lambda n: (-n.trust_score, -n.uptime_percentage))
+        )
+        return min(candidates, key=key, default=None)
+
+    entry = best(n for n in nodes if n.node_type == 'entry')
+    if entry is None:
+        return []
+    path, used_regions = [entry], {entry.region}
+    for _ in range(hop_count - 2):
+        relays = [n for n in nodes if n.node_type == 'relay' and n not in path]
+        relay = best((n for n in relays if n.region not in used_regions)) or best(relays, by_load=False)
+        if relay is not None:
+            path.append(relay)
+            used_regions.add(relay.region)
+    destination = best(n for n in nodes if n.node_type == 'destination' and n not in path)
+    if destination is not None:
+        path.append(destination)
+    return path
+
+
+def _load_spread(nodes: List, circuits: Dict, node_type: str) -> Dict:
+    members = [n for n in nodes if n.node_type == node_type]
+    loads = sorted((circuits[n.pk] for n in members), reverse=True)
+    total = sum(loads) or 1
+    return {
+        'nodes': len(members),
+        'nodes_used': sum(1 for load in loads if load),
+        'top_node_share': loads[0] / total if loads else 0.0,
+        'max_load_percent': 100.0 * loads[0] / members[0].max_circuits if loads else 0.0,
+        'full_nodes': sum(1 for n in members if circuits[n.pk] >= n.max_circuits),
+    }
+
+
+def simulate_sessions(
+    sessions: int = 10_000,
+    entries: int = 20,
+    relays: int = 200,
+    destinations: int = 20,
+    regions: int = 8,
+    hop_count: int = 3,
+    seed: int = 0,
+) -> Dict:
+    """
+    Establish ``sessions`` paths against a synthetic network, without a database.
+
+    Circuits are never closed, so nodes fill up. Returns timings and the
+    per-type load spread for the weighted directory and for the previous
+    top-ranked rule.
+    """
+    rng = random.Random(seed)
+    nodes = _synthetic_nodes(
+        {'entry': entries, 'relay': relays, 'destination': destinations}, regions, rng,
+    )
+    directory = RelayDirectory(
+        loader=lambda: nodes,
+        refresh_seconds=float('inf'),
+        miss_refresh_seconds=float('inf'),
+        min_trust=0.3,
+        rng=random.Random(seed),
+        use_shared_version=False,
+    )
+    directory.refresh()
+
+    short_paths = 0
+    started = time.perf_counter()
+    for _ in range(sessions):
+        path = directory.select_path(hop_count)
+        if len(path) < hop_count:
+            short_paths += 1
+        directory.record_circuits(path, 1)
+    weighted_seconds = time.perf_counter() - started
+    weighted_circuits = {n.pk: directory.circuits(n) for n in nodes}
+
+    # The previous rule scans every candidate per hop in memory here; in
+    # production each hop was also a database round trip.
+    baseline_circuits = {n.pk: 0 for n in nodes}
+    started = time.perf_counter()
+    for _ in range(sessions):
+        for node in _top_ranked_path(nodes, baseline_circuits, hop_count):
+            baseline_circuits[node.pk] += 1
+    baseline_seconds = time.perf_counter() - started
+
+    types = ('entry', 'relay', 'destination')
+    return {
+        'sessions': sessions,
+        'weighted': {
+            'us_per_path': weighted_seconds / sessions * 1e6,
+            'short_paths': short_paths,
+            'spread': {t: _load_spread(nodes, weighted_circuits, t) for t in types},
+        },
+        'top_ranked': {
+            'us_per_path': baseline_seconds / sessions * 1e6,
+            'spread': {t: _load_spread(nodes, baseline_circuits, t) for t in types},
+        },
+    }
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_relay_directory = None
+
+
+def get_relay_directory() -> RelayDirectory:
+    """Get the process-wide relay directory."""
+    global _relay_directory
+    if _relay_directory is None:
+        _relay_directory = RelayDirectory()
+    return _relay_directory
+
+
+def invalidate_relay_directory():
+    """
+    Make every process rebuild its relay directory.
+
+    Call after node membership or status changes (registration, going
+    inactive, maintenance). Heartbeats need not call it; they are picked up
+    by the periodic refresh.
+    """
+    if _relay_directory is not None:
+        _relay_directory.invalidate()
+    try:
+        if not cache.add(VERSION_CACHE_KEY, 1, timeout=None):
+            cache.incr(VERSION_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Could not publish relay directory version: {e}")
@@ -4,8 +4,6 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db.models import Q, Count
 from django.db import transaction
-import requests
-import ipaddress
 import json
 import logging
 from datetime import timedelta
@@ -16,8 +14,10 @@ from ..models import (
     UserNotificationSettings, SecurityAlert, AccountLockEvent,
     Notification
 )
-from shared.circuit_breaker import ipinfo_breaker, CircuitBreakerOpen
+from shared.geoip import get_geoip_service
 from .duress_code_service import get_duress_code_service
+from .ip_reputation import is_ip_blacklisted
+from . import login_risk
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +29,9 @@ class SecurityService:
         self.max_failed_attempts = getattr(settings, 'MAX_FAILED_ATTEMPTS', 5)
         self.lockout_duration_minutes = getattr(settings, 'LOCKOUT_DURATION_MINUTES', 30)
         self.suspicious_threshold = getattr(settings, 'SUSPICIOUS_THRESHOLD', 3)
-        self.geo_db_path = getattr(settings, 'GEOIP_PATH', None)
         self._duress_service = None
+        # None follows LOGIN_RISK_SETTINGS['ENRICHMENT_MODE']
+        self.enrichment_mode = None
 
     @staticmethod
     def _get_user_notification_settings(user):
@@ -138,6 +139,10 @@ class SecurityService:
         """
         Analyzes a login attempt and calculates a risk score
         Returns a LoginAttempt object with risk assessment
+
+        Only the fast-path score runs here; geolocation, full scoring,
+        device bookkeeping and alerts run in ``enrich_login_attempt``
+        (see security.services.login_risk).
         """
         try:
             ip_address, _ = get_client_ip(request)
@@ -161,84 +166,145 @@ class SecurityService:
                 user_agent=user_agent_string,
                 status='success' if is_successful else 'failed',
                 failure_reason=failure_reason or '',
-                is_suspicious=False,  # Will be set after risk calculation
-                threat_score=0  # Will be set after risk calculation
             )
-            
-            # Get geolocation from IP if available
-            try:
-                location_data = self._get_location_from_ip(ip_address)
-                if location_data:
-                    attempt.location = f"{location_data.get('city', '')}, {location_data.get('country', '')}"
-            except Exception as e:
-                logger.error(f"Error getting location data: {e}")
-                attempt.location = "Unknown Location"
-            
-            # Calculate risk score and identify suspicious factors
-            risk_data = self._calculate_risk_score(user, attempt, user_agent)
+
+            risk_data = self._fast_risk_score(user, attempt, user_agent)
             attempt.threat_score = risk_data['risk_score']
             attempt.suspicious_factors = risk_data['suspicious_factors']
             attempt.is_suspicious = attempt.threat_score >= 80
-            
-            # Save the attempt
             attempt.save()
-            
-            # Handle new device registration for successful logins
-            if is_successful and user:
-                self._handle_device_registration(user, request, user_agent, ip_address)
-            
-            # Take action if suspicious
-            if attempt.is_suspicious:
-                if is_successful:
-                    self.handle_suspicious_login(user, attempt)
-                else:
-                    self.handle_failed_login_attempt(user, attempt)
-            
+
+            if not is_successful:
+                login_risk.record_ip_failure(ip_address)
+
+            login_risk.schedule_enrichment(
+                self, attempt, fast_suspicious=attempt.is_suspicious, mode=self.enrichment_mode
+            )
             return attempt
             
         except Exception as e:
             logger.error(f"Error analyzing login attempt: {str(e)}")
             raise
+
+    def enrich_login_attempt(self, attempt, fast_suspicious=False):
+        """
+        Second phase of login analysis, run off the authentication request.
+
+        Geolocates the attempt, replaces the fast-path score with the full
+        one, registers the device and raises alerts. Any successful login the
+        full score finds suspicious is escalated back to its session, whatever
+        the fast path decided: the login view gates on the fast verdict, but
+        other sign-in paths do not.
+
+        Args:
+            attempt: LoginAttempt or its primary key
+            fast_suspicious: Verdict of the fast path (logged)
+        """
+        if not isinstance(attempt, LoginAttempt):
+            attempt = LoginAttempt.objects.select_related('user').filter(pk=attempt).first()
+            if attempt is None:
+                return None
+        user = attempt.user
+        user_agent = user_agents.parse(attempt.user_agent or '')
+
+        # Get geolocation from IP if available
+        try:
+            location_data = self._get_location_from_ip(attempt.ip_address)
+            if location_data:
+                attempt.location = f"{location_data.get('city', '')}, {location_data.get('country', '')}"
+        except Exception as e:
+            logger.error(f"Error getting location data: {e}")
+            attempt.location = "Unknown Location"
+
+        # Calculate risk score and identify suspicious factors
+        risk_data = self._calculate_risk_score(user, attempt, user_agent)
+        attempt.threat_score = risk_data['risk_score']
+        attempt.suspicious_factors = risk_data['suspicious_factors']
+        attempt.is_suspicious = attempt.threat_score >= 80
+        attempt.save(update_fields=['location', 'threat_score', 'suspicious_factors', 'is_suspicious'])
+
+        is_successful = attempt.status == 'success'
+        if is_successful and user:
+            self._handle_device_registration(user, attempt.device_fingerprint, user_agent, attempt.ip_address)
+            login_risk.refresh_user_features(user)
+
+        # Take action if suspicious
+        if attempt.is_suspicious:
+            if is_successful:
+                self.handle_suspicious_login(user, attempt)
+                if user:
+                    login_risk.escalate_session(user, attempt)
+                    logger.info(
+                        f"Escalated login attempt {attempt.pk} "
+                        f"(fast path {'flagged' if fast_suspicious else 'passed'} it)"
+                    )
+            else:
+                self.handle_failed_login_attempt(user, attempt)
+
+        return attempt
     
     def _get_location_from_ip(self, ip_address):
         """Get location information from IP address using GeoIP2 or external service"""
-        if not ip_address or ip_address == '127.0.0.1':
+        location = get_geoip_service().lookup(ip_address)
+        if not location:
             return {}
-        
-        # Try GeoIP2 first if available
-        if self.geo_db_path:
-            try:
-                import geoip2.database
-                with geoip2.database.Reader(f"{self.geo_db_path}/GeoLite2-City.mmdb") as reader:
-                    response = reader.city(ip_address)
-                    return {
-                        'city': response.city.name,
-                        'country': response.country.name,
-                        'country_code': response.country.iso_code
-                    }
-            except Exception as e:
-                logger.warning(f"GeoIP2 lookup failed: {e}")
-        
+        return {
+            'city': location['city'],
+            'country': location['country'],
+            'country_code': location['country_code']
+        }
+    
+    def _fast_risk_score(self, user, login_attempt, user_agent):
+        """
+        Request-path risk score from cached features only.
+
+        Mirrors the device, failure, hour, user-agent and IP-reputation
+        factors of ``_calculate_risk_score``; location-based factors need
+        geolocation and are left to enrichment.
+        """
+        risk_score = 0
+        suspicious_factors = {}
+
         try:
-            ipinfo_breaker.before_call()
-            response = requests.get(f"https://ipinfo.io/{ip_address}/json", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                ipinfo_breaker.on_success()
-                return {
-                    'city': data.get('city', ''),
-                    'country': data.get('country', ''),
-                    'country_code': data.get('country', '')
-                }
-            ipinfo_breaker.on_failure()
-        except CircuitBreakerOpen:
-            pass
+            features = login_risk.get_user_features(user) if user else None
+
+            if features is not None and login_attempt.device_fingerprint:
+                if login_attempt.device_fingerprint not in features['devices']:
+                    risk_score += 30
+                    suspicious_factors['new_device'] = True
+
+            recent_failed_attempts = login_risk.get_ip_failures(login_attempt.ip_address)
+            if recent_failed_attempts >= 3:
+                risk_score += min(40, recent_failed_attempts * 10)
+                suspicious_factors['recent_failures'] = recent_failed_attempts
+
+            if features is not None:
+                hour = timezone.now().hour
+                if features['hours'] and hour not in features['hours']:
+                    risk_score += 20
+                    suspicious_factors['unusual_time'] = f"{hour}:00"
+
+                if user_agent and not any(
+                    user_agent.browser.family in agent and user_agent.os.family in agent
+                    for agent in features['agents']
+                ):
+                    risk_score += 15
+                    suspicious_factors['unusual_user_agent'] = f"{user_agent.browser.family} on {user_agent.os.family}"
+
+            if self._is_ip_blacklisted(login_attempt.ip_address):
+                risk_score += 50
+                suspicious_factors['blacklisted_ip'] = True
+
+            risk_score = min(risk_score, 100)
+
         except Exception as e:
-            ipinfo_breaker.on_failure(e)
-            logger.error(f"Error in IP geolocation: {e}")
-        
-        return {}
-    
+            logger.error(f"Error calculating fast-path risk score: {e}")
+
+        return {
+            'risk_score': risk_score,
+            'suspicious_factors': suspicious_factors
+        }
+
     def _calculate_risk_score(self, user, login_attempt, user_agent):
         """
         Calculate a risk score for the login attempt based on various factors
@@ -246,6 +312,13 @@ class SecurityService:
         """
         risk_score = 0
         suspicious_factors = {}
+
+        # Enrichment runs after the attempt was saved, possibly much later:
+        # score it as of its own timestamp, against earlier attempts only.
+        attempted_at = login_attempt.timestamp or timezone.now()
+        history = LoginAttempt.objects.filter(timestamp__lt=attempted_at)
+        if login_attempt.pk:
+            history = history.exclude(pk=login_attempt.pk)
         
         try:
             # Check if this is a known device
@@ -261,10 +334,10 @@ class SecurityService:
             
             # Check for recent failed attempts from same IP
             if login_attempt.ip_address:
-                recent_failed_attempts = LoginAttempt.objects.filter(
+                recent_failed_attempts = history.filter(
                     ip_address=login_attempt.ip_address,
                     status='failed',
-                    timestamp__gte=timezone.now() - timedelta(hours=24)
+                    timestamp__gte=attempted_at - timedelta(hours=24)
                 ).count()
                 
                 if recent_failed_attempts >= 3:
@@ -273,7 +346,7 @@ class SecurityService:
             
             # Check if location is new for this user
             if user and login_attempt.location:
-                known_location = LoginAttempt.objects.filter(
+                known_location = history.filter(
                     user=user,
                     status='success',
                     location=login_attempt.location
@@ -284,14 +357,14 @@ class SecurityService:
                     suspicious_factors['new_location'] = login_attempt.location
             
             # Check for time anomalies (logins at unusual hours)
-            hour = timezone.now().hour
+            hour = attempted_at.hour
             
             # Analyze user's typical login hours
             if user:
-                typical_hours = LoginAttempt.objects.filter(
+                typical_hours = history.filter(
                     user=user,
                     status='success',
-                    timestamp__gte=timezone.now() - timedelta(days=30)
+                    timestamp__gte=attempted_at - timedelta(days=30)
                 ).extra(select={'hour': 'EXTRACT(hour FROM timestamp)'}).values_list('hour', flat=True)
                 
                 typical_hours_set = set(typical_hours)
@@ -301,13 +374,13 @@ class SecurityService:
             
             # Check for rapid location changes (impossible travel)
             if user and login_attempt.location:
-                last_login = LoginAttempt.objects.filter(
+                last_login = history.filter(
                     user=user,
                     status='success'
                 ).order_by('-timestamp').first()
                 
                 if last_login and last_login.location and last_login.location != login_attempt.location:
-                    time_diff = timezone.now() - last_login.timestamp
+                    time_diff = attempted_at - last_login.timestamp
                     if time_diff.total_seconds() < 3600:  # Less than an hour
                         risk_score += 50
                         suspicious_factors['impossible_travel'] = {
@@ -318,10 +391,10 @@ class SecurityService:
             
             # Check for unusual user agent patterns
             if user and user_agent:
-                recent_agents = LoginAttempt.objects.filter(
+                recent_agents = history.filter(
                     user=user,
                     status='success',
-                    timestamp__gte=timezone.now() - timedelta(days=7)
+                    timestamp__gte=attempted_at - timedelta(days=7)
                 ).values_list('user_agent', flat=True).distinct()
                 
                 similar_agent_found = any(
@@ -340,9 +413,9 @@ class SecurityService:
             
             # Check for velocity attacks (multiple attempts from different IPs)
             if user:
-                recent_ips = LoginAttempt.objects.filter(
+                recent_ips = history.filter(
                     username_attempted=user.username,
-                    timestamp__gte=timezone.now() - timedelta(hours=1)
+                    timestamp__gte=attempted_at - timedelta(hours=1)
                 ).values('ip_address').distinct().count()
                 
                 if recent_ips > 5:
@@ -360,13 +433,9 @@ class SecurityService:
             'suspicious_factors': suspicious_factors
         }
     
-    def _handle_device_registration(self, user, request, user_agent, ip_address):
+    def _handle_device_registration(self, user, device_fingerprint, user_agent, ip_address):
         """Register or update device information for successful logins"""
         try:
-            _data = getattr(request, 'data', None)
-            if _data is None:
-                _data = getattr(request, 'POST', None) or {}
-            device_fingerprint = _data.get('device_fingerprint', '') if hasattr(_data, 'get') else ''
             if not device_fingerprint:
                 return
             
@@ -610,15 +679,11 @@ class SecurityService:
         against BLACKLISTED_IPS, so CIDR ranges like ``10.0.0.0/8`` never
         matched. Mirror AccountProtectionService.is_ip_blacklisted and
         match against the pre-parsed ``BLACKLISTED_IP_NETS`` networks.
+
+        Both paths now share the compiled IP reputation index, which also
+        covers ranges ingested from threat-intel feeds.
         """
-        nets = getattr(settings, 'BLACKLISTED_IP_NETS', [])
-        if not nets:
-            return False
-        try:
-            addr = ipaddress.ip_address(ip_address)
-        except ValueError:
-            return False
-        return any(addr in net for net in nets)
+        return is_ip_blacklisted(ip_address)
 
 
 class NotificationService:
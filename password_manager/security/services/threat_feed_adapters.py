@@ -22,7 +22,7 @@ pattern).
 
 import logging
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from django.utils import timezone
@@ -68,6 +68,9 @@ class FeedSyncResult:
     message: str = ''
     # industry_code -> number of recent breaches attributable to this feed.
     industry_signals: Dict[str, int] = field(default_factory=dict)
+    # (network, category, score) ranges for the IP reputation index. None
+    # leaves the feed's previously ingested ranges in place.
+    ip_indicators: Optional[List[Tuple[str, str, float]]] = None
 
 
 class ThreatFeedAdapter:
@@ -19,9 +19,25 @@ from .breach_tasks import (
     check_for_breaches,
     scan_user_vault,
     daily_breach_scan,
+    scan_vault_shard,
+    update_pwned_passwords_mirror,
 )
 
 
+# ============================================================================
+# Quantum Entropy Pool Tasks
+# ============================================================================
+
+from .entropy_tasks import refill_quantum_entropy_pool
+
+
+# ============================================================================
+# Login Risk Enrichment Tasks
+# ============================================================================
+
+from .login_risk_tasks import enrich_login_attempt
+
+
 # ============================================================================
 # Genetic Password Tasks (from breach_tasks module)
 # ============================================================================
@@ -221,6 +237,10 @@ __all__ = [
     'check_for_breaches',
     'scan_user_vault',
     'daily_breach_scan',
+    'scan_vault_shard',
+    'update_pwned_passwords_mirror',
+    'refill_quantum_entropy_pool',
+    'enrich_login_attempt',
     'check_genetic_evolution',
     'daily_genetic_evolution_check',
     'sync_epigenetic_data',
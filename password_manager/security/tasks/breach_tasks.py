@@ -4,6 +4,7 @@ from django.core.cache import cache
 from vault.models.vault_models import EncryptedVaultItem
 from vault.models import BreachAlert
 from ..services.breach_monitor import HIBPService
+from ..services.hibp_batch import BatchBreachChecker
 from ..services.crypto_service import CryptoService
 from ..services.account_protection import account_protection_service
 import json
@@ -14,6 +15,80 @@ import logging
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Users per `scan_vault_shard` task fanned out by `daily_breach_scan`.
+BREACH_SCAN_SHARD_SIZE = 200
+
+
+def _hash_vault_passwords(items, user_by_id):
+    """
+    Decrypt and HIBP-hash password items.
+
+    Returns:
+        list of (item, sha1_hash) for items whose password was available
+    """
+    hashed = []
+    for item in items:
+        try:
+            password = item.get_decrypted_password(user_by_id[item.user_id])
+        except Exception as e:
+            logger.error(f"Error processing item {item.id}: {str(e)}")
+            continue
+        if password:
+            hashed.append((item, HIBPService.hash_password(password)))
+    return hashed
+
+
+def _create_password_breach_alerts(breached):
+    """
+    Bulk-create password BreachAlerts for ``[(item, breach_count), ...]``.
+
+    Items that already have a password alert are skipped, matching the
+    previous per-item get_or_create(user, data_type, identifier).
+    """
+    if not breached:
+        return 0
+    existing = set(
+        BreachAlert.objects.filter(
+            data_type='password',
+            user_id__in={item.user_id for item, _ in breached},
+            identifier__in=[str(item.id) for item, _ in breached],
+        ).values_list('user_id', 'identifier')
+    )
+    now = timezone.now()
+    alerts = [
+        BreachAlert(
+            user_id=item.user_id,
+            data_type='password',
+            identifier=item.id,
+            breach_name='Password Breach',
+            breach_description=f'This password was found in {breach_count} data breaches',
+            severity='high' if breach_count > 1000 else 'medium',
+            detected_at=now,
+        )
+        for item, breach_count in breached
+        if (item.user_id, str(item.id)) not in existing
+    ]
+    BreachAlert.objects.bulk_create(alerts)
+    return len(alerts)
+
+
+def _batch_check_vault_items(items, user_by_id):
+    """
+    Hash ``items``, resolve all hashes with one lookup per unique prefix and
+    record alerts in bulk.
+
+    Returns:
+        (breached, stats): ``[(item, count), ...]`` and the batch stats dict
+    """
+    hashed = _hash_vault_passwords(items, user_by_id)
+    counts, stats = BatchBreachChecker().check_hashes(h for _, h in hashed)
+    breached = [
+        (item, counts[full_hash]) for item, full_hash in hashed
+        if counts.get(full_hash)
+    ]
+    _create_password_breach_alerts(breached)
+    return breached, stats.as_dict()
+
 @shared_task
 def check_for_breaches(user_id, data_type='password', identifiers=None):
     """
@@ -49,45 +124,17 @@ def check_for_breaches(user_id, data_type='password', identifiers=None):
                     item_type='password'
                 )
                 
-            # Check each password
-            for item in items:
-                results['checked'] += 1
-                
-                # This is a stub - in reality you would decrypt the item
-                # securely to get access to the password
-                password = item.get_decrypted_password(user)
-                
-                if password:
-                    # Hash the password
-                    hash_value = HIBPService.hash_password(password)
-                    prefix = hash_value[:5]
-                    suffix = hash_value[5:]
-                    
-                    # Check if password is breached
-                    breach_results = HIBPService.check_password_prefix(prefix)
-                    
-                    if suffix in breach_results:
-                        breach_count = breach_results[suffix]
-                        
-                        # Create breach alert
-                        BreachAlert.objects.get_or_create(
-                            user=user,
-                            data_type='password',
-                            identifier=item.id,
-                            defaults={
-                                'breach_name': 'Password Breach',
-                                'breach_description': f'This password was found in {breach_count} data breaches',
-                                'severity': 'high' if breach_count > 1000 else 'medium',
-                                'detected_at': timezone.now()
-                            }
-                        )
-                        
-                        results['breached'] += 1
-                        results['items'].append({
-                            'id': item.id,
-                            'name': item.name,
-                            'count': breach_count
-                        })
+            items = list(items)
+            results['checked'] = len(items)
+            breached, results['hibp_stats'] = _batch_check_vault_items(items, {user.id: user})
+            
+            for item, breach_count in breached:
+                results['breached'] += 1
+                results['items'].append({
+                    'id': item.id,
+                    'name': item.name,
+                    'count': breach_count
+                })
         
         elif data_type == 'email':
             # Check email breaches
@@ -170,9 +217,6 @@ def scan_user_vault(self, user_id):
         
         # Set up progress tracking
         total_items = vault_items.count()
-        processed = 0
-        breached = 0
-        breached_items = []
         
         # Update task state
         self.update_state(
@@ -180,65 +224,26 @@ def scan_user_vault(self, user_id):
             meta={'progress': 0, 'total': total_items}
         )
         
-        # Process each password item
-        for item in vault_items:
-            processed += 1
-            
-            try:
-                # In a real implementation, this would decrypt the password
-                # For this example, we're assuming direct access to the plaintext
-                # which would need to be handled securely in production
-                
-                # This is a stub - in reality you would decrypt the item
-                # securely to get access to the password
-                password = item.get_decrypted_password(user)
-                
-                if password:
-                    # Hash the password
-                    hash_value = HIBPService.hash_password(password)
-                    prefix = hash_value[:5]
-                    suffix = hash_value[5:]
-                    
-                    # Check if password is breached
-                    result = HIBPService.check_password_prefix(prefix)
-                    
-                    if suffix in result:
-                        breach_count = result[suffix]
-                        
-                        # Create breach alert
-                        BreachAlert.objects.get_or_create(
-                            user=user,
-                            data_type='password',
-                            identifier=item.id,
-                            defaults={
-                                'breach_name': 'Password Breach',
-                                'breach_description': f'This password was found in {breach_count} data breaches',
-                                'severity': 'high' if breach_count > 1000 else 'medium',
-                                'detected_at': timezone.now()
-                            }
-                        )
-                        
-                        breached += 1
-                        breached_items.append({
-                            'id': item.id,
-                            'count': breach_count
-                        })
-            
-            except Exception as e:
-                logger.error(f"Error processing item {item.id}: {str(e)}")
-            
-            # Update progress
-            if processed % 5 == 0 or processed == total_items:
-                self.update_state(
-                    state='PROGRESS',
-                    meta={'progress': (processed / total_items) * 100, 'total': total_items}
-                )
+        # Decrypt and hash everything first, then resolve all hashes with
+        # one range lookup per unique prefix instead of one per item.
+        breached_pairs, hibp_stats = _batch_check_vault_items(vault_items, {user.id: user})
+        breached = len(breached_pairs)
+        breached_items = [
+            {'id': item.id, 'count': breach_count}
+            for item, breach_count in breached_pairs
+        ]
+        
+        self.update_state(
+            state='PROGRESS',
+            meta={'progress': 100, 'total': total_items}
+        )
         
         # Return the final result
         return {
             'total': total_items,
             'breached': breached,
-            'items': breached_items
+            'items': breached_items,
+            'hibp_stats': hibp_stats,
         }
     
     except User.DoesNotExist:
@@ -249,20 +254,78 @@ def scan_user_vault(self, user_id):
         logger.error(f"Error scanning vault: {str(e)}")
         raise Exception(f"Error scanning vault: {str(e)}")
 
+@shared_task
+def scan_vault_shard(user_ids):
+    """
+    Scan the password items of a shard of users in one batch, so prefixes
+    shared across users are resolved once.
+
+    Args:
+        user_ids (list): IDs of the users in this shard
+    """
+    users = {user.id: user for user in User.objects.filter(id__in=user_ids, is_active=True)}
+    items = EncryptedVaultItem.objects.filter(user_id__in=list(users), item_type='password')
+    
+    breached, hibp_stats = _batch_check_vault_items(items, users)
+    
+    return {
+        'users': len(users),
+        'breached': len(breached),
+        'hibp_stats': hibp_stats,
+    }
+
+
 # Scheduled task to run daily
 @shared_task
 def daily_breach_scan():
     """
-    Daily scheduled task to scan all users' vaults
+    Daily scheduled task to scan all users' vaults, fanned out in shards of
+    BREACH_SCAN_SHARD_SIZE users rather than one task per user
     """
     # Get all active users
-    users = User.objects.filter(is_active=True)
+    user_ids = list(User.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
     
-    for user in users:
-        # Queue individual scan task
-        scan_user_vault.delay(user.id)
+    shards = 0
+    for start in range(0, len(user_ids), BREACH_SCAN_SHARD_SIZE):
+        scan_vault_shard.delay(user_ids[start:start + BREACH_SCAN_SHARD_SIZE])
+        shards += 1
     
-    return f"Scheduled scans for {users.count()} users"
+    return f"Scheduled scans for {len(user_ids)} users in {shards} shards"
+
+
+@shared_task
+def update_pwned_passwords_mirror(max_prefixes=None):
+    """
+    Refresh the next slice of the offline Pwned Passwords mirror from the
+    live range API (see security.services.hibp_mirror.update_mirror).
+
+    No-op unless HIBP_MIRROR_SETTINGS enables the mirror and a base file
+    has been imported.
+    """
+    import os
+    from django.conf import settings
+    from ..services import hibp_mirror
+
+    config = getattr(settings, 'HIBP_MIRROR_SETTINGS', {})
+    path = config.get('PATH')
+    if not config.get('ENABLED') or not path or not os.path.exists(path):
+        return {'skipped': True}
+
+    # Overlapping runs would race on the delta file and sweep cursor
+    lock_key = 'hibp_mirror:update_lock'
+    if not cache.add(lock_key, 1, 3600):
+        return {'skipped': True, 'reason': 'update already running'}
+    try:
+        result = hibp_mirror.update_mirror(
+            path, max_prefixes or config.get('UPDATE_BATCH', 1024)
+        )
+    finally:
+        cache.delete(lock_key)
+    logger.info(
+        "Pwned Passwords mirror: refreshed %d prefixes (cursor %05X, compacted=%s)",
+        result['fetched'], result['cursor'], result['compacted'],
+    )
+    return result
 
 
 # =============================================================================
@@ -725,6 +788,7 @@ def update_threat_intelligence():
     total_items = 0
     # Aggregate recent-breach pressure per industry across all feeds.
     industry_totals = {}
+    ip_sources_changed = 0
 
     for feed in feeds:
         adapter = get_feed_adapter(feed.feed_type)
@@ -759,6 +823,8 @@ def update_threat_intelligence():
         total_items += result.items_count
         for industry, count in result.industry_signals.items():
             industry_totals[industry] = industry_totals.get(industry, 0) + count
+        if result.ip_indicators is not None:
+            ip_sources_changed += _update_ip_reputation_source(feed, result.ip_indicators)
         logger.info(f"Synced threat feed {feed.name}: {result.message}")
 
     # Only reset stale industries when every feed succeeded AND at least one feed
@@ -771,6 +837,15 @@ def update_threat_intelligence():
         reset_stale=(failed_count == 0 and updated_count > 0),
     )
 
+    # Only changed feeds were recompiled; the merge into the shared index
+    # runs once for the whole sync.
+    if ip_sources_changed:
+        from ..services.ip_reputation import get_ip_reputation_index
+        try:
+            get_ip_reputation_index().rebuild()
+        except OSError as e:
+            logger.error(f"IP reputation index rebuild failed: {e}")
+
     logger.info(
         f"Threat intel update complete: {updated_count} feeds updated, "
         f"{failed_count} failed, {total_items} items, "
@@ -782,9 +857,31 @@ def update_threat_intelligence():
         'feeds_failed': failed_count,
         'items_ingested': total_items,
         'industries_updated': industries_updated,
+        'ip_sources_updated': ip_sources_changed,
     }
 
 
+def _update_ip_reputation_source(feed, indicators):
+    """
+    Recompile one feed's ranges for the IP reputation index.
+
+    Scores are weighted by the feed's reliability so a noisy feed cannot
+    block an address on its own. Returns 1 if the source was written.
+    """
+    from ..services.ip_reputation import get_ip_reputation_index
+
+    reliability = feed.reliability_score if feed.reliability_score is not None else 1.0
+    try:
+        get_ip_reputation_index().update_source(
+            f"feed-{feed.feed_id}",
+            ((network, category, score * reliability) for network, category, score in indicators),
+        )
+    except OSError as e:
+        logger.error(f"Could not store IP indicators for feed {feed.name}: {e}")
+        return 0
+    return 1
+
+
 def _apply_industry_signals(IndustryThreatLevel, industry_totals, reset_stale=True):
     """Upsert IndustryThreatLevel rows from aggregated recent-breach counts.
 
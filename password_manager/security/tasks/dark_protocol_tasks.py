@@ -195,6 +195,7 @@ def health_check_nodes(self):
         
         checked_count = 0
         failed_count = 0
+        deactivated_count = 0
         
         for node in nodes:
             # Simulate health check (in production, this would ping the node)
@@ -230,6 +231,7 @@ def health_check_nodes(self):
                 if recent_failures >= 3:
                     node.status = 'inactive'
                     node.save(update_fields=['status'])
+                    deactivated_count += 1
                     logger.warning(f"Node {node.node_id[:8]}... marked inactive")
             else:
                 # Update uptime percentage
@@ -250,6 +252,10 @@ def health_check_nodes(self):
             
             checked_count += 1
         
+        if deactivated_count:
+            from ..services.relay_directory import invalidate_relay_directory
+            invalidate_relay_directory()
+        
         logger.info(f"Health checks complete: {checked_count} nodes, {failed_count} failures")
         
         return {
@@ -283,20 +289,20 @@ def cleanup_expired_sessions(self):
     from ..models.dark_protocol_models import (
         GarlicSession, RoutingPath, TrafficBundle, NetworkHealth
     )
+    from ..services.dark_protocol_service import get_dark_protocol_service
     
     logger.info("Starting session cleanup")
     
     try:
         now = timezone.now()
         
-        # Mark expired sessions as terminated
+        # Mark expired sessions as terminated, releasing their circuits
         expired_sessions = GarlicSession.objects.filter(
             status='active',
             expires_at__lt=now,
         )
         
-        session_count = expired_sessions.count()
-        expired_sessions.update(status='terminated')
+        session_count = get_dark_protocol_service().end_sessions(expired_sessions)
         
         # Deactivate expired paths
         expired_paths = RoutingPath.objects.filter(
@@ -470,6 +476,9 @@ def register_node(
             }
         )
         
+        from ..services.relay_directory import invalidate_relay_directory
+        invalidate_relay_directory()
+        
         action = "registered" if created else "updated"
         logger.info(f"Node {node_id[:8]}... {action}")
         
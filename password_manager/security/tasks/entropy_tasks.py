@@ -0,0 +1,32 @@
+import asyncio
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refill_quantum_entropy_pool():
+    """
+    Top the shared quantum entropy pool up to its high watermark.
+
+    Queued by ``QuantumEntropyPool`` when the pool drops below its low
+    watermark (refill mode ``celery``) and run periodically by beat. Only
+    does work when the pool is shared through Redis; a local-memory pool
+    lives in another process and refills itself.
+    """
+    from ..services.quantum_rng_service import get_quantum_pool
+
+    pool = get_quantum_pool()
+    if pool.store_type != 'redis':
+        pool.release_refill_lock()
+        return {'added': 0, 'skipped': 'local pool'}
+
+    try:
+        added = asyncio.run(pool.refill())
+    finally:
+        pool.release_refill_lock()
+
+    logger.info("Quantum entropy pool refill added %s byte(s)", added)
+    return {'added': added, 'pool_depth': pool.level()}
@@ -0,0 +1,22 @@
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def enrich_login_attempt(attempt_id, fast_suspicious=False):
+    """
+    Enrichment stage of login risk analysis (security.services.login_risk).
+
+    Queued by ``SecurityService.analyze_login_attempt`` once the attempt
+    row has committed.
+    """
+    from ..services.security_service import SecurityService
+
+    attempt = SecurityService().enrich_login_attempt(attempt_id, fast_suspicious=fast_suspicious)
+    if attempt is None:
+        logger.warning("Login attempt %s vanished before enrichment", attempt_id)
+        return None
+    return {'attempt_id': attempt_id, 'threat_score': attempt.threat_score, 'is_suspicious': attempt.is_suspicious}
@@ -509,6 +509,32 @@ class DarkProtocolIntegrationTests(TransactionTestCase):
         active_after = service.get_active_session(self.user)
         self.assertIsNone(active_after)
 
+    def test_terminate_releases_every_hop(self):
+        """Circuit counts on every node of the path return to zero."""
+        from security.services.dark_protocol_service import get_dark_protocol_service
+        
+        service = get_dark_protocol_service()
+        # Drop any snapshot left over from an earlier test's nodes
+        service.relay_directory.invalidate()
+        result = service.establish_session(user=self.user, hop_count=3)
+        self.assertTrue(result.success)
+        
+        counts = dict(self.DarkProtocolNode.objects.values_list('pk', 'current_circuits'))
+        self.assertEqual(sum(counts.values()), 3)
+        path = [node for node in service.relay_directory.snapshot().nodes if counts[node.pk]]
+        self.assertEqual(sum(service.relay_directory.circuits(node) for node in path), 3)
+        
+        self.assertTrue(service.terminate_session(result.session_id, self.user))
+        self.assertEqual(
+            list(self.DarkProtocolNode.objects.values_list('current_circuits', flat=True)), [0] * 4
+        )
+        self.assertEqual([service.relay_directory.circuits(node) for node in path], [0] * 3)
+        
+        # A second terminate does not release the circuits again
+        self.assertTrue(service.terminate_session(result.session_id, self.user))
+        result.session.refresh_from_db()
+        self.assertEqual(result.session.path_node_ids, [])
+
 
 # =============================================================================
 # Task Tests
@@ -567,6 +593,36 @@ class DarkProtocolTaskTests(TestCase):
         self.assertTrue(result['success'])
         self.assertEqual(result['expired_sessions'], 1)
 
+    def test_cleanup_task_releases_circuits_of_expired_sessions(self):
+        """Expiring a session gives back its circuit slot on every hop."""
+        from security.tasks.dark_protocol_tasks import cleanup_expired_sessions
+
+        relay = self.DarkProtocolNode.objects.create(
+            node_id=secrets.token_hex(32),
+            fingerprint=secrets.token_hex(32),
+            node_type='destination',
+            status='active',
+            current_circuits=1,
+        )
+        self.DarkProtocolNode.objects.filter(pk=self.node.pk).update(current_circuits=1)
+        self.GarlicSession.objects.create(
+            user=self.user,
+            encrypted_path=b'test',
+            layer_keys=b'test',
+            path_length=2,
+            entry_node=self.node,
+            path_node_ids=[str(self.node.pk), str(relay.pk)],
+            expires_at=timezone.now() - timedelta(hours=1),
+            status='active',
+        )
+
+        result = cleanup_expired_sessions()
+
+        self.assertEqual(result['expired_sessions'], 1)
+        self.assertEqual(
+            sorted(self.DarkProtocolNode.objects.values_list('current_circuits', flat=True)), [0, 0]
+        )
+
     def test_rotate_network_paths_task_noop_without_active_sessions(self):
         """Smoke test: no active-session users, so nothing to rotate.
 
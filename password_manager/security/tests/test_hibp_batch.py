@@ -0,0 +1,131 @@
+"""
+Tests for batched Pwned Passwords checks (security/services/hibp_batch.py).
+
+Covers:
+  * one range request per unique prefix, with hit-ratio / requests-saved stats
+  * range cache reuse across runs
+  * failed prefixes report None (unknown) and are not cached
+  * scan_vault_shard writes BreachAlerts in bulk, without duplicates
+"""
+
+import uuid
+from unittest.mock import patch
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from security.services.hibp import _sha1_hex
+from security.services.hibp_batch import BatchBreachChecker
+from security.tasks.breach_tasks import scan_vault_shard
+from vault.models import BreachAlert
+from vault.models.vault_models import EncryptedVaultItem
+
+User = get_user_model()
+
+BREACHED = {_sha1_hex(p): n for p, n in (('password', 9659365), ('letmein', 500))}
+
+
+class _RangeServer:
+    """httpx.MockTransport handler that serves BREACHED and counts requests."""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.requests = []
+
+    def __call__(self, request):
+        prefix = request.url.path.rsplit('/', 1)[-1]
+        self.requests.append(prefix)
+        body = '\r\n'.join(
+            f'{h[5:]}:{n}' for h, n in BREACHED.items() if h.startswith(prefix)
+        )
+        return httpx.Response(self.status_code, text=body + '\r\n' + 'F' * 35 + ':0')
+
+
+class BatchBreachCheckerTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _checker(self, server):
+        return BatchBreachChecker(transport=httpx.MockTransport(server))
+
+    def test_one_request_per_prefix(self):
+        """Hashes sharing a prefix are resolved with a single request."""
+        server = _RangeServer()
+        password_hash = _sha1_hex('password')
+        same_prefix = password_hash[:5] + '0' * 35
+        hashes = [password_hash, same_prefix, _sha1_hex('letmein'), password_hash.lower()]
+
+        counts, stats = self._checker(server).check_hashes(hashes)
+
+        self.assertEqual(sorted(server.requests), sorted({h[:5].upper() for h in hashes}))
+        self.assertEqual(counts[password_hash], 9659365)
+        self.assertEqual(counts[same_prefix], 0)
+        self.assertEqual(counts[_sha1_hex('letmein')], 500)
+        self.assertEqual(stats.hashes, 3)
+        self.assertEqual(stats.unique_prefixes, 2)
+        self.assertEqual(stats.requests_saved, 1)
+
+    def test_cached_ranges_reused(self):
+        """A second run is served from the range cache."""
+        self._checker(_RangeServer()).check_hashes([_sha1_hex('password')])
+        server = _RangeServer()
+
+        counts, stats = self._checker(server).check_hashes([_sha1_hex('password')])
+
+        self.assertEqual(server.requests, [])
+        self.assertEqual(counts[_sha1_hex('password')], 9659365)
+        self.assertEqual(stats.cache_hits, 1)
+        self.assertEqual(stats.prefix_hit_ratio, 1.0)
+
+    def test_failed_prefix_is_unknown(self):
+        """HTTP errors yield None counts and are not cached."""
+        server = _RangeServer(status_code=503)
+
+        with patch('security.services.hibp_batch.hibp_breaker'):
+            counts, stats = self._checker(server).check_hashes([_sha1_hex('password')])
+
+        self.assertIsNone(counts[_sha1_hex('password')])
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(cache.get('hibp:range:' + _sha1_hex('password')[:5]), None)
+
+
+class ScanVaultShardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(username=f'shard{i}', password='x' * 12) for i in range(2)
+        ]
+        self.items = {}
+        for user, secret in zip(self.users, ('password', 'correct horse battery staple')):
+            item = EncryptedVaultItem.objects.create(
+                user=user, item_id=uuid.uuid4().hex, item_type='password', encrypted_data='x',
+            )
+            self.items[item.id] = secret
+
+    def _run_shard(self, server):
+        def decrypt(item, user):
+            return self.items[item.id]
+
+        transport = httpx.MockTransport(server)
+        with patch.object(EncryptedVaultItem, 'get_decrypted_password', decrypt), \
+                patch('security.tasks.breach_tasks.BatchBreachChecker',
+                      lambda: BatchBreachChecker(transport=transport)):
+            return scan_vault_shard([u.id for u in self.users])
+
+    def test_bulk_alerts_without_duplicates(self):
+        """Breached items get one alert each, even across repeated scans."""
+        result = self._run_shard(_RangeServer())
+        self._run_shard(_RangeServer())
+
+        self.assertEqual(result['users'], 2)
+        self.assertEqual(result['breached'], 1)
+        self.assertEqual(result['hibp_stats']['unique_prefixes'], 2)
+        alerts = BreachAlert.objects.filter(data_type='password')
+        self.assertEqual(alerts.count(), 1)
+        self.assertEqual(alerts.get().user, self.users[0])
+        self.assertEqual(alerts.get().severity, 'high')
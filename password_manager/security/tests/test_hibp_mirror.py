@@ -0,0 +1,150 @@
+"""
+Tests for the offline Pwned Passwords mirror (security/services/hibp_mirror.py).
+
+Covers:
+  * import from range files and binary-search lookups
+  * check_password_prefix served from a fresh mirror, live API when stale
+  * full-hash checks answered by binary search, not range decoding
+  * incremental delta updates overriding the base and compacting on wrap
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from security.services import hibp, hibp_mirror
+
+
+HASH_A = hibp._sha1_hex('password')   # 5BAA6...
+HASH_B = hibp._sha1_hex('hunter2')
+
+
+def _write_range(directory, full_hash, entries):
+    with open(os.path.join(directory, f'{full_hash[:5]}.txt'), 'w') as fh:
+        fh.write('\r\n'.join(f'{suffix}:{count}' for suffix, count in entries.items()))
+
+
+class PwnedPasswordsMirrorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.source = os.path.join(self.tmp, 'ranges')
+        os.mkdir(self.source)
+        self.path = os.path.join(self.tmp, 'pwned.bin')
+
+        _write_range(self.source, HASH_A, {
+            HASH_A[5:]: 9659365,
+            'F' * 35: 3,
+            '0' * 35: 0,  # Add-Padding filler, must be dropped
+        })
+        _write_range(self.source, HASH_B, {HASH_B[5:]: 42})
+        hibp_mirror.import_mirror(self.source, self.path)
+        hibp_mirror._mirror = None
+        self.addCleanup(setattr, hibp_mirror, '_mirror', None)
+
+    def test_import_and_lookup(self):
+        """Imported hashes resolve to their counts; unknown suffixes are 0."""
+        mirror = hibp_mirror.PwnedPasswordsMirror(self.path)
+        self.addCleanup(mirror.close)
+
+        self.assertEqual(mirror.lookup(HASH_A), 9659365)
+        self.assertEqual(mirror.lookup(HASH_B.lower()), 42)
+        self.assertEqual(mirror.lookup(HASH_A[:5] + 'E' * 35), 0)
+        self.assertEqual(mirror.range_for_prefix(HASH_A[:5]), {HASH_A[5:]: 9659365, 'F' * 35: 3})
+
+    def test_uncovered_prefix_is_none(self):
+        """Prefixes absent from the import are reported as not covered."""
+        mirror = hibp_mirror.PwnedPasswordsMirror(self.path)
+        self.addCleanup(mirror.close)
+
+        self.assertIsNone(mirror.lookup('00000' + 'A' * 35))
+        self.assertIsNone(mirror.range_for_prefix('00000'))
+
+    def test_check_password_prefix_uses_fresh_mirror(self):
+        """A fresh mirror answers without any HTTP request."""
+        with override_settings(HIBP_MIRROR_SETTINGS={'ENABLED': True, 'PATH': self.path}), \
+                patch('security.services.hibp.requests.get') as live:
+            self.assertEqual(hibp.is_password_breached('password'), (True, 9659365))
+
+        live.assert_not_called()
+
+    def test_full_hash_callers_skip_range_decoding(self):
+        """Breach checks binary-search the mirror instead of decoding the range."""
+        from security.services.hibp_batch import BatchBreachChecker
+
+        with override_settings(HIBP_MIRROR_SETTINGS={'ENABLED': True, 'PATH': self.path}), \
+                patch.object(hibp_mirror.MirrorFile, 'range') as decode:
+            self.assertEqual(hibp.is_password_breached(HASH_B), (True, 42))
+            counts, stats = BatchBreachChecker().check_hashes([HASH_A, HASH_B, HASH_A[:5] + 'E' * 35])
+
+        decode.assert_not_called()
+        self.assertEqual(counts, {HASH_A: 9659365, HASH_B: 42, HASH_A[:5] + 'E' * 35: 0})
+        self.assertEqual(stats.mirror_hits, 2)
+
+    def test_stale_mirror_falls_back_to_live_api(self):
+        """A mirror older than MAX_AGE_HOURS is bypassed."""
+        hibp_mirror.write_mirror(
+            self.path, hibp_mirror.iter_range_directory(self.source),
+            synced_at=time.time() - 48 * 3600,
+        )
+        settings = {'ENABLED': True, 'PATH': self.path, 'MAX_AGE_HOURS': 24}
+
+        with override_settings(HIBP_MIRROR_SETTINGS=settings), \
+                patch('security.services.hibp.fetch_password_range', return_value={}) as live:
+            self.assertEqual(hibp.check_password_prefix(HASH_A[:5]), {})
+
+        live.assert_called_once_with(HASH_A[:5])
+
+    def test_delta_overrides_base(self):
+        """Prefixes covered by the delta file win over the base."""
+        result = hibp_mirror.update_mirror(
+            self.path, 3, fetch_range=lambda prefix: {'A' * 35: 7},
+        )
+        self.assertEqual(result, {'fetched': 3, 'cursor': 3, 'compacted': False})
+
+        hibp_mirror.write_mirror(
+            self.path + hibp_mirror.DELTA_SUFFIX,
+            [(int(HASH_A[:5], 16), hibp_mirror.pack_range({HASH_A[5:]: 10000000}))],
+            cursor=int(HASH_A[:5], 16) + 1,
+        )
+        mirror = hibp_mirror.PwnedPasswordsMirror(self.path)
+        self.addCleanup(mirror.close)
+
+        self.assertEqual(mirror.lookup(HASH_A), 10000000)
+        self.assertEqual(mirror.lookup(HASH_A[:5] + 'F' * 35), 0)
+        self.assertEqual(mirror.lookup(HASH_B), 42)
+
+    def test_sweep_completion_compacts_delta(self):
+        """Reaching the end of the keyspace folds the delta into the base."""
+        sweep_started = int(time.time()) - 3600
+        hibp_mirror.write_mirror(
+            self.path + hibp_mirror.DELTA_SUFFIX,
+            [(int(HASH_A[:5], 16), hibp_mirror.pack_range({HASH_A[5:]: 10000000}))],
+            synced_at=sweep_started,
+            cursor=hibp_mirror.PREFIX_COUNT - 1,
+        )
+
+        result = hibp_mirror.update_mirror(self.path, 10, fetch_range=lambda prefix: {})
+
+        self.assertEqual(result, {'fetched': 1, 'cursor': 0, 'compacted': True})
+        self.assertFalse(os.path.exists(self.path + hibp_mirror.DELTA_SUFFIX))
+        mirror = hibp_mirror.PwnedPasswordsMirror(self.path)
+        self.addCleanup(mirror.close)
+        self.assertEqual(mirror.synced_at, sweep_started)
+        self.assertEqual(mirror.lookup(HASH_A), 10000000)
+        self.assertEqual(mirror.lookup(HASH_B), 42)
+        self.assertEqual(mirror.range_for_prefix('FFFFF'), {})
+
+    def test_failed_fetch_stops_batch(self):
+        """A fetch failure leaves the cursor on the failed prefix for retry."""
+        result = hibp_mirror.update_mirror(
+            self.path, 5, fetch_range=lambda prefix: None if prefix == '00002' else {},
+        )
+
+        self.assertEqual(result['fetched'], 2)
+        self.assertEqual(result['cursor'], 2)
@@ -0,0 +1,147 @@
+"""
+Tests for the compiled IP reputation index (security/services/ip_reputation.py).
+
+Covers:
+  * flattening overlapping ranges with the highest score winning
+  * per-source compilation, merged rebuilds and remapping in place
+  * the settings blacklist tracking override_settings
+  * feed IP indicators flowing from update_threat_intelligence
+"""
+
+import ipaddress
+import os
+import random
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from security.services import ip_reputation
+from security.services.ip_reputation import IPReputation, IPReputationIndex, flatten
+
+
+class FlattenTests(SimpleTestCase):
+
+    def test_overlaps_resolved_by_score_and_neighbours_merged(self):
+        intervals = sorted([
+            (0, 99, 'scanner', 0.3),
+            (10, 19, 'botnet', 0.95),
+            (50, 149, 'scanner', 0.3),
+            (200, 209, 'tor', 0.5),
+            (210, 219, 'tor', 0.5),
+        ])
+        self.assertEqual(list(flatten(intervals)), [
+            (0, 9, 'scanner', 0.3),
+            (10, 19, 'botnet', 0.95),
+            (20, 149, 'scanner', 0.3),
+            (200, 219, 'tor', 0.5),
+        ])
+
+    def test_matches_linear_scan_on_random_ranges(self):
+        rng = random.Random(7)
+        intervals = []
+        for _ in range(300):
+            start = rng.randrange(0, 5000)
+            intervals.append((start, start + rng.randrange(0, 200), f'c{rng.randrange(3)}', rng.random()))
+        flat = list(flatten(sorted(intervals)))
+
+        for (_, end, _, _), (start, _, _, _) in zip(flat, flat[1:]):
+            self.assertLess(end, start)
+        for probe in range(0, 5300, 7):
+            expected = max((score for s, e, _, score in intervals if s <= probe <= e), default=None)
+            found = next((score for s, e, _, score in flat if s <= probe <= e), None)
+            self.assertEqual(found, expected)
+
+
+@override_settings(BLACKLISTED_IP_NETS=[])
+class IPReputationIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.index = IPReputationIndex(self.tmp, block_score=0.9, reload_check_interval=0)
+
+    def test_lookup_after_rebuild(self):
+        self.index.update_source('feed-a', [
+            ('203.0.113.0/24', 'scanner', 0.4),
+            ('203.0.113.128/25', 'botnet', 0.95),
+            ('2001:db8::/32', 'tor', 0.6),
+        ])
+        self.assertIsNone(self.index.lookup('203.0.113.1'))  # not published yet
+
+        self.assertEqual(self.index.rebuild(), {4: 2, 6: 1})
+        self.assertEqual(self.index.lookup('203.0.113.1'), IPReputation('scanner', 0.4))
+        self.assertEqual(self.index.lookup('203.0.113.200').category, 'botnet')
+        self.assertEqual(self.index.lookup('2001:db8:1::5').category, 'tor')
+        self.assertEqual(self.index.lookup('::ffff:203.0.113.1').category, 'scanner')
+        self.assertIsNone(self.index.lookup('198.51.100.1'))
+        self.assertIsNone(self.index.lookup('not-an-ip'))
+
+        self.assertTrue(self.index.is_blacklisted('203.0.113.200'))
+        self.assertFalse(self.index.is_blacklisted('203.0.113.1'))
+
+    def test_sources_merge_and_update_independently(self):
+        self.index.update_source('feed-a', [('10.0.0.0/8', 'scanner', 0.5)])
+        self.index.update_source('feed-b', [('10.1.0.0/16', 'botnet', 0.9)])
+        self.index.rebuild()
+        self.assertEqual(self.index.lookup('10.1.2.3').category, 'botnet')
+        self.assertEqual(self.index.lookup('10.2.0.1').category, 'scanner')
+
+        self.index.update_source('feed-b', [('10.2.0.0/16', 'botnet', 0.9)])
+        self.index.rebuild()
+        self.assertEqual(self.index.lookup('10.1.2.3').category, 'scanner')
+        self.assertEqual(self.index.lookup('10.2.0.1').category, 'botnet')
+
+        self.assertTrue(self.index.remove_source('feed-a'))
+        self.index.rebuild()
+        self.assertIsNone(self.index.lookup('10.1.2.3'))
+        self.assertEqual(self.index.source_names(), ['feed-b'])
+
+    def test_other_process_rebuild_is_picked_up(self):
+        self.index.update_source('feed-a', [('192.0.2.0/24', 'scanner', 0.5)])
+        self.index.rebuild()
+        self.assertIsNotNone(self.index.lookup('192.0.2.1'))
+
+        writer = IPReputationIndex(self.tmp)
+        writer.update_source('feed-a', [('198.51.100.0/24', 'scanner', 0.5)])
+        writer.rebuild()
+
+        self.assertIsNone(self.index.lookup('192.0.2.1'))
+        self.assertIsNotNone(self.index.lookup('198.51.100.1'))
+
+    def test_settings_blacklist_tracks_override_settings(self):
+        self.index.update_source('feed-a', [('192.0.2.0/24', 'scanner', 0.2)])
+        self.index.rebuild()
+        self.assertFalse(self.index.is_blacklisted('192.0.2.7'))
+
+        with override_settings(BLACKLISTED_IP_NETS=[ipaddress.ip_network('192.0.2.0/28')]):
+            self.assertEqual(self.index.lookup('192.0.2.7'), IPReputation('blacklist', 1.0))
+            self.assertTrue(self.index.is_blacklisted('192.0.2.7'))
+            self.assertFalse(self.index.is_blacklisted('192.0.2.20'))
+
+        self.assertFalse(self.index.is_blacklisted('192.0.2.7'))
+
+    def test_corrupt_index_is_ignored(self):
+        with open(self.index.index_path, 'wb') as fh:
+            fh.write(b'garbage')
+        self.assertIsNone(self.index.lookup('192.0.2.1'))
+
+
+class ThreatFeedIngestionTests(SimpleTestCase):
+
+    def test_feed_indicators_are_weighted_by_reliability(self):
+        from security.tasks.breach_tasks import _update_ip_reputation_source
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        index = IPReputationIndex(tmp, reload_check_interval=0)
+        feed = type('Feed', (), {'feed_id': 'abc', 'name': 'test', 'reliability_score': 0.5})()
+
+        with patch.object(ip_reputation, 'get_ip_reputation_index', return_value=index):
+            self.assertEqual(_update_ip_reputation_source(feed, [('192.0.2.0/24', 'botnet', 1.0)]), 1)
+        index.rebuild()
+
+        self.assertEqual(index.source_names(), ['feed-abc'])
+        self.assertEqual(index.lookup('192.0.2.1'), IPReputation('botnet', 0.5))
+        self.assertTrue(os.path.exists(index.index_path))
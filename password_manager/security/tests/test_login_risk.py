@@ -0,0 +1,194 @@
+"""
+Tests for two-phase login risk analysis (security/services/login_risk.py).
+
+Covers:
+  * the fast path deferring geolocation, full scoring and device bookkeeping
+  * fast-path scoring from the cached feature snapshot and IP failure counter
+  * enrichment by primary key and escalation of a flipped verdict
+  * enforcement of an escalation on JWT and DRF token authentication
+  * the login view refusing a login the fast path flags
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from ..models import LoginAttempt, SecurityAlert, UserDevice
+from ..services import login_risk
+from ..services.security_service import SecurityService
+
+DEFERRED = {'ENRICHMENT_MODE': 'thread'}
+
+
+@patch('security.services.security_service.get_client_ip', return_value=('203.0.113.9', True))
+class LoginRiskTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.service = SecurityService()
+        self.user = User.objects.create_user(username='riskuser', password='pw-123456')
+
+    def _request(self, fingerprint='fp-1'):
+        request = RequestFactory().post('/auth/login/', {'username': 'riskuser', 'device_fingerprint': fingerprint})
+        request.META['HTTP_USER_AGENT'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0'
+        return request
+
+    @override_settings(LOGIN_RISK_SETTINGS=DEFERRED)
+    def test_fast_path_defers_enrichment(self, _):
+        with patch.object(self.service, '_get_location_from_ip') as geo, \
+                patch.object(self.service, '_calculate_risk_score') as full, \
+                self.captureOnCommitCallbacks() as callbacks:
+            attempt = self.service.analyze_login_attempt(self.user, self._request(), is_successful=True)
+
+        geo.assert_not_called()
+        full.assert_not_called()
+        self.assertIn('new_device', attempt.suspicious_factors)
+        self.assertFalse(UserDevice.objects.filter(user=self.user).exists())
+
+        self.assertEqual(len(callbacks), 1)
+        with patch.object(login_risk, '_dispatch') as dispatch:
+            callbacks[0]()
+        dispatch.assert_called_once_with(attempt.pk, False, 'thread')
+
+    @override_settings(LOGIN_RISK_SETTINGS=DEFERRED)
+    def test_fast_path_reads_cached_features(self, _):
+        first = self.service.analyze_login_attempt(self.user, self._request(), is_successful=True)
+        self.service.enrich_login_attempt(first.pk)
+        self.assertTrue(UserDevice.objects.filter(user=self.user, fingerprint='fp-1').exists())
+
+        # Features are cached by enrichment; the fast path only inserts
+        with self.assertNumQueries(3):  # savepoint, INSERT, release
+            second = self.service.analyze_login_attempt(self.user, self._request(), is_successful=True)
+        self.assertNotIn('new_device', second.suspicious_factors)
+        self.assertNotIn('unusual_user_agent', second.suspicious_factors)
+
+    @override_settings(LOGIN_RISK_SETTINGS=DEFERRED)
+    def test_failed_logins_raise_fast_path_score(self, _):
+        for _ in range(4):
+            self.service.analyze_login_attempt(self.user, self._request(), is_successful=False)
+        attempt = self.service.analyze_login_attempt(self.user, self._request(), is_successful=False)
+        self.assertEqual(attempt.suspicious_factors['recent_failures'], 4)
+        self.assertEqual(login_risk.get_ip_failures('203.0.113.9'), 5)
+
+    @override_settings(LOGIN_RISK_SETTINGS=dict(DEFERRED, REVOKE_ON_ESCALATION=True))
+    def test_enrichment_escalates_flipped_verdict(self, _):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        attempt = self.service.analyze_login_attempt(self.user, self._request(), is_successful=True)
+        self.assertFalse(attempt.is_suspicious)
+        RefreshToken.for_user(self.user)  # the session this login created
+
+        with patch.object(self.service, '_calculate_risk_score',
+                          return_value={'risk_score': 90, 'suspicious_factors': {'impossible_travel': True}}), \
+                patch.object(self.service, 'lock_social_accounts'):
+            enriched = self.service.enrich_login_attempt(attempt.pk, fast_suspicious=False)
+
+        self.assertTrue(enriched.is_suspicious)
+        self.assertTrue(LoginAttempt.objects.get(pk=attempt.pk).is_suspicious)
+        self.assertTrue(SecurityAlert.objects.filter(user=self.user, alert_type='suspicious_activity').exists())
+
+        escalation = login_risk.get_login_escalation(self.user)
+        self.assertEqual(escalation['attempt_id'], attempt.pk)
+        self.assertEqual(escalation['revoked_tokens'], 1)
+
+    @override_settings(LOGIN_RISK_SETTINGS=DEFERRED)
+    def test_escalation_rejects_existing_tokens(self, _):
+        from rest_framework.authtoken.models import Token
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from auth_module.token_family import FamilyLimitedTokenObtainPairSerializer
+
+        from ..authentication import EscalationAwareJWTAuthentication
+
+        def sign_in():
+            return FamilyLimitedTokenObtainPairSerializer.get_token(self.user).access_token
+
+        def authenticate(token):
+            request = RequestFactory().get('/api/auth/me/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            return EscalationAwareJWTAuthentication().authenticate(request)
+
+        attempt = self.service.analyze_login_attempt(self.user, self._request(), is_successful=True)
+        Token.objects.create(user=self.user)
+        old_access = sign_in()
+        # Minted without an auth_time claim, so iat is compared instead
+        legacy_access = AccessToken.for_user(self.user)
+        self.assertEqual(authenticate(old_access)[0], self.user)
+
+        with patch.object(self.service, '_calculate_risk_score',
+                          return_value={'risk_score': 90, 'suspicious_factors': {'impossible_travel': True}}), \
+                patch.object(self.service, 'lock_social_accounts'):
+            self.service.enrich_login_attempt(attempt.pk, fast_suspicious=False)
+
+        # Revocation is on by default
+        escalation = login_risk.get_login_escalation(self.user)
+        self.assertTrue(escalation['revoked_drf_token'])
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(old_access)
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(legacy_access)
+
+        # A sign-in after the escalation is accepted, even within the same second
+        new_access = sign_in()
+        self.assertGreater(new_access['auth_time'], escalation['escalated_ts'])
+        self.assertEqual(authenticate(new_access)[0], self.user)
+
+    @override_settings(LOGIN_RISK_SETTINGS=DEFERRED)
+    def test_enrichment_escalates_fast_path_verdict(self, _):
+        attempt = self.service.analyze_login_attempt(self.user, self._request(), is_successful=True)
+        LoginAttempt.objects.filter(pk=attempt.pk).update(is_suspicious=True)
+
+        with patch.object(self.service, '_calculate_risk_score',
+                          return_value={'risk_score': 95, 'suspicious_factors': {'blacklisted_ip': True}}), \
+                patch.object(self.service, 'lock_social_accounts'):
+            self.service.enrich_login_attempt(attempt.pk, fast_suspicious=True)
+
+        self.assertEqual(login_risk.get_login_escalation(self.user)['attempt_id'], attempt.pk)
+
+    def test_login_view_refuses_fast_path_suspicious_login(self, _):
+        from rest_framework.test import APIClient
+
+        from auth_module.models import UserSalt
+
+        UserSalt.objects.create(user=self.user, salt=b's' * 32, auth_hash=b'h' * 32)
+        flagged = LoginAttempt(user=self.user, threat_score=90, is_suspicious=True)
+
+        with patch('auth_module.views.security_service.analyze_login_attempt', return_value=flagged):
+            response = APIClient().post(
+                '/api/auth/login/', {'username': 'riskuser', 'password': 'pw-123456'}, format='json',
+            )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['code'], 'login_suspicious')
+
+    def test_full_score_ignores_the_attempt_itself(self, _):
+        attempt = LoginAttempt.objects.create(
+            user=self.user, username_attempted='riskuser', ip_address='203.0.113.9',
+            status='success', location='Sydney, Australia', timestamp=timezone.now(),
+        )
+        risk = self.service._calculate_risk_score(self.user, attempt, None)
+        self.assertEqual(risk['suspicious_factors']['new_location'], 'Sydney, Australia')
+
+    def test_full_score_ignores_later_attempts(self, _):
+        attempt = LoginAttempt.objects.create(
+            user=self.user, username_attempted='riskuser', ip_address='203.0.113.9',
+            status='success', location='Sydney, Australia',
+        )
+        # Logins after the attempt (enrichment can run late) are not its history
+        LoginAttempt.objects.create(
+            user=self.user, username_attempted='riskuser', ip_address='198.51.100.7',
+            status='success', location='Sydney, Australia',
+        )
+        LoginAttempt.objects.create(
+            user=self.user, username_attempted='riskuser', ip_address='198.51.100.7',
+            status='success', location='Paris, France',
+        )
+        risk = self.service._calculate_risk_score(self.user, attempt, None)
+        self.assertEqual(risk['suspicious_factors']['new_location'], 'Sydney, Australia')
+        self.assertNotIn('impossible_travel', risk['suspicious_factors'])
@@ -0,0 +1,118 @@
+"""
+Tests for the compiled pattern dictionary (security/services/pattern_dictionary.py).
+
+Covers:
+  * one-pass matching agreeing with a brute-force substring scan
+  * leet readings, spans and category merging
+  * the on-disk file being remapped after a rebuild
+  * PatternAnalysisEngine using a configured dictionary
+"""
+
+import os
+import random
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from security.services.pattern_analysis_engine import PatternAnalysisEngine
+from security.services.pattern_dictionary import (
+    PatternDictionary,
+    PatternMatch,
+    SharedPatternDictionary,
+    iter_date_patterns,
+    leet_readings,
+    write_dictionary,
+)
+
+
+class PatternDictionaryMatchTests(SimpleTestCase):
+
+    def test_matches_agree_with_substring_scan(self):
+        rng = random.Random(7)
+        readings = {'1': ('1', 'a')}
+        for _ in range(200):
+            words = {''.join(rng.choices('abc1', k=rng.randint(1, 5))) for _ in range(rng.randint(0, 30))}
+            dictionary = PatternDictionary.from_patterns((w, 'word') for w in words)
+            for _ in range(10):
+                text = ''.join(rng.choices('abc1', k=rng.randint(0, 12)))
+                expected = {
+                    (start, start + len(w), w)
+                    for w in words
+                    for start in range(len(text) - len(w) + 1)
+                    if all(t == c or (t == '1' and c == 'a') for t, c in zip(text[start:], w))
+                }
+                found = {(m.start, m.end, m.pattern) for m in dictionary.find(text, readings)}
+                self.assertEqual(found, expected, (sorted(words), text))
+
+    def test_leet_spans_and_categories(self):
+        dictionary = PatternDictionary.from_patterns([
+            ('password', 'word'), ('password', 'keyboard'), ('word', 'word'), ('1987', 'date'),
+        ])
+        readings = leet_readings({'a': ['@'], 'o': ['0']})
+        self.assertEqual(dictionary.find('p@ssw0rd1987', readings), [
+            PatternMatch(0, 8, 'password', ('word', 'keyboard'), True),
+            PatternMatch(4, 8, 'word', ('word',), True),
+            PatternMatch(8, 12, '1987', ('date',), False),
+        ])
+        self.assertEqual(dictionary.find('p@ssw0rd'), [])
+
+    def test_min_length_and_case(self):
+        dictionary = PatternDictionary.from_patterns([('Ab', 'name'), ('Alice', 'name')], min_length=3)
+        self.assertEqual(dictionary.pattern_count, 1)
+        self.assertEqual([m.pattern for m in dictionary.find('xalicex')], ['alice'])
+
+    def test_date_patterns(self):
+        dates = set(iter_date_patterns(1999, 2000))
+        self.assertTrue({'12311999', '31121999', '19991231', '123199', '0229', '20000229'} <= dates)
+        self.assertNotIn('19990229', dates)
+
+
+class SharedPatternDictionaryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'patterns.bin')
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_remaps_rebuilt_file(self):
+        shared = SharedPatternDictionary(self.path, reload_check_interval=0)
+        self.assertIsNone(shared.current())
+
+        write_dictionary(self.path, [('dragon', 'word')])
+        self.assertEqual([m.pattern for m in shared.current().find('dragon1')], ['dragon'])
+
+        write_dictionary(self.path, [('falcon', 'word')])
+        self.assertEqual(shared.current().find('dragon1'), [])
+        self.assertEqual(shared.current().pattern_count, 1)
+
+    def test_corrupt_file_is_ignored(self):
+        with open(self.path, 'wb') as fh:
+            fh.write(b'not a dictionary')
+        with self.assertLogs('security.services.pattern_dictionary', 'ERROR'):
+            self.assertIsNone(SharedPatternDictionary(self.path, reload_check_interval=0).current())
+
+
+class PatternAnalysisEngineDictionaryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'patterns.bin')
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_builtin_lists_without_a_file(self):
+        with override_settings(PATTERN_DICTIONARY_SETTINGS={'PATH': self.path}):
+            result = PatternAnalysisEngine().analyze_password('P@ssw0rd123')
+        self.assertEqual(result.detected_base_words, ['password'])
+        # Keyboard walks only count when typed as-is
+        self.assertEqual(result.keyboard_patterns, [])
+        self.assertEqual(result.pattern_matches[0][:3], (0, 8, 'password'))
+
+    def test_configured_dictionary(self):
+        write_dictionary(self.path, [('gandalf', 'name'), ('zxcvbnm', 'keyboard'), ('and', 'word')])
+        with override_settings(PATTERN_DICTIONARY_SETTINGS={'PATH': self.path, 'RELOAD_CHECK_SECONDS': 0}):
+            result = PatternAnalysisEngine().analyze_password('G4ndalf_zxcvbnm')
+        # 'and' sits inside the longer 'gandalf' match
+        self.assertEqual(result.detected_base_words, ['gandalf'])
+        self.assertEqual(result.keyboard_patterns, ['zxcvbnm'])
+        self.assertTrue(result.has_dictionary_base)
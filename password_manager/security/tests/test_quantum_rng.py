@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 import asyncio
 import json
 import os
+import time
 
 from ..services.quantum_rng_service import (
     QuantumPasswordGenerator,
@@ -26,6 +27,7 @@ from ..services.quantum_rng_service import (
     QuantumProvider,
     QuantumCertificate,
     QuantumEntropyBatch,
+    EntropyRingBuffer,
     get_quantum_generator,
 )
 from ..models import QuantumPasswordCertificate, QuantumEntropyBatch as DBQuantumEntropyBatch
@@ -290,6 +292,109 @@ class EntropyPoolTestCase(TestCase):
         result = asyncio.run(pool.get_random_bytes(100))
         self.assertEqual(len(result[0]), 100)
 
+    def _pool_with_providers(self, *providers, **kwargs):
+        pool = QuantumEntropyPool(refill_mode='none', **kwargs)
+        pool._providers = list(providers) + [FallbackCryptoProvider()]
+        return pool
+    
+    def _fake_provider(self, name, fill=b'\x01', delay=0.0):
+        provider = MagicMock()
+        provider.is_available.return_value = True
+        provider.get_provider_name.return_value = name
+        provider.get_quantum_source.return_value = 'test_source'
+        
+        async def fetch(count):
+            await asyncio.sleep(delay)
+            return fill * count, f'{getattr(name, "value", name)}-circuit'
+        
+        provider.fetch_random_bytes.side_effect = fetch
+        return provider
+    
+    def test_read_never_waits_on_providers(self):
+        """An empty pool serves fallback bytes and counts the starvation."""
+        slow = self._fake_provider(QuantumProvider.ANU, delay=30)
+        pool = self._pool_with_providers(slow, min_pool_size=32, max_pool_size=64)
+        
+        random_bytes, certificate = asyncio.run(pool.get_random_bytes(16))
+        
+        self.assertEqual(len(random_bytes), 16)
+        self.assertEqual(certificate.provider, QuantumProvider.FALLBACK.value)
+        slow.fetch_random_bytes.assert_not_called()
+        status = pool.get_pool_status()
+        self.assertEqual(status['starved_requests'], 1)
+        self.assertEqual(status['starved_bytes'], 16)
+    
+    def test_refill_fetches_concurrently_with_timeouts(self):
+        """Providers are queried together; a slow one times out without blocking the rest."""
+        anu = self._fake_provider(QuantumProvider.ANU, fill=b'\x0a')
+        ionq = self._fake_provider(QuantumProvider.IONQ, fill=b'\x0b', delay=0.2)
+        stuck = self._fake_provider(QuantumProvider.IBM, delay=30)
+        pool = self._pool_with_providers(
+            anu, stuck, ionq, min_pool_size=32, max_pool_size=96, batch_size=64, provider_timeout=0.5
+        )
+        
+        started = time.perf_counter()
+        added = asyncio.run(pool.refill())
+        
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(added, 64)
+        status = pool.get_pool_status()
+        self.assertEqual(status['total_bytes_available'], 64)
+        self.assertEqual(status['provider_timeouts'], {QuantumProvider.IBM.value: 1})
+        self.assertGreater(status['last_refill_latency_ms'], 0)
+        
+        # Bytes come out in provider priority order with their provenance
+        random_bytes, certificate = asyncio.run(pool.get_random_bytes(40))
+        self.assertEqual(random_bytes, b'\x0a' * 32 + b'\x0b' * 8)
+        self.assertEqual(certificate.provider, QuantumProvider.IONQ.value)
+        self.assertEqual(certificate.circuit_id, 'ionq_quantum-circuit')
+        self.assertEqual(pool.level(), 24)
+    
+    def test_refill_accepts_str_named_providers(self):
+        """Cosmic-ray and ocean-wave providers return a plain str name."""
+        anu = self._fake_provider(QuantumProvider.ANU, fill=b'\x0a')
+        cosmic = self._fake_provider(QuantumProvider.COSMIC_RAY.value, fill=b'\x0c')
+        pool = self._pool_with_providers(anu, cosmic, min_pool_size=16, max_pool_size=32, batch_size=16)
+        
+        self.assertEqual(asyncio.run(pool.refill()), 32)
+        
+        random_bytes, certificate = asyncio.run(pool.get_random_bytes(32))
+        self.assertEqual(random_bytes, b'\x0a' * 16 + b'\x0c' * 16)
+        self.assertEqual(certificate.provider, QuantumProvider.COSMIC_RAY.value)
+    
+    def test_ring_buffer_wraps_and_skips_expired(self):
+        """The byte ring wraps around and drops expired segments on read."""
+        ring = EntropyRingBuffer(8)
+        now = time.time()
+        self.assertEqual(ring.write(b'abcdef', QuantumProvider.ANU, None, now + 60), 6)
+        self.assertEqual(ring.read(4)[0], b'abcd')
+        self.assertEqual(ring.write(b'ghijklmn', QuantumProvider.IBM, 'c1', now - 1), 6)
+        self.assertEqual(ring.write(b'zz', QuantumProvider.IONQ, None, now + 60), 0)
+        self.assertEqual(ring.available(), 8)
+        
+        data, segments = ring.read(8)
+        self.assertEqual(data, b'ef')
+        self.assertEqual([s.provider for s in segments], [QuantumProvider.ANU])
+        self.assertEqual(ring.available(), 0)
+        self.assertEqual(ring.write(b'0123456', QuantumProvider.IONQ, None, now + 60), 7)
+        self.assertEqual(ring.read(7)[0], b'0123456')
+    
+    def test_background_refill_after_low_watermark(self):
+        """Dropping below the low watermark wakes the refill thread."""
+        anu = self._fake_provider(QuantumProvider.ANU, fill=b'\x07')
+        pool = self._pool_with_providers(anu, min_pool_size=32, max_pool_size=64, batch_size=64)
+        pool.refill_mode = 'thread'
+        
+        asyncio.run(pool.get_random_bytes(8))
+        deadline = time.time() + 5
+        while pool.level() < 64 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        self.assertEqual(pool.level(), 64)
+        random_bytes, certificate = asyncio.run(pool.get_random_bytes(16))
+        self.assertEqual(random_bytes, b'\x07' * 16)
+        self.assertEqual(certificate.provider, QuantumProvider.ANU.value)
+
 
 # =============================================================================
 # Password Generator Tests
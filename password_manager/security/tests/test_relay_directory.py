@@ -0,0 +1,146 @@
+"""
+Tests for the dark protocol relay directory (security/services/relay_directory.py).
+
+Covers:
+  * path shape, region diversity and the same-region fallback
+  * verified / bridge / preferred-region filtering
+  * load feedback keeping full nodes out of paths
+  * snapshot refresh on invalidation and on a short path
+  * the 10k-session simulation spreading circuits over every node
+"""
+
+import random
+import uuid
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from security.services.relay_directory import RelayDirectory, simulate_sessions
+
+
+def _node(node_type, region='EU', trust=1.0, bandwidth=100, circuits=0, max_circuits=1000, age=None):
+    return SimpleNamespace(
+        pk=uuid.uuid4(),
+        node_id=uuid.uuid4().hex,
+        node_type=node_type,
+        region=region,
+        trust_score=trust,
+        bandwidth_mbps=bandwidth,
+        uptime_percentage=100.0,
+        current_circuits=circuits,
+        max_circuits=max_circuits,
+        last_seen_at=timezone.now() - (age or timedelta(0)),
+    )
+
+
+def _directory(nodes, **kwargs):
+    kwargs.setdefault('rng', random.Random(1))
+    return RelayDirectory(
+        loader=lambda: nodes,
+        refresh_seconds=3600,
+        miss_refresh_seconds=3600,
+        min_trust=0.3,
+        use_shared_version=False,
+        **kwargs,
+    )
+
+
+class RelayDirectorySelectionTests(SimpleTestCase):
+
+    def test_path_shape_and_region_diversity(self):
+        nodes = (
+            [_node('entry', region) for region in ('EU', 'NA')]
+            + [_node('relay', region) for region in ('EU', 'NA', 'AS', 'SA')]
+            + [_node('destination', region) for region in ('EU', 'NA', 'AS', 'SA', 'AF')]
+        )
+        directory = _directory(nodes)
+        for _ in range(200):
+            path = directory.select_path(hop_count=4, require_verified=False)
+            self.assertEqual([n.node_type for n in path], ['entry', 'relay', 'relay', 'destination'])
+            self.assertEqual(len({n.region for n in path}), 4)
+
+    def test_same_region_fallback(self):
+        nodes = [_node('entry'), _node('relay'), _node('relay'), _node('destination')]
+        path = _directory(nodes).select_path(hop_count=4)
+        self.assertEqual(len({n.pk for n in path}), 4)
+
+    def test_verified_bridges_and_preferred_regions(self):
+        bridge = _node('bridge', 'NA')
+        low_trust_entry = _node('entry', 'EU', trust=0.1)
+        preferred_entry = _node('entry', 'AS')
+        nodes = [bridge, low_trust_entry, preferred_entry, _node('entry', 'NA'), _node('destination', 'SA')]
+        directory = _directory(nodes)
+
+        entries = Counter(directory.select_path(2, require_verified=True)[0].pk for _ in range(200))
+        self.assertNotIn(low_trust_entry.pk, entries)
+        self.assertEqual(directory.select_path(2, use_bridges=True)[0], bridge)
+        self.assertEqual(directory.select_path(2, preferred_regions=['AS'])[0], preferred_entry)
+        # An unavailable preference falls back to any entry
+        self.assertEqual(len(directory.select_path(2, preferred_regions=['OC'])), 2)
+
+    def test_load_feedback_skips_full_nodes(self):
+        busy = _node('entry', bandwidth=1000, max_circuits=10)
+        idle = _node('entry', bandwidth=1)
+        directory = _directory([busy, idle, _node('destination', 'NA')])
+        picks = Counter()
+        for _ in range(100):
+            path = directory.select_path(2)
+            picks[path[0].pk] += 1
+            directory.record_circuits(path, 1)
+        self.assertEqual(picks[busy.pk], 10)
+        self.assertEqual(directory.circuits(busy), 10)
+
+        directory.record_circuits([busy], -1)
+        self.assertEqual(directory.select_path(2)[0], busy)
+
+    def test_stale_nodes_are_skipped(self):
+        stale = _node('entry', bandwidth=1000, age=timedelta(minutes=10))
+        fresh = _node('entry', bandwidth=1)
+        directory = _directory([stale, fresh, _node('destination', 'NA')])
+        self.assertTrue(all(directory.select_path(2)[0] == fresh for _ in range(50)))
+
+
+class RelayDirectoryRefreshTests(SimpleTestCase):
+
+    def test_invalidate_reloads(self):
+        nodes = [_node('entry'), _node('destination', 'NA')]
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return list(nodes)
+
+        directory = RelayDirectory(loader=loader, refresh_seconds=3600, use_shared_version=False)
+        directory.select_path(2)
+        directory.select_path(2)
+        self.assertEqual(len(loads), 1)
+
+        nodes[0].current_circuits = 7
+        directory.invalidate()
+        directory.select_path(2)
+        self.assertEqual(len(loads), 2)
+        self.assertEqual(directory.circuits(nodes[0]), 7)
+
+    def test_short_path_refreshes_once(self):
+        nodes = [_node('entry')]
+        directory = RelayDirectory(
+            loader=lambda: list(nodes), refresh_seconds=3600, miss_refresh_seconds=0, use_shared_version=False,
+        )
+        self.assertEqual(len(directory.select_path(2)), 1)
+        nodes.append(_node('destination', 'NA'))
+        self.assertEqual(len(directory.select_path(2)), 2)
+
+
+class RelayDirectorySimulationTests(SimpleTestCase):
+
+    def test_load_spreads_over_all_nodes(self):
+        result = simulate_sessions(sessions=10_000, seed=3)
+        weighted, top_ranked = result['weighted'], result['top_ranked']
+        self.assertEqual(weighted['short_paths'], 0)
+        for node_type, spread in weighted['spread'].items():
+            self.assertEqual(spread['nodes_used'], spread['nodes'], node_type)
+            self.assertLessEqual(spread['max_load_percent'], 100.0, node_type)
+            self.assertEqual(top_ranked['spread'][node_type]['nodes_used'], 1)
@@ -0,0 +1,348 @@
+"""
+Buffered Model Writer
+=====================
+
+Moves high-volume, fire-and-forget inserts (``SystemLog`` rows from
+``DatabaseLogHandler``, ``PerformanceMetric`` rows from
+``PerformanceMonitoringMiddleware``) off the request thread.
+
+Callers hand an unsaved model instance to ``write_row()``. It goes into one
+bounded in-process queue shared by every model, and a background flusher
+thread drains the queue into batches of up to ``BATCH_SIZE`` rows, or
+whatever has arrived ``FLUSH_INTERVAL_SECONDS`` after the first row, and
+writes each model's rows with one ``bulk_create``.
+
+When the queue fills up:
+- above ``SAMPLE_ABOVE`` of capacity, rows not marked ``essential`` are
+  sampled: one in ``SAMPLE_EVERY`` is kept, the rest are counted as
+  ``sampled_out``
+- when it is full, essential rows wait up to ``BLOCK_TIMEOUT_MS`` for space
+  (back-pressure on the caller); anything that still does not fit is
+  counted as ``dropped``
+
+Queued rows are flushed on interpreter shutdown (``atexit``) and by
+``flush_buffered_writes()``. ``get_writer_stats()`` reports the enqueued,
+flushed, sampled-out, dropped and failed counters.
+
+With ``ENABLED`` off (as in tests) ``write_row()`` saves the row
+immediately on the calling thread, like the old ``objects.create()``.
+
+Configuration (``settings.BUFFERED_DB_WRITES``):
+- ENABLED: queue rows for the flusher (synchronous saves otherwise)
+- MAX_QUEUE: rows held in memory before sampling and dropping kick in
+- BATCH_SIZE: upper bound on rows per flush
+- FLUSH_INTERVAL_SECONDS: how long the first queued row may wait
+- SAMPLE_ABOVE: queue fill fraction above which non-essential rows are sampled
+- SAMPLE_EVERY: keep one in this many non-essential rows while sampling
+- BLOCK_TIMEOUT_MS: how long essential rows wait for space when the queue is full
+
+Usage:
+    from shared.buffered_writer import write_row
+
+    write_row(PerformanceMetric(**data))
+    write_row(SystemLog(level='ERROR', ...), essential=True)
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'MAX_QUEUE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL_SECONDS': 1.0,
+    'SAMPLE_ABOVE': 0.8,
+    'SAMPLE_EVERY': 10,
+    'BLOCK_TIMEOUT_MS': 50,
+}
+
+_STOP = object()
+
+_flusher_thread = threading.local()
+
+
+def get_writer_config() -> Dict:
+    """Writer settings merged over the defaults"""
+    try:
+        from django.conf import settings
+        overrides = getattr(settings, 'BUFFERED_DB_WRITES', {}) or {}
+    except Exception:
+        overrides = {}
+    return {**DEFAULT_CONFIG, **overrides}
+
+
+def in_flusher_thread() -> bool:
+    """True on a flusher thread; log handlers use it to avoid feeding themselves."""
+    return getattr(_flusher_thread, 'active', False)
+
+
+class BufferedModelWriter:
+    """
+    Bounded queue of unsaved model instances written by one flusher thread
+
+    The thread is started on first use and restarted in a forked child, so
+    a writer created before a prefork server forks keeps working.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, sample_above: float = 0.8,
+                 sample_every: int = 10, block_timeout_ms: float = 50):
+        self.max_queue = max(1, int(max_queue))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.sample_threshold = int(self.max_queue * sample_above)
+        self.sample_every = max(1, int(sample_every))
+        self.block_timeout = max(0.0, block_timeout_ms / 1000.0)
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._sample_counter = 0
+        self._running = True
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.enqueued = 0
+        self.flushed = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_at = None
+
+    # =========================================================================
+    # Producer side
+    # =========================================================================
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked child: the parent's thread and queued rows do not exist here
+                self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="buffered-db-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, instance, essential: bool = False) -> bool:
+        """
+        Queue an unsaved model instance
+
+        Returns False if the row was sampled out or dropped.
+        """
+        if not self._running:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        self._ensure_thread()
+
+        if not essential and self._queue.qsize() >= self.sample_threshold:
+            with self._stats_lock:
+                self._sample_counter += 1
+                keep = self._sample_counter % self.sample_every == 0
+                if not keep:
+                    self.sampled_out += 1
+            if not keep:
+                return False
+
+        try:
+            if essential and self.block_timeout > 0:
+                self._queue.put(instance, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(instance)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every row queued before this call has been written"""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Write out the queue and stop the flusher thread"""
+        if not self._running:
+            return
+        self._running = False
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    # =========================================================================
+    # Flusher side
+    # =========================================================================
+
+    def _collect(self) -> List:
+        """Block for the first item, then fill the batch until its deadline"""
+        batch = [self._queue.get()]
+        if batch[0] is _STOP or isinstance(batch[0], threading.Event):
+            return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP or isinstance(item, threading.Event):
+                break
+        return batch
+
+    def _run(self):
+        _flusher_thread.active = True
+        while True:
+            batch = self._collect()
+            rows = [item for item in batch if item is not _STOP and not isinstance(item, threading.Event)]
+            if rows:
+                self._write(rows)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if batch[-1] is _STOP:
+                self._close_connections()
+                return
+
+    def _write(self, rows: List):
+        by_model = defaultdict(list)
+        for row in rows:
+            by_model[type(row)].append(row)
+
+        written = failed = 0
+        for model, instances in by_model.items():
+            try:
+                model.objects.bulk_create(instances, batch_size=self.batch_size)
+                written += len(instances)
+            except Exception as e:
+                failed += len(instances)
+                logger.warning(f"Buffered write of {len(instances)} {model.__name__} rows failed: {e}")
+        self._close_connections()
+
+        with self._stats_lock:
+            self.flushed += written
+            self.failed += failed
+            self.batches += 1
+            self.last_flush_at = time.time()
+
+    @staticmethod
+    def _close_connections():
+        try:
+            from django.db import close_old_connections
+            close_old_connections()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'enqueued': self.enqueued,
+                'flushed': self.flushed,
+                'sampled_out': self.sampled_out,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'queued': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'last_flush_at': self.last_flush_at,
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._reset_stats()
+
+
+# =============================================================================
+# Shared writer
+# =============================================================================
+
+_writer: Optional[BufferedModelWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_buffered_writer() -> BufferedModelWriter:
+    """The process-wide writer, built from ``settings.BUFFERED_DB_WRITES``"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = get_writer_config()
+                _writer = BufferedModelWriter(
+                    max_queue=config['MAX_QUEUE'],
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL_SECONDS'],
+                    sample_above=config['SAMPLE_ABOVE'],
+                    sample_every=config['SAMPLE_EVERY'],
+                    block_timeout_ms=config['BLOCK_TIMEOUT_MS'],
+                )
+    return _writer
+
+
+def buffered_writes_enabled() -> bool:
+    return bool(get_writer_config()['ENABLED'])
+
+
+def write_row(instance, essential: bool = False) -> bool:
+    """
+    Persist an unsaved model instance, buffered when enabled
+
+    Returns False if the row was sampled out or dropped. With buffering
+    off the row is saved immediately and database errors propagate.
+    """
+    if not buffered_writes_enabled():
+        instance.save(force_insert=True)
+        return True
+    return get_buffered_writer().enqueue(instance, essential=essential)
+
+
+def flush_buffered_writes(timeout: float = 5.0) -> bool:
+    """Write out everything queued so far; False if it did not finish in time"""
+    if _writer is None:
+        return True
+    return _writer.flush(timeout)
+
+
+def get_writer_stats() -> Dict:
+    """Counters of the process-wide writer (zeros before its first use)"""
+    if _writer is None:
+        return {
+            'enqueued': 0, 'flushed': 0, 'sampled_out': 0, 'dropped': 0, 'failed': 0,
+            'batches': 0, 'queued': 0, 'max_queue': get_writer_config()['MAX_QUEUE'],
+            'last_flush_at': None,
+        }
+    return _writer.stats()
+
+
+def shutdown_buffered_writer(timeout: float = 5.0):
+    """Flush queued rows and stop the flusher (registered with ``atexit``)"""
+    if _writer is not None:
+        _writer.stop(timeout)
+
+
+atexit.register(shutdown_buffered_writer)
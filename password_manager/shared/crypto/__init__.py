@@ -5,6 +5,7 @@ Provides encryption services including:
 - XChaCha20-Poly1305 AEAD encryption
 - Key derivation (PBKDF2, HKDF)
 - Stream encryption for large files
+- Byte-wise Shamir secret sharing over GF(2^8) (shamir_gf256)
 """
 
 from .xchacha20 import (
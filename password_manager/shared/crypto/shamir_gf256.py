@@ -0,0 +1,192 @@
+"""
+Byte-wise Shamir Secret Sharing over GF(2^8)
+
+Every byte of the secret is the constant term of its own random polynomial
+of degree ``threshold - 1`` over GF(2^8) (the AES field, x^8+x^4+x^3+x+1).
+A share is the evaluation of all of those polynomials at one non-zero x, so
+it is exactly as long as the secret and there is no size limit.
+
+Arithmetic runs on whole byte arrays: addition is XOR and multiplying an
+array by a field element x is one table lookup, ``np.take(MUL[x], array)``,
+into a 256x256 product table built from log/exp tables. Each share is
+evaluated for all bytes at once by Horner's rule (``threshold - 1`` lookups
+and XORs per share). Reconstruction interpolates at x=0 with Lagrange
+coefficients that depend only on the share indices and are cached.
+
+Usage:
+    from shared.crypto.shamir_gf256 import split, combine, split_many
+
+    shares = split(secret, threshold=3, shares=5)   # [(1, b'...'), ..., (5, b'...')]
+    secret = combine(shares[:3])
+
+    # Many secrets in one vectorised pass
+    per_secret = split_many([s1, s2, s3], threshold=2, shares=3)
+"""
+
+import secrets
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+MAX_SHARES = 255
+
+
+def _build_tables():
+    exp = np.zeros(510, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.int32)
+    value = 1
+    for power in range(255):
+        exp[power] = exp[power + 255] = value
+        log[value] = power
+        # Multiply by the generator 0x03: value * 2 (reduced) xor value
+        doubled = value << 1
+        if doubled & 0x100:
+            doubled ^= 0x11B
+        value = doubled ^ value
+    mul = exp[log[:, None] + log[None, :]]
+    mul[0, :] = mul[:, 0] = 0
+    return exp, log, mul
+
+
+EXP, LOG, MUL = _build_tables()
+
+Share = Tuple[int, bytes]
+
+
+def _mul(a: int, b: int) -> int:
+    return int(MUL[a, b])
+
+
+def _inv(a: int) -> int:
+    return int(EXP[255 - LOG[a]])
+
+
+def _check_parameters(threshold: int, shares: int):
+    if threshold < 2:
+        raise ValueError("Threshold must be at least 2")
+    if threshold > shares:
+        raise ValueError(f"Threshold ({threshold}) cannot exceed total shares ({shares})")
+    if shares > MAX_SHARES:
+        raise ValueError(f"At most {MAX_SHARES} shares are possible over GF(256)")
+
+
+def _evaluate(constant: np.ndarray, coefficients: np.ndarray, xs: Sequence[int]) -> np.ndarray:
+    """
+    Evaluate one polynomial per byte column at every x.
+
+    ``constant`` is (L,), ``coefficients`` is (degree, L) holding the
+    coefficients of x^1 .. x^degree. Returns a (len(xs), L) uint8 array.
+    """
+    out = np.empty((len(xs), constant.shape[0]), dtype=np.uint8)
+    for i, x in enumerate(xs):
+        row, acc = MUL[x], out[i]
+        acc[:] = coefficients[-1]
+        for coefficient in coefficients[-2::-1]:
+            np.take(row, acc, out=acc)
+            acc ^= coefficient
+        np.take(row, acc, out=acc)
+        acc ^= constant
+    return out
+
+
+def _random_coefficients(degree: int, length: int) -> np.ndarray:
+    return np.frombuffer(secrets.token_bytes(degree * length), dtype=np.uint8).reshape(degree, length)
+
+
+def split(secret: bytes, threshold: int, shares: int) -> List[Share]:
+    """
+    Split ``secret`` into ``shares`` shares, any ``threshold`` of which recover it.
+
+    Returns:
+        ``[(x, share_bytes), ...]`` for x = 1..shares; each share is
+        ``len(secret)`` bytes long
+    """
+    _check_parameters(threshold, shares)
+    values = np.frombuffer(bytes(secret), dtype=np.uint8)
+    xs = range(1, shares + 1)
+    evaluations = _evaluate(values, _random_coefficients(threshold - 1, len(values)), xs)
+    return [(x, evaluations[i].tobytes()) for i, x in enumerate(xs)]
+
+
+def split_many(secret_list: Sequence[bytes], threshold: int, shares: int) -> List[List[Share]]:
+    """
+    Split several secrets with the same threshold in one pass.
+
+    Byte columns are independent, so the secrets are concatenated, split
+    together and the shares cut back apart. Returns one share list per
+    secret, in order.
+    """
+    _check_parameters(threshold, shares)
+    joined = np.frombuffer(b''.join(bytes(s) for s in secret_list), dtype=np.uint8)
+    xs = range(1, shares + 1)
+    evaluations = _evaluate(joined, _random_coefficients(threshold - 1, len(joined)), xs)
+    results = []
+    offset = 0
+    for secret in secret_list:
+        end = offset + len(secret)
+        results.append([(x, evaluations[i, offset:end].tobytes()) for i, x in enumerate(xs)])
+        offset = end
+    return results
+
+
+@lru_cache(maxsize=1024)
+def lagrange_coefficients(xs: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Weights w_i with f(0) = XOR_i w_i * f(x_i) for polynomials through ``xs``.
+
+    In GF(2^8) subtraction is XOR, so w_i = prod_{j != i} x_j / (x_i ^ x_j).
+    """
+    if len(set(xs)) != len(xs):
+        raise ValueError("Share indices must be distinct")
+    if any(not 1 <= x <= MAX_SHARES for x in xs):
+        raise ValueError(f"Share indices must be between 1 and {MAX_SHARES}")
+    weights = []
+    for i, xi in enumerate(xs):
+        weight = 1
+        for j, xj in enumerate(xs):
+            if i != j:
+                weight = _mul(weight, _mul(xj, _inv(xi ^ xj)))
+        weights.append(weight)
+    return tuple(weights)
+
+
+def _share_matrix(share_list: Sequence[Share]) -> Tuple[Tuple[int, ...], np.ndarray]:
+    if len(share_list) < 2:
+        raise ValueError("Need at least 2 shares to reconstruct")
+    xs = tuple(int(x) for x, _ in share_list)
+    lengths = {len(value) for _, value in share_list}
+    if len(lengths) != 1:
+        raise ValueError("Shares have different lengths")
+    ys = np.frombuffer(b''.join(bytes(value) for _, value in share_list), dtype=np.uint8)
+    return xs, ys.reshape(len(share_list), lengths.pop())
+
+
+def combine(share_list: Sequence[Share]) -> bytes:
+    """
+    Recover the secret from ``threshold`` or more shares.
+
+    With fewer than ``threshold`` shares the result is unrelated random
+    bytes; callers that need to detect that should check a hash or MAC.
+    """
+    xs, ys = _share_matrix(share_list)
+    out = np.zeros(ys.shape[1], dtype=np.uint8)
+    term = np.empty_like(out)
+    for weight, y in zip(lagrange_coefficients(xs), ys):
+        np.take(MUL[weight], y, out=term)
+        out ^= term
+    return out.tobytes()
+
+
+def refresh(share_list: Sequence[Share], threshold: int) -> List[Share]:
+    """
+    Re-randomise shares without reconstructing the secret.
+
+    Adds the evaluations of fresh random polynomials with a zero constant
+    term, so old and new shares can no longer be mixed.
+    """
+    xs, ys = _share_matrix(share_list)
+    _check_parameters(threshold, max(threshold, len(xs)))
+    zero = np.zeros(ys.shape[1], dtype=np.uint8)
+    deltas = _evaluate(zero, _random_coefficients(threshold - 1, ys.shape[1]), xs)
+    return [(x, (ys[i] ^ deltas[i]).tobytes()) for i, x in enumerate(xs)]
@@ -0,0 +1,369 @@
+"""
+Shared GeoIP Lookup Service
+============================
+
+One process-wide IP geolocation service for every app that needs it.
+
+The MaxMind GeoLite2-City database is opened once per process in
+memory-mapped mode and reopened automatically when the file on disk is
+replaced (e.g. by a weekly geoipupdate run). Results are kept in an LRU
+cache keyed by IP, and in a second LRU keyed by /24 (IPv4) or /48 (IPv6)
+prefix whenever the database record covers the whole prefix, so a login
+storm from one network costs a dictionary lookup per request.
+
+When the database has no answer, callers that allow it fall back to the
+ipinfo.io API behind ``ipinfo_breaker``.
+
+Usage:
+    from shared.geoip import get_geoip_service
+
+    location = get_geoip_service().lookup('203.0.113.7')
+    locations = get_geoip_service().lookup_many(ips, allow_remote=False)
+
+Results are dicts with ``city``, ``country``, ``country_code``, ``region``,
+``latitude`` and ``longitude``; an empty dict means "unknown".
+"""
+
+import ipaddress
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _LRUCache:
+    """Small thread-safe LRU mapping with per-entry expiry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class GeoIPService:
+    """
+    Process-wide GeoIP lookups with a shared mmap reader and LRU caches.
+
+    Attributes:
+        db_path: Path to the GeoLite2-City database
+        cache_size: Entries in each of the IP and prefix caches
+        reload_check_interval: Seconds between mtime checks of the database
+    """
+
+    IPV4_PREFIX = 24
+    IPV6_PREFIX = 48
+
+    # Remote answers and misses are cached for less time than database
+    # answers, which stay valid until the database file changes.
+    REMOTE_TTL = 3600
+    MISS_TTL = 300
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        cache_size: int = 10000,
+        reload_check_interval: float = 60.0,
+        remote_timeout: float = 5.0
+    ):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.reload_check_interval = reload_check_interval
+        self.remote_timeout = remote_timeout
+
+        self._reader = None
+        self._reader_mtime: Optional[float] = None
+        self._next_reload_check = 0.0
+        self._reader_lock = threading.Lock()
+
+        self._ip_cache = _LRUCache(cache_size)
+        self._prefix_cache = _LRUCache(cache_size)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'ip_cache_hits': 0,
+            'prefix_cache_hits': 0,
+            'db_lookups': 0,
+            'remote_lookups': 0,
+            'reloads': 0,
+        }
+
+    # ==========================================================================
+    # DATABASE
+    # ==========================================================================
+
+    def _get_reader(self):
+        """Return the shared reader, reopening it if the file has changed."""
+        now = time.monotonic()
+        if self._reader is not None and now < self._next_reload_check:
+            return self._reader
+
+        with self._reader_lock:
+            if self._reader is not None and now < self._next_reload_check:
+                return self._reader
+            self._next_reload_check = now + self.reload_check_interval
+
+            if not self.db_path:
+                return None
+            try:
+                mtime = os.stat(self.db_path).st_mtime
+            except OSError:
+                if self._reader is not None:
+                    logger.warning(f"GeoIP database {self.db_path} disappeared; keeping the loaded copy")
+                return self._reader
+
+            if self._reader is not None and mtime == self._reader_mtime:
+                return self._reader
+
+            try:
+                import geoip2.database
+                import maxminddb
+                reader = geoip2.database.Reader(self.db_path, mode=maxminddb.MODE_MMAP)
+            except Exception as e:
+                logger.warning(f"Could not open GeoIP database {self.db_path}: {e}")
+                return self._reader
+
+            # In-flight lookups keep their reference to the old reader; it
+            # is closed when the last one drops it.
+            reloaded = self._reader is not None
+            self._reader = reader
+            self._reader_mtime = mtime
+            self._ip_cache.clear()
+            self._prefix_cache.clear()
+            if reloaded:
+                self._increment('reloads')
+                logger.info(f"Reloaded GeoIP database {self.db_path}")
+            return reader
+
+    def _db_lookup(self, reader, ip: str, address) -> Optional[Tuple[Dict, bool]]:
+        """Look ``ip`` up in the database: (location, record covers the prefix)."""
+        if reader is None:
+            return None
+        self._increment('db_lookups')
+        try:
+            response = reader.city(ip)
+        except Exception:
+            # AddressNotFoundError or a malformed database record
+            return None
+
+        subdivision = response.subdivisions.most_specific
+        location = {
+            'city': response.city.name or '',
+            'country': response.country.name or '',
+            'country_code': response.country.iso_code or '',
+            'region': subdivision.iso_code or '',
+            'latitude': response.location.latitude,
+            'longitude': response.location.longitude,
+        }
+        network = getattr(response.traits, 'network', None)
+        covers_prefix = network is not None and network.prefixlen <= self._prefix_length(address)
+        return location, covers_prefix
+
+    # ==========================================================================
+    # REMOTE FALLBACK
+    # ==========================================================================
+
+    def _remote_lookup(self, ip: str) -> Optional[Dict]:
+        """Ask ipinfo.io, guarded by the shared circuit breaker."""
+        from shared.circuit_breaker import ipinfo_breaker, CircuitBreakerOpen
+        import requests
+
+        self._increment('remote_lookups')
+        try:
+            ipinfo_breaker.before_call()
+            response = requests.get(f"https://ipinfo.io/{ip}/json", timeout=self.remote_timeout)
+            if response.status_code != 200:
+                ipinfo_breaker.on_failure()
+                return None
+            data = response.json()
+            ipinfo_breaker.on_success()
+        except CircuitBreakerOpen:
+            return None
+        except Exception as e:
+            ipinfo_breaker.on_failure(e)
+            logger.error(f"IP geolocation failed: {e}")
+            return None
+
+        loc = data.get('loc', '0,0').split(',')
+        return {
+            'city': data.get('city', ''),
+            'country': data.get('country', ''),
+            'country_code': data.get('country', ''),
+            'region': data.get('region', ''),
+            'latitude': float(loc[0]) if len(loc) > 0 and loc[0] else 0,
+            'longitude': float(loc[1]) if len(loc) > 1 and loc[1] else 0,
+        }
+
+    # ==========================================================================
+    # LOOKUPS
+    # ==========================================================================
+
+    def _prefix_length(self, address) -> int:
+        return self.IPV4_PREFIX if address.version == 4 else self.IPV6_PREFIX
+
+    def _prefix_key(self, address) -> str:
+        return str(ipaddress.ip_network(f"{address}/{self._prefix_length(address)}", strict=False))
+
+    def lookup(self, ip: Optional[str], allow_remote: bool = True) -> Dict:
+        """
+        Geolocate one IP address.
+
+        Args:
+            ip: IPv4 or IPv6 address
+            allow_remote: Fall back to ipinfo.io when the database has no answer
+
+        Returns:
+            Location dict, or {} for private, invalid or unknown addresses
+        """
+        try:
+            address = ipaddress.ip_address((ip or '').strip())
+        except ValueError:
+            return {}
+        if not address.is_global:
+            return {}
+        ip = str(address)
+
+        # Checked first so a replaced database also invalidates cached answers
+        reader = self._get_reader()
+
+        # An empty cached entry is a recent miss on both database and remote
+        cached = self._ip_cache.get(ip)
+        if cached is not None:
+            self._increment('ip_cache_hits')
+            return dict(cached)
+
+        prefix_key = self._prefix_key(address)
+        cached = self._prefix_cache.get(prefix_key)
+        if cached is not None:
+            self._increment('prefix_cache_hits')
+            return dict(cached)
+
+        found = self._db_lookup(reader, ip, address)
+        if found is not None:
+            location, covers_prefix = found
+            self._ip_cache.set(ip, location)
+            if covers_prefix:
+                self._prefix_cache.set(prefix_key, location)
+            return dict(location)
+
+        if not allow_remote:
+            return {}
+
+        location = self._remote_lookup(ip)
+        if location:
+            self._ip_cache.set(ip, location, ttl=self.REMOTE_TTL)
+            return dict(location)
+        self._ip_cache.set(ip, {}, ttl=self.MISS_TTL)
+        return {}
+
+    def lookup_many(self, ips: Iterable[str], allow_remote: bool = True) -> Dict[str, Dict]:
+        """
+        Geolocate many IP addresses, resolving each distinct address once.
+
+        Returns:
+            Mapping of each input IP to its location dict
+        """
+        results: Dict[str, Dict] = {}
+        for ip in ips:
+            if ip not in results:
+                results[ip] = self.lookup(ip, allow_remote=allow_remote)
+        return results
+
+    # ==========================================================================
+    # METRICS AND UTILITIES
+    # ==========================================================================
+
+    def _increment(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict:
+        """Cache hit and lookup counters."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'db_path': self.db_path,
+            'db_loaded': self._reader is not None,
+            'ip_cache_entries': len(self._ip_cache),
+            'prefix_cache_entries': len(self._prefix_cache),
+        })
+        return stats
+
+    def clear_cache(self):
+        """Drop every cached result."""
+        self._ip_cache.clear()
+        self._prefix_cache.clear()
+
+
+def _default_db_path() -> Optional[str]:
+    explicit = getattr(settings, 'GEOIP_DB_PATH', None)
+    if explicit:
+        # Historically a directory holding GeoLite2-City.mmdb
+        if os.path.isdir(explicit):
+            return os.path.join(explicit, getattr(settings, 'GEOIP_CITY', 'GeoLite2-City.mmdb'))
+        return explicit
+    geoip_dir = getattr(settings, 'GEOIP_PATH', None)
+    if not geoip_dir:
+        return None
+    return os.path.join(geoip_dir, getattr(settings, 'GEOIP_CITY', 'GeoLite2-City.mmdb'))
+
+
+# Global singleton instance
+_geoip_service: Optional[GeoIPService] = None
+_geoip_service_lock = threading.Lock()
+
+
+def get_geoip_service() -> GeoIPService:
+    """
+    Get or create the process-wide GeoIPService.
+
+    Configured from settings.GEOIP_PATH / GEOIP_CITY and
+    settings.GEOIP_LOOKUP_SETTINGS.
+    """
+    global _geoip_service
+
+    with _geoip_service_lock:
+        if _geoip_service is None:
+            config = getattr(settings, 'GEOIP_LOOKUP_SETTINGS', {})
+            _geoip_service = GeoIPService(
+                db_path=_default_db_path(),
+                cache_size=config.get('CACHE_SIZE', 10000),
+                reload_check_interval=config.get('RELOAD_CHECK_SECONDS', 60.0),
+                remote_timeout=config.get('REMOTE_TIMEOUT', 5.0),
+            )
+
+    return _geoip_service
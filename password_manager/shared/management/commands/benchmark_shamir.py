@@ -0,0 +1,75 @@
+"""
+Compare Shamir split/reconstruct throughput: GF(2^8) engine vs. prime field.
+
+Usage:
+    python manage.py benchmark_shamir [--sizes 1024 65536 1048576 10485760]
+                                      [--threshold K] [--shares N] [--prime-max BYTES]
+                                      [--batch N]
+
+For each secret size, times ``shared.crypto.shamir_gf256`` against the
+previous implementation (``ShamirSecretSharer.split_secret_prime``, 64-byte
+chunks over GF(2^521 - 1)) and reports MB/s. The prime-field path is only
+timed up to ``--prime-max`` bytes because it is orders of magnitude slower.
+``--batch`` additionally times ``split_many`` on that many 32-byte secrets
+against splitting them one by one.
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from auth_module.services.shamir_py3 import ShamirSecretSharer
+from shared.crypto import shamir_gf256
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Benchmark GF(256) Shamir split/reconstruct throughput against the prime-field implementation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 65536, 1048576, 10485760])
+        parser.add_argument('--threshold', type=int, default=3)
+        parser.add_argument('--shares', type=int, default=5)
+        parser.add_argument('--prime-max', type=int, default=65536)
+        parser.add_argument('--batch', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        k, n = options['threshold'], options['shares']
+        self.stdout.write(f"k={k} n={n}; MB/s of secret processed")
+        self.stdout.write(
+            f"{'size':>10} {'gf256 split':>12} {'gf256 join':>11} {'prime split':>12} {'prime join':>11}"
+        )
+
+        def rate(size, seconds):
+            return f"{size / seconds / 1e6:.2f}" if seconds else "inf"
+
+        for size in options['sizes']:
+            secret = os.urandom(size)
+            shares, split_s = _timed(shamir_gf256.split, secret, k, n)
+            recovered, join_s = _timed(shamir_gf256.combine, shares[:k])
+            assert recovered == secret
+            row = f"{size:>10} {rate(size, split_s):>12} {rate(size, join_s):>11}"
+
+            if size <= options['prime_max']:
+                prime_shares, prime_split_s = _timed(ShamirSecretSharer.split_secret_prime, secret.hex(), k, n)
+                recovered_hex, prime_join_s = _timed(ShamirSecretSharer.recover_secret, prime_shares[:k])
+                assert recovered_hex == secret.hex()
+                row += f" {rate(size, prime_split_s):>12} {rate(size, prime_join_s):>11}"
+            else:
+                row += f" {'-':>12} {'-':>11}"
+            self.stdout.write(row)
+
+        if options['batch']:
+            batch = [os.urandom(32) for _ in range(options['batch'])]
+            _, many_s = _timed(shamir_gf256.split_many, batch, k, n)
+            _, single_s = _timed(lambda: [shamir_gf256.split(s, k, n) for s in batch])
+            self.stdout.write(
+                f"{options['batch']} x 32-byte secrets: split_many {many_s * 1000:.1f} ms, "
+                f"one by one {single_s * 1000:.1f} ms"
+            )
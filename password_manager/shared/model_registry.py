@@ -0,0 +1,209 @@
+"""
+Lazy Model Registry
+===================
+
+Loads ML models on first use instead of at process start, so web and Celery
+workers that never serve an ML request never import TensorFlow or torch.
+
+Each model is registered with a factory (which does its heavy imports
+itself) and an optional warm-up callable. The first ``get()`` builds the
+model under a per-model lock, runs the warm-up, and records how long the
+load took and how much resident memory it added; ``stats()`` reports both.
+
+A failed load is remembered: ``get()`` returns ``None`` until ``reset()``
+instead of retrying on every request, unless the model was registered with
+``retry_failures=True``.
+
+Usage:
+    from shared.model_registry import ModelRegistry
+
+    registry = ModelRegistry('ml_security')
+    registry.register('password_strength', _build_password_strength, warmup=_warm)
+
+    model = registry.get('password_strength')   # loads on first call
+    registry.preload(['password_strength'])      # e.g. before a prefork server forks
+
+Weights should be stored so they can be memory-mapped read-only (joblib
+uncompressed dumps with ``mmap_mode='r'``, ``torch.load(mmap=True)``);
+sibling workers then share the same page-cache pages instead of each
+holding a private copy. See ``mmap_joblib_load`` and ``mmap_torch_state_dict``.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (0 if it cannot be read)"""
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            return 0
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def mmap_joblib_load(path: str):
+    """
+    Load a joblib dump with its numpy arrays memory-mapped read-only
+
+    Only uncompressed dumps can be mapped; compressed ones are loaded
+    normally by joblib.
+    """
+    import joblib
+    return joblib.load(path, mmap_mode='r')
+
+
+def mmap_torch_state_dict(path, map_location='cpu'):
+    """
+    Load a torch state dict whose tensors stay backed by the file
+
+    Falls back to a regular load on torch versions without ``mmap``.
+    Use with ``module.load_state_dict(state, assign=True)`` so the module
+    keeps the mapped tensors instead of copying them.
+    """
+    import torch
+    try:
+        return torch.load(path, map_location=map_location, weights_only=True, mmap=True)  # nosec B614
+    except TypeError:
+        return torch.load(path, map_location=map_location, weights_only=True)  # nosec B614
+
+
+class _Entry:
+    __slots__ = ('factory', 'warmup', 'retry_failures', 'lock', 'instance', 'loaded', 'error',
+                 'load_seconds', 'warmup_seconds', 'rss_delta_bytes', 'loaded_at')
+
+    def __init__(self, factory: Callable[[], Any], warmup: Optional[Callable[[Any], None]],
+                 retry_failures: bool = False):
+        self.factory = factory
+        self.warmup = warmup
+        self.retry_failures = retry_failures
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.instance = None
+        self.loaded = False
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.rss_delta_bytes = None
+        self.loaded_at = None
+
+
+class ModelRegistry:
+    """Named, lazily-built model instances with load statistics"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._entries: Dict[str, _Entry] = {}
+
+    def register(self, model_name: str, factory: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], None]] = None, retry_failures: bool = False):
+        """Register (or replace) a model factory; nothing is loaded yet"""
+        self._entries[model_name] = _Entry(factory, warmup, retry_failures)
+
+    def names(self):
+        return list(self._entries)
+
+    def is_loaded(self, model_name: str) -> bool:
+        entry = self._entries.get(model_name)
+        return bool(entry and entry.loaded)
+
+    def get_error(self, model_name: str) -> Optional[str]:
+        """Message of the last failed load, if any"""
+        entry = self._entries.get(model_name)
+        return entry.error if entry else None
+
+    def get(self, model_name: str):
+        """
+        Get a model instance, loading it on first use
+
+        Returns:
+            Model instance, or None if the name is unknown or loading failed
+        """
+        entry = self._entries.get(model_name)
+        if entry is None:
+            return None
+        if entry.loaded:
+            return entry.instance
+
+        with entry.lock:
+            if entry.loaded:
+                return entry.instance
+
+            entry.error = None
+            rss_before = current_rss_bytes()
+            started = time.perf_counter()
+            try:
+                instance = entry.factory()
+            except Exception as e:
+                logger.warning(f"Failed to load {self.name} model '{model_name}': {e}")
+                entry.error = str(e)
+                instance = None
+            entry.load_seconds = time.perf_counter() - started
+
+            if instance is not None and entry.warmup is not None:
+                warmup_started = time.perf_counter()
+                try:
+                    entry.warmup(instance)
+                except Exception as e:
+                    logger.warning(f"Failed to warm up {self.name} model '{model_name}': {e}")
+                entry.warmup_seconds = time.perf_counter() - warmup_started
+
+            entry.rss_delta_bytes = max(0, current_rss_bytes() - rss_before)
+            if instance is None and entry.retry_failures:
+                return None
+            entry.instance = instance
+            entry.loaded_at = time.time()
+            entry.loaded = True
+
+        if instance is not None:
+            logger.info(
+                f"{self.name} model '{model_name}' loaded in {entry.load_seconds:.2f}s "
+                f"(+{entry.rss_delta_bytes / 2**20:.1f} MiB RSS)"
+            )
+        return instance
+
+    def preload(self, model_names: Optional[Iterable[str]] = None):
+        """Load the given models (all registered ones by default) now"""
+        for model_name in (self.names() if model_names is None else model_names):
+            self.get(model_name)
+
+    def reset(self, model_name: Optional[str] = None):
+        """Forget loaded instances (and failures) so the next get() reloads"""
+        names = self.names() if model_name is None else [model_name]
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None:
+                with entry.lock:
+                    entry.reset()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-model load state, load/warm-up time and RSS added by the load"""
+        return {
+            model_name: {
+                'loaded': entry.loaded and entry.instance is not None,
+                'error': entry.error,
+                'load_seconds': round(entry.load_seconds, 3) if entry.load_seconds is not None else None,
+                'warmup_seconds': round(entry.warmup_seconds, 3) if entry.warmup_seconds is not None else None,
+                'rss_delta_mib': round(entry.rss_delta_bytes / 2**20, 1) if entry.rss_delta_bytes is not None else None,
+                'loaded_at': entry.loaded_at,
+            }
+            for model_name, entry in self._entries.items()
+        }
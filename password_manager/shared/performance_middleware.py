@@ -17,6 +17,8 @@ from django.conf import settings
 from django.utils import timezone
 from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 
+from .buffered_writer import buffered_writes_enabled, write_row
+
 logger = logging.getLogger('performance')
 
 
@@ -140,11 +142,14 @@ class PerformanceMonitoringMiddleware:
             # Log performance data
             logger.info(f"Performance: {log_data}")
             
-            # Store in database if enabled (run synchronously to avoid issues)
-            if getattr(settings, 'STORE_PERFORMANCE_METRICS', False) and _connection_is_usable():
+            # Store in database if enabled. Buffered rows are bulk-inserted by
+            # the shared writer's flusher thread, on its own connection.
+            if getattr(settings, 'STORE_PERFORMANCE_METRICS', False) and (
+                buffered_writes_enabled() or _connection_is_usable()
+            ):
                 try:
                     from .models import PerformanceMetric
-                    PerformanceMetric.objects.create(**log_data)
+                    write_row(PerformanceMetric(**log_data))
                 except TransactionManagementError:
                     # Broken atomic block — skip silently to avoid cascade
                     pass
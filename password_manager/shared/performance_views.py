@@ -25,6 +25,7 @@ from .models import (
     PerformancePrediction
 )
 from .performance_middleware import SystemResourceMonitor, PerformanceMetricsCollector
+from .buffered_writer import get_writer_stats
 
 
 @api_view(['GET'])
@@ -73,7 +74,8 @@ def system_health(request):
             'data': {
                 'metrics': metrics,
                 'health_status': health_status,
-                'warnings': warnings
+                'warnings': warnings,
+                'buffered_writes': get_writer_stats(),
             }
         })
     else:
@@ -0,0 +1,114 @@
+"""
+Tests for shared/buffered_writer.py.
+
+Uses an in-memory stand-in for a model manager, so no database is needed:
+batching per model, flush and stop, sampling and dropping under pressure,
+failure accounting, and the synchronous path when buffering is disabled.
+"""
+
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from shared import buffered_writer
+from shared.buffered_writer import BufferedModelWriter
+
+
+def _model(name, gate=None, fail=False):
+    """A class whose ``objects.bulk_create`` records each call."""
+    calls = []
+
+    def bulk_create(instances, batch_size=None):
+        if gate is not None:
+            gate.wait(5)
+        if fail:
+            raise RuntimeError("database is down")
+        calls.append(list(instances))
+        return instances
+
+    model = type(name, (), {'objects': mock.Mock(bulk_create=bulk_create)})
+    model.calls = calls
+    return model
+
+
+class BufferedModelWriterTests(SimpleTestCase):
+
+    def _writer(self, **kwargs):
+        writer = BufferedModelWriter(**kwargs)
+        self.addCleanup(writer.stop, 1.0)
+        return writer
+
+    def test_rows_are_batched_per_model(self):
+        Log, Metric = _model('Log'), _model('Metric')
+        writer = self._writer(batch_size=100, flush_interval=5)
+        rows = [Log() for _ in range(30)] + [Metric() for _ in range(20)]
+        for row in rows:
+            self.assertTrue(writer.enqueue(row))
+        self.assertTrue(writer.flush(2))
+
+        self.assertEqual(sum(len(c) for c in Log.calls), 30)
+        self.assertEqual(sum(len(c) for c in Metric.calls), 20)
+        self.assertLessEqual(len(Log.calls), 2)
+        stats = writer.stats()
+        self.assertEqual((stats['enqueued'], stats['flushed'], stats['queued']), (50, 50, 0))
+
+    def test_stop_writes_queued_rows(self):
+        Log = _model('Log')
+        writer = BufferedModelWriter(flush_interval=60)
+        for _ in range(5):
+            writer.enqueue(Log())
+        writer.stop(2)
+        self.assertEqual(sum(len(c) for c in Log.calls), 5)
+        self.assertFalse(writer.enqueue(Log()))
+        self.assertEqual(writer.stats()['dropped'], 1)
+
+    def test_sampling_and_dropping_under_pressure(self):
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        Log = _model('Log', gate=gate)
+        writer = self._writer(max_queue=10, batch_size=1, flush_interval=0,
+                              sample_above=0.6, sample_every=2, block_timeout_ms=10)
+        # The first row occupies the flusher, which then waits on the gate
+        writer.enqueue(Log())
+        writer.flush(0.05)
+        for _ in range(5):
+            self.assertTrue(writer.enqueue(Log()))
+        # Queue is at 60% (flush marker + 5 rows): every other row is kept
+        kept = [writer.enqueue(Log()) for _ in range(20)]
+        stats = writer.stats()
+        self.assertGreater(stats['sampled_out'], 0)
+        self.assertGreater(stats['dropped'], 0)
+        self.assertEqual(stats['queued'], 10)
+        # Essential rows wait for space, then are dropped too
+        self.assertFalse(writer.enqueue(Log(), essential=True))
+        self.assertEqual(writer.stats()['dropped'], stats['dropped'] + 1)
+
+        gate.set()
+        self.assertTrue(writer.flush(2))
+        self.assertEqual(writer.stats()['flushed'], 6 + kept.count(True))
+
+    def test_failed_batches_are_counted(self):
+        Broken = _model('Broken', fail=True)
+        writer = self._writer()
+        writer.enqueue(Broken())
+        writer.enqueue(Broken())
+        self.assertTrue(writer.flush(2))
+        self.assertEqual(writer.stats()['failed'], 2)
+        self.assertEqual(writer.stats()['flushed'], 0)
+
+
+class WriteRowTests(SimpleTestCase):
+
+    @override_settings(BUFFERED_DB_WRITES={'ENABLED': False})
+    def test_disabled_saves_immediately(self):
+        row = mock.Mock()
+        self.assertTrue(buffered_writer.write_row(row))
+        row.save.assert_called_once_with(force_insert=True)
+
+    def test_enabled_queues_on_shared_writer(self):
+        writer = mock.Mock()
+        with override_settings(BUFFERED_DB_WRITES={'ENABLED': True}), \
+                mock.patch.object(buffered_writer, 'get_buffered_writer', return_value=writer):
+            buffered_writer.write_row('row', essential=True)
+        writer.enqueue.assert_called_once_with('row', essential=True)
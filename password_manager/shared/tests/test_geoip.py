@@ -0,0 +1,100 @@
+"""
+Tests for shared/geoip.py.
+
+The MaxMind reader is replaced with a fake so the tests need no database
+file; they check that the reader is opened once, reopened when the file
+changes, and skipped entirely on IP and prefix cache hits.
+"""
+
+import ipaddress
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from shared.geoip import GeoIPService
+
+
+def _city_response(city, network):
+    return SimpleNamespace(
+        city=SimpleNamespace(name=city),
+        country=SimpleNamespace(name='Australia', iso_code='AU'),
+        subdivisions=SimpleNamespace(most_specific=SimpleNamespace(iso_code='NSW')),
+        location=SimpleNamespace(latitude=-33.86, longitude=151.2),
+        traits=SimpleNamespace(network=ipaddress.ip_network(network)),
+    )
+
+
+class GeoIPServiceTests(SimpleTestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.mmdb')
+        os.close(fd)
+        self.addCleanup(os.remove, self.db_path)
+
+        self.reader = MagicMock()
+        self.reader.city.side_effect = lambda ip: _city_response('Sydney', '1.2.3.0/24')
+        patcher = patch('geoip2.database.Reader', return_value=self.reader)
+        self.open_reader = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.service = GeoIPService(db_path=self.db_path, reload_check_interval=0)
+
+    def test_reader_opened_once_and_results_cached(self):
+        for _ in range(50):
+            location = self.service.lookup('1.2.3.4')
+
+        self.assertEqual(location['city'], 'Sydney')
+        self.assertEqual(location['country_code'], 'AU')
+        self.assertEqual(location['region'], 'NSW')
+        self.assertEqual(self.open_reader.call_count, 1)
+        self.assertEqual(self.reader.city.call_count, 1)
+        self.assertEqual(self.service.get_stats()['ip_cache_hits'], 49)
+
+    def test_prefix_cache_only_when_record_covers_prefix(self):
+        self.service.lookup('1.2.3.4')
+        self.assertEqual(self.service.lookup('1.2.3.200')['city'], 'Sydney')
+        self.assertEqual(self.reader.city.call_count, 1)
+
+        # A /32 record says nothing about the rest of 5.6.7.0/24
+        self.reader.city.side_effect = lambda ip: _city_response(f'city-{ip}', f'{ip}/32')
+        self.service.lookup('5.6.7.8')
+        self.assertEqual(self.service.lookup('5.6.7.9')['city'], 'city-5.6.7.9')
+        self.assertEqual(self.reader.city.call_count, 3)
+
+    def test_reopens_database_when_file_changes(self):
+        self.service.lookup('1.2.3.4')
+        stat = os.stat(self.db_path)
+        os.utime(self.db_path, (stat.st_atime, stat.st_mtime + 10))
+
+        self.service.lookup('1.2.3.4')
+
+        self.assertEqual(self.open_reader.call_count, 2)
+        self.assertEqual(self.reader.city.call_count, 2)
+        self.assertEqual(self.service.get_stats()['reloads'], 1)
+
+    def test_private_and_invalid_addresses_are_unknown(self):
+        for ip in ('127.0.0.1', '10.1.2.3', '::1', 'not-an-ip', '', None):
+            self.assertEqual(self.service.lookup(ip), {})
+        self.reader.city.assert_not_called()
+
+    @patch('shared.geoip.GeoIPService._remote_lookup', return_value=None)
+    def test_remote_fallback_only_when_allowed(self, remote):
+        self.reader.city.side_effect = ValueError('not found')
+
+        self.assertEqual(self.service.lookup('8.8.8.8', allow_remote=False), {})
+        remote.assert_not_called()
+        self.assertEqual(self.service.lookup('8.8.8.8'), {})
+        self.assertEqual(self.service.lookup('8.8.8.8'), {})
+        # The miss is cached, so the remote API is asked once
+        remote.assert_called_once_with('8.8.8.8')
+
+    def test_lookup_many_resolves_each_address_once(self):
+        ips = ['1.2.3.4', '1.2.3.4', '1.2.3.5', '192.168.0.1']
+        results = self.service.lookup_many(ips)
+
+        self.assertEqual(set(results), set(ips))
+        self.assertEqual(results['1.2.3.5']['city'], 'Sydney')
+        self.assertEqual(results['192.168.0.1'], {})
+        self.assertEqual(self.reader.city.call_count, 1)
@@ -0,0 +1,72 @@
+"""
+Tests for shared/model_registry.py.
+
+Factories are plain callables, so no ML framework is needed; the tests
+check that models load once on first use, that warm-up runs after the
+load, and how failed loads are cached or retried.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from shared.model_registry import ModelRegistry
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = ModelRegistry('test')
+
+    def test_model_is_built_once_on_first_use(self):
+        factory = MagicMock(return_value='model')
+        warmup = MagicMock()
+        self.registry.register('strength', factory, warmup=warmup)
+
+        self.assertFalse(self.registry.is_loaded('strength'))
+        factory.assert_not_called()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.registry.get('strength')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['model'] * 8)
+        factory.assert_called_once_with()
+        warmup.assert_called_once_with('model')
+
+        stats = self.registry.stats()['strength']
+        self.assertTrue(stats['loaded'])
+        self.assertIsNotNone(stats['load_seconds'])
+        self.assertIsNotNone(stats['rss_delta_mib'])
+
+    def test_failed_load_is_cached_until_reset(self):
+        factory = MagicMock(side_effect=[OSError('missing weights'), 'model'])
+        self.registry.register('anomaly', factory)
+
+        self.assertIsNone(self.registry.get('anomaly'))
+        self.assertIsNone(self.registry.get('anomaly'))
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(self.registry.stats()['anomaly']['error'], 'missing weights')
+
+        self.registry.reset('anomaly')
+        self.assertEqual(self.registry.get('anomaly'), 'model')
+
+    def test_retry_failures_reloads_on_next_call(self):
+        factory = MagicMock(side_effect=[OSError('download failed'), 'model'])
+        self.registry.register('classifier', factory, retry_failures=True)
+
+        self.assertIsNone(self.registry.get('classifier'))
+        self.assertEqual(self.registry.get_error('classifier'), 'download failed')
+        self.assertEqual(self.registry.get('classifier'), 'model')
+        self.assertIsNone(self.registry.get_error('classifier'))
+
+    def test_warmup_failure_keeps_model(self):
+        self.registry.register('threat', lambda: 'model', warmup=MagicMock(side_effect=ValueError))
+        self.assertEqual(self.registry.get('threat'), 'model')
+
+    def test_unknown_model(self):
+        self.assertIsNone(self.registry.get('missing'))
@@ -0,0 +1,85 @@
+"""
+Tests for shared/crypto/shamir_gf256.py.
+
+Checks the field tables against carry-less multiplication, that any
+threshold-sized subset of shares recovers the secret (also for empty and
+multi-megabyte secrets), batch splitting, and share refresh.
+"""
+
+import os
+import random
+
+from django.test import SimpleTestCase
+
+from shared.crypto import shamir_gf256
+
+
+def _slow_mul(a, b):
+    product = 0
+    while b:
+        if b & 1:
+            product ^= a
+        a <<= 1
+        if a & 0x100:
+            a ^= 0x11B
+        b >>= 1
+    return product
+
+
+class ShamirGF256Tests(SimpleTestCase):
+    def setUp(self):
+        self.rng = random.Random(0)
+
+    def test_multiplication_table(self):
+        for a in range(256):
+            for b in range(0, 256, 7):
+                self.assertEqual(shamir_gf256._mul(a, b), _slow_mul(a, b))
+            if a:
+                self.assertEqual(shamir_gf256._mul(a, shamir_gf256._inv(a)), 1)
+
+    def test_any_threshold_subset_recovers(self):
+        for length in (0, 1, 33, 4096):
+            secret = os.urandom(length)
+            for threshold, total in ((2, 2), (3, 5), (5, 10)):
+                shares = shamir_gf256.split(secret, threshold, total)
+                self.assertEqual([x for x, _ in shares], list(range(1, total + 1)))
+                self.assertTrue(all(len(value) == length for _, value in shares))
+                for _ in range(3):
+                    subset = self.rng.sample(shares, threshold)
+                    self.assertEqual(shamir_gf256.combine(subset), secret)
+                self.assertEqual(shamir_gf256.combine(shares), secret)
+
+    def test_fewer_shares_than_threshold_do_not_recover(self):
+        secret = os.urandom(64)
+        shares = shamir_gf256.split(secret, 3, 5)
+        self.assertNotEqual(shamir_gf256.combine(shares[:2]), secret)
+
+    def test_large_secret(self):
+        secret = os.urandom(3 * 2**20)
+        shares = shamir_gf256.split(secret, 3, 5)
+        self.assertEqual(shamir_gf256.combine(shares[2:]), secret)
+
+    def test_split_many(self):
+        secrets = [os.urandom(self.rng.randint(0, 100)) for _ in range(50)]
+        for secret, shares in zip(secrets, shamir_gf256.split_many(secrets, 2, 4)):
+            self.assertEqual(shamir_gf256.combine([shares[3], shares[1]]), secret)
+
+    def test_refresh_keeps_secret(self):
+        secret = os.urandom(128)
+        shares = shamir_gf256.split(secret, 3, 5)
+        refreshed = shamir_gf256.refresh(shares, 3)
+        self.assertTrue(all(old != new for old, new in zip(shares, refreshed)))
+        self.assertEqual(shamir_gf256.combine(refreshed[:3]), secret)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            shamir_gf256.split(b'secret', 1, 3)
+        with self.assertRaises(ValueError):
+            shamir_gf256.split(b'secret', 4, 3)
+        with self.assertRaises(ValueError):
+            shamir_gf256.split(b'secret', 2, 256)
+        shares = shamir_gf256.split(b'secret', 2, 3)
+        with self.assertRaises(ValueError):
+            shamir_gf256.combine([shares[0], shares[0]])
+        with self.assertRaises(ValueError):
+            shamir_gf256.combine([shares[0], (2, b'short')])
@@ -154,6 +154,16 @@ class SocialRecoveryFullFlowTests(TestCase):
         recovered = ShamirSecretSharer.recover_secret(shares[:2])
         assert recovered == secret
 
+    def test_shamir_recovers_prime_field_shares(self):
+        # Shares handed out before the GF(256) switch must still recover.
+        secret = _secrets.token_hex(100)
+        shares = ShamirSecretSharer.split_secret_prime(secret, 3, 5)
+        assert ShamirSecretSharer.recover_secret(shares[1:4]) == secret
+        with self.assertRaises(ValueError):
+            ShamirSecretSharer.recover_secret(
+                shares[:2] + ShamirSecretSharer.split_secret(secret, 3, 5)[2:3]
+            )
+
     def test_schnorr_equality_proof_verifies(self):
         # Both commitments commit to the same scalar but with different
         # blinding factors -> verify_equality must accept.
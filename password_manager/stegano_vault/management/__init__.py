@@ -0,0 +1 @@
+# Management commands for stegano_vault app
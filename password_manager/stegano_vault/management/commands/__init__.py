@@ -0,0 +1 @@
+# stegano_vault management commands
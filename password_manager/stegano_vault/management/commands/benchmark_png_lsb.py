@@ -0,0 +1,66 @@
+"""
+Compare PNG LSB embed/extract times: v2 keyed stream vs. v1 Fisher-Yates.
+
+Usage:
+    python manage.py benchmark_png_lsb [--sizes 256 1024 2048 4096]
+                                       [--blob BYTES] [--v1-max SIDE]
+
+For each square cover of ``SIDE x SIDE`` pixels, embeds a random blob of
+``--blob`` bytes (capped at the cover's capacity) and extracts it again
+with both formats, reporting milliseconds. v1 builds a permutation of
+every pixel with one SHA-256 call each, so it is only timed up to
+``--v1-max`` pixels per side.
+"""
+
+import io
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from stegano_vault.services import png_lsb_service as svc
+
+
+def _cover(side):
+    img = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Benchmark PNG LSB embed/extract for the v2 and v1 formats across cover sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[256, 1024, 2048, 4096])
+        parser.add_argument('--blob', type=int, default=65536)
+        parser.add_argument('--v1-max', type=int, default=1024)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'cover':>11} {'blob':>8} {'v2 embed':>9} {'v2 extract':>11}"
+            f" {'v1 embed':>9} {'v1 extract':>11}"
+        )
+        for side in options['sizes']:
+            cover = _cover(side)
+            blob = os.urandom(min(options['blob'], svc.png_capacity_bytes(cover, version=2)))
+            key = os.urandom(16)
+            row = f"{f'{side}x{side}':>11} {len(blob):>8}"
+
+            versions = [2, 1] if side <= options['v1_max'] else [2]
+            for version in versions:
+                stego, embed_s = _timed(svc.embed_blob_in_png, cover, blob, stego_key=key, version=version)
+                recovered, extract_s = _timed(svc.extract_blob_from_png, stego, stego_key=key)
+                if recovered != blob:
+                    raise CommandError(f"v{version} round trip failed for a {side}x{side} cover")
+                row += f" {embed_s * 1000:>9.1f} {extract_s * 1000:>11.1f}"
+            if len(versions) == 1:
+                row += f" {'-':>9} {'-':>11}"
+            self.stdout.write(row)
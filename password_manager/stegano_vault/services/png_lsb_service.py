@@ -14,11 +14,26 @@ Design
 * Pixel write-order is a pseudo-random permutation keyed by a
   deterministic stego key derived from the blob header magic. This
   defeats trivial "scan the first N LSBs" steganalysis.
-* A 4-byte length header ``LEN(uint32 LE)`` is written first, so the
-  extractor knows exactly how many bytes to read back.
 * Only lossless input / output formats are accepted. JPEG input /
   output is rejected explicitly because JPEG re-encoding would
   destroy the LSB payload.
+
+Formats
+-------
+
+* v2 (``version=2``): header ``TAG(4) || LEN(uint32 LE)``, where
+  TAG is derived from the stego key. Pixel order is a keyed Feistel
+  permutation of the pixel indices whose round tables come from a
+  ChaCha20 keystream; position i is computed directly, so only the
+  pixels the payload needs are generated, all at once with NumPy, and
+  the LSB reads / writes happen on a NumPy view of the pixel buffer.
+* v1 (written by default): header ``LEN(uint32 LE)``; pixel order is a
+  full Fisher-Yates shuffle with one SHA-256 call per pixel. Images
+  without a matching v2 tag are extracted as v1.
+
+The web app (``frontend/src/services/stego/pngLsb.js``) and the browser
+extension (``browser-extension/src/stego/pngLsb.js``) only read and write
+v1, so ``DEFAULT_VERSION`` stays 1 until both implement v2.
 """
 
 from __future__ import annotations
@@ -28,6 +43,9 @@ import io
 import struct
 from typing import Tuple
 
+import numpy as np
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+
 try:
     from PIL import Image
 except Exception as exc:  # pragma: no cover
@@ -38,8 +56,12 @@ except Exception as exc:  # pragma: no cover
 
 
 PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
-HEADER_LEN = 4          # uint32 LE: length of embedded blob in bytes
+HEADER_LEN = 4          # v1 header: uint32 LE length of embedded blob in bytes
+V2_HEADER_LEN = 8       # v2 header: 4-byte keyed tag + uint32 LE length
+V2_TAG_LEN = 4
+V2_FEISTEL_ROUNDS = 6
 BITS_PER_PIXEL = 3      # we use R, G, B LSBs; alpha is untouched
+DEFAULT_VERSION = 1     # format written by default; the JS clients only read v1
 
 
 class PngLsbError(Exception):
@@ -92,6 +114,61 @@ def _permutation(num_pixels: int, stego_key: bytes) -> list[int]:
     return out
 
 
+class _KeyedPixelOrder:
+    """
+    v2 pixel order: a keyed permutation of ``range(num_pixels)``.
+
+    A balanced Feistel network over 2 * ``half_bits`` bits, with random
+    lookup tables as round functions, permutes the power-of-four domain
+    covering ``num_pixels``; outputs beyond ``num_pixels`` are walked
+    through the network again until they land inside (cycle walking),
+    which keeps the result a permutation. The tag and the tables are
+    consecutive slices of one ChaCha20 keystream. Same steganalysis-only
+    strength as v1.
+    """
+
+    def __init__(self, num_pixels: int, stego_key: bytes):
+        self.num_pixels = num_pixels
+        self.half_bits = max(1, ((num_pixels - 1).bit_length() + 1) // 2)
+        table_size = 1 << self.half_bits
+        key = hashlib.sha256(b"png-lsb/v2|" + stego_key).digest()
+        stream = Cipher(algorithms.ChaCha20(key, bytes(16)), mode=None).encryptor().update(
+            bytes(V2_TAG_LEN + 4 * V2_FEISTEL_ROUNDS * table_size)
+        )
+        self.tag = stream[:V2_TAG_LEN]
+        self.tables = (
+            np.frombuffer(stream, dtype="<u4", offset=V2_TAG_LEN).astype(np.int64)
+            & (table_size - 1)
+        ).reshape(V2_FEISTEL_ROUNDS, table_size)
+
+    def _feistel(self, x: np.ndarray) -> np.ndarray:
+        mask = (1 << self.half_bits) - 1
+        left, right = x >> self.half_bits, x & mask
+        for table in self.tables:
+            left, right = right, left ^ table[right]
+        return (left << self.half_bits) | right
+
+    def positions(self, count: int) -> np.ndarray:
+        """Pixel indices for the first ``count`` slots of the order."""
+        out = self._feistel(np.arange(count, dtype=np.int64))
+        outside = np.flatnonzero(out >= self.num_pixels)
+        while outside.size:
+            out[outside] = self._feistel(out[outside])
+            outside = outside[out[outside] >= self.num_pixels]
+        return out
+
+
+def _lsb_offsets(order: _KeyedPixelOrder, n_bits: int) -> np.ndarray:
+    """Byte offsets into the flat RGBA buffer of the first ``n_bits`` LSB slots."""
+    pixels = order.positions(-(-n_bits // BITS_PER_PIXEL))
+    channels = np.arange(BITS_PER_PIXEL, dtype=np.int64)
+    return (pixels[:, None] * 4 + channels).ravel()[:n_bits]
+
+
+def _read_lsbs(flat: np.ndarray, offsets: np.ndarray) -> bytes:
+    return np.packbits(flat[offsets] & 1).tobytes()
+
+
 def _pack_bits(data: bytes) -> list[int]:
     """Expand bytes to a list of bits, MSB first per byte."""
     bits = []
@@ -111,16 +188,24 @@ def _unpack_bits(bits: list[int]) -> bytes:
     return bytes(out)
 
 
-def png_capacity_bytes(cover_bytes: bytes) -> int:
+def _header_len(version: int) -> int:
+    if version == 1:
+        return HEADER_LEN
+    if version == 2:
+        return V2_HEADER_LEN
+    raise ValueError(f"Unknown PNG LSB format version {version}")
+
+
+def png_capacity_bytes(cover_bytes: bytes, *, version: int = DEFAULT_VERSION) -> int:
     """
-    Return how many payload bytes (excluding the 4-byte LEN header)
+    Return how many payload bytes (excluding the format's header)
     can be hidden in ``cover_bytes`` at 3 bits/pixel.
     """
     _assert_is_png(cover_bytes)
     img = Image.open(io.BytesIO(cover_bytes))
     width, height = img.size
     total_bits = width * height * BITS_PER_PIXEL
-    return max(0, total_bits // 8 - HEADER_LEN)
+    return max(0, total_bits // 8 - _header_len(version))
 
 
 def compute_cover_hash(cover_bytes: bytes) -> str:
@@ -138,6 +223,7 @@ def embed_blob_in_png(
     blob: bytes,
     *,
     stego_key: bytes = b"default-png-lsb-key",
+    version: int = DEFAULT_VERSION,
 ) -> bytes:
     """
     Return PNG bytes with ``blob`` LSB-embedded in the cover image's
@@ -152,18 +238,32 @@ def embed_blob_in_png(
     _assert_is_png(cover_bytes)
     if not isinstance(blob, (bytes, bytearray)):
         raise TypeError("blob must be bytes")
+    header_len = _header_len(version)
 
     img = Image.open(io.BytesIO(cover_bytes)).convert("RGBA")
     width, height = img.size
     num_pixels = width * height
 
-    capacity = num_pixels * BITS_PER_PIXEL // 8 - HEADER_LEN
+    capacity = num_pixels * BITS_PER_PIXEL // 8 - header_len
     if len(blob) > capacity:
         raise CoverTooSmallError(
-            f"Cover too small: need {len(blob) + HEADER_LEN} bytes of "
-            f"capacity, have {capacity + HEADER_LEN}."
+            f"Cover too small: need {len(blob) + header_len} bytes of "
+            f"capacity, have {capacity + header_len}."
         )
 
+    if version == 2:
+        order = _KeyedPixelOrder(num_pixels, stego_key)
+        payload = order.tag + struct.pack("<I", len(blob)) + bytes(blob)
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+        pixels = np.array(img)  # (height, width, 4), owned copy
+        flat = pixels.reshape(-1)
+        offsets = _lsb_offsets(order, bits.size)
+        flat[offsets] = (flat[offsets] & 0xFE) | bits
+        img = Image.fromarray(pixels, "RGBA")
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=False)
+        return buf.getvalue()
+
     header = struct.pack("<I", len(blob))
     bits = _pack_bits(header + bytes(blob))
 
@@ -200,15 +300,37 @@ def extract_blob_from_png(
     """
     Inverse of :func:`embed_blob_in_png`.
 
-    Reads the 4-byte length header first, then the blob bytes, both
-    from the same keyed permutation of pixel LSBs. Raises PngLsbError
-    if the length header is insane (> ``max_blob_bytes`` or > pixel
-    capacity).
+    Reads the header first, then the blob bytes, both from the same
+    keyed permutation of pixel LSBs. Images whose v2 tag does not match
+    ``stego_key`` are read as v1. Raises PngLsbError if the length
+    header is insane (> ``max_blob_bytes`` or > pixel capacity).
     """
     _assert_is_png(stego_bytes)
     img = Image.open(io.BytesIO(stego_bytes)).convert("RGBA")
     width, height = img.size
     num_pixels = width * height
+
+    if num_pixels * BITS_PER_PIXEL >= V2_HEADER_LEN * 8:
+        order = _KeyedPixelOrder(num_pixels, stego_key)
+        flat = np.asarray(img).reshape(-1)
+        header = _read_lsbs(flat, _lsb_offsets(order, V2_HEADER_LEN * 8))
+        if header[:V2_TAG_LEN] == order.tag:
+            (length,) = struct.unpack("<I", header[V2_TAG_LEN:])
+            capacity_bytes = num_pixels * BITS_PER_PIXEL // 8 - V2_HEADER_LEN
+            if length == 0 or length > max_blob_bytes or length > capacity_bytes:
+                raise PngLsbError(
+                    f"Invalid embedded length {length} (capacity {capacity_bytes}, "
+                    f"max allowed {max_blob_bytes})."
+                )
+            offsets = _lsb_offsets(order, (V2_HEADER_LEN + length) * 8)
+            return _read_lsbs(flat, offsets[V2_HEADER_LEN * 8:])
+
+    return _extract_v1(img, stego_key, max_blob_bytes)
+
+
+def _extract_v1(img, stego_key: bytes, max_blob_bytes: int) -> bytes:
+    width, height = img.size
+    num_pixels = width * height
     pixels = list(img.getdata())
     order = _permutation(num_pixels, stego_key)
 
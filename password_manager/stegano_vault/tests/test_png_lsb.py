@@ -5,9 +5,11 @@ Covers:
   * Round-trip of an arbitrary binary blob through a small synthetic
     PNG cover with the keyed pixel permutation.
   * Rejection of lossy formats (JPEG bytes).
-  * Capacity calculation honouring the 4-byte length header.
+  * Capacity calculation honouring the v2 8-byte header.
   * Determinism: embedding with the same stego_key twice produces
     identical output.
+  * v1 images still extracting, and the v2 permutation being a
+    bijection on the pixel indices.
 """
 
 from __future__ import annotations
@@ -92,8 +94,10 @@ def test_lossy_input_rejected():
 def test_capacity_bytes():
     cover = _make_cover(32, 32)
     cap = svc.png_capacity_bytes(cover)
-    # 32*32 pixels * 3 bits / 8 - 4 (length header) = 384 - 4 = 380
+    # 32*32 pixels * 3 bits / 8 - 4 (v1 length header) = 384 - 4 = 380
     assert cap == 380
+    # v2 adds a 4-byte keyed tag: 384 - 8 = 376
+    assert svc.png_capacity_bytes(cover, version=2) == 376
 
 
 def test_blob_too_big():
@@ -108,3 +112,35 @@ def test_compute_cover_hash_is_deterministic():
     cover = _make_cover(8, 8)
     assert svc.compute_cover_hash(cover) == svc.compute_cover_hash(cover)
     assert len(svc.compute_cover_hash(cover)) == 64  # hex sha256
+
+
+def test_v1_images_still_extract():
+    cover = _make_cover(32, 32)
+    blob = bytes(range(250)) + b"v1"
+    stego = svc.embed_blob_in_png(cover, blob, stego_key=b"vault", version=1)
+    assert svc.extract_blob_from_png(stego, stego_key=b"vault") == blob
+    assert svc.embed_blob_in_png(cover, blob, stego_key=b"vault", version=2) != stego
+
+
+def test_default_format_is_v1_for_js_clients():
+    # frontend / browser-extension pngLsb.js only read v1
+    cover = _make_cover(32, 32)
+    blob = b"client-readable"
+    assert svc.embed_blob_in_png(cover, blob, stego_key=b"k") == svc.embed_blob_in_png(
+        cover, blob, stego_key=b"k", version=1
+    )
+
+
+def test_v2_fills_whole_capacity():
+    cover = _make_cover(17, 13)
+    blob = bytes(reversed(range(256)))[: svc.png_capacity_bytes(cover, version=2)]
+    stego = svc.embed_blob_in_png(cover, blob, stego_key=b"full", version=2)
+    assert svc.extract_blob_from_png(stego, stego_key=b"full") == blob
+
+
+def test_v2_pixel_order_is_a_permutation():
+    for num_pixels in (1, 2, 5, 64, 1000, 4097):
+        order = svc._KeyedPixelOrder(num_pixels, b"perm")
+        assert sorted(order.positions(num_pixels).tolist()) == list(range(num_pixels))
+        # A shorter prefix is the same order, cut short.
+        assert order.positions(num_pixels // 2).tolist() == order.positions(num_pixels)[: num_pixels // 2].tolist()
@@ -0,0 +1 @@
+# vault management commands
@@ -0,0 +1,167 @@
+"""
+Benchmark audit log ingestion, per-user paging and retention at scale.
+
+Usage:
+    python manage.py benchmark_audit_log [--rows 10000000] [--users 1000]
+                                         [--events 100000] [--page-size 50]
+                                         [--depths 1 100 1000] [--keep]
+
+Against the configured database:
+
+1. bulk-inserts ``--rows`` synthetic ``AuditLog`` rows for ``--users``
+   benchmark users, spread over the last 180 days
+2. records ``--events`` events through ``record_audit_event()`` and, with
+   the Redis buffer, drains them with ``flush_audit_events()``, reporting
+   events/s for each step
+3. for one user, times the page at each of ``--depths`` with keyset
+   pagination and with OFFSET
+4. deletes everything past the retention window with
+   ``delete_audit_logs_before()`` one batch at a time, reporting the total
+   and the slowest batch (the longest any lock is held)
+
+Benchmark users and their rows are removed afterwards unless ``--keep``.
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from vault.models import AuditLog
+from vault.services import audit_log as svc
+
+USER_PREFIX = 'audit-bench-'
+INSERT_BATCH = 10000
+
+
+class Command(BaseCommand):
+    help = "Benchmark audit log batched ingestion, keyset paging and chunked retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=100_000)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--depths', type=int, nargs='+', default=[1, 100, 1000])
+        parser.add_argument('--keep', action='store_true')
+
+    def handle(self, *args, **options):
+        users = self._create_users(options['users'])
+        try:
+            self._insert(users, options['rows'])
+            self._ingest(users, options['events'])
+            self._paging(users[0], options['page_size'], options['depths'])
+            self._retention()
+        finally:
+            if not options['keep']:
+                self._cleanup(users)
+
+    def _create_users(self, count):
+        User = get_user_model()
+        User.objects.bulk_create(
+            [User(username=f"{USER_PREFIX}{i}") for i in range(count)], ignore_conflicts=True,
+        )
+        return list(User.objects.filter(username__startswith=USER_PREFIX).order_by('pk'))
+
+    def _insert(self, users, rows):
+        actions = [choice for choice, _ in AuditLog.ACTION_TYPES]
+        now = timezone.now()
+        span = int(timedelta(days=180).total_seconds())
+        rng = random.Random(0)
+
+        started = time.perf_counter()
+        for offset in range(0, rows, INSERT_BATCH):
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    user_id=rng.choice(users).pk,
+                    action=rng.choice(actions),
+                    item_type='password',
+                    status='success',
+                    timestamp=now - timedelta(seconds=rng.randrange(span)),
+                )
+                for _ in range(min(INSERT_BATCH, rows - offset))
+            ])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"bulk insert: {rows} rows in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)")
+
+    def _ingest(self, users, events):
+        if not events:
+            return
+        buffer = svc.audit_log_settings()['BUFFER']
+        started = time.perf_counter()
+        for i in range(events):
+            svc.record_audit_event(users[i % len(users)].pk, 'access_item', item_type='password')
+        record_s = time.perf_counter() - started
+        self.stdout.write(f"record ({buffer}): {events} events, {events / record_s:,.0f} events/s")
+
+        if buffer != 'redis':
+            return
+        started = time.perf_counter()
+        written = 0
+        while True:
+            result = svc.flush_audit_events()
+            written += result['written']
+            if not result['written']:
+                break
+        drain_s = time.perf_counter() - started
+        self.stdout.write(f"drain: {written} rows, {written / drain_s:,.0f} rows/s")
+
+    def _paging(self, user, page_size, depths):
+        queryset = AuditLog.objects.filter(user=user).order_by('-timestamp', '-pk')
+        self.stdout.write(f"user {user.pk}: {queryset.count()} rows; ms for the page at each depth")
+        self.stdout.write(f"{'page':>8} {'keyset':>10} {'offset':>10}")
+
+        cursor, page_no = None, 0
+        for depth in sorted(depths):
+            # Walk the cursor to the page before ``depth`` (untimed), then time one page
+            while page_no < depth - 1:
+                cursor = svc.audit_log_page(user, cursor=cursor, limit=page_size).next_cursor
+                page_no += 1
+                if cursor is None:
+                    break
+            if cursor is None and depth > 1:
+                self.stdout.write(f"{depth:>8} {'(past last page)':>21}")
+                break
+
+            started = time.perf_counter()
+            svc.audit_log_page(user, cursor=cursor, limit=page_size)
+            keyset_ms = (time.perf_counter() - started) * 1000
+
+            offset = (depth - 1) * page_size
+            started = time.perf_counter()
+            list(queryset[offset:offset + page_size])
+            offset_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"{depth:>8} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+    def _retention(self):
+        cutoff = svc.retention_cutoff()
+        batch_size = svc.audit_log_settings()['DELETE_BATCH_SIZE']
+        deleted = batches = 0
+        slowest = 0.0
+        started = time.perf_counter()
+        while True:
+            # max_seconds=0: one batch per call, so each call times one batch
+            batch_started = time.perf_counter()
+            result = svc.delete_audit_logs_before(cutoff, batch_size=batch_size, max_seconds=0, pause_seconds=0)
+            slowest = max(slowest, time.perf_counter() - batch_started)
+            deleted += result['deleted']
+            batches += result['batches']
+            if result['complete']:
+                break
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"retention: {deleted} rows in {batches} batches of <= {batch_size}, "
+            f"{elapsed:.1f} s total, slowest batch {slowest * 1000:.1f} ms"
+        )
+
+    def _cleanup(self, users):
+        user_ids = [user.pk for user in users]
+        while True:
+            ids = list(AuditLog.objects.filter(user_id__in=user_ids).values_list('pk', flat=True)[:INSERT_BATCH])
+            if not ids:
+                break
+            AuditLog.objects.filter(pk__in=ids).delete()
+        get_user_model().objects.filter(pk__in=user_ids).delete()
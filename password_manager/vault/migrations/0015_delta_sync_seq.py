@@ -0,0 +1,78 @@
+"""
+Delta sync: per-user change sequence on vault items and tombstones.
+
+Adds ``sync_seq`` to ``EncryptedVaultItem`` and ``DeletedItem`` and
+backfills it so every existing row gets a distinct position in its
+owner's sequence (``UserSalt.sync_version``). Items and tombstones are
+numbered in the order they last changed; the user's ``sync_version`` is
+advanced past the last number so new writes always sort after them.
+
+Users without a ``UserSalt`` row have never initialised a vault and are
+left at 0.
+"""
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_sync_seq(apps, schema_editor):
+    UserSalt = apps.get_model('vault', 'UserSalt')
+    EncryptedVaultItem = apps.get_model('vault', 'EncryptedVaultItem')
+    DeletedItem = apps.get_model('vault', 'DeletedItem')
+
+    for salt in UserSalt.objects.only('id', 'user_id', 'sync_version').iterator():
+        changes = [
+            (item.updated_at, 0, item)
+            for item in EncryptedVaultItem.objects.filter(user_id=salt.user_id).only('id', 'updated_at')
+        ]
+        changes += [
+            (tombstone.deleted_at, 1, tombstone)
+            for tombstone in DeletedItem.objects.filter(user_id=salt.user_id).only('id', 'deleted_at')
+        ]
+        if not changes:
+            continue
+        changes.sort(key=lambda change: (change[0], change[1], str(change[2].pk)))
+
+        seq = salt.sync_version or 0
+        items, tombstones = [], []
+        for _, kind, row in changes:
+            seq += 1
+            row.sync_seq = seq
+            (items if kind == 0 else tombstones).append(row)
+
+        EncryptedVaultItem.objects.bulk_update(items, ['sync_seq'], batch_size=BATCH_SIZE)
+        DeletedItem.objects.bulk_update(tombstones, ['sync_seq'], batch_size=BATCH_SIZE)
+        salt.sync_version = seq
+        salt.save(update_fields=['sync_version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vault', '0014_eitem_tags_gin_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deleteditem',
+            name='sync_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='encryptedvaultitem',
+            name='sync_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='deleteditem',
+            index=models.Index(fields=['user', 'sync_seq'], name='vault_delet_user_id_86030f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='encryptedvaultitem',
+            index=models.Index(fields=['user', 'sync_seq'], name='vault_encry_user_id_df6222_idx'),
+        ),
+        migrations.RunPython(backfill_sync_seq, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+"""
+Audit log: caller-supplied timestamps and a keyset pagination index.
+
+``AuditLog.timestamp`` switches from ``auto_now_add`` to a ``timezone.now``
+default so rows written in batches keep the time the event happened
+rather than the time of the flush. The ``(user, -timestamp, -id)`` index
+serves newest-first keyset pages of one user's log.
+"""
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vault', '0015_delta_sync_seq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='vault_audit_user_ts_id_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import os
 import base64
 
@@ -51,7 +52,8 @@ class AuditLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     action = models.CharField(max_length=20, choices=ACTION_TYPES)
     item_type = models.CharField(max_length=20, blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set by the caller when the event happens, not when the batched insert runs
+    timestamp = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
@@ -60,6 +62,8 @@ class AuditLog(models.Model):
         indexes = [
             models.Index(fields=['user', 'action']),
             models.Index(fields=['timestamp']),
+            # Keyset pagination of one user's log, newest first
+            models.Index(fields=['user', '-timestamp', '-id'], name='vault_audit_user_ts_id_idx'),
         ]
 
 class DeletedItem(models.Model):
@@ -67,9 +71,12 @@ class DeletedItem(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     item_id = models.CharField(max_length=64)
     deleted_at = models.DateTimeField()
+    # Position of this deletion in the owner's change sequence.
+    sync_seq = models.BigIntegerField(default=0)
     
     class Meta:
         indexes = [
             models.Index(fields=['user', 'deleted_at']),
+            models.Index(fields=['user', 'sync_seq']),
             models.Index(fields=['item_id']),
         ]
@@ -132,6 +132,10 @@ class EncryptedVaultItem(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     last_used_at = models.DateTimeField(null=True, blank=True)
     
+    # Delta sync: value of the owner's change sequence (UserSalt.sync_version)
+    # when this item was last written. See vault/services/sync_feed.py.
+    sync_seq = models.BigIntegerField(default=0)
+
     # Flags
     favorite = models.BooleanField(default=False)
     deleted = models.BooleanField(default=False)
@@ -146,6 +150,7 @@ class EncryptedVaultItem(models.Model):
             models.Index(fields=['folder']),
             models.Index(fields=['user', 'item_type', 'favorite']),
             models.Index(fields=['user', 'updated_at']),
+            models.Index(fields=['user', 'sync_seq']),
             # FHE search indexes
             models.Index(fields=['user', 'domain_fuzzy_hash']),
             models.Index(fields=['fhe_cache_timestamp']),
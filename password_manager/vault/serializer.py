@@ -3,6 +3,7 @@ from vault.models.vault_models import EncryptedVaultItem
 from vault.models import UserSalt, AuditLog, DeletedItem, VaultFolder
 from django.contrib.auth.models import User
 from vault.models.backup_models import VaultBackup
+from vault.services import backup_stream
 import json
 
 class EncryptedVaultItemSerializer(serializers.ModelSerializer):
@@ -84,9 +85,10 @@ class VaultItemSerializer(serializers.ModelSerializer):
             'last_used_at',
             'favorite',
             'folder_id',
-            'tags'
+            'tags',
+            'sync_seq',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'sync_seq']
 
     def create(self, validated_data):
         # Associate with current user. The queryset on ``folder_id`` already
@@ -95,11 +97,51 @@ class VaultItemSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+class SyncItemSerializer(serializers.ModelSerializer):
+    """One client-side change in a sync request.
+
+    ``item_id`` is the upsert key, so the model's unique validator is
+    dropped here; ownership is checked when the batch is applied. Every
+    field is optional at this level because an update only carries what
+    changed -- new items are checked for ``encrypted_data``/``item_type``
+    when the batch is applied. ``base_seq`` is the item's ``sync_seq`` the
+    edit was made against; a newer server copy makes it a conflict.
+    """
+    folder_id = _UserScopedFolderPrimaryKeyRelatedField(
+        source='folder',
+        required=False,
+        allow_null=True,
+    )
+    base_seq = serializers.IntegerField(required=False, min_value=0)
+
+    class Meta:
+        model = EncryptedVaultItem
+        fields = [
+            'item_id',
+            'encrypted_data',
+            'item_type',
+            'last_used_at',
+            'favorite',
+            'folder_id',
+            'tags',
+            'base_seq',
+        ]
+        extra_kwargs = {
+            'item_id': {'validators': [], 'required': True},
+            'encrypted_data': {'required': False},
+            'item_type': {'required': False},
+        }
+
+
 class SyncSerializer(serializers.Serializer):
     """Serializer for synchronizing vault items across devices"""
     last_sync = serializers.DateTimeField(required=False)
+    # Delta sync: cursor into the per-user change feed (see
+    # vault/services/sync_feed.py). Omit to use the legacy last_sync mode.
+    since_seq = serializers.IntegerField(required=False, min_value=0)
+    page_size = serializers.IntegerField(required=False, min_value=1)
     items = serializers.ListField(
-        child=VaultItemSerializer(), 
+        child=SyncItemSerializer(),
         required=False
     )
     deleted_items = serializers.ListField(
@@ -108,7 +150,7 @@ class SyncSerializer(serializers.Serializer):
     )
     
     class Meta:
-        fields = ['last_sync', 'items', 'deleted_items']
+        fields = ['last_sync', 'since_seq', 'page_size', 'items', 'deleted_items']
 
 class BackupSerializer(serializers.ModelSerializer):
     """Serializer for vault backups"""
@@ -127,11 +169,18 @@ class BackupSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'size', 'cloud_sync_status']
     
     def get_item_count(self, obj):
+        stub = backup_stream.parse_stub(obj.encrypted_data)
+        if stub is not None:
+            # Recorded when the stream was written; None if unknown
+            return stub.get('item_count')
         try:
             backup_data = json.loads(obj.encrypted_data)
-            return len(backup_data.get('items', []))
-        except:
+        except (json.JSONDecodeError, TypeError):
+            # Envelope-encrypted backups are opaque to the server
+            return 0
+        if not isinstance(backup_data, dict):
             return 0
+        return len(backup_data.get('items', []))
 
 
 class EmergencyVaultSerializer(serializers.ModelSerializer):
@@ -0,0 +1,439 @@
+"""
+Audit log ingestion, retention and per-user queries.
+
+Ingestion
+---------
+``record_audit_event()`` does not touch the database. It appends the event
+(with its own timestamp) to a Redis stream, capped at ``STREAM_MAXLEN``
+entries, that every web and worker process shares. The beat task
+``vault.tasks.flush_audit_events`` drains the stream through a consumer
+group in batches of ``FLUSH_BATCH_SIZE``: one ``bulk_create`` per batch,
+then XACK + XDEL. Delivery is at-least-once: entries read by a drain that
+died before acknowledging them are reclaimed (XAUTOCLAIM) after
+``CLAIM_IDLE_SECONDS``, so an event may be stored twice but is not lost.
+
+A batch the database rejects is retried one row at a time; rows that still
+fail (or cannot be parsed) are copied to the ``<STREAM_KEY>:dead`` stream
+and acknowledged, so one bad event never holds up the rest of the stream.
+``record_audit_event()`` rejects unknown actions and statuses and trims
+fields to their column lengths, so such rows should not reach the flush.
+
+If Redis cannot be reached the event is handed to the in-process
+``shared.buffered_writer`` instead (marked essential, so it is never
+sampled out). ``BUFFER='local'`` always does that, and ``BUFFER='redis'``
+behaves like it when ``REDIS_CACHE_ALIAS`` is not a django-redis cache
+(``USE_REDIS_CACHE`` unset), rather than retrying a connection that can
+never succeed. ``BUFFER='sync'`` writes on the calling thread, which tests
+use.
+
+Retention
+---------
+``delete_audit_logs_before()`` deletes in bounded batches: each batch
+selects at most ``DELETE_BATCH_SIZE`` primary keys through the timestamp
+index and deletes them in its own short statement, so no lock is held for
+longer than one batch and replicas never see one huge transaction. A run
+stops after ``DELETE_MAX_SECONDS``; the next run continues where it left
+off.
+
+Queries
+-------
+``audit_log_page()`` pages one user's log newest-first with keyset
+pagination on ``(timestamp, id)``, served by the
+``(user, -timestamp, -id)`` index: every page costs the same however deep
+it is, unlike OFFSET paging.
+"""
+
+import base64
+import ipaddress
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'BUFFER': 'redis',            # 'redis', 'local' or 'sync'
+    'REDIS_CACHE_ALIAS': 'default',
+    'STREAM_KEY': 'vault:audit:stream',
+    'STREAM_MAXLEN': 1_000_000,
+    'FLUSH_BATCH_SIZE': 5000,
+    'FLUSH_MAX_BATCHES': 50,
+    'CLAIM_IDLE_SECONDS': 300,
+    'RETENTION_DAYS': 90,
+    'DELETE_BATCH_SIZE': 5000,
+    'DELETE_MAX_SECONDS': 300,
+    'DELETE_PAUSE_SECONDS': 0.05,
+    'PAGE_SIZE': 50,
+    'MAX_PAGE_SIZE': 500,
+}
+
+CONSUMER_GROUP = 'audit-writers'
+
+
+def audit_log_settings() -> Dict:
+    return {**DEFAULT_SETTINGS, **(getattr(settings, 'AUDIT_LOG_SETTINGS', {}) or {})}
+
+
+def redis_configured(conf: Optional[Dict] = None) -> bool:
+    """True if the stream's cache alias is backed by django-redis."""
+    conf = conf or audit_log_settings()
+    backend = settings.CACHES.get(conf['REDIS_CACHE_ALIAS'], {}).get('BACKEND', '')
+    return backend.startswith('django_redis.')
+
+
+# =============================================================================
+# Redis stream
+# =============================================================================
+
+def _text(value) -> str:
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class RedisAuditStream:
+    """Redis stream of pending audit events, drained by a consumer group."""
+
+    def __init__(self, key: str, maxlen: int, redis_cache_alias: str = 'default',
+                 claim_idle_seconds: float = 300):
+        from django_redis import get_redis_connection
+        self._key = key
+        self._maxlen = maxlen
+        self._claim_idle_ms = int(claim_idle_seconds * 1000)
+        self._redis = get_redis_connection(redis_cache_alias)
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._group_ready = False
+
+    def add(self, fields: Dict[str, str]):
+        self._redis.xadd(self._key, fields, maxlen=self._maxlen, approximate=True)
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        from redis.exceptions import ResponseError
+        try:
+            self._redis.xgroup_create(self._key, CONSUMER_GROUP, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_ready = True
+
+    def read(self, count: int) -> List[Tuple[str, Dict[str, str]]]:
+        """Up to ``count`` unacknowledged entries, reclaimed ones first."""
+        self._ensure_group()
+        claimed = self._redis.xautoclaim(
+            self._key, CONSUMER_GROUP, self._consumer,
+            min_idle_time=self._claim_idle_ms, start_id='0-0', count=count,
+        )
+        messages = list(claimed[1])
+        if len(messages) < count:
+            for _, stream_messages in self._redis.xreadgroup(
+                CONSUMER_GROUP, self._consumer, {self._key: '>'}, count=count - len(messages),
+            ) or []:
+                messages.extend(stream_messages)
+        return [
+            (_text(entry_id), {_text(k): _text(v) for k, v in fields.items()})
+            for entry_id, fields in messages
+            if fields
+        ]
+
+    def dead_letter(self, fields: Dict[str, str], reason: str):
+        self._redis.xadd(f"{self._key}:dead", {**fields, 'error': reason[:500]},
+                         maxlen=self._maxlen, approximate=True)
+
+    def ack(self, entry_ids: List[str]):
+        if entry_ids:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.xack(self._key, CONSUMER_GROUP, *entry_ids)
+            pipe.xdel(self._key, *entry_ids)
+            pipe.execute()
+
+    def size(self) -> int:
+        return int(self._redis.xlen(self._key))
+
+
+_stream: Optional[RedisAuditStream] = None
+
+
+def get_audit_stream() -> RedisAuditStream:
+    global _stream
+    if _stream is None:
+        conf = audit_log_settings()
+        _stream = RedisAuditStream(
+            conf['STREAM_KEY'],
+            conf['STREAM_MAXLEN'],
+            redis_cache_alias=conf['REDIS_CACHE_ALIAS'],
+            claim_idle_seconds=conf['CLAIM_IDLE_SECONDS'],
+        )
+    return _stream
+
+
+# =============================================================================
+# Ingestion
+# =============================================================================
+
+def _event_fields(user_id, action, item_type, status, ip_address, user_agent, timestamp) -> Dict[str, str]:
+    return {
+        'user_id': str(user_id),
+        'action': action,
+        'item_type': item_type or '',
+        'status': status,
+        'ip_address': ip_address or '',
+        'user_agent': user_agent or '',
+        'timestamp': repr(timestamp.timestamp()),
+    }
+
+
+def _row_from_fields(fields: Dict[str, str]):
+    from vault.models import AuditLog
+    return AuditLog(
+        user_id=int(fields['user_id']),
+        action=fields['action'],
+        item_type=fields.get('item_type') or None,
+        status=fields.get('status') or 'success',
+        ip_address=fields.get('ip_address') or None,
+        user_agent=fields.get('user_agent') or None,
+        timestamp=datetime.fromtimestamp(float(fields['timestamp']), tz=dt_timezone.utc),
+    )
+
+
+def _valid_ip(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+
+def record_audit_event(
+    user_id: int,
+    action: str,
+    item_type: Optional[str] = None,
+    status: str = 'success',
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+):
+    """
+    Queue one audit event for a batched insert.
+
+    Raises ValueError for an action or status that is not one of
+    ``AuditLog``'s choices. An over-long ``item_type`` is truncated and an
+    unparsable ``ip_address`` is stored as null.
+    """
+    from vault.models import AuditLog
+    from shared.buffered_writer import write_row
+
+    if action not in {choice for choice, _ in AuditLog.ACTION_TYPES}:
+        raise ValueError(f"Unknown audit action: {action!r}")
+    if status not in {choice for choice, _ in AuditLog.STATUS_CHOICES}:
+        raise ValueError(f"Unknown audit status: {status!r}")
+    item_type = item_type[:AuditLog._meta.get_field('item_type').max_length] if item_type else None
+    ip_address = _valid_ip(ip_address)
+
+    timestamp = timestamp or timezone.now()
+    conf = audit_log_settings()
+    buffer = conf['BUFFER']
+    if buffer == 'redis' and not redis_configured(conf):
+        buffer = 'local'
+    if buffer == 'redis':
+        fields = _event_fields(user_id, action, item_type, status, ip_address, user_agent, timestamp)
+        try:
+            get_audit_stream().add(fields)
+            return
+        except Exception as e:
+            logger.warning(f"Audit stream unavailable, buffering locally: {e}")
+
+    row = AuditLog(
+        user_id=user_id, action=action, item_type=item_type, status=status,
+        ip_address=ip_address, user_agent=user_agent, timestamp=timestamp,
+    )
+    if buffer == 'sync':
+        row.save(force_insert=True)
+    else:
+        write_row(row, essential=True)
+
+
+def _bulk_insert(rows: List):
+    from vault.models import AuditLog
+
+    # Own savepoint, so a rejected batch leaves any outer transaction usable
+    with transaction.atomic():
+        AuditLog.objects.bulk_create(rows)
+
+
+def _write_entries(stream: RedisAuditStream, entries: List[Tuple[str, Dict[str, str]]]) -> Tuple[int, int]:
+    """
+    Insert one batch of stream entries; returns ``(written, dead_lettered)``.
+
+    Falls back to row-by-row inserts when the batch is rejected. Entries
+    that cannot be parsed or inserted go to the dead-letter stream.
+    """
+    parsed, dead = [], []
+    for _, fields in entries:
+        try:
+            parsed.append((fields, _row_from_fields(fields)))
+        except (KeyError, TypeError, ValueError) as e:
+            dead.append((fields, f"unparsable event: {e}"))
+
+    written = 0
+    if parsed:
+        try:
+            _bulk_insert([row for _, row in parsed])
+            written = len(parsed)
+        except DatabaseError as e:
+            logger.warning(f"Audit batch of {len(parsed)} rows rejected, inserting one by one: {e}")
+            for fields, row in parsed:
+                try:
+                    _bulk_insert([row])
+                    written += 1
+                except DatabaseError as row_error:
+                    dead.append((fields, str(row_error)))
+
+    for fields, reason in dead:
+        logger.error(f"Dead-lettering audit event for user {fields.get('user_id')}: {reason}")
+        stream.dead_letter(fields, reason)
+    return written, len(dead)
+
+
+def flush_audit_events(max_batches: Optional[int] = None) -> Dict:
+    """Drain queued events from the stream into ``AuditLog``."""
+    conf = audit_log_settings()
+    if conf['BUFFER'] != 'redis':
+        return {'written': 0, 'batches': 0, 'dead_lettered': 0}
+    max_batches = conf['FLUSH_MAX_BATCHES'] if max_batches is None else max_batches
+    stream = get_audit_stream()
+
+    written = batches = dead_lettered = 0
+    for _ in range(max_batches):
+        entries = stream.read(conf['FLUSH_BATCH_SIZE'])
+        if not entries:
+            break
+        batch_written, batch_dead = _write_entries(stream, entries)
+        stream.ack([entry_id for entry_id, _ in entries])
+        written += batch_written
+        dead_lettered += batch_dead
+        batches += 1
+    return {'written': written, 'batches': batches, 'dead_lettered': dead_lettered}
+
+
+# =============================================================================
+# Retention
+# =============================================================================
+
+def delete_audit_logs_before(
+    cutoff: datetime,
+    batch_size: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    pause_seconds: Optional[float] = None,
+) -> Dict:
+    """
+    Delete rows older than ``cutoff`` in bounded, index-driven batches.
+
+    Returns ``{'deleted', 'batches', 'complete'}``; ``complete`` is False
+    when the run stopped at ``max_seconds`` with rows left to delete.
+    """
+    from vault.models import AuditLog
+
+    conf = audit_log_settings()
+    batch_size = batch_size or conf['DELETE_BATCH_SIZE']
+    max_seconds = conf['DELETE_MAX_SECONDS'] if max_seconds is None else max_seconds
+    pause_seconds = conf['DELETE_PAUSE_SECONDS'] if pause_seconds is None else pause_seconds
+
+    deadline = time.monotonic() + max_seconds
+    deleted = batches = 0
+    while True:
+        ids = list(
+            AuditLog.objects.filter(timestamp__lt=cutoff)
+            .order_by('timestamp')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return {'deleted': deleted, 'batches': batches, 'complete': True}
+        count, _ = AuditLog.objects.filter(pk__in=ids).delete()
+        deleted += count
+        batches += 1
+        if len(ids) < batch_size:
+            return {'deleted': deleted, 'batches': batches, 'complete': True}
+        if time.monotonic() >= deadline:
+            return {'deleted': deleted, 'batches': batches, 'complete': False}
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def retention_cutoff(days_to_keep: Optional[int] = None) -> datetime:
+    days = audit_log_settings()['RETENTION_DAYS'] if days_to_keep is None else days_to_keep
+    return timezone.now() - timedelta(days=days)
+
+
+# =============================================================================
+# Per-user queries
+# =============================================================================
+
+@dataclass
+class AuditLogPage:
+    entries: List
+    next_cursor: Optional[str]
+
+
+def encode_cursor(timestamp: datetime, pk: int) -> str:
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError on anything else."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        stamp, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(stamp), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid audit log cursor") from e
+
+
+def audit_log_page(user, cursor: Optional[str] = None, limit: Optional[int] = None,
+                   action: Optional[str] = None) -> AuditLogPage:
+    """
+    One page of ``user``'s audit log, newest first.
+
+    Pass the returned ``next_cursor`` back to get the following page; it
+    is None on the last page.
+    """
+    from vault.models import AuditLog
+
+    conf = audit_log_settings()
+    limit = max(1, min(int(limit or conf['PAGE_SIZE']), conf['MAX_PAGE_SIZE']))
+
+    queryset = AuditLog.objects.filter(user=user)
+    if action:
+        queryset = queryset.filter(action=action)
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk))
+
+    rows = list(queryset.order_by('-timestamp', '-pk')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].pk)
+    return AuditLogPage(entries=rows, next_cursor=next_cursor)
+
+
+def serialize_entry(entry) -> Dict:
+    return {
+        'id': entry.pk,
+        'action': entry.action,
+        'item_type': entry.item_type,
+        'status': entry.status,
+        'ip_address': entry.ip_address,
+        'user_agent': entry.user_agent,
+        'timestamp': entry.timestamp.isoformat(),
+    }
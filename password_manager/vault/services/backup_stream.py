@@ -0,0 +1,205 @@
+"""
+Streaming vault backup format (``ndjson-v1``).
+
+A backup is newline-delimited JSON, optionally gzip-compressed:
+
+    {"format": "vault-backup", "version": "ndjson-v1", "created_at": ...}
+    {"id": ..., "item_id": ..., "encrypted_data": ..., ...}     one per item
+    ...
+    {"end": true, "item_count": N}
+
+Items are written straight from a queryset ``iterator()`` into a file-like
+sink and read back one line at a time, so neither side ever holds the whole
+vault as Python objects. The trailer lets readers detect truncated uploads.
+
+Items are still field-level encrypted client-side; like the legacy
+``{"items": [...]}`` JSON backup, this format carries no key material.
+"""
+
+import base64
+import gzip
+import io
+import json
+import logging
+from typing import IO, Iterable, Iterator
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STREAM_FORMAT_VERSION = 'ndjson-v1'
+CONTENT_TYPE = 'application/x-ndjson'
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Rows fetched per round trip by ``QuerySet.iterator()``.
+ITERATOR_CHUNK_SIZE = 2000
+
+
+class BackupFormatError(ValueError):
+    """Raised when a streamed backup is malformed or truncated."""
+
+
+def serialize_item(item) -> dict:
+    """Backup representation of one EncryptedVaultItem (same as legacy JSON)."""
+    return {
+        'id': str(item.id),
+        'item_id': item.item_id,
+        'item_type': item.item_type,
+        'encrypted_data': item.encrypted_data,
+        'created_at': item.created_at.isoformat(),
+        'updated_at': item.updated_at.isoformat(),
+        'favorite': item.favorite,
+        'tags': item.tags,
+    }
+
+
+def _dump_line(obj) -> bytes:
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def write_backup(items: Iterable, sink: IO[bytes], compress: bool = True) -> int:
+    """
+    Stream ``items`` (model instances) into ``sink`` as an ndjson-v1 backup.
+
+    Pass ``queryset.iterator(chunk_size=ITERATOR_CHUNK_SIZE)`` to keep
+    memory flat.
+
+    Returns:
+        Number of items written.
+    """
+    stream = gzip.GzipFile(fileobj=sink, mode='wb', mtime=0) if compress else sink
+    count = 0
+    try:
+        stream.write(_dump_line({
+            'format': 'vault-backup',
+            'version': STREAM_FORMAT_VERSION,
+            'created_at': timezone.now().isoformat(),
+        }))
+        for item in items:
+            stream.write(_dump_line(serialize_item(item)))
+            count += 1
+        stream.write(_dump_line({'end': True, 'item_count': count}))
+    finally:
+        if compress:
+            stream.close()
+    return count
+
+
+class _Peekable(io.RawIOBase):
+    """Raw adapter that lets us sniff the gzip magic on read-only streams
+    (S3 StreamingBody, GCS BlobReader, SpooledTemporaryFile)."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def peek(self, size):
+        if len(self._buffer) < size:
+            self._buffer += self._raw.read(size - len(self._buffer)) or b''
+        return self._buffer
+
+    def readinto(self, b):
+        if self._buffer:
+            n = min(len(b), len(self._buffer))
+            b[:n] = self._buffer[:n]
+            self._buffer = self._buffer[n:]
+            return n
+        data = self._raw.read(len(b)) or b''
+        b[:len(data)] = data
+        return len(data)
+
+
+def open_backup(source: IO[bytes]) -> IO[bytes]:
+    """Buffered reader over ``source``, transparently gunzipping if needed."""
+    raw = _Peekable(source)
+    compressed = raw.peek(2)[:2] == GZIP_MAGIC
+    buffered = io.BufferedReader(raw, buffer_size=1 << 16)
+    if compressed:
+        return gzip.GzipFile(fileobj=buffered, mode='rb')
+    return buffered
+
+
+def iter_decompressed(source: IO[bytes], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield the raw NDJSON bytes of a backup in chunks, closing ``source``."""
+    try:
+        stream = open_backup(source)
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        source.close()
+
+
+def iter_backup_items(source: IO[bytes]) -> Iterator[dict]:
+    """
+    Yield item dicts from an ndjson-v1 backup, one line at a time.
+
+    Raises:
+        BackupFormatError: bad header, malformed line, or missing/mismatched
+            trailer (truncated upload).
+    """
+    stream = open_backup(source)
+    try:
+        header = json.loads(stream.readline() or b'null')
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError, EOFError) as e:
+        raise BackupFormatError(f"unreadable backup header: {e}") from e
+    if not isinstance(header, dict) or header.get('version') != STREAM_FORMAT_VERSION:
+        raise BackupFormatError("not an ndjson-v1 vault backup")
+
+    count = 0
+    try:
+        for line in stream:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict) and record.get('end') is True:
+                if record.get('item_count') != count:
+                    raise BackupFormatError(
+                        f"trailer says {record.get('item_count')} items, read {count}"
+                    )
+                return
+            count += 1
+            yield record
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError, EOFError) as e:
+        raise BackupFormatError(f"malformed backup line {count + 2}: {e}") from e
+    raise BackupFormatError("backup is truncated (no trailer)")
+
+
+# ---------------------------------------------------------------------------
+# DB stub
+# ---------------------------------------------------------------------------
+#
+# ``VaultBackup.encrypted_data`` for a streamed backup holds a small JSON
+# stub. When the backup went to object storage the stub is all there is;
+# otherwise the (compressed) stream is inlined as base64. The item count is
+# recorded so listings don't have to read the stream.
+
+def make_stub(compressed: bool, inline_data: bytes = None, item_count: int = None) -> str:
+    stub = {
+        'format': STREAM_FORMAT_VERSION,
+        'compression': 'gzip' if compressed else 'none',
+        'storage': 'db' if inline_data is not None else 'cloud',
+        'item_count': item_count,
+    }
+    if inline_data is not None:
+        stub['data'] = base64.b64encode(inline_data).decode('ascii')
+    return json.dumps(stub)
+
+
+def parse_stub(raw_data):
+    """Return the stub dict if ``raw_data`` is an ndjson-v1 stub, else None."""
+    if not raw_data or not raw_data.lstrip().startswith('{'):
+        return None
+    # Cheap prefix check first: legacy backups can be large JSON documents
+    if f'"format": "{STREAM_FORMAT_VERSION}"' not in raw_data[:200]:
+        return None
+    try:
+        stub = json.loads(raw_data)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return stub if isinstance(stub, dict) and stub.get('format') == STREAM_FORMAT_VERSION else None
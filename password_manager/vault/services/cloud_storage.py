@@ -228,6 +228,82 @@ class CloudStorageService:
 
         return None
 
+    def upload_backup_stream(self, user_id, fileobj, backup_id=None,
+                             content_type='application/octet-stream'):
+        """
+        Upload a backup from a file-like object without loading it into memory.
+
+        S3 uses a managed multipart upload; GCS uses a chunked resumable
+        upload. Part/chunk size comes from VAULT_BACKUP_STREAM_SETTINGS.
+        """
+        if not self.client and not self._s3_client:
+            return None
+
+        backup_id = backup_id or str(uuid.uuid4())
+        blob_name = f"backups/{user_id}/{backup_id}"
+        part_size = int(
+            getattr(settings, 'VAULT_BACKUP_STREAM_SETTINGS', {}).get('PART_SIZE', 8 * 1024 * 1024)
+        )
+
+        if self.client and self.bucket_name:
+            try:
+                bucket = self.client.bucket(self.bucket_name)
+                blob = bucket.blob(blob_name)
+                # GCS requires chunk_size to be a multiple of 256 KiB
+                blob.chunk_size = max(1, part_size // (256 * 1024)) * 256 * 1024
+                blob.upload_from_file(fileobj, rewind=True, content_type=content_type)
+                return blob_name
+            except Exception as e:
+                logger.error("GCS streaming upload failed: %s", e)
+                return None
+
+        if self._s3_client and self._s3_bucket_name:
+            try:
+                from boto3.s3.transfer import TransferConfig
+                fileobj.seek(0)
+                self._s3_client.upload_fileobj(
+                    fileobj,
+                    self._s3_bucket_name,
+                    blob_name,
+                    ExtraArgs={
+                        'ServerSideEncryption': 'AES256',
+                        'ContentType': content_type,
+                    },
+                    Config=TransferConfig(
+                        multipart_threshold=part_size,
+                        multipart_chunksize=part_size,
+                    ),
+                )
+                return blob_name
+            except Exception as e:
+                logger.error("S3 streaming upload failed: %s", e)
+                return None
+
+        return None
+
+    def open_backup_stream(self, cloud_path):
+        """Return a readable binary stream for a backup object, or None."""
+        if self.client and self.bucket_name:
+            try:
+                bucket = self.client.bucket(self.bucket_name)
+                return bucket.blob(cloud_path).open('rb')
+            except Exception as e:
+                logger.error("GCS stream open failed: %s", e)
+                return None
+
+        if self._s3_client and self._s3_bucket_name:
+            try:
+                resp = self._s3_client.get_object(
+                    Bucket=self._s3_bucket_name,
+                    Key=cloud_path,
+                )
+                return resp['Body']
+            except Exception as e:
+                logger.error("S3 stream open failed: %s", e)
+                return None
+
+        return None
+
     def download_backup(self, cloud_path):
         """Download a backup from cloud storage"""
         if self.client and self.bucket_name:
@@ -52,7 +52,7 @@ def process_audit_log(self, user_id: int, action: str, details: Dict = None):
         details: Additional action details
     """
     try:
-        from vault.models import AuditLog
+        from vault.services.audit_log import record_audit_event
         
         # Deduplication guard: bucket the current time into 10-second
         # windows so that retries of the same logical event within the
@@ -67,7 +67,7 @@ def process_audit_log(self, user_id: int, action: str, details: Dict = None):
             )
             return {'status': 'deduplicated', 'user_id': user_id, 'action': action}
         
-        AuditLog.objects.create(
+        record_audit_event(
             user_id=user_id,
             action=action,
             item_type=details.get('item_type', 'unknown') if details else 'unknown',
@@ -82,29 +82,61 @@ def process_audit_log(self, user_id: int, action: str, details: Dict = None):
         logger.info(f"Audit log created: user={user_id}, action={action}")
         return {'status': 'success', 'user_id': user_id, 'action': action}
         
+    except ValueError as exc:
+        # Unknown action/status: retrying cannot fix it
+        logger.error(f"Audit log rejected: {exc}")
+        return {'status': 'rejected', 'user_id': user_id, 'action': action}
+        
     except Exception as exc:
         logger.error(f"Audit log failed: {exc}")
         raise self.retry(exc=exc)
 
 
+@shared_task(name='vault.tasks.flush_audit_events')
+def flush_audit_events():
+    """
+    Write queued audit events from the Redis stream in batches.
+    
+    Runs every few seconds from beat; see vault.services.audit_log. Does
+    nothing unless events are buffered in Redis.
+    """
+    from vault.services.audit_log import audit_log_settings, flush_audit_events as flush, redis_configured
+    
+    conf = audit_log_settings()
+    if conf['BUFFER'] != 'redis' or not redis_configured(conf):
+        return {'written': 0, 'batches': 0, 'dead_lettered': 0}
+    result = flush()
+    if result['written'] or result['dead_lettered']:
+        logger.info(
+            f"Flushed {result['written']} audit events in {result['batches']} batches"
+            f" ({result['dead_lettered']} dead-lettered)"
+        )
+    return result
+
+
 @shared_task(name='vault.tasks.cleanup_old_audit_logs')
-def cleanup_old_audit_logs(days_to_keep: int = 90):
+def cleanup_old_audit_logs(days_to_keep: Optional[int] = None):
     """
     Clean up audit logs older than specified days.
     
+    Deletes in bounded batches through the timestamp index and stops after
+    AUDIT_LOG_SETTINGS['DELETE_MAX_SECONDS']; rows left over are picked up
+    by the next run.
+    
     Args:
         days_to_keep: Number of days to retain logs
+            (default AUDIT_LOG_SETTINGS['RETENTION_DAYS'])
     """
     try:
-        from vault.models import AuditLog
+        from vault.services.audit_log import delete_audit_logs_before, retention_cutoff
         
-        cutoff_date = timezone.now() - timedelta(days=days_to_keep)
-        deleted_count, _ = AuditLog.objects.filter(
-            timestamp__lt=cutoff_date
-        ).delete()
+        result = delete_audit_logs_before(retention_cutoff(days_to_keep))
         
-        logger.info(f"Cleaned up {deleted_count} old audit logs")
-        return {'deleted': deleted_count}
+        logger.info(
+            f"Cleaned up {result['deleted']} old audit logs in {result['batches']} batches"
+            + ("" if result['complete'] else " (time budget reached, more remain)")
+        )
+        return result
         
     except Exception as exc:
         logger.error(f"Audit log cleanup failed: {exc}")
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from . import views
 from .views.backup_views import BackupViewSet
+from .views.audit_views import audit_log
 
 # PR D (2026-06): vault URLconf rewrite — fixes three independent routing
 # defects (all verified with django.urls.resolve/reverse in the canny venv):
@@ -85,6 +86,9 @@ urlpatterns = [
 
     path('search/', views.search, name='vault-search'),
 
+    # The signed-in user's audit trail, keyset-paginated
+    path('audit-log/', audit_log, name='vault-audit-log'),
+
     path('create_backup/', BackupViewSet.as_view({'post': 'create_backup'}), name='create-backup'),
     path('restore_backup/<uuid:pk>/', BackupViewSet.as_view({'post': 'restore'}), name='restore-backup'),
 
@@ -3,9 +3,11 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
+from django.db import transaction
 from vault.models.vault_models import EncryptedVaultItem
 from vault.models import UserSalt
 from vault.serializer import EncryptedVaultItemSerializer
+from vault.services import sync_feed
 from vault.crypto import derive_auth_key, generate_salt
 from password_manager.throttling import VaultOperationThrottle
 import base64
@@ -98,6 +100,23 @@ class VaultItemViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Return only items belonging to authenticated user"""
         return EncryptedVaultItem.objects.filter(user=self.request.user)
+
+    # Writes take the next position in the per-user sync feed so delta
+    # sync clients (crud_views.VaultItemViewSet.sync) see them.
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save(sync_seq=sync_feed.next_seq(self.request.user))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save(sync_seq=sync_feed.next_seq(self.request.user))
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            sync_feed.record_deletions(
+                self.request.user, [instance.item_id], sync_feed.next_seq(self.request.user),
+            )
+            instance.delete()
     
     def create(self, request, *args, **kwargs):
         """Create a new encrypted vault item"""
@@ -0,0 +1,51 @@
+"""
+Audit log API: the signed-in user's own audit trail, newest first.
+
+GET /api/vault/audit-log/?limit=50&action=update_item&cursor=<next_cursor>
+
+Pages are keyset-paginated (see vault.services.audit_log.audit_log_page):
+pass ``next_cursor`` from one response as ``cursor`` to get the next page.
+"""
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from password_manager.api_utils import error_response, success_response
+from vault.models import AuditLog
+from vault.services.audit_log import audit_log_page, serialize_entry
+
+_ACTIONS = {choice for choice, _ in AuditLog.ACTION_TYPES}
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def audit_log(request):
+    """List the requesting user's audit log entries"""
+    action = request.query_params.get('action') or None
+    if action and action not in _ACTIONS:
+        return error_response("Unknown audit action", code="invalid_action")
+
+    limit = request.query_params.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return error_response("limit must be an integer", code="invalid_limit")
+
+    try:
+        page = audit_log_page(
+            request.user,
+            cursor=request.query_params.get('cursor') or None,
+            limit=limit,
+            action=action,
+        )
+    except ValueError:
+        return error_response("Invalid cursor", code="invalid_cursor")
+
+    return success_response(
+        data={
+            'entries': [serialize_entry(entry) for entry in page.entries],
+            'next_cursor': page.next_cursor,
+        },
+        message="Audit log retrieved",
+    )
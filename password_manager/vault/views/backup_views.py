@@ -27,15 +27,21 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from vault.models.vault_models import EncryptedVaultItem
 from vault.models.backup_models import VaultBackup
 from vault.serializer import BackupSerializer, VaultItemSerializer
+from vault.services import backup_stream, sync_feed
 from vault.services.cloud_storage import CloudStorageService
 import base64
+import io
+import itertools
 import json
 import logging
+import shutil
+import tempfile
 from typing import Optional
 
 from password_manager.api_utils import error_response, success_response
@@ -60,6 +66,16 @@ def _looks_like_b64_md5(value: str) -> bool:
         return False
 
 
+def _stream_settings() -> dict:
+    """VAULT_BACKUP_STREAM_SETTINGS with defaults filled in."""
+    return {
+        'COMPRESS': True,
+        'SPOOL_MAX_BYTES': 16 * 1024 * 1024,
+        'RESTORE_BATCH_SIZE': 1000,
+        **getattr(settings, 'VAULT_BACKUP_STREAM_SETTINGS', {}),
+    }
+
+
 # Placeholder row while payload lives only in object storage (valet-key upload flow).
 CLOUD_ONLY_PAYLOAD_META = {'cloud_only': True, 'v': 1}
 
@@ -366,53 +382,31 @@ class BackupViewSet(viewsets.ModelViewSet):
                 )
             is_envelope_encrypted = True
 
-        with transaction.atomic():
-            vault_items = EncryptedVaultItem.objects.filter(
-                user=request.user,
-                deleted=False,
-            )
-
-            items_data = [
-                {
-                    'id': str(item.id),
-                    'item_id': item.item_id,
-                    'item_type': item.item_type,
-                    'encrypted_data': item.encrypted_data,
-                    'created_at': item.created_at.isoformat(),
-                    'updated_at': item.updated_at.isoformat(),
-                    'favorite': item.favorite,
-                    'tags': item.tags,
-                }
-                for item in vault_items
-            ]
-
-            if is_envelope_encrypted:
-                # Client has already sealed the items list. Store the
-                # envelope verbatim; the server has no way to inspect it.
-                stored_data = json.dumps(envelope)
-                # Item count cannot be derived from the ciphertext; record
-                # the server-side count for the response only (a UX hint).
-                server_item_count = len(items_data)
-                logger.info(
-                    "Backup created (envelope-v1) for user %s with %d items",
-                    request.user.id,
-                    server_item_count,
-                )
-            else:
-                backup_data = {
-                    'version': '1.0',
-                    'created_at': timezone.now().isoformat(),
-                    'item_count': len(items_data),
-                    'items': items_data,
-                }
-                stored_data = json.dumps(backup_data)
-                server_item_count = len(items_data)
+        name = request.data.get(
+            'name', f"Backup {timezone.now().strftime('%Y-%m-%d %H:%M')}"
+        )
+        if not is_envelope_encrypted:
+            return self._create_streamed_backup(request, name)
+
+        # Client has already sealed the items list. Store the envelope
+        # verbatim; the server has no way to inspect it. Item count
+        # cannot be derived from the ciphertext; record the server-side
+        # count for the response only (a UX hint).
+        stored_data = json.dumps(envelope)
+        server_item_count = EncryptedVaultItem.objects.filter(
+            user=request.user,
+            deleted=False,
+        ).count()
+        logger.info(
+            "Backup created (envelope-v1) for user %s with %d items",
+            request.user.id,
+            server_item_count,
+        )
 
+        with transaction.atomic():
             backup = VaultBackup.objects.create(
                 user=request.user,
-                name=request.data.get(
-                    'name', f"Backup {timezone.now().strftime('%Y-%m-%d %H:%M')}"
-                ),
+                name=name,
                 encrypted_data=stored_data,
                 size=len(stored_data),
             )
@@ -429,15 +423,62 @@ class BackupViewSet(viewsets.ModelViewSet):
                 backup.cloud_sync_status = 'synced'
                 backup.save()
 
-            return Response({
-                'id': backup.id,
-                'name': backup.name,
-                'created_at': backup.created_at,
-                'item_count': server_item_count,
-                'size': backup.size,
-                'cloud_synced': backup.cloud_sync_status == 'synced',
-                'envelope_encrypted': is_envelope_encrypted,
-            })
+        return self._backup_created_response(backup, server_item_count, True)
+
+    def _create_streamed_backup(self, request, name):
+        """Write the vault as an ndjson-v1 stream (see backup_stream).
+
+        Items are read with ``iterator()`` straight into a spooled temp
+        file, which is then either multipart-uploaded to object storage
+        (the DB row keeps a small stub) or inlined into the row when no
+        bucket is configured. Memory stays flat regardless of vault size.
+        """
+        config = _stream_settings()
+        compress = bool(config['COMPRESS'])
+        backup = VaultBackup(user=request.user, name=name)
+
+        with tempfile.SpooledTemporaryFile(max_size=config['SPOOL_MAX_BYTES']) as spool:
+            items = EncryptedVaultItem.objects.filter(
+                user=request.user,
+                deleted=False,
+            ).iterator(chunk_size=backup_stream.ITERATOR_CHUNK_SIZE)
+            item_count = backup_stream.write_backup(items, spool, compress=compress)
+            backup.size = spool.tell()
+
+            cloud_path = CloudStorageService().upload_backup_stream(
+                request.user.id,
+                spool,
+                str(backup.id),
+                content_type='application/gzip' if compress else backup_stream.CONTENT_TYPE,
+            )
+            if cloud_path:
+                backup.encrypted_data = backup_stream.make_stub(compress, item_count=item_count)
+                backup.cloud_storage_path = cloud_path
+                backup.cloud_sync_status = 'synced'
+            else:
+                spool.seek(0)
+                backup.encrypted_data = backup_stream.make_stub(
+                    compress, inline_data=spool.read(), item_count=item_count,
+                )
+
+        backup.save()
+        logger.info(
+            "Backup created (%s) for user %s with %d items, %d bytes",
+            backup_stream.STREAM_FORMAT_VERSION, request.user.id, item_count, backup.size,
+        )
+        return self._backup_created_response(backup, item_count, False)
+
+    @staticmethod
+    def _backup_created_response(backup, item_count, envelope_encrypted):
+        return Response({
+            'id': backup.id,
+            'name': backup.name,
+            'created_at': backup.created_at,
+            'item_count': item_count,
+            'size': backup.size,
+            'cloud_synced': backup.cloud_sync_status == 'synced',
+            'envelope_encrypted': envelope_encrypted,
+        })
 
     # ------------------------------------------------------------------
     # Direct cloud-upload (valet-key) flow — unchanged
@@ -718,11 +759,27 @@ class BackupViewSet(viewsets.ModelViewSet):
 
             {"format": "envelope-v1" | "plaintext-json", "data": <object>}
 
+        Streamed (ndjson-v1) backups are returned as-is, decompressed, as
+        an ``application/x-ndjson`` streaming response.
+
         The server attaches NO KEK material and performs NO decryption.
         """
         backup = self.get_object()
         raw_data = backup.encrypted_data
 
+        stream_stub = backup_stream.parse_stub(raw_data)
+        if stream_stub is not None:
+            source = self._open_streamed_backup(backup, stream_stub)
+            if source is None:
+                return error_response(
+                    'Failed to download backup from cloud',
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            return StreamingHttpResponse(
+                backup_stream.iter_decompressed(source),
+                content_type=backup_stream.CONTENT_TYPE,
+            )
+
         # Cloud-only stub -> fetch from object storage transparently.
         try:
             stub = json.loads(raw_data) if raw_data else {}
@@ -782,6 +839,10 @@ class BackupViewSet(viewsets.ModelViewSet):
           encrypted): ``{}`` — server reads the stored blob, which must be
           ``{"items": [...]}``, and restores from it.
 
+        * **Streamed backup** (``ndjson-v1``, the default for new plain
+          backups): ``{}`` — the server reads the stored stream line by
+          line and upserts items in ``RESTORE_BATCH_SIZE`` batches.
+
         * **Envelope backup with no client-supplied items**: returns a
           ``422 envelope_requires_client_decryption`` with the stored
           ciphertext attached so the client can decrypt and re-call. The
@@ -798,87 +859,92 @@ class BackupViewSet(viewsets.ModelViewSet):
                 'Backup not found', status_code=status.HTTP_404_NOT_FOUND,
             )
 
-        with transaction.atomic():
-            # Mode 1: client supplied decrypted items directly.
-            client_items = request.data.get('items')
-            if client_items is not None:
-                if not isinstance(client_items, list):
-                    return error_response(
-                        '"items" must be a list',
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        code='invalid_items',
-                    )
-                return self._restore_from_items(
-                    request, backup, client_items,
+        # Mode 1: client supplied decrypted items directly.
+        client_items = request.data.get('items')
+        if client_items is not None:
+            if not isinstance(client_items, list):
+                return error_response(
+                    '"items" must be a list',
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    code='invalid_items',
                 )
+            return self._restore_from_items(
+                request, backup, client_items,
+            )
 
-            # Mode 2/3: try to read the stored blob.
-            raw_data = backup.encrypted_data
-            try:
-                stub = json.loads(raw_data) if raw_data else {}
-            except (json.JSONDecodeError, TypeError):
-                stub = {}
-            if (
-                stub.get('cloud_only')
-                and stub.get('v') == CLOUD_ONLY_PAYLOAD_META['v']
-                and backup.cloud_storage_path
-            ):
-                cloud_service = CloudStorageService()
-                blob = cloud_service.download_backup(backup.cloud_storage_path)
-                if not blob:
-                    return error_response(
-                        'Failed to download backup from cloud',
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-                raw_data = (
-                    blob.decode('utf-8') if isinstance(blob, bytes) else blob
-                )
-            elif not raw_data and backup.cloud_storage_path:
-                cloud_service = CloudStorageService()
-                raw_data = cloud_service.download_backup(
-                    backup.cloud_storage_path,
-                )
-                if not raw_data:
-                    return error_response(
-                        'Failed to download backup from cloud',
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-                if isinstance(raw_data, bytes):
-                    raw_data = raw_data.decode('utf-8')
+        # Mode 2/3: try to read the stored blob.
+        raw_data = backup.encrypted_data
 
-            try:
-                parsed = json.loads(raw_data)
-            except (json.JSONDecodeError, TypeError):
+        # Streamed ndjson-v1 backup: restore incrementally.
+        stream_stub = backup_stream.parse_stub(raw_data)
+        if stream_stub is not None:
+            return self._restore_from_stream(request, backup, stream_stub)
+
+        try:
+            stub = json.loads(raw_data) if raw_data else {}
+        except (json.JSONDecodeError, TypeError):
+            stub = {}
+        if (
+            stub.get('cloud_only')
+            and stub.get('v') == CLOUD_ONLY_PAYLOAD_META['v']
+            and backup.cloud_storage_path
+        ):
+            cloud_service = CloudStorageService()
+            blob = cloud_service.download_backup(backup.cloud_storage_path)
+            if not blob:
                 return error_response(
-                    'Stored backup is not valid JSON',
+                    'Failed to download backup from cloud',
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
-
-            # Mode 3: envelope -> tell the client to decrypt locally.
-            if parsed.get('version') == ENVELOPE_VERSION_V1:
+            raw_data = (
+                blob.decode('utf-8') if isinstance(blob, bytes) else blob
+            )
+        elif not raw_data and backup.cloud_storage_path:
+            cloud_service = CloudStorageService()
+            raw_data = cloud_service.download_backup(
+                backup.cloud_storage_path,
+            )
+            if not raw_data:
                 return error_response(
-                    (
-                        'Backup is envelope-encrypted. Decrypt the envelope '
-                        'client-side and re-call this endpoint with the '
-                        'decrypted items list as "items".'
-                    ),
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    code='envelope_requires_client_decryption',
-                    details={'envelope': parsed},
+                    'Failed to download backup from cloud',
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
+            if isinstance(raw_data, bytes):
+                raw_data = raw_data.decode('utf-8')
 
-            # Mode 2: plain-JSON backup. An empty ``items`` list is a
-            # legitimate state — a user can back up an empty vault and
-            # later restore it without losing the "this backup exists"
-            # signal — so only reject when ``items`` is missing entirely
-            # or the wrong shape.
-            items = parsed.get('items')
-            if items is None or not isinstance(items, list):
-                return error_response(
-                    'Invalid backup data',
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-            return self._restore_from_items(request, backup, items)
+        try:
+            parsed = json.loads(raw_data)
+        except (json.JSONDecodeError, TypeError):
+            return error_response(
+                'Stored backup is not valid JSON',
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Mode 3: envelope -> tell the client to decrypt locally.
+        if parsed.get('version') == ENVELOPE_VERSION_V1:
+            return error_response(
+                (
+                    'Backup is envelope-encrypted. Decrypt the envelope '
+                    'client-side and re-call this endpoint with the '
+                    'decrypted items list as "items".'
+                ),
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                code='envelope_requires_client_decryption',
+                details={'envelope': parsed},
+            )
+
+        # Mode 2: plain-JSON backup. An empty ``items`` list is a
+        # legitimate state — a user can back up an empty vault and
+        # later restore it without losing the "this backup exists"
+        # signal — so only reject when ``items`` is missing entirely
+        # or the wrong shape.
+        items = parsed.get('items')
+        if items is None or not isinstance(items, list):
+            return error_response(
+                'Invalid backup data',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        return self._restore_from_items(request, backup, items)
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -903,37 +969,27 @@ class BackupViewSet(viewsets.ModelViewSet):
         Strictly validate the restore payload. Returns ``None`` on
         success or a Response on failure. No DB writes have happened
         at the point this is called.
+
+        ``items`` is either a list or an iterator (a streamed backup);
+        for iterators the size limit is enforced as items are read.
         """
         from django.conf import settings as _settings
         max_items = int(getattr(
             _settings, 'VAULT_BACKUP_MAX_RESTORE_ITEMS', self.MAX_RESTORE_ITEMS
         ))
 
-        if not isinstance(items, list):
-            return error_response(
-                message="Restore payload 'items' must be a list.",
-                code="invalid_restore_payload",
-                status_code=status.HTTP_400_BAD_REQUEST,
-            )
-        if len(items) > max_items:
-            return error_response(
-                message=(
-                    f"Backup too large: {len(items)} items exceeds the "
-                    f"server limit of {max_items}. Split the backup or "
-                    "raise VAULT_BACKUP_MAX_RESTORE_ITEMS in settings."
-                ),
-                code="restore_too_large",
-                status_code=status.HTTP_400_BAD_REQUEST,
-                details={'item_count': len(items), 'limit': max_items},
-            )
+        if isinstance(items, list) and len(items) > max_items:
+            return self._restore_too_large(len(items), max_items)
         # Audit-fix (PR #272 review): track item_id uniqueness during
-        # validation. _restore_from_items uses `update_or_create(user,
-        # item_id=...)`, so a payload with two entries sharing the
-        # same item_id would silently let the second clobber the
-        # first — making restore output order-dependent and losing
-        # data with no error reported. Reject the whole batch instead.
+        # validation. Restores upsert on ``item_id``, so a payload with
+        # two entries sharing the same item_id would silently let the
+        # second clobber the first — making restore output
+        # order-dependent and losing data with no error reported.
+        # Reject the whole batch instead.
         seen_item_ids: set = set()
         for idx, item in enumerate(items):
+            if idx >= max_items:
+                return self._restore_too_large(f'>{max_items}', max_items)
             if not isinstance(item, dict):
                 return error_response(
                     message=f"Restore item at index {idx} is not a JSON object.",
@@ -967,6 +1023,71 @@ class BackupViewSet(viewsets.ModelViewSet):
             seen_item_ids.add(item_id)
         return None
 
+    @staticmethod
+    def _restore_too_large(item_count, max_items):
+        return error_response(
+            message=(
+                f"Backup too large: {item_count} items exceeds the "
+                f"server limit of {max_items}. Split the backup or "
+                "raise VAULT_BACKUP_MAX_RESTORE_ITEMS in settings."
+            ),
+            code="restore_too_large",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            details={'item_count': item_count, 'limit': max_items},
+        )
+
+    def _open_streamed_backup(self, backup, stub):
+        """Readable binary stream for an ndjson-v1 backup, or None."""
+        if stub.get('storage') == 'db':
+            try:
+                return io.BytesIO(base64.b64decode(stub.get('data') or ''))
+            except (ValueError, TypeError, base64.binascii.Error):
+                return None
+        if not backup.cloud_storage_path:
+            return None
+        return CloudStorageService().open_backup_stream(backup.cloud_storage_path)
+
+    def _restore_from_stream(self, request, backup, stub):
+        """
+        Restore from an ndjson-v1 backup in two passes over the stream:
+        validate every line (no DB writes), then rewind and bulk-upsert.
+        Cloud objects are spooled to a local temp file so the second pass
+        does not download the backup again.
+        """
+        source = self._open_streamed_backup(backup, stub)
+        if source is None:
+            return error_response(
+                'Failed to download backup from cloud',
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        config = _stream_settings()
+        with tempfile.SpooledTemporaryFile(max_size=config['SPOOL_MAX_BYTES']) as spool:
+            try:
+                shutil.copyfileobj(source, spool)
+            finally:
+                source.close()
+
+            try:
+                spool.seek(0)
+                validation_error = self._validate_restore_payload(
+                    backup_stream.iter_backup_items(spool)
+                )
+            except backup_stream.BackupFormatError as exc:
+                logger.warning("streamed backup %s is unreadable: %s", backup.id, exc)
+                return error_response(
+                    'Stored backup is corrupt or truncated',
+                    code='corrupt_backup',
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            if validation_error is not None:
+                return validation_error
+
+            spool.seek(0)
+            return self._bulk_restore(
+                request, backup, backup_stream.iter_backup_items(spool),
+            )
+
     def _restore_from_items(self, request, backup, items):
         """
         Batch-write a list of (already field-level encrypted) items.
@@ -984,27 +1105,44 @@ class BackupViewSet(viewsets.ModelViewSet):
         validation_error = self._validate_restore_payload(items)
         if validation_error is not None:
             return validation_error
+        return self._bulk_restore(request, backup, iter(items))
+
+    def _bulk_restore(self, request, backup, items):
+        """
+        Upsert validated items in ``RESTORE_BATCH_SIZE`` batches.
 
+        Each batch is one ``bulk_create(update_conflicts=True)`` keyed on
+        ``item_id`` instead of an ``update_or_create`` per item. Everything
+        still runs in one transaction so ``clear_existing`` is rolled back
+        if any batch fails.
+        """
+        batch_size = max(1, int(_stream_settings()['RESTORE_BATCH_SIZE']))
         clear_existing = bool(request.data.get('clear_existing', False))
         restored_count = 0
         try:
             with transaction.atomic():
+                # Restored items and removed ones go into the sync feed
+                # so other devices pick them up on their next delta sync.
+                salt_row = sync_feed.lock_sequence(request.user)
+                cleared = set()
                 if clear_existing:
-                    EncryptedVaultItem.objects.filter(user=request.user).delete()
-
-                for item_data in items:
-                    item_id = item_data.get('item_id')
-                    EncryptedVaultItem.objects.update_or_create(
-                        user=request.user,
-                        item_id=item_id,
-                        defaults={
-                            'item_type': item_data.get('item_type', 'password'),
-                            'encrypted_data': item_data.get('encrypted_data', ''),
-                            'favorite': item_data.get('favorite', False),
-                            'tags': item_data.get('tags', []),
-                        },
+                    existing = EncryptedVaultItem.objects.filter(user=request.user)
+                    cleared = set(existing.values_list('item_id', flat=True))
+                    existing.delete()
+
+                while True:
+                    batch = list(itertools.islice(items, batch_size))
+                    if not batch:
+                        break
+                    first_seq = sync_feed.allocate(salt_row, len(batch))
+                    self._upsert_items(request.user, batch, first_seq)
+                    cleared.difference_update(item_data['item_id'] for item_data in batch)
+                    restored_count += len(batch)
+
+                if cleared:
+                    sync_feed.record_deletions(
+                        request.user, sorted(cleared), sync_feed.allocate(salt_row, len(cleared)),
                     )
-                    restored_count += 1
         except Exception as exc:
             # Tx already rolled back by atomic() — live vault preserved.
             logger.exception("backup restore failed mid-batch: %s", exc)
@@ -1021,3 +1159,29 @@ class BackupViewSet(viewsets.ModelViewSet):
             'backup_name': backup.name,
             'backup_date': backup.created_at,
         })
+
+    @staticmethod
+    def _upsert_items(user, batch, first_seq=0):
+        # item_id is globally unique: an upsert must never take over a
+        # row that belongs to another user.
+        item_ids = [item_data['item_id'] for item_data in batch]
+        if EncryptedVaultItem.objects.filter(item_id__in=item_ids).exclude(user=user).exists():
+            raise IntegrityError("restore item_id collides with another user's item")
+
+        EncryptedVaultItem.objects.bulk_create(
+            [
+                EncryptedVaultItem(
+                    user=user,
+                    item_id=item_data['item_id'],
+                    item_type=item_data.get('item_type', 'password'),
+                    encrypted_data=item_data.get('encrypted_data', ''),
+                    favorite=item_data.get('favorite', False),
+                    tags=item_data.get('tags', []),
+                    sync_seq=(first_seq + offset) if first_seq else 0,
+                )
+                for offset, item_data in enumerate(batch)
+            ],
+            update_conflicts=True,
+            unique_fields=['item_id'],
+            update_fields=['item_type', 'encrypted_data', 'favorite', 'tags', 'updated_at', 'sync_seq'],
+        )
@@ -9,8 +9,11 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 from vault.models.vault_models import EncryptedVaultItem
-from vault.models import UserSalt, DeletedItem, AuditLog
+from vault.models import UserSalt, DeletedItem
 from vault.serializer import VaultItemSerializer, SyncSerializer
+from vault.services import sync_feed
+from vault.services.audit_log import record_audit_event
+import itertools
 import json
 
 # Import the standardized response helpers
@@ -19,6 +22,9 @@ from .api_views import error_response, success_response
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT/UPDATE statement when applying a sync batch.
+SYNC_WRITE_BATCH_SIZE = 500
+
 
 class _HookFailed(Exception):
     """Security hook (honeypot / self-destruct) errored; fail closed."""
@@ -211,12 +217,15 @@ class VaultItemViewSet(viewsets.ModelViewSet):
             )
             
         try:
-            # Save the item
-            item = serializer.save(user=request.user)
+            # Save the item at the next position in the sync feed
+            with transaction.atomic():
+                item = serializer.save(
+                    user=request.user, sync_seq=sync_feed.next_seq(request.user),
+                )
             
             # Log the action
-            AuditLog.objects.create(
-                user=request.user,
+            record_audit_event(
+                user_id=request.user.pk,
                 action='create_item',
                 item_type=item.item_type,
                 status='success'
@@ -255,11 +264,12 @@ class VaultItemViewSet(viewsets.ModelViewSet):
             )
             
         try:
-            item = serializer.save()
+            with transaction.atomic():
+                item = serializer.save(sync_seq=sync_feed.next_seq(request.user))
             
             # Log the action
-            AuditLog.objects.create(
-                user=request.user,
+            record_audit_event(
+                user_id=request.user.pk,
                 action='update_item',
                 item_type=item.item_type,
                 status='success'
@@ -288,19 +298,18 @@ class VaultItemViewSet(viewsets.ModelViewSet):
             )
             
         try:
-            # Store deleted item ID for syncing
-            DeletedItem.objects.create(
-                user=request.user,
-                item_id=instance.item_id,
-                deleted_at=timezone.now()
-            )
-            
-            # Delete the item
-            instance.delete()
+            with transaction.atomic():
+                # Store deleted item ID for syncing
+                sync_feed.record_deletions(
+                    request.user, [instance.item_id], sync_feed.next_seq(request.user),
+                )
+
+                # Delete the item
+                instance.delete()
             
             # Log the action
-            AuditLog.objects.create(
-                user=request.user,
+            record_audit_event(
+                user_id=request.user.pk,
                 action='delete_item',
                 item_type=instance.item_type,
                 status='success'
@@ -324,14 +333,27 @@ class VaultItemViewSet(viewsets.ModelViewSet):
         
         This endpoint enables bidirectional sync between client and server:
         1. Client sends local changes (items and deletions)
-        2. Server processes these changes
-        3. Server returns changes that occurred since client's last sync
+        2. Server applies them as one batch
+        3. Server returns changes the client has not seen yet
+
+        Two modes:
+
+        * **Delta** (send ``since_seq``): every change to the vault has a
+          position in a per-user sequence (see vault/services/sync_feed.py).
+          The response carries at most ``page_size`` changes after
+          ``since_seq`` plus the ``cursor`` to send next; while
+          ``has_more`` is true the client keeps calling with the new
+          cursor (and no local changes) to page through its catch-up.
+        * **Legacy** (``last_sync`` timestamp only): returns every item
+          updated after ``last_sync`` in one response.
         
         Request format:
         {
-            "last_sync": "2023-01-01T00:00:00Z",  // ISO timestamp of last sync
+            "since_seq": 1234,                   // delta cursor (0 = full sync)
+            "page_size": 500,                    // optional, delta mode only
+            "last_sync": "2023-01-01T00:00:00Z",  // legacy: ISO timestamp of last sync
             "items": [                           // Array of changed items
-                { item_id: "uuid", ... }
+                { item_id: "uuid", base_seq: 1200, ... }
             ],
             "deleted_items": ["item_id1", ...]   // Array of deleted item IDs
         }
@@ -342,10 +364,14 @@ class VaultItemViewSet(viewsets.ModelViewSet):
             "message": "Sync completed successfully",
             "items": [...],            // Server-side changes
             "deleted_items": [...],    // Server-side deletions
+            "cursor": 1734,            // delta mode: next since_seq
+            "has_more": false,         // delta mode: more pages pending
+            "conflicts": [...],        // items whose base_seq is stale
+            "rejected_items": [...],   // items that could not be applied
             "sync_time": "2023..."     // Current server time for next sync
         }
         """
-        serializer = SyncSerializer(data=request.data)
+        serializer = SyncSerializer(data=request.data, context={'request': request})
 
         if not serializer.is_valid():
             return error_response(
@@ -361,26 +387,26 @@ class VaultItemViewSet(viewsets.ModelViewSet):
         # second writer would silently win, dropping the first device's
         # edits. We now:
         #   (1) take a row lock on the per-user UserSalt for the
-        #       duration of the transaction (serialises concurrent
-        #       sync calls within the DB);
+        #       duration of any transaction that writes (serialises
+        #       concurrent writers within the DB; pure catch-up reads
+        #       don't need it);
         #   (2) honour an optional `expected_sync_version` from the
         #       client (optimistic concurrency). If present and it
-        #       doesn't match the locked row, return 409 Conflict so
+        #       doesn't match the row, return 409 Conflict so
         #       the client can re-fetch and merge.
-        #   (3) bump UserSalt.sync_version inside the same tx so the
+        #   (3) advance UserSalt.sync_version inside the same tx so the
         #       next sync attempt sees the new value.
-        from vault.models import UserSalt
         expected_version = request.data.get('expected_sync_version')
+        validated = serializer.validated_data
+        client_items = validated.get('items', [])
+        deleted_item_ids = validated.get('deleted_items', [])
+        did_mutate = bool(client_items) or bool(deleted_item_ids)
 
         try:
             with transaction.atomic():
-                # SELECT FOR UPDATE — any concurrent sync for this user
-                # blocks here until our transaction commits.
                 salt_row = (
-                    UserSalt.objects
-                    .select_for_update()
-                    .filter(user=request.user)
-                    .first()
+                    sync_feed.lock_sequence(request.user) if did_mutate
+                    else UserSalt.objects.filter(user=request.user).first()
                 )
                 if salt_row is None:
                     return error_response(
@@ -415,49 +441,45 @@ class VaultItemViewSet(viewsets.ModelViewSet):
                             },
                         )
 
-                last_sync = serializer.validated_data.get('last_sync')
-                client_items = serializer.validated_data.get('items', [])
-                deleted_item_ids = serializer.validated_data.get('deleted_items', [])
+                # Apply client-side changes. sync_version only advances
+                # when something was actually written (PR #272 review:
+                # background polls must not 409 each other).
+                outcome = {'conflicts': [], 'rejected_items': []}
+                if did_mutate:
+                    outcome = self._apply_sync_changes(
+                        request.user, salt_row, client_items, deleted_item_ids,
+                    )
 
-                # Get server-side changes since last_sync
+                if 'since_seq' in validated:
+                    page_size = min(
+                        validated.get('page_size') or sync_feed.default_page_size(),
+                        sync_feed.page_size_limit(),
+                    )
+                    page = sync_feed.read_changes(
+                        request.user, validated['since_seq'], page_size,
+                        high_water=salt_row.sync_version,
+                    )
+                    return success_response({
+                        'items': self.get_serializer(page.items, many=True).data,
+                        'deleted_items': page.deleted_item_ids,
+                        'cursor': page.cursor,
+                        'has_more': page.has_more,
+                        'sync_time': timezone.now(),
+                        'sync_version': salt_row.sync_version,
+                        **outcome,
+                    }, message="Sync completed successfully")
+
+                # Legacy mode: everything changed since last_sync.
+                last_sync = validated.get('last_sync')
                 server_items = self.get_queryset()
-                if last_sync:
-                    server_items = server_items.filter(updated_at__gt=last_sync)
-
-                # Get deleted items since last_sync
                 server_deleted = []
                 if last_sync:
+                    server_items = server_items.filter(updated_at__gt=last_sync)
                     server_deleted = DeletedItem.objects.filter(
                         user=request.user,
                         deleted_at__gt=last_sync
                     ).values_list('item_id', flat=True)
 
-                # Process client-side changes
-                for item_data in client_items:
-                    self._process_sync_item(item_data)
-
-                # Process client-side deletions
-                if deleted_item_ids:
-                    self.get_queryset().filter(item_id__in=deleted_item_ids).delete()
-
-                # Bump sync_version under the same lock IFF the sync
-                # actually mutated server state.
-                #
-                # Audit-fix (PR #272 review): the previous code bumped
-                # the version on every successful sync, including pure
-                # read/poll requests. That made the token track
-                # request count rather than data version — and meant
-                # two devices doing benign background polls would
-                # 409 each other on the next mutating sync even
-                # though neither had written anything. We now only
-                # bump when there were client items to write or
-                # deletes to apply.
-                did_mutate = bool(client_items) or bool(deleted_item_ids)
-                if did_mutate:
-                    salt_row.sync_version = (salt_row.sync_version or 0) + 1
-                    salt_row.save(update_fields=['sync_version'])
-
-                # Return server-side changes
                 server_items_serializer = self.get_serializer(server_items, many=True)
 
                 return success_response({
@@ -465,6 +487,7 @@ class VaultItemViewSet(viewsets.ModelViewSet):
                     'deleted_items': list(server_deleted),
                     'sync_time': timezone.now(),
                     'sync_version': salt_row.sync_version,
+                    **outcome,
                 }, message="Sync completed successfully")
                 
         except Exception as e:
@@ -474,33 +497,68 @@ class VaultItemViewSet(viewsets.ModelViewSet):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _process_sync_item(self, item_data):
+    def _apply_sync_changes(self, user, salt_row, client_items, deleted_item_ids):
         """
-        Helper method to process a single item during sync
-        Returns the processed item
+        Apply one sync request's changes as a batch.
+
+        Existing items are loaded with a single query, written back with
+        ``bulk_update``, new items go through ``bulk_create`` and deletions
+        become tombstones in the change feed. Each applied change gets its
+        own sequence number from the locked ``salt_row``.
         """
-        item_id = item_data.get('item_id')
-        if not item_id:
-            return None
-            
-        try:
-            # Update existing item
-            existing_item = self.get_queryset().get(item_id=item_id)
-            item_serializer = self.get_serializer(
-                existing_item, 
-                data=item_data, 
-                partial=True
+        # Last write wins inside a single request.
+        incoming = {item_data['item_id']: dict(item_data) for item_data in client_items}
+        existing = {
+            item.item_id: item
+            for item in EncryptedVaultItem.objects.filter(item_id__in=list(incoming))
+        }
+
+        conflicts, rejected = [], []
+        to_create, to_update, update_fields = [], [], set()
+        for item_id, item_data in incoming.items():
+            base_seq = item_data.pop('base_seq', None)
+            current = existing.get(item_id)
+            if current is None:
+                if not item_data.get('encrypted_data') or not item_data.get('item_type'):
+                    rejected.append({'item_id': item_id, 'reason': 'missing_fields'})
+                    continue
+                to_create.append(EncryptedVaultItem(user=user, **item_data))
+            elif current.user_id != user.id:
+                # item_id is globally unique; don't reveal who owns it.
+                rejected.append({'item_id': item_id, 'reason': 'item_id_unavailable'})
+            elif base_seq is not None and current.sync_seq > base_seq:
+                conflicts.append({'item_id': item_id, 'server_seq': current.sync_seq})
+            else:
+                item_data.pop('item_id')
+                for name, value in item_data.items():
+                    setattr(current, name, value)
+                update_fields.update(item_data)
+                to_update.append(current)
+
+        deletions = list(
+            EncryptedVaultItem.objects
+            .filter(user=user, item_id__in=deleted_item_ids)
+            .values_list('item_id', flat=True)
+        )
+
+        first_seq = sync_feed.allocate(salt_row, len(to_update) + len(to_create) + len(deletions))
+        now = timezone.now()
+        for offset, item in enumerate(itertools.chain(to_update, to_create)):
+            item.sync_seq = first_seq + offset
+            item.updated_at = now
+
+        if to_update:
+            EncryptedVaultItem.objects.bulk_update(
+                to_update,
+                sorted(update_fields | {'sync_seq', 'updated_at'}),
+                batch_size=SYNC_WRITE_BATCH_SIZE,
             )
-            
-            if item_serializer.is_valid():
-                return item_serializer.save()
-                
-        except EncryptedVaultItem.DoesNotExist:
-            # Create new item
-            item_data['user'] = self.request.user.id
-            item_serializer = self.get_serializer(data=item_data)
-            
-            if item_serializer.is_valid():
-                return item_serializer.save()
-                
-        return None
+        if to_create:
+            EncryptedVaultItem.objects.bulk_create(to_create, batch_size=SYNC_WRITE_BATCH_SIZE)
+        if deletions:
+            EncryptedVaultItem.objects.filter(user=user, item_id__in=deletions).delete()
+            sync_feed.record_deletions(
+                user, deletions, first_seq + len(to_update) + len(to_create),
+            )
+
+        return {'conflicts': conflicts, 'rejected_items': rejected}